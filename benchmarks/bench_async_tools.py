@@ -0,0 +1,102 @@
+# -*- coding: utf-8 -*-
+"""混合负载下同步工具与异步工具的延迟对比
+
+一个“慢”机器人持续执行耗时的运动指令，同时另一组机器人上有高频的状态查询。
+sync 模式与原先的同步工具一样直接在事件循环中执行阻塞调用；
+async 模式通过 RobotExecutor 把调用放到各机器人的线程池中。
+输出状态查询的 p50/p99 延迟。
+
+运行:
+    python benchmarks/bench_async_tools.py --move-ms 500 --status-ms 2
+"""
+import argparse
+import asyncio
+import statistics
+import time
+
+from agilebot_mcp.executor import RobotExecutor
+from agilebot_mcp.registry import RobotRegistry, with_robot_lock
+
+
+class FakeArm:
+    def __init__(self, move_latency, status_latency):
+        self.move_latency = move_latency
+        self.status_latency = status_latency
+
+    def move_line(self):
+        time.sleep(self.move_latency)
+        return 0
+
+    def get_robot_status(self):
+        time.sleep(self.status_latency)
+        return "ROBOT_IDLE", 0
+
+
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+async def scenario(mode, args):
+    registry = RobotRegistry()
+    robot_lock = with_robot_lock(registry)
+    executor = RobotExecutor(pool_size=args.pool_size, queue_depth=args.queue_depth)
+    slow_ip = "10.27.1.1"
+    fast_ips = [f"10.27.1.{i + 2}" for i in range(args.fast_robots)]
+    for ip in [slow_ip] + fast_ips:
+        registry[ip] = FakeArm(args.move_ms / 1000.0, args.status_ms / 1000.0)
+
+    @robot_lock
+    def move(ip):
+        return registry[ip].move_line()
+
+    @robot_lock
+    def status(ip):
+        return registry[ip].get_robot_status()
+
+    async def call(ip, func):
+        if mode == "sync":
+            return func(ip)
+        return await executor.run(ip, func)
+
+    latencies = []
+    deadline = time.perf_counter() + args.duration
+
+    async def mover():
+        while time.perf_counter() < deadline:
+            await call(slow_ip, move)
+            await asyncio.sleep(0)
+
+    # 请求到达时间也计入延迟：事件循环被阻塞时，排队等待的时间同样由客户端承担
+    async def timed_poller(ip):
+        while time.perf_counter() < deadline:
+            issued = time.perf_counter()
+            await asyncio.sleep(args.interval_ms / 1000.0)
+            await call(ip, status)
+            latencies.append(time.perf_counter() - issued - args.interval_ms / 1000.0)
+
+    await asyncio.gather(mover(), *(timed_poller(ip) for ip in fast_ips))
+    executor.shutdown()
+    return latencies
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--duration", type=float, default=5.0, help="测试时长（秒）")
+    parser.add_argument("--move-ms", type=float, default=500.0, help="模拟运动指令耗时（毫秒）")
+    parser.add_argument("--status-ms", type=float, default=2.0, help="模拟状态查询耗时（毫秒）")
+    parser.add_argument("--interval-ms", type=float, default=10.0, help="状态查询间隔（毫秒）")
+    parser.add_argument("--fast-robots", type=int, default=4, help="执行状态查询的机器人数量")
+    parser.add_argument("--pool-size", type=int, default=2, help="每个机器人的线程数")
+    parser.add_argument("--queue-depth", type=int, default=16, help="每个机器人的排队深度")
+    args = parser.parse_args()
+
+    print(f"{'mode':>6} {'calls':>7} {'p50_ms':>8} {'p99_ms':>8} {'max_ms':>8}")
+    for mode in ("sync", "async"):
+        latencies = asyncio.run(scenario(mode, args))
+        print(f"{mode:>6} {len(latencies):>7} {statistics.median(latencies) * 1000:>8.1f} "
+              f"{percentile(latencies, 99) * 1000:>8.1f} {max(latencies) * 1000:>8.1f}")
+
+
+if __name__ == "__main__":
+    main()
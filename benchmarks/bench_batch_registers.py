@@ -0,0 +1,66 @@
+# -*- coding: utf-8 -*-
+"""逐个读取与批量读取寄存器的耗时对比
+
+通过进程内的 FastMCP 实例调用工具，对比 N 次 read_R 与 1 次 read_registers_tool。
+--rtt-ms 模拟客户端与服务器之间每次工具调用的往返延迟。
+
+运行:
+    python benchmarks/bench_batch_registers.py --count 200 --rpc-ms 2 --rtt-ms 1
+"""
+import argparse
+import asyncio
+import time
+
+from agilebot_mcp.sdk import StatusCodeEnum
+from agilebot_mcp.mcp_tools import mcp
+from agilebot_mcp.robot_core import robot_list
+
+IP = "10.27.1.254"
+
+
+class FakeRegister:
+    def __init__(self, latency):
+        self.latency = latency
+
+    def read_R(self, index):
+        time.sleep(self.latency)
+        return float(index), StatusCodeEnum.OK
+
+
+class FakeArm:
+    def __init__(self, latency):
+        self.register = FakeRegister(latency)
+
+
+async def single_calls(count, rtt):
+    for index in range(1, count + 1):
+        await asyncio.sleep(rtt)
+        await mcp.call_tool("read_R", {"ip": IP, "index": index})
+
+
+async def batch_call(count, rtt):
+    await asyncio.sleep(rtt)
+    await mcp.call_tool("read_registers_tool", {"ip": IP, "kind": "R", "start": 1, "end": count})
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--count", type=int, default=200, help="读取的寄存器数量")
+    parser.add_argument("--rpc-ms", type=float, default=2.0, help="模拟每次SDK调用耗时（毫秒）")
+    parser.add_argument("--rtt-ms", type=float, default=1.0, help="模拟每次MCP工具调用的往返延迟（毫秒）")
+    args = parser.parse_args()
+
+    robot_list[IP] = FakeArm(args.rpc_ms / 1000.0)
+    rtt = args.rtt_ms / 1000.0
+
+    results = {}
+    for name, scenario in (("single", single_calls), ("batch", batch_call)):
+        start = time.perf_counter()
+        asyncio.run(scenario(args.count, rtt))
+        results[name] = time.perf_counter() - start
+        print(f"{name:>7}: {results[name] * 1000:8.1f} ms")
+    print(f"speedup: {results['single'] / results['batch']:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+# -*- coding: utf-8 -*-
+"""多控制柜文件部署的基准测试
+
+在模拟器上把一个程序包（example/file_manager 中的程序、离线轨迹和CSV）部署到 --robots 台控制柜，
+模拟器按 --rate-kbps 计算传输时间，每次调用另有固定延迟和随机抖动。对比:
+    sequential: 逐台、逐个文件上传，每次操作新建 FileManager（改造前的写法）
+    upload_files: file_transfer.upload_files 一次调用并行部署
+    upload_files_unchanged: 内容未变化时再次部署（全部跳过）
+以及逐台单独部署时最慢的一台的耗时。upload_files 超过最慢一台的 --max-ratio 倍时以退出码1结束。
+
+运行:
+    python benchmarks/bench_file_transfer.py --robots 20
+    python benchmarks/bench_file_transfer.py --robots 20 --rate-kbps 5000 --output file_transfer.json
+"""
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+
+from agilebot_mcp import sdk
+from agilebot_mcp.backend import set_backend, create_file_manager
+from agilebot_mcp.simulator import configure_simulator, reset_simulator
+from agilebot_mcp.file_transfer import upload_files, file_managers, manifest, FILE_TYPES
+
+from harness import run_meta, save_results
+
+EXAMPLE_DIR = Path(__file__).resolve().parent.parent / "Python_v1.7.1.3" / "example" / "file_manager"
+BUNDLE = [
+    {"path": str(EXAMPLE_DIR / "test_prog"), "file_type": "program"},
+    {"path": str(EXAMPLE_DIR / "test_torque.trajectory"), "file_type": "trajectory"},
+    {"path": str(EXAMPLE_DIR / "test.csv"), "file_type": "tmp"},
+]
+
+
+def deploy_sequential(ips):
+    """改造前的写法：逐台、逐个文件上传，每次新建 FileManager"""
+    for ip in ips:
+        for item in BUNDLE:
+            manager = create_file_manager(ip)
+            ret = manager.upload(item["path"], getattr(sdk, FILE_TYPES[item["file_type"]]), True)
+            if ret != sdk.StatusCodeEnum.OK:
+                raise RuntimeError(f"上传失败: {ip}, {item['path']}")
+
+
+def deploy(ips):
+    result = json.loads(upload_files(ips, BUNDLE))
+    if result["status"] != "success" or result["failed"]:
+        raise RuntimeError(f"部署失败: {result}")
+    return result
+
+
+def timed(func, *args):
+    start = time.perf_counter()
+    func(*args)
+    return time.perf_counter() - start
+
+
+def fresh():
+    reset_simulator()
+    file_managers.clear()
+    manifest._entries.clear()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--robots", type=int, default=20, help="控制柜数量")
+    parser.add_argument("--rate-kbps", type=float, default=5000, help="每台控制柜的传输速度（KB/s）")
+    parser.add_argument("--latency-ms", type=float, default=5.0, help="模拟器每次调用的固定延迟（毫秒）")
+    parser.add_argument("--jitter-ms", type=float, default=20.0, help="模拟器每次调用的随机延迟上限（毫秒）")
+    parser.add_argument("--max-ratio", type=float, default=2.0, help="upload_files 允许的耗时上限（最慢一台的倍数）")
+    parser.add_argument("--output", help="保存结果的JSON文件")
+    args = parser.parse_args()
+
+    set_backend("sim")
+    configure_simulator(latency=args.latency_ms / 1000.0, jitter=args.jitter_ms / 1000.0, failure_rate=0.0,
+                        seed=0, file_transfer_rate=args.rate_kbps * 1024)
+    ips = [f"10.28.{index // 250}.{index % 250 + 1}" for index in range(args.robots)]
+
+    fresh()
+    single = max(timed(deploy_sequential, [ip]) for ip in ips)
+    fresh()
+    sequential = timed(deploy_sequential, ips)
+    fresh()
+    parallel = timed(deploy, ips)
+    unchanged_start = time.perf_counter()
+    skipped = deploy(ips)["skipped"]
+    unchanged = time.perf_counter() - unchanged_start
+
+    results = {
+        "deploy/slowest_single": {"seconds": round(single, 3)},
+        "deploy/sequential": {"seconds": round(sequential, 3)},
+        "deploy/upload_files": {"seconds": round(parallel, 3), "ratio_to_slowest": round(parallel / single, 2)},
+        "deploy/upload_files_unchanged": {"seconds": round(unchanged, 3), "skipped": skipped},
+    }
+    print(f"{args.robots} 台控制柜, 程序包 {len(BUNDLE)} 个文件, 传输速度 {args.rate_kbps:.0f} KB/s")
+    for name, stats in results.items():
+        extra = f"（最慢一台的 {stats['ratio_to_slowest']} 倍）" if "ratio_to_slowest" in stats else ""
+        print(f"{name[7:]:<26}{stats['seconds']:>10.3f} s{extra}")
+
+    if args.output:
+        save_results(args.output, run_meta(args), results)
+        print(f"结果已保存到 {args.output}")
+
+    if parallel > single * args.max_ratio:
+        print(f"upload_files 耗时 {parallel:.3f} s，超过最慢一台的 {args.max_ratio} 倍")
+        sys.exit(1)
+    sys.exit(0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+# -*- coding: utf-8 -*-
+"""多机器人批量操作的基准测试
+
+在模拟器上连接 --robots 台机器人（每次调用延迟 --latency-ms 毫秒，另有随机抖动），对每个操作比较:
+    sequential: 客户端逐台调用单机工具（改造前的做法）
+    fleet_call: 一次 fleet_call_tool 调用并发执行
+fleet_call 的耗时超过单次调用延迟（固定延迟加抖动上限）的 --max-ratio 倍时以退出码1结束。
+
+运行:
+    python benchmarks/bench_fleet.py --robots 30
+    python benchmarks/bench_fleet.py --robots 30 --latency-ms 20 --output fleet.json
+"""
+import argparse
+import asyncio
+import json
+import logging
+import sys
+import tempfile
+import time
+
+from agilebot_mcp.backend import set_backend
+from agilebot_mcp.simulator import configure_simulator, reset_simulator
+from agilebot_mcp.mcp_tools import mcp
+from agilebot_mcp.robot_core import cleanup_robot_connections
+from agilebot_mcp.logging_setup import configure_logging, stop_logging
+
+from harness import run_meta, save_results
+
+# (单机工具, 单机参数, 批量操作名, 批量参数)
+CASES = (
+    ("write_R", {"index": 1, "value": 1.5}, "write_R_register", {"index": 1, "value": 1.5}),
+    ("read_R", {"index": 1}, "read_R_register", {"index": 1}),
+    ("set_current_payload_tool", {"payload_id": 0}, "set_current_payload", {"payload_id": 0}),
+    ("get_robot_info_tool", {}, "get_robot_info", {}),
+)
+
+
+async def call_tool(name, arguments):
+    result = await mcp.call_tool(name, arguments)
+    return json.loads(result[0].text)
+
+
+async def run(args):
+    ips = [f"10.29.{index // 250}.{index % 250 + 1}" for index in range(args.robots)]
+    for ip in ips:
+        await call_tool("connect_robot_tool", {"ip": ip})
+    await call_tool("define_robot_group_tool", {"name": "cells", "ips": json.dumps(ips)})
+
+    results = {}
+    for tool, tool_args, operation, operation_args in CASES:
+        start = time.perf_counter()
+        for ip in ips:
+            response = await call_tool(tool, dict({"ip": ip}, **tool_args))
+            if response.get("status") != "success":
+                raise RuntimeError(f"{tool} 失败: {response}")
+        sequential = time.perf_counter() - start
+
+        start = time.perf_counter()
+        response = await call_tool("fleet_call_tool", {"operation": operation, "args": json.dumps(operation_args),
+                                                       "group": "cells", "concurrency": args.concurrency})
+        fleet = time.perf_counter() - start
+        if response["succeeded"] != len(ips):
+            raise RuntimeError(f"{operation} 部分失败: {response}")
+        results[f"fleet/{operation}"] = {
+            "sequential_ms": round(sequential * 1000, 1),
+            "fleet_ms": round(fleet * 1000, 1),
+            "speedup": round(sequential / fleet, 1),
+            "p50_robot_ms": response["latency_ms"]["p50"],
+            "max_robot_ms": response["latency_ms"]["max"],
+        }
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--robots", type=int, default=30, help="机器人数量")
+    parser.add_argument("--latency-ms", type=float, default=20.0, help="模拟器每次调用的固定延迟（毫秒）")
+    parser.add_argument("--jitter-ms", type=float, default=10.0, help="模拟器每次调用的随机延迟上限（毫秒）")
+    parser.add_argument("--concurrency", type=int, default=32, help="fleet_call_tool 的并发数")
+    parser.add_argument("--max-ratio", type=float, default=3.0, help="fleet_call 允许的耗时上限（单次调用延迟的倍数）")
+    parser.add_argument("--output", help="保存结果的JSON文件")
+    args = parser.parse_args()
+
+    set_backend("sim")
+    reset_simulator()
+    configure_simulator(latency=args.latency_ms / 1000.0, jitter=args.jitter_ms / 1000.0, failure_rate=0.0, seed=0)
+    # 与服务器一样使用后台队列写日志，不在调用线程中同步输出到终端
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    with tempfile.TemporaryDirectory() as log_dir:
+        configure_logging(log_dir=log_dir)
+        try:
+            results = asyncio.run(run(args))
+        finally:
+            cleanup_robot_connections()
+            stop_logging()
+
+    print(f"{args.robots} 台机器人, 调用延迟 {args.latency_ms:.0f} ms + 抖动 {args.jitter_ms:.0f} ms")
+    print(f"{'操作':<24}{'逐台(ms)':>12}{'批量(ms)':>12}{'加速比':>10}{'单台最大(ms)':>16}")
+    for name, stats in results.items():
+        print(f"{name[6:]:<24}{stats['sequential_ms']:>12.1f}{stats['fleet_ms']:>12.1f}"
+              f"{stats['speedup']:>10.1f}{stats['max_robot_ms']:>16.1f}")
+
+    if args.output:
+        save_results(args.output, run_meta(args), results)
+        print(f"结果已保存到 {args.output}")
+
+    limit = (args.latency_ms + args.jitter_ms) * args.max_ratio
+    slow = [name for name, stats in results.items() if stats["fleet_ms"] > limit]
+    if slow:
+        print(f"以下操作的批量耗时超过 {limit:.0f} ms: {', '.join(slow)}")
+        sys.exit(1)
+    sys.exit(0)
+
+
+if __name__ == "__main__":
+    main()
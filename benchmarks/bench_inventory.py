@@ -0,0 +1,135 @@
+# -*- coding: utf-8 -*-
+"""按清单批量连接的基准测试
+
+在模拟器上生成一个 --robots 台机器人的清单（每次连接耗时 --connect-s 秒），对比:
+    lazy: 客户端逐台调用 connect_robot 后再发出第一个请求（改造前的做法）
+    bootstrap: 按清单以 --concurrency 的并发数连接，完成后再发出第一个请求
+并测量在批量连接刚开始时就发出的请求（在注册表中排队等待连接完成）的延迟。
+批量连接耗时超过理论值（按并发数分轮，每轮一次连接时间）的 --max-ratio 倍，
+或排队的请求失败时以退出码1结束。
+
+运行:
+    python benchmarks/bench_inventory.py
+    python benchmarks/bench_inventory.py --robots 32 --connect-s 0.3 --concurrency 16 --output inventory.json
+"""
+import argparse
+import json
+import logging
+import math
+import os
+import sys
+import tempfile
+import time
+
+from agilebot_mcp.backend import set_backend
+from agilebot_mcp.simulator import configure_simulator, reset_simulator
+from agilebot_mcp.robot_core import connect_robot, cleanup_robot_connections
+from agilebot_mcp.registers import read_R_register
+from agilebot_mcp.inventory import start_bootstrap
+from agilebot_mcp.logging_setup import configure_logging, stop_logging
+
+from harness import run_meta, save_results
+
+
+def first_requests(ips):
+    """每台机器人的第一个请求的延迟（毫秒）"""
+    latencies = []
+    for ip in ips:
+        start = time.perf_counter()
+        if json.loads(read_R_register(ip, 1))["status"] != "success":
+            raise RuntimeError(f"读取R寄存器失败: {ip}")
+        latencies.append((time.perf_counter() - start) * 1000)
+    return latencies
+
+
+def run_lazy(ips):
+    start = time.perf_counter()
+    latencies = []
+    for ip in ips:
+        request_start = time.perf_counter()
+        connect_robot(ip)
+        first_requests([ip])
+        latencies.append((time.perf_counter() - request_start) * 1000)
+    return time.perf_counter() - start, latencies
+
+
+def run_bootstrap(ips, path):
+    start = time.perf_counter()
+    bootstrap = start_bootstrap(path)
+    # 批量连接刚开始时对最后一台机器人发出的请求，排队等待连接完成
+    queued_start = time.perf_counter()
+    queued = json.loads(read_R_register(ips[-1], 1))
+    queued_ms = (time.perf_counter() - queued_start) * 1000
+    bootstrap.wait()
+    elapsed = time.perf_counter() - start
+    if bootstrap.describe()["connected"] != len(ips):
+        raise RuntimeError(f"批量连接未全部成功: {bootstrap.counts()}")
+    return elapsed, first_requests(ips), queued["status"] == "success", queued_ms
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--robots", type=int, default=32, help="清单中的机器人数量")
+    parser.add_argument("--connect-s", type=float, default=0.3, help="模拟的单次连接耗时（秒）")
+    parser.add_argument("--concurrency", type=int, default=16, help="批量连接的并发数")
+    parser.add_argument("--latency-ms", type=float, default=2.0, help="模拟器RPC延迟（毫秒）")
+    parser.add_argument("--max-ratio", type=float, default=1.5, help="批量连接允许的耗时上限（理论值的倍数）")
+    parser.add_argument("--output", help="保存结果的JSON文件")
+    args = parser.parse_args()
+
+    set_backend("sim")
+    configure_simulator(latency=args.latency_ms / 1000.0, jitter=0.0, failure_rate=0.0, seed=0,
+                        connect_time=args.connect_s)
+    ips = [f"10.31.{index // 250}.{index % 250 + 1}" for index in range(args.robots)]
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    with tempfile.TemporaryDirectory() as work_dir:
+        configure_logging(log_dir=work_dir)
+        path = os.path.join(work_dir, "inventory.json")
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({"concurrency": args.concurrency, "timeout": args.connect_s * 10,
+                       "robots": [{"ip": ip, "name": f"cell-{index}", "groups": [f"line-{index % 4}"]}
+                                  for index, ip in enumerate(ips)]}, f)
+        try:
+            reset_simulator()
+            lazy, lazy_first = run_lazy(ips)
+            cleanup_robot_connections()
+            reset_simulator()
+            bootstrap, warm_first, queued_ok, queued_ms = run_bootstrap(ips, path)
+        finally:
+            cleanup_robot_connections()
+            stop_logging()
+
+    expected = math.ceil(args.robots / args.concurrency) * args.connect_s
+    results = {
+        "inventory/lazy": {
+            "connect_all_s": round(lazy, 3),
+            "first_request_ms_max": round(max(lazy_first), 1),
+        },
+        "inventory/bootstrap": {
+            "connect_all_s": round(bootstrap, 3),
+            "expected_s": round(expected, 3),
+            "first_request_ms_max": round(max(warm_first), 1),
+            "queued_request_ok": queued_ok,
+            "queued_request_ms": round(queued_ms, 1),
+        },
+    }
+    print(f"{args.robots} 台机器人, 单次连接 {args.connect_s} 秒, 并发数 {args.concurrency}")
+    print(f"{'方式':<24}{'全部连接(s)':>14}{'首个请求最大(ms)':>20}")
+    for name, stats in results.items():
+        print(f"{name:<24}{stats['connect_all_s']:>14.3f}{stats['first_request_ms_max']:>20.1f}")
+    print(f"批量连接期间排队的请求: {'成功' if queued_ok else '失败'}, 延迟 {queued_ms:.1f} ms")
+
+    if args.output:
+        save_results(args.output, run_meta(args), results)
+        print(f"结果已保存到 {args.output}")
+
+    if not queued_ok or bootstrap > expected * args.max_ratio:
+        print(f"批量连接耗时 {bootstrap:.3f} 秒，理论值 {expected:.3f} 秒，或排队的请求失败")
+        sys.exit(1)
+    sys.exit(0)
+
+
+if __name__ == "__main__":
+    main()
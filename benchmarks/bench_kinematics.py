@@ -0,0 +1,163 @@
+# -*- coding: utf-8 -*-
+"""本地运动学与控制器转换RPC的对比
+
+在模拟器上随机生成 --poses 组关节值（模拟器RPC延迟 --latency-ms），对比:
+    controller: 逐个调用控制器的 convert_joint_to_cart / convert_cart_to_joint（改造前检查一批位姿的方式）
+    local: 一次 forward_kinematics / check_reachability 调用完成整批计算（含首次建立模型的耗时）
+并检查一致性：本地正解与控制器正解的位置/姿态偏差，以及按正解结果的姿态求逆解、
+再求正解回到原位姿的误差。偏差超过 --tolerance-mm，或有可达位姿被判为不可达时以退出码1结束。
+
+运行:
+    python benchmarks/bench_kinematics.py
+    python benchmarks/bench_kinematics.py --poses 5000 --latency-ms 5 --output kinematics.json
+"""
+import argparse
+import json
+import logging
+import sys
+import time
+
+import numpy as np
+
+from agilebot_mcp.backend import set_backend
+from agilebot_mcp.sdk import MotionPose, PoseType, StatusCodeEnum
+from agilebot_mcp.simulator import configure_simulator, reset_simulator
+from agilebot_mcp.robot_core import connect_robot, robot_list, cleanup_robot_connections
+from agilebot_mcp.kinematics import POSTURE_FIELDS, forward_kinematics, check_reachability, _rotation, _rotation_error
+
+from harness import run_meta, save_results
+
+IP = "10.34.1.1"
+# 随机关节值的范围（度），避开 J5 = 0 附近的腕部奇异位置
+JOINT_LOW = (-170, -90, -70, -170, 10, -180)
+JOINT_HIGH = (170, 90, 150, 170, 115, 180)
+
+
+def controller_forward(arm, joints):
+    poses, postures = [], []
+    for row in joints:
+        pose = MotionPose()
+        pose.pt = PoseType.JOINT
+        pose.joint.j1, pose.joint.j2, pose.joint.j3, pose.joint.j4, pose.joint.j5, pose.joint.j6 = row
+        cart, ret = arm.motion.convert_joint_to_cart(pose)
+        if ret != StatusCodeEnum.OK:
+            raise RuntimeError(f"控制器正解失败, 错误代码: {ret}")
+        position, posture = cart.cartData.position, cart.cartData.posture
+        poses.append([position.x, position.y, position.z, position.a, position.b, position.c])
+        postures.append([getattr(posture, field) for field in POSTURE_FIELDS])
+    return np.array(poses), postures
+
+
+def controller_inverse(arm, poses, postures):
+    reachable = 0
+    for row, posture in zip(poses, postures):
+        pose = MotionPose()
+        pose.pt = PoseType.CART
+        position = pose.cartData.position
+        position.x, position.y, position.z, position.a, position.b, position.c = row
+        for field, value in zip(POSTURE_FIELDS, posture):
+            setattr(pose.cartData.posture, field, value)
+        _, ret = arm.motion.convert_cart_to_joint(pose)
+        reachable += ret == StatusCodeEnum.OK
+    return reachable
+
+
+def _rotation_deg(poses, expected):
+    """两组 a、b、c 之间的最大旋转角（度），用旋转矩阵比较，不受欧拉角多解影响"""
+    error = _rotation_error(_rotation(expected[:, 3:]), _rotation(poses[:, 3:]))
+    return float(np.degrees(np.linalg.norm(error, axis=1)).max())
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--poses", type=int, default=1000, help="位姿数量")
+    parser.add_argument("--latency-ms", type=float, default=2.0, help="模拟器RPC延迟（毫秒）")
+    parser.add_argument("--tolerance-mm", type=float, default=0.01, help="允许的位置偏差（毫米）")
+    parser.add_argument("--seed", type=int, default=0, help="随机数种子")
+    parser.add_argument("--output", help="保存结果的JSON文件")
+    args = parser.parse_args()
+
+    logging.disable(logging.INFO)
+    set_backend("sim")
+    configure_simulator(latency=args.latency_ms / 1000.0, jitter=0.0, failure_rate=0.0, seed=0)
+    reset_simulator()
+    joints = np.random.default_rng(args.seed).uniform(JOINT_LOW, JOINT_HIGH, (args.poses, 6)).round(3)
+    try:
+        if json.loads(connect_robot(IP))["status"] != "success":
+            raise RuntimeError("连接模拟机器人失败")
+        arm = robot_list.get(IP)
+
+        start = time.perf_counter()
+        expected, expected_postures = controller_forward(arm, joints.tolist())
+        controller_fk = time.perf_counter() - start
+        start = time.perf_counter()
+        controller_reachable = controller_inverse(arm, expected.tolist(), expected_postures)
+        controller_ik = time.perf_counter() - start
+
+        start = time.perf_counter()
+        forward = json.loads(forward_kinematics(IP, joints.tolist()))
+        local_fk = time.perf_counter() - start
+        poses = np.array([[item["cartesian"][axis] for axis in ("x", "y", "z", "a", "b", "c")]
+                          for item in forward["poses"]])
+        postures = [[item["posture"][field] for field in POSTURE_FIELDS] for item in forward["poses"]]
+
+        # 同一姿态的位姿一起检查，每种姿态一次调用
+        groups = {}
+        for index, posture in enumerate(expected_postures):
+            groups.setdefault(tuple(posture), []).append(index)
+        solutions = [None] * len(poses)
+        start = time.perf_counter()
+        for posture, indexes in groups.items():
+            result = json.loads(check_reachability(IP, expected[indexes].tolist(),
+                                                   posture=dict(zip(POSTURE_FIELDS, posture))))
+            for index, item in zip(indexes, result["results"]):
+                solutions[index] = item
+        local_ik = time.perf_counter() - start
+
+        # 逆解结果再求正解，检查是否回到原位姿
+        solved = [index for index, item in enumerate(solutions) if item["reachable"]]
+        round_trip = json.loads(forward_kinematics(IP, [solutions[index]["joint"] for index in solved]))
+        round_trip = np.array([[item["cartesian"][axis] for axis in ("x", "y", "z")] for item in round_trip["poses"]])
+    finally:
+        cleanup_robot_connections()
+
+    results = {
+        "kinematics/controller": {
+            "forward_s": round(controller_fk, 3),
+            "inverse_s": round(controller_ik, 3),
+            "reachable": controller_reachable,
+        },
+        "kinematics/local": {
+            "forward_s": round(local_fk, 3),
+            "inverse_s": round(local_ik, 3),
+            "reachable": len(solved),
+            "verified": forward["verified"],
+            "forward_position_mm": round(float(np.abs(poses[:, :3] - expected[:, :3]).max()), 6),
+            "forward_angle_deg": round(_rotation_deg(poses, expected), 6),
+            "posture_mismatch": sum(posture != item for posture, item in zip(postures, expected_postures)),
+            "round_trip_position_mm": round(float(np.abs(round_trip - expected[solved, :3]).max()), 6),
+        },
+    }
+    controller, local = results["kinematics/controller"], results["kinematics/local"]
+    print(f"{args.poses} 个位姿, 模拟器RPC延迟 {args.latency_ms} ms")
+    print(f"{'方式':<24}{'正解(s)':>10}{'逆解(s)':>10}{'可达':>8}")
+    for name, stats in results.items():
+        print(f"{name:<24}{stats['forward_s']:>10.3f}{stats['inverse_s']:>10.3f}{stats['reachable']:>8}")
+    print(f"正解加速 {controller['forward_s'] / max(local['forward_s'], 1e-9):.1f}x, "
+          f"逆解加速 {controller['inverse_s'] / max(local['inverse_s'], 1e-9):.1f}x")
+    print(f"与控制器的偏差: 位置 {local['forward_position_mm']} mm, 姿态 {local['forward_angle_deg']} 度, "
+          f"姿态标志不一致 {local['posture_mismatch']} 个; 逆解往返位置误差 {local['round_trip_position_mm']} mm")
+
+    if args.output:
+        save_results(args.output, run_meta(args), results)
+        print(f"结果已保存到 {args.output}")
+
+    if (not local["verified"] or local["forward_position_mm"] > args.tolerance_mm or local["posture_mismatch"]
+            or local["reachable"] != args.poses or local["round_trip_position_mm"] > args.tolerance_mm):
+        print("本地运动学与控制器不一致，或有可达位姿被判为不可达")
+        sys.exit(1)
+    sys.exit(0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+# -*- coding: utf-8 -*-
+"""日志开销基准测试
+
+在模拟器后端（无延迟）上反复调用几个每次成功都会写 INFO 日志的工具，对比以下日志配置下的每秒调用数:
+    off: 根日志器级别为 WARNING，INFO 日志直接跳过
+    sync: 改造前的配置，调用线程中同步格式化并写入 RotatingFileHandler
+    queue: logging_setup.configure_logging，不限速
+    queue_limited: logging_setup.configure_logging，使用默认的限速和抽样
+另外单独测量一个线程中直接调用 logger.info 的开销（log/<配置>）。
+
+运行:
+    python benchmarks/bench_logging.py --iterations 2000
+    python benchmarks/bench_logging.py --iterations 2000 --output logging.json
+"""
+import argparse
+import asyncio
+import logging
+import sys
+import tempfile
+import time
+from logging.handlers import RotatingFileHandler
+from pathlib import Path
+
+from agilebot_mcp.backend import set_backend
+from agilebot_mcp.simulator import configure_simulator, reset_simulator
+from agilebot_mcp.mcp_tools import mcp
+from agilebot_mcp.logging_setup import configure_logging, stop_logging, LOG_FORMAT
+from agilebot_mcp.robot_core import cleanup_robot_connections
+from agilebot_mcp.executor import robot_executor
+
+from harness import measure, summarize, run_meta, save_results, print_results
+
+IP = "10.27.1.254"
+MODES = ("off", "sync", "queue", "queue_limited")
+CALLS = (
+    ("read_R", {"ip": IP, "index": 1}),
+    ("write_R", {"ip": IP, "index": 1, "value": 1.5}),
+    ("read_modbus_holding_regs_tool", {"ip": IP, "channel": 2, "slave_id": 1, "address": 0, "number": 8}),
+)
+
+
+def apply_mode(mode, log_dir):
+    """按模式配置根日志器，返回需要在测试结束时关闭的处理器"""
+    stop_logging()
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+        handler.close()
+    if mode == "off":
+        root.setLevel(logging.WARNING)
+        return None
+    if mode == "sync":
+        handler = RotatingFileHandler(str(Path(log_dir) / f"{mode}.log"), maxBytes=1024 * 1024,
+                                      backupCount=3, encoding="utf-8")
+        handler.setFormatter(logging.Formatter(LOG_FORMAT))
+        root.addHandler(handler)
+        root.setLevel(logging.INFO)
+        return handler
+    configure_logging(log_dir=str(Path(log_dir) / mode), rate=0 if mode == "queue" else 20)
+    return None
+
+
+def bench_logger(iterations):
+    logger = logging.getLogger("agilebot_mcp.bench")
+    latencies = []
+    for index in range(iterations):
+        start = time.perf_counter()
+        logger.info("读取R寄存器成功: %s, 索引: %s, 值: %s", IP, index, 1.5)
+        latencies.append(time.perf_counter() - start)
+    return summarize(latencies, sum(latencies))
+
+
+async def bench_tools(iterations):
+    await mcp.call_tool("connect_robot_tool", {"ip": IP})
+
+    async def call():
+        name, args = CALLS[call.index % len(CALLS)]
+        call.index += 1
+        return await mcp.call_tool(name, args)
+
+    call.index = 0
+    return await measure(call, iterations, warmup=20)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--iterations", type=int, default=2000, help="每种配置的计时调用次数")
+    parser.add_argument("--modes", nargs="+", default=list(MODES), choices=MODES)
+    parser.add_argument("--output", help="保存结果的JSON文件")
+    args = parser.parse_args()
+
+    set_backend("sim")
+    reset_simulator()
+    configure_simulator(latency=0.0, jitter=0.0, failure_rate=0.0, seed=0)
+
+    results = {}
+    with tempfile.TemporaryDirectory() as log_dir:
+        try:
+            for mode in args.modes:
+                handler = apply_mode(mode, log_dir)
+                results[f"log/{mode}"] = bench_logger(args.iterations)
+                results[f"tool/{mode}"] = asyncio.run(bench_tools(args.iterations))
+                stop_logging()
+                if handler is not None:
+                    logging.getLogger().removeHandler(handler)
+                    handler.close()
+        finally:
+            cleanup_robot_connections()
+            robot_executor.shutdown(wait=False)
+    print_results(results, columns=("p50_ms", "p95_ms", "p99_ms", "calls_per_s"))
+
+    if args.output:
+        save_results(args.output, run_meta(args), results)
+        print(f"结果已保存到 {args.output}")
+    sys.exit(0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+# -*- coding: utf-8 -*-
+"""离线轨迹就绪等待的基准测试
+
+在模拟器上运行离线轨迹任务（准备耗时 --prepare-s 秒），测量从机器人实际回到空闲
+到任务开始执行之间的延迟，以及等待期间的RPC查询次数；
+与SDK示例中每2秒查询一次 get_robot_status/get_servo_status 的固定轮询对比。
+
+运行:
+    python benchmarks/bench_offline_wait.py --runs 5
+    python benchmarks/bench_offline_wait.py --runs 5 --prepare-s 0.7 --output offline_wait.json
+"""
+import argparse
+import json
+import statistics
+import time
+
+from agilebot_mcp.backend import set_backend
+from agilebot_mcp.simulator import configure_simulator, reset_simulator
+from agilebot_mcp.robot_core import connect_robot, robot_list, cleanup_robot_connections
+from agilebot_mcp.offline_trajectory import run_offline_trajectory
+from agilebot_mcp.jobs import job_manager
+
+from harness import run_meta, save_results
+
+IP = "10.27.1.254"
+FIXED_INTERVAL = 2.0
+
+
+def wait_fixed(prepare_s):
+    """SDK示例的做法：准备后每2秒查询一次状态"""
+    with robot_list.lease(IP) as arm:
+        arm.trajectory.set_offline_trajectory_file("bench.trajectory")
+        arm.trajectory.prepare_offline_trajectory()
+    start = time.monotonic()
+    rpc = 0
+    while True:
+        time.sleep(FIXED_INTERVAL)
+        with robot_list.lease(IP) as arm:
+            robot_status, _ = arm.get_robot_status()
+            servo_status, _ = arm.get_servo_status()
+        rpc += 2
+        if str(robot_status).endswith("ROBOT_IDLE") and str(servo_status).endswith("SERVO_IDLE"):
+            break
+    return time.monotonic() - start - prepare_s, rpc
+
+
+def wait_adaptive(prepare_s):
+    result = json.loads(run_offline_trajectory(IP, "bench.trajectory", wait_finish=False))
+    job = job_manager.get(result["job_id"])
+    job.wait()
+    if job.state != "succeeded":
+        raise RuntimeError(job.error)
+    return job.result["ready_wait_s"] - prepare_s, job.result["rpc_checks"]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5, help="每种方式的运行次数")
+    parser.add_argument("--prepare-s", type=float, default=0.7, help="模拟的准备耗时（秒）")
+    parser.add_argument("--latency-ms", type=float, default=2.0, help="模拟器RPC延迟（毫秒）")
+    parser.add_argument("--output", help="保存结果的JSON文件")
+    args = parser.parse_args()
+
+    set_backend("sim")
+    reset_simulator()
+    configure_simulator(latency=args.latency_ms / 1000.0, jitter=0.0, failure_rate=0.0, seed=0,
+                        offline_prepare_time=args.prepare_s, offline_run_time=0.01)
+    connect_robot(IP)
+
+    results = {}
+    try:
+        for name, func in (("adaptive", wait_adaptive), ("fixed_2s", wait_fixed)):
+            delays, rpcs = [], []
+            for _ in range(args.runs):
+                delay, rpc = func(args.prepare_s)
+                delays.append(delay * 1000)
+                rpcs.append(rpc)
+                time.sleep(0.05)
+            results[f"offline_wait/{name}"] = {
+                "extra_wait_ms_mean": round(statistics.mean(delays), 1),
+                "extra_wait_ms_max": round(max(delays), 1),
+                "rpc_per_wait": round(statistics.mean(rpcs), 1),
+            }
+    finally:
+        cleanup_robot_connections()
+
+    print(f"{'方式':<24}{'额外等待均值(ms)':>18}{'额外等待最大(ms)':>18}{'RPC次数':>10}")
+    for name, stats in results.items():
+        print(f"{name:<24}{stats['extra_wait_ms_mean']:>18.1f}{stats['extra_wait_ms_max']:>18.1f}"
+              f"{stats['rpc_per_wait']:>10.1f}")
+
+    if args.output:
+        save_results(args.output, run_meta(args), results)
+        print(f"结果已保存到 {args.output}")
+
+
+if __name__ == "__main__":
+    main()
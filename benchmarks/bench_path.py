@@ -0,0 +1,143 @@
+# -*- coding: utf-8 -*-
+"""逐点发送运动指令与一次提交整条路径的对比
+
+通过进程内的 FastMCP 实例在模拟器上（RPC延迟 --latency-ms）执行一条 --points 个路径点的关节路径，
+--rtt-ms 模拟客户端与服务器之间每次工具调用的往返延迟。对比:
+    single: 每个路径点调用一次 move_robot_joint（每次都在服务器上做就绪检查），
+        再调用 get_current_joint_positions_tool 确认到位后发送下一个（改造前的方式）
+    path: 一次 run_path_tool 调用提交整条路径，之后每 --poll-ms 毫秒调用一次 get_job_tool 直到任务结束
+    bas: 一次 run_bas_script_tool 调用，路径点批量写入PR寄存器后编译为一个BAS脚本，一次RPC交给控制器执行
+三种方式结束后机器人都应停在最后一个路径点，否则以退出码1结束。
+
+运行:
+    python benchmarks/bench_path.py
+    python benchmarks/bench_path.py --points 100 --latency-ms 5 --rtt-ms 2 --output path.json
+"""
+import argparse
+import asyncio
+import json
+import logging
+import math
+import sys
+import time
+
+from agilebot_mcp.backend import set_backend
+from agilebot_mcp.sdk import PoseType
+from agilebot_mcp.simulator import configure_simulator, reset_simulator
+from agilebot_mcp.mcp_tools import mcp
+from agilebot_mcp.robot_core import connect_robot, robot_list, invalidate_robot_ready, cleanup_robot_connections
+
+from harness import run_meta, save_results
+
+IP = "10.36.1.1"
+AXES = ("j1", "j2", "j3", "j4", "j5", "j6")
+
+
+def waypoints(count):
+    """关节空间中的一段往复扫描路径"""
+    return [[round(30 * math.sin(2 * math.pi * i / count), 3), round(10 + 20 * i / count, 3), 20.0, 0.0,
+             round(45 + 15 * math.cos(2 * math.pi * i / count), 3), 0.0] for i in range(count)]
+
+
+async def call(name, arguments, rtt):
+    await asyncio.sleep(rtt)
+    result = await mcp.call_tool(name, dict(arguments, ip=IP))
+    return json.loads(result[0].text)
+
+
+async def single_calls(points, rtt, poll):
+    calls = 0
+    for point in points:
+        result = await call("move_robot_joint", {"joint_positions": json.dumps(point)}, rtt)
+        calls += 1
+        if result["status"] != "success":
+            raise RuntimeError(result["message"])
+        while True:
+            current = await call("get_current_joint_positions_tool", {}, rtt)
+            calls += 1
+            if all(abs(current["positions"][axis] - value) <= 0.01 for axis, value in zip(AXES, point)):
+                break
+            await asyncio.sleep(poll)
+    return calls
+
+
+async def path_call(points, rtt, poll):
+    result = await call("run_path_tool", {"waypoints": json.dumps(points)}, rtt)
+    if result["status"] != "success":
+        raise RuntimeError(result["message"])
+    calls = 1
+    while True:
+        await asyncio.sleep(poll)
+        job = await call("get_job_tool", {"job_id": result["job_id"]}, rtt)
+        calls += 1
+        if job["data"]["state"] != "running" and job["data"]["state"] != "pending":
+            if job["data"]["state"] != "succeeded":
+                raise RuntimeError(job["data"]["error"])
+            return calls
+
+
+async def bas_call(points, rtt, poll):
+    result = await call("run_bas_script_tool", {"waypoints": json.dumps(points)}, rtt)
+    if result["status"] != "success":
+        raise RuntimeError(result["message"])
+    return 1
+
+
+def final_joints():
+    """直接查询控制器，不使用可能还没刷新的状态快照"""
+    with robot_list.lease(IP) as arm:
+        pose, _ = arm.motion.get_current_pose(PoseType.JOINT)
+    return [getattr(pose.joint, axis) for axis in AXES]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--points", type=int, default=40, help="路径点数量")
+    parser.add_argument("--latency-ms", type=float, default=2.0, help="模拟器RPC延迟（毫秒）")
+    parser.add_argument("--rtt-ms", type=float, default=1.0, help="模拟每次MCP工具调用的往返延迟（毫秒）")
+    parser.add_argument("--poll-ms", type=float, default=10.0, help="客户端查询到位/任务状态的间隔（毫秒）")
+    parser.add_argument("--output", help="保存结果的JSON文件")
+    args = parser.parse_args()
+
+    logging.disable(logging.INFO)
+    set_backend("sim")
+    configure_simulator(latency=args.latency_ms / 1000.0, jitter=0.0, failure_rate=0.0, seed=0)
+    reset_simulator()
+    points = waypoints(args.points)
+    rtt, poll = args.rtt_ms / 1000.0, args.poll_ms / 1000.0
+    results, arrived = {}, True
+    try:
+        connect_robot(IP)
+        for name, scenario in (("single", single_calls), ("path", path_call), ("bas", bas_call)):
+            invalidate_robot_ready(IP)
+            asyncio.run(call("move_robot_joint", {"joint_positions": json.dumps([0, 0, 0, 0, 90, 0])}, 0))
+            start = time.perf_counter()
+            calls = asyncio.run(scenario(points, rtt, poll))
+            elapsed = time.perf_counter() - start
+            joints = final_joints()
+            arrived &= all(abs(value - target) <= 0.01 for value, target in zip(joints, points[-1]))
+            results[f"path/{name}"] = {"total_ms": round(elapsed * 1000, 1), "tool_calls": calls,
+                                       "per_point_ms": round(elapsed * 1000 / args.points, 2)}
+    finally:
+        cleanup_robot_connections()
+
+    print(f"{args.points} 个路径点, 模拟器RPC延迟 {args.latency_ms} ms, 工具调用往返延迟 {args.rtt_ms} ms")
+    print(f"{'方式':<16}{'总耗时(ms)':>12}{'每点(ms)':>12}{'工具调用':>10}")
+    for name, stats in results.items():
+        print(f"{name:<16}{stats['total_ms']:>12.1f}{stats['per_point_ms']:>12.2f}{stats['tool_calls']:>10}")
+    single = results["path/single"]["total_ms"]
+    print(f"speedup: path {single / max(results['path/path']['total_ms'], 1e-9):.1f}x, "
+          f"bas {single / max(results['path/bas']['total_ms'], 1e-9):.1f}x")
+
+    if args.output:
+        save_results(args.output, run_meta(args), results)
+        print(f"结果已保存到 {args.output}")
+
+    if not arrived:
+        print("执行结束后机器人没有停在最后一个路径点")
+        sys.exit(1)
+    sys.exit(0)
+
+
+if __name__ == "__main__":
+    main()
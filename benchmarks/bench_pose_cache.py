@@ -0,0 +1,138 @@
+# -*- coding: utf-8 -*-
+"""批量位姿转换与转换缓存的基准测试
+
+模拟对同一组工件点反复规划：--points 个笛卡尔位姿（用户坐标系1、工具坐标系1），重复 --rounds 轮，
+每轮把全部位姿转换为关节值（模拟器RPC延迟 --latency-ms）。对比:
+    controller: 每轮逐个调用控制器的 convert_cart_to_joint（改造前的方式）
+    batch_cold: 每轮一次 convert_poses，每轮前清除缓存（只有批量本地计算）
+    batch_cached: 每轮一次 convert_poses，第一轮之后全部从缓存返回
+另外测量修改坐标系之后的一轮（缓存失效后重新计算）。缓存结果与重新计算的结果不一致、
+有位姿不可达或第一轮之后仍有未命中时以退出码1结束。
+
+运行:
+    python benchmarks/bench_pose_cache.py
+    python benchmarks/bench_pose_cache.py --points 500 --rounds 20 --latency-ms 5 --output pose_cache.json
+"""
+import argparse
+import json
+import logging
+import sys
+import time
+
+import numpy as np
+
+from agilebot_mcp.backend import set_backend
+from agilebot_mcp.sdk import StatusCodeEnum
+from agilebot_mcp.simulator import configure_simulator, reset_simulator
+from agilebot_mcp.robot_core import connect_robot, robot_list, cleanup_robot_connections
+from agilebot_mcp.coordinate_system import add_coordinate, update_coordinate
+from agilebot_mcp.pose_conversion import convert_poses, _controller_inverse
+
+from harness import run_meta, save_results
+
+IP = "10.35.1.1"
+POSTURE = {"arm_back_front": 0, "arm_up_down": 0, "wrist_flip": 0}
+USER_FRAME = {"id": 1, "position": {"x": 350.0, "y": -120.0, "z": 80.0}, "orientation": {"r": 0.0, "p": 0.0, "y": 15.0}}
+TOOL_FRAME = {"id": 1, "position": {"x": 0.0, "y": 0.0, "z": 120.0}, "orientation": {"r": 0.0, "p": 0.0, "y": 0.0}}
+
+
+def fixture_points(count, seed):
+    """工件坐标系中朝下的抓取点，位于机器人前方的工作台上"""
+    rng = np.random.default_rng(seed)
+    points = np.zeros((count, 6))
+    points[:, 0] = rng.uniform(-100, 100, count)
+    points[:, 1] = rng.uniform(-150, 150, count)
+    points[:, 2] = rng.uniform(0, 150, count)
+    points[:, 3] = 180.0
+    points[:, 4] = rng.uniform(-10, 10, count)
+    points[:, 5] = rng.uniform(-90, 90, count)
+    return points.round(3).tolist()
+
+
+def run_controller(arm, points, rounds):
+    start = time.perf_counter()
+    failures = 0
+    for _ in range(rounds):
+        for row in points:
+            _, ret = _controller_inverse(arm, row, POSTURE, 1, 1)
+            failures += ret != StatusCodeEnum.OK
+    return time.perf_counter() - start, failures
+
+
+def run_batch(points, rounds, refresh):
+    """返回 (总耗时, 每轮耗时, 最后一轮的结果)"""
+    timings, result = [], None
+    for _ in range(rounds):
+        start = time.perf_counter()
+        result = json.loads(convert_poses(IP, points, posture=POSTURE, uf=1, tf=1, refresh=refresh))
+        timings.append(time.perf_counter() - start)
+        if result["status"] != "success":
+            raise RuntimeError(result["message"])
+    return sum(timings), timings, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--points", type=int, default=200, help="工件点数量")
+    parser.add_argument("--rounds", type=int, default=10, help="规划轮数")
+    parser.add_argument("--latency-ms", type=float, default=2.0, help="模拟器RPC延迟（毫秒）")
+    parser.add_argument("--seed", type=int, default=0, help="随机数种子")
+    parser.add_argument("--output", help="保存结果的JSON文件")
+    args = parser.parse_args()
+
+    logging.disable(logging.INFO)
+    set_backend("sim")
+    configure_simulator(latency=args.latency_ms / 1000.0, jitter=0.0, failure_rate=0.0, seed=0)
+    reset_simulator()
+    points = fixture_points(args.points, args.seed)
+    try:
+        connect_robot(IP)
+        for sys_type, frame in ((0, USER_FRAME), (1, TOOL_FRAME)):
+            add_coordinate(IP, sys_type)
+            update_coordinate(IP, sys_type, frame)
+        controller_s, controller_failures = run_controller(robot_list.get(IP), points, args.rounds)
+        cold_s, _, cold = run_batch(points, args.rounds, refresh=True)
+        cached_s, cached_rounds, cached = run_batch(points, args.rounds, refresh=False)
+        # 修改工具坐标系后缓存失效，下一轮重新计算
+        update_coordinate(IP, 1, dict(TOOL_FRAME, position={"x": 0.0, "y": 0.0, "z": 125.0}))
+        _, invalidated_rounds, invalidated = run_batch(points, 1, refresh=False)
+    finally:
+        cleanup_robot_connections()
+
+    results = {
+        "pose_cache/controller": {"total_s": round(controller_s, 3),
+                                  "per_round_ms": round(controller_s / args.rounds * 1000, 2),
+                                  "reachable": args.points - controller_failures // args.rounds},
+        "pose_cache/batch_cold": {"total_s": round(cold_s, 3), "per_round_ms": round(cold_s / args.rounds * 1000, 2),
+                                  "reachable": cold["reachable"], "method": cold["method"]},
+        "pose_cache/batch_cached": {"total_s": round(cached_s, 3),
+                                    "per_round_ms": round(cached_s / args.rounds * 1000, 2),
+                                    "warm_round_ms": round(min(cached_rounds[1:] or cached_rounds) * 1000, 2),
+                                    "reachable": cached["reachable"], "method": cached["method"],
+                                    "hit_rate": round(cached["cached"] / args.points, 3)},
+        "pose_cache/after_frame_change": {"round_ms": round(invalidated_rounds[0] * 1000, 2),
+                                          "cached": invalidated["cached"], "method": invalidated["method"]},
+    }
+    print(f"{args.points} 个工件点, {args.rounds} 轮, 模拟器RPC延迟 {args.latency_ms} ms")
+    print(f"{'方式':<28}{'总耗时(s)':>12}{'每轮(ms)':>12}{'可达':>8}")
+    for name in ("pose_cache/controller", "pose_cache/batch_cold", "pose_cache/batch_cached"):
+        stats = results[name]
+        print(f"{name:<28}{stats['total_s']:>12.3f}{stats['per_round_ms']:>12.2f}{stats['reachable']:>8}")
+    warm = results["pose_cache/batch_cached"]
+    print(f"缓存命中时每轮 {warm['warm_round_ms']} ms, 命中率 {warm['hit_rate']}; "
+          f"修改坐标系后一轮 {results['pose_cache/after_frame_change']['round_ms']} ms, "
+          f"命中 {invalidated['cached']} 个")
+
+    if args.output:
+        save_results(args.output, run_meta(args), results)
+        print(f"结果已保存到 {args.output}")
+
+    consistent = [item["joint"] for item in cached["results"]] == [item["joint"] for item in cold["results"]]
+    if not consistent or cold["reachable"] != args.points or warm["hit_rate"] != 1.0 or invalidated["cached"]:
+        print("缓存结果与重新计算的结果不一致、有位姿不可达，或缓存未按预期命中/失效")
+        sys.exit(1)
+    sys.exit(0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+# -*- coding: utf-8 -*-
+"""控制柜重启后自动恢复的基准测试
+
+在模拟器上连接一台机器人，客户端线程每 --call-interval-ms 毫秒读取一次R寄存器，
+随后模拟控制柜重启（停机 --downtime-s 秒）。对比:
+    monitored: 启用健康检查（检查间隔 --interval-s 秒）和自动重连
+    unmonitored: 不启用健康检查（改造前），重启后的调用一直失败，直到手动断开再连接
+统计从重启到第一次调用成功的中断时间、失败的调用数，以及重连期间排队调用的最大延迟。
+monitored 的中断时间超过停机时间加 --max-extra-s 秒时以退出码1结束。
+
+运行:
+    python benchmarks/bench_reconnect.py
+    python benchmarks/bench_reconnect.py --downtime-s 1 --interval-s 0.2 --output reconnect.json
+"""
+import argparse
+import json
+import logging
+import sys
+import tempfile
+import threading
+import time
+
+from agilebot_mcp.backend import set_backend
+from agilebot_mcp.simulator import configure_simulator, reset_simulator, simulate_reboot
+from agilebot_mcp.robot_core import connect_robot, cleanup_robot_connections
+from agilebot_mcp.registers import read_R_register
+from agilebot_mcp import health
+from agilebot_mcp.logging_setup import configure_logging, stop_logging
+
+from harness import run_meta, save_results
+
+IP = "10.30.1.1"
+
+
+def run_case(args, monitored):
+    reset_simulator()
+    health.health_monitor.stop()
+    health.health_monitor.interval = args.interval_s
+    if not monitored:
+        health.HEALTH_ENABLED = False
+    connect_robot(IP)
+    health.HEALTH_ENABLED = monitored
+
+    calls = []
+    stop = threading.Event()
+
+    def client():
+        while not stop.is_set():
+            start = time.monotonic()
+            ok = json.loads(read_R_register(IP, 1))["status"] == "success"
+            calls.append((start, time.monotonic(), ok))
+            time.sleep(args.call_interval_ms / 1000.0)
+
+    thread = threading.Thread(target=client)
+    thread.start()
+    time.sleep(0.2)
+    rebooted_at = time.monotonic()
+    simulate_reboot(IP, args.downtime_s)
+    time.sleep(args.downtime_s + args.window_s)
+    stop.set()
+    thread.join()
+    health.health_monitor.stop()
+    cleanup_robot_connections()
+
+    after = [call for call in calls if call[0] >= rebooted_at]
+    recovered = next((end for start, end, ok in after if ok), None)
+    return {
+        "recovered": recovered is not None,
+        "outage_s": round(recovered - rebooted_at, 3) if recovered is not None else None,
+        "failed_calls": sum(1 for call in after if not call[2]),
+        "max_call_ms": round(max(end - start for start, end, _ in after) * 1000, 1),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--downtime-s", type=float, default=1.0, help="模拟的控制柜停机时间（秒）")
+    parser.add_argument("--interval-s", type=float, default=0.2, help="健康检查间隔（秒）")
+    parser.add_argument("--call-interval-ms", type=float, default=20.0, help="客户端调用间隔（毫秒）")
+    parser.add_argument("--window-s", type=float, default=3.0, help="停机结束后继续观察的时间（秒）")
+    parser.add_argument("--latency-ms", type=float, default=2.0, help="模拟器RPC延迟（毫秒）")
+    parser.add_argument("--max-extra-s", type=float, default=1.5, help="允许的中断时间超出停机时间的上限（秒）")
+    parser.add_argument("--output", help="保存结果的JSON文件")
+    args = parser.parse_args()
+
+    set_backend("sim")
+    configure_simulator(latency=args.latency_ms / 1000.0, jitter=0.0, failure_rate=0.0, seed=0,
+                        telemetry_period=0.05)
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    with tempfile.TemporaryDirectory() as log_dir:
+        configure_logging(log_dir=log_dir)
+        try:
+            results = {f"reconnect/{name}": run_case(args, monitored)
+                       for name, monitored in (("monitored", True), ("unmonitored", False))}
+        finally:
+            stop_logging()
+
+    print(f"停机 {args.downtime_s} 秒, 健康检查间隔 {args.interval_s} 秒, 调用间隔 {args.call_interval_ms:.0f} ms")
+    print(f"{'方式':<24}{'恢复':>8}{'中断时间(s)':>14}{'失败调用':>10}{'最长调用(ms)':>16}")
+    for name, stats in results.items():
+        outage = "-" if stats["outage_s"] is None else f"{stats['outage_s']:.3f}"
+        print(f"{name:<24}{str(stats['recovered']):>8}{outage:>14}{stats['failed_calls']:>10}"
+              f"{stats['max_call_ms']:>16.1f}")
+
+    if args.output:
+        save_results(args.output, run_meta(args), results)
+        print(f"结果已保存到 {args.output}")
+
+    monitored = results["reconnect/monitored"]
+    if not monitored["recovered"] or monitored["outage_s"] > args.downtime_s + args.max_extra_s:
+        print(f"自动重连未能在停机后 {args.max_extra_s} 秒内恢复")
+        sys.exit(1)
+    sys.exit(0)
+
+
+if __name__ == "__main__":
+    main()
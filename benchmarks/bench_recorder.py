@@ -0,0 +1,65 @@
+# -*- coding: utf-8 -*-
+"""轨迹录制缓冲区基准测试
+
+把 PoseRingBuffer 写满（并回绕）后，测量按时间窗口和抽取间隔读取一段数据的耗时和内存分配，
+与直接复制整个缓冲区对比。读取只复制选中的采样点，耗时和内存应与缓冲区大小基本无关。
+
+运行:
+    python benchmarks/bench_recorder.py --capacity 1000000 --max-samples 1000
+"""
+import argparse
+import time
+import tracemalloc
+
+import numpy as np
+
+from agilebot_mcp.recorder import PoseRingBuffer
+
+
+def timed(func, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        func()
+    elapsed = (time.perf_counter() - start) / repeat
+    tracemalloc.start()
+    func()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed * 1000, peak / 1024
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--capacity", type=int, default=1000000, help="缓冲区容量（采样点数）")
+    parser.add_argument("--rate", type=float, default=250.0, help="模拟的采样频率（Hz）")
+    parser.add_argument("--max-samples", type=int, default=1000, help="每次读取返回的最多采样点数")
+    parser.add_argument("--repeat", type=int, default=20, help="每项测量的重复次数")
+    args = parser.parse_args()
+
+    buffer = PoseRingBuffer(args.capacity)
+    total = args.capacity + args.capacity // 3
+    joint = [1.0, 2.0, 3.0, 4.0, 5.0, 6.0]
+    cart = [400.0, 0.0, 300.0, 180.0, 0.0, 0.0]
+    start = time.perf_counter()
+    for index in range(total):
+        buffer.append(index / args.rate, joint, cart, 1, 1)
+    append_us = (time.perf_counter() - start) / total * 1e6
+    duration = (total - 1) / args.rate
+    print(f"缓冲区: {args.capacity} 个采样点, {buffer.nbytes / 1024 / 1024:.1f} MB, "
+          f"写入 {total} 个（已回绕）, 每次写入 {append_us:.2f} us")
+
+    cases = {
+        "select 全部（抽取）": lambda: buffer.select(None, None, args.max_samples),
+        "select 最近10秒": lambda: buffer.select(duration - 10, None, args.max_samples),
+        "select 跨回绕点的窗口": lambda: buffer.select(duration / 2, duration / 2 + 60, args.max_samples),
+        "复制整个缓冲区": lambda: (buffer.t.copy(), buffer.joint.copy(), buffer.cart.copy(), buffer.status.copy()),
+        "np.roll 后切片": lambda: np.roll(buffer.t, -buffer._oldest())[::max(1, args.capacity // args.max_samples)],
+    }
+    print(f"{'操作':<24}{'耗时(ms)':>12}{'内存峰值(KB)':>16}")
+    for name, func in cases.items():
+        elapsed_ms, peak_kb = timed(func, args.repeat)
+        print(f"{name:<24}{elapsed_ms:>12.3f}{peak_kb:>16.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+# -*- coding: utf-8 -*-
+"""RobotRegistry 压力测试
+
+使用模拟的 Arm（每次调用固定延迟）测量吞吐量随机器人数量的变化，
+并检查同一机器人上是否出现并发调用。
+
+运行:
+    python benchmarks/bench_registry.py --robots 1,2,4,8,16 --clients 32
+"""
+import argparse
+import itertools
+import threading
+import time
+
+from agilebot_mcp.registry import RobotRegistry, with_robot_lock
+
+
+class FakeArm:
+    def __init__(self, latency):
+        self.latency = latency
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self._counter_lock = threading.Lock()
+
+    def get_robot_status(self):
+        with self._counter_lock:
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        time.sleep(self.latency)
+        with self._counter_lock:
+            self.in_flight -= 1
+        return "ROBOT_IDLE", 0
+
+
+def run(robot_count, clients, duration, latency):
+    registry = RobotRegistry()
+    robot_lock = with_robot_lock(registry)
+    ips = [f"10.27.1.{i + 1}" for i in range(robot_count)]
+    for ip in ips:
+        registry[ip] = FakeArm(latency)
+
+    @robot_lock
+    def get_status(ip):
+        return registry[ip].get_robot_status()
+
+    counts = [0] * clients
+    stop = threading.Event()
+
+    def client(n):
+        for ip in itertools.islice(itertools.cycle(ips), n, None):
+            if stop.is_set():
+                break
+            get_status(ip)
+            counts[n] += 1
+
+    threads = [threading.Thread(target=client, args=(n,)) for n in range(clients)]
+    start = time.perf_counter()
+    for t in threads:
+        t.start()
+    time.sleep(duration)
+    stop.set()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - start
+
+    max_in_flight = max(registry[ip].max_in_flight for ip in ips)
+    return sum(counts) / elapsed, max_in_flight
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--robots", default="1,2,4,8,16", help="逗号分隔的机器人数量列表")
+    parser.add_argument("--clients", type=int, default=32, help="并发客户端线程数")
+    parser.add_argument("--duration", type=float, default=2.0, help="每组测试时长（秒）")
+    parser.add_argument("--latency-ms", type=float, default=2.0, help="模拟RPC延迟（毫秒）")
+    args = parser.parse_args()
+
+    latency = args.latency_ms / 1000.0
+    ideal = 1.0 / latency
+    print(f"{'robots':>6} {'calls/s':>10} {'speedup':>8} {'ideal':>8} {'max_in_flight':>14}")
+    baseline = None
+    for robot_count in (int(n) for n in args.robots.split(",")):
+        throughput, max_in_flight = run(robot_count, args.clients, args.duration, latency)
+        baseline = baseline or throughput
+        print(f"{robot_count:>6} {throughput:>10.0f} {throughput / baseline:>8.2f} "
+              f"{ideal * min(robot_count, args.clients):>8.0f} {max_in_flight:>14}")
+        assert max_in_flight == 1, "同一机器人出现并发调用"
+
+
+if __name__ == "__main__":
+    main()
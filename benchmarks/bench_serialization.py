@@ -0,0 +1,151 @@
+# -*- coding: utf-8 -*-
+"""工具返回值序列化的微基准测试
+
+用模拟器构造的SDK对象（笛卡尔PR寄存器、关节PR寄存器、坐标系）测量从SDK对象到JSON文本的单次耗时:
+    legacy_json: 改造前的写法，逐字段拼成字典后 json.dumps(ensure_ascii=False)
+    dataclass_json: responses.py 的数据类 + 标准库 json 编码器
+    dataclass_orjson: responses.py 的数据类 + orjson 编码器（安装了 orjson 时）
+另外测量只有 status/message 的简单返回值。所有方式的输出解析后必须相同。
+
+运行:
+    python benchmarks/bench_serialization.py
+    python benchmarks/bench_serialization.py --number 200000 --output serialization.json
+"""
+import argparse
+import json
+import timeit
+
+from agilebot_mcp.backend import set_backend
+from agilebot_mcp.sdk import PoseType
+from agilebot_mcp.simulator import SimArm, reset_simulator
+from agilebot_mcp import responses
+from agilebot_mcp.responses import PoseRegisterData, CoordinateData, success, error
+
+from harness import run_meta, save_results
+
+IP = "10.32.1.1"
+
+
+def legacy_pose_register(index, pose_register):
+    """改造前 registers._pose_register_to_dict 的写法"""
+    pose_data = pose_register.poseRegisterData
+    result = {
+        "index": index,
+        "id": pose_register.id,
+        "name": pose_register.name,
+        "comment": pose_register.comment,
+        "pose_type": str(pose_data.pt)
+    }
+    if pose_data.pt == PoseType.JOINT:
+        result["joint"] = {
+            "j1": pose_data.joint.j1, "j2": pose_data.joint.j2, "j3": pose_data.joint.j3,
+            "j4": pose_data.joint.j4, "j5": pose_data.joint.j5, "j6": pose_data.joint.j6
+        }
+    elif pose_data.pt == PoseType.CART:
+        result["cartesian"] = {
+            "x": pose_data.cartData.position.x, "y": pose_data.cartData.position.y,
+            "z": pose_data.cartData.position.z, "a": pose_data.cartData.position.a,
+            "b": pose_data.cartData.position.b, "c": pose_data.cartData.position.c
+        }
+        result["posture"] = {
+            "arm_back_front": pose_data.cartData.posture.arm_back_front,
+            "arm_left_right": pose_data.cartData.posture.arm_left_right,
+            "arm_up_down": pose_data.cartData.posture.arm_up_down,
+            "wrist_flip": pose_data.cartData.posture.wrist_flip
+        }
+    return json.dumps({"status": "success", "data": result}, ensure_ascii=False)
+
+
+def legacy_coordinate(coord):
+    """改造前 coordinate_system.get_coordinate 的写法"""
+    result = {
+        "id": coord.coordinate_info.coordinate_id,
+        "name": coord.coordinate_info.name,
+        "comment": coord.coordinate_info.comment,
+        "group_id": coord.coordinate_info.group_id,
+        "position": {"x": coord.position.x, "y": coord.position.y, "z": coord.position.z},
+        "orientation": {"r": coord.orientation.r, "p": coord.orientation.p, "y": coord.orientation.y}
+    }
+    return json.dumps({"status": "success", "data": result}, ensure_ascii=False)
+
+
+def build_objects():
+    set_backend("sim")
+    reset_simulator()
+    arm = SimArm()
+    arm.connect(IP)
+    arm.register.write_PR(_pose_register(1, PoseType.CART))
+    arm.register.write_PR(_pose_register(2, PoseType.JOINT))
+    from agilebot_mcp.sdk import CoordinateSystemType
+    coord, _ = arm.coordinate_system.add(CoordinateSystemType.UserFrame)
+    coord.coordinate_info.name = "夹具坐标系"
+    coord.position.x, coord.position.y, coord.position.z = 412.5, -87.25, 301.0
+    cart, _ = arm.register.read_PR(1)
+    joint, _ = arm.register.read_PR(2)
+    return cart, joint, coord
+
+
+def _pose_register(index, pose_type):
+    from agilebot_mcp.sdk import PoseRegister
+    register = PoseRegister()
+    register.id = index
+    register.name = f"工件{index}"
+    register.comment = "bench"
+    data = register.poseRegisterData
+    data.pt = pose_type
+    if pose_type == PoseType.CART:
+        position = data.cartData.position
+        position.x, position.y, position.z, position.a, position.b, position.c = 400.125, 12.5, 300.75, 180.0, 0.5, -90.0
+    else:
+        joint = data.joint
+        joint.j1, joint.j2, joint.j3, joint.j4, joint.j5, joint.j6 = 0.1, -0.5, 0.75, 0.0, 1.2, -3.1
+    return register
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--number", type=int, default=100000, help="每种方式的调用次数")
+    parser.add_argument("--repeat", type=int, default=5, help="重复次数，取最快的一次")
+    parser.add_argument("--output", help="保存结果的JSON文件")
+    args = parser.parse_args()
+
+    cart, joint, coord = build_objects()
+    payloads = {
+        "pr_cartesian": (lambda: legacy_pose_register(1, cart),
+                         lambda: success(data=PoseRegisterData.from_sdk(1, cart, PoseType.JOINT, PoseType.CART))),
+        "pr_joint": (lambda: legacy_pose_register(2, joint),
+                     lambda: success(data=PoseRegisterData.from_sdk(2, joint, PoseType.JOINT, PoseType.CART))),
+        "coordinate": (lambda: legacy_coordinate(coord), lambda: success(data=CoordinateData.from_sdk(coord))),
+        "status_message": (lambda: json.dumps({"status": "error", "message": "读取PR寄存器失败"}, ensure_ascii=False),
+                           lambda: error("读取PR寄存器失败")),
+    }
+    encoders = [name for name, encoder in responses.ENCODERS.items() if encoder is not None]
+
+    def per_call_us(func):
+        return min(timeit.repeat(func, number=args.number, repeat=args.repeat)) / args.number * 1e6
+
+    results = {}
+    for name, (legacy, typed) in payloads.items():
+        stats = {"legacy_json_us": round(per_call_us(legacy), 3)}
+        for encoder in encoders:
+            previous = responses.set_encoder(encoder)
+            try:
+                if json.loads(typed()) != json.loads(legacy()):
+                    raise RuntimeError(f"{name} 的输出与改造前不一致: {typed()}")
+                stats[f"dataclass_{encoder}_us"] = round(per_call_us(typed), 3)
+            finally:
+                responses.set_encoder(previous)
+        results[f"serialization/{name}"] = stats
+
+    columns = ["legacy_json_us"] + [f"dataclass_{encoder}_us" for encoder in encoders]
+    print(f"{'返回值':<28}" + "".join(f"{column[:-3]:>20}" for column in columns) + "  （微秒/次）")
+    for name, stats in results.items():
+        print(f"{name[14:]:<28}" + "".join(f"{stats[column]:>20.2f}" for column in columns))
+
+    if args.output:
+        save_results(args.output, run_meta(args), results)
+        print(f"结果已保存到 {args.output}")
+
+
+if __name__ == "__main__":
+    main()
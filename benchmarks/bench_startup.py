@@ -0,0 +1,157 @@
+# -*- coding: utf-8 -*-
+"""服务器冷启动基准测试
+
+MCP客户端每个会话都会通过stdio启动一个新的服务器进程，冷启动时间直接影响第一次工具调用。
+每轮启动一个新的解释器进程，测量两项:
+    startup/import: python -X importtime 统计的 import agilebot_mcp.server 总耗时
+    startup/handshake: 启动 python -m agilebot_mcp 到收到 initialize 和 tools/list 响应的时间
+
+同时检查启动过程中没有导入SDK和可选的重量级依赖（numpy/scipy/tensorflow/paramiko），
+它们应该在对应工具第一次被调用时才导入。超过 --budget-ms（握手中位数）或
+--package-budget-ms（本包模块自身的导入耗时）时以退出码1结束。
+
+运行:
+    python benchmarks/bench_startup.py --runs 5 --output startup.json
+    python benchmarks/bench_startup.py --baseline startup.json --max-regression 20
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from harness import (
+    summarize, run_meta, save_results, load_results, compare, print_results, print_regressions
+)
+
+SRC = Path(__file__).resolve().parent.parent / "src"
+PACKAGE = "agilebot_mcp"
+# 启动时不应该导入的顶层模块
+DEFERRED_MODULES = ("Agilebot", "numpy", "scipy", "tensorflow", "paramiko")
+
+
+def _env():
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [str(SRC), env.get("PYTHONPATH")]))
+    env.setdefault("AGILEBOT_MCP_BACKEND", "sim")
+    return env
+
+
+def importtime(workdir):
+    """在新进程中导入服务器模块，返回 -X importtime 的 [(self_us, cumulative_us, 模块名)]"""
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {PACKAGE}.server"],
+        cwd=workdir, env=_env(), capture_output=True, text=True, check=True
+    )
+    rows = []
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        rows.append((int(self_us), int(cumulative_us), name.strip()))
+    return rows
+
+
+def _request(proc, message):
+    proc.stdin.write(json.dumps(message) + "\n")
+    proc.stdin.flush()
+    if "id" not in message:
+        return None
+    while True:
+        line = proc.stdout.readline()
+        if not line:
+            raise RuntimeError("服务器在响应前退出")
+        response = json.loads(line)
+        if response.get("id") == message["id"]:
+            return response
+
+
+def handshake(workdir):
+    """启动服务器并完成 initialize + tools/list，返回 (耗时秒, 工具数量)"""
+    start = time.perf_counter()
+    proc = subprocess.Popen(
+        [sys.executable, "-m", PACKAGE], cwd=workdir, env=_env(),
+        stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL,
+        text=True, encoding="utf-8"
+    )
+    try:
+        _request(proc, {"jsonrpc": "2.0", "id": 1, "method": "initialize", "params": {
+            "protocolVersion": "2024-11-05", "capabilities": {},
+            "clientInfo": {"name": "bench_startup", "version": "0"}}})
+        _request(proc, {"jsonrpc": "2.0", "method": "notifications/initialized"})
+        tools = _request(proc, {"jsonrpc": "2.0", "id": 2, "method": "tools/list"})
+        elapsed = time.perf_counter() - start
+    finally:
+        proc.stdin.close()
+        try:
+            proc.wait(timeout=5)
+        except subprocess.TimeoutExpired:
+            proc.kill()
+            proc.wait()
+    return elapsed, len(tools["result"]["tools"])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5, help="冷启动次数")
+    parser.add_argument("--budget-ms", type=float, default=1500.0, help="启动到 tools/list 响应的中位数预算（毫秒）")
+    parser.add_argument("--package-budget-ms", type=float, default=200.0,
+                        help=f"{PACKAGE} 模块自身导入耗时的中位数预算（毫秒，不含 mcp 等依赖）")
+    parser.add_argument("--top", type=int, default=10, help="列出累计导入耗时最高的模块数量")
+    parser.add_argument("--output", help="保存结果的JSON文件")
+    parser.add_argument("--baseline", help="作为基线对比的JSON结果文件")
+    parser.add_argument("--max-regression", type=float, default=20.0, help="允许的最大退化百分比")
+    args = parser.parse_args()
+
+    import_times, package_times, handshake_times = [], [], []
+    deferred_loaded = set()
+    tool_count = 0
+    with tempfile.TemporaryDirectory() as workdir:
+        for _ in range(args.runs):
+            rows = importtime(workdir)
+            import_times.append(next(c for _, c, name in rows if name == f"{PACKAGE}.server") / 1e6)
+            package_times.append(sum(s for s, _, name in rows if name.split(".")[0] == PACKAGE) / 1e6)
+            deferred_loaded.update(name for _, _, name in rows if name.split(".")[0] in DEFERRED_MODULES)
+            elapsed, tool_count = handshake(workdir)
+            handshake_times.append(elapsed)
+
+    results = {
+        "startup/import": summarize(import_times, sum(import_times)),
+        "startup/package_import": summarize(package_times, sum(package_times)),
+        "startup/handshake": summarize(handshake_times, sum(handshake_times)),
+    }
+    print_results(results, columns=("p50_ms", "p95_ms", "mean_ms"))
+    print(f"\ntools/list 返回 {tool_count} 个工具")
+    print(f"最后一次导入中累计耗时最高的 {args.top} 个模块:")
+    for self_us, cumulative_us, name in sorted(rows, key=lambda row: row[1], reverse=True)[:args.top]:
+        print(f"  {cumulative_us / 1000:9.1f} ms (自身 {self_us / 1000:7.1f} ms)  {name}")
+
+    exit_code = 0
+    if deferred_loaded:
+        print(f"启动时导入了应延迟加载的模块: {', '.join(sorted(deferred_loaded))}")
+        exit_code = 1
+    handshake_ms = statistics.median(handshake_times) * 1000
+    package_ms = statistics.median(package_times) * 1000
+    if handshake_ms > args.budget_ms:
+        print(f"冷启动 {handshake_ms:.1f} ms 超过预算 {args.budget_ms} ms")
+        exit_code = 1
+    if package_ms > args.package_budget_ms:
+        print(f"{PACKAGE} 导入 {package_ms:.1f} ms 超过预算 {args.package_budget_ms} ms")
+        exit_code = 1
+    if args.output:
+        save_results(args.output, run_meta(args), results)
+        print(f"结果已保存到 {args.output}")
+    if args.baseline:
+        regressions = compare(results, load_results(args.baseline), args.max_regression, ("p50_ms",), 1.0)
+        print_regressions(regressions, args.max_regression)
+        if regressions:
+            exit_code = 1
+    sys.exit(exit_code)
+
+
+if __name__ == "__main__":
+    main()
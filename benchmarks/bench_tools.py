@@ -0,0 +1,364 @@
+# -*- coding: utf-8 -*-
+"""所有MCP工具的基准测试
+
+通过进程内的 FastMCP 实例调用 mcp_tools.py 中的每个工具，机器人使用模拟器后端（simulator.py），
+统计每个工具的 p50/p95/p99 延迟、每秒调用数和每次调用的内存分配；
+另有多机器人（每台机器人一个客户端）和多客户端（同一台机器人）的并发混合负载场景。
+
+结果可保存为JSON，并与基线对比，任一指标退化超过 --max-regression 百分比时以退出码1结束。
+mcp_tools.py 中新增的工具若没有在 TOOL_CASES 中登记，同样以退出码1结束。
+
+运行:
+    python benchmarks/bench_tools.py --iterations 200 --latency-ms 1 --output results.json
+    python benchmarks/bench_tools.py --baseline results.json --max-regression 20
+"""
+import argparse
+import asyncio
+import itertools
+import json
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from agilebot_mcp.backend import set_backend
+from agilebot_mcp.simulator import configure_simulator, reset_simulator
+from agilebot_mcp.mcp_tools import mcp
+from agilebot_mcp.modbus_poll import poll_scheduler
+from agilebot_mcp.robot_core import cleanup_robot_connections
+from agilebot_mcp.executor import robot_executor
+from agilebot_mcp.jobs import job_manager
+
+from harness import (
+    DEFAULT_GATED_METRICS, measure, measure_allocations, summarize, is_error,
+    run_meta, save_results, load_results, compare, print_results, print_regressions
+)
+
+IP = "10.27.1.254"
+MODBUS = {"channel": 2, "slave_id": 1}
+PR_DATA = json.dumps({"pose_type": "CART", "cartesian": {"x": 400, "y": 0, "z": 300, "a": 180, "b": 0, "c": 0}})
+COORDINATE = json.dumps({"id": 1, "name": "bench", "position": {"x": 1, "y": 2, "z": 3},
+                         "orientation": {"r": 0, "p": 0, "y": 0}})
+EXAMPLE_DIR = Path(__file__).resolve().parent.parent / "Python_v1.7.1.3" / "example" / "file_manager"
+EXAMPLE_TRAJECTORY = str(EXAMPLE_DIR / "test_torque.trajectory")
+EXAMPLE_CSV = str(EXAMPLE_DIR / "test.csv")
+COMPILED_TRAJECTORY = str(Path(tempfile.gettempdir()) / "agilebot_mcp_bench.trajectory")
+EXAMPLE_PROGRAM = str(EXAMPLE_DIR / "test_prog")
+DOWNLOAD_DIR = str(Path(tempfile.gettempdir()) / "agilebot_mcp_bench_download")
+INVENTORY = str(Path(tempfile.gettempdir()) / "agilebot_mcp_bench_inventory.json")
+_ids = itertools.count(100)
+
+
+async def call_tool(name, arguments):
+    return await mcp.call_tool(name, arguments)
+
+
+async def _add_coordinate():
+    result = await call_tool("add_coordinate_tool", {"ip": IP, "sys_type": 0})
+    return {"coordinate_id": json.loads(result[0].text)["data"]["id"]}
+
+
+async def _add_payload():
+    payload_id = next(_ids)
+    await call_tool("add_payload_tool", {"ip": IP, "payload_info": json.dumps({"id": payload_id, "m_load": 1.0})})
+    return {"payload_id": payload_id}
+
+
+async def _new_payload_info():
+    return {"payload_info": json.dumps({"id": next(_ids), "m_load": 1.0, "comment": "bench"})}
+
+
+def _wait_jobs():
+    for job in job_manager.jobs(IP, active_only=True):
+        job.wait()
+
+
+async def _idle_robot():
+    """离线轨迹任务在后台线程中运行，下一次提交前等待上一个任务结束"""
+    await asyncio.to_thread(_wait_jobs)
+    return {}
+
+
+async def _latest_job():
+    await asyncio.to_thread(_wait_jobs)
+    return {"job_id": max(job_manager.jobs(IP), key=lambda job: job.created_at).id}
+
+
+async def _running_job():
+    await asyncio.to_thread(_wait_jobs)
+    result = await call_tool("run_offline_trajectory_tool", {"ip": IP, "file_name": "bench.trajectory"})
+    return {"job_id": json.loads(result[0].text)["job_id"]}
+
+
+async def _upload_program():
+    await call_tool("upload_files_tool", {"ips": IP, "files": EXAMPLE_PROGRAM, "file_type": "program"})
+    return {}
+
+
+async def _define_group():
+    await call_tool("define_robot_group_tool", {"name": "bench-remove", "ips": json.dumps([IP])})
+    return {}
+
+
+async def _connected_robot():
+    """重连在后台线程中进行，下一次重连前等待上一次结束"""
+    while True:
+        result = await call_tool("get_robot_health_tool", {"ip": IP})
+        if json.loads(result[0].text)["health"]["state"] != "reconnecting":
+            return {}
+        await asyncio.sleep(0.005)
+
+
+async def _inventory_file():
+    Path(INVENTORY).write_text(json.dumps({"robots": [{"ip": IP, "name": "bench", "groups": ["bench-inventory"]}]}),
+                               encoding="utf-8")
+    return {}
+
+
+async def _loaded_inventory():
+    await _inventory_file()
+    await call_tool("load_inventory_tool", {"path": INVENTORY, "wait": True})
+    return {}
+
+
+def _before(name, arguments):
+    """每次调用前先执行另一个工具，例如删除前先写入"""
+    async def setup():
+        await call_tool(name, dict({"ip": IP}, **arguments))
+        return {}
+    return setup
+
+
+# 工具名 -> (参数, 每次调用前的准备)；ip 参数自动补充。按顺序执行，锁轴相关工具放在运动工具之后
+TOOL_CASES = {
+    "connect_robot_tool": ({}, None),
+    "get_status_tool": ({}, None),
+    "get_controller_info_tool": ({}, None),
+    "get_robot_snapshot_tool": ({}, None),
+    "get_current_joint_positions_tool": ({}, None),
+    "get_current_cartesian_position_tool": ({}, None),
+    "get_servo_status_tool": ({}, None),
+    "get_robot_info_tool": ({}, None),
+    "acquire_access_tool": ({}, None),
+    "release_access_tool": ({}, None),
+    "power_off_robot_tool": ({}, None),
+    "power_on_robot_tool": ({}, None),
+    "servo_reset_tool": ({}, None),
+    "move_robot_joint": ({"joint_positions": "[0, 10, 20, 0, 30, 0]"}, None),
+    "move_robot_cartesian": ({"position": "[400, 0, 300, 180, 0, 0]"}, None),
+    "read_R": ({"index": 1}, None),
+    "write_R": ({"index": 1, "value": 1.5}, None),
+    "delete_R": ({"index": 1}, _before("write_R", {"index": 1, "value": 1.5})),
+    "read_MR": ({"index": 1}, None),
+    "write_MR": ({"index": 1, "value": 3}, None),
+    "delete_MR": ({"index": 1}, _before("write_MR", {"index": 1, "value": 3})),
+    "read_PR": ({"index": 1}, None),
+    "write_PR": ({"index": 1, "pose_data": PR_DATA}, None),
+    "delete_PR": ({"index": 1}, _before("write_PR", {"index": 1, "pose_data": PR_DATA})),
+    "read_registers_tool": ({"kind": "R", "start": 1, "end": 50}, None),
+    "write_registers_tool": ({"kind": "R", "values": json.dumps({str(i): float(i) for i in range(1, 51)})}, None),
+    "read_modbus_coils_tool": (dict(MODBUS, address=0, number=100), None),
+    "write_modbus_coils_tool": (dict(MODBUS, address=0, values=json.dumps([1, 0] * 8)), None),
+    "read_modbus_holding_regs_tool": (dict(MODBUS, address=0, number=100), None),
+    "write_modbus_holding_regs_tool": (dict(MODBUS, address=0, values=json.dumps(list(range(16)))), None),
+    "read_modbus_discrete_inputs_tool": (dict(MODBUS, address=0, number=100), None),
+    "read_modbus_input_regs_tool": (dict(MODBUS, address=0, number=100), None),
+    "define_modbus_poll_group_tool": (dict(MODBUS, name="bench", period=1.0, ranges=json.dumps(
+        [{"kind": "holding_regs", "address": 0, "number": 64}, {"kind": "coils", "address": 0, "number": 16}])), None),
+    "list_modbus_poll_groups_tool": ({}, None),
+    "get_modbus_poll_changes_tool": ({"name": "bench", "cursor": 0}, None),
+    "remove_modbus_poll_group_tool": ({"name": "bench-remove"}, _before("define_modbus_poll_group_tool", dict(
+        MODBUS, name="bench-remove", period=60.0, ranges=json.dumps([{"kind": "coils", "address": 0, "number": 1}])))),
+    "get_drag_status_tool": ({}, None),
+    "set_drag_status_tool": ({"cart_x": True}, None),
+    "enable_drag_tool": ({"enable": False}, None),
+    "get_coordinate_list_tool": ({"sys_type": 0}, None),
+    "add_coordinate_tool": ({"sys_type": 0}, None),
+    "get_coordinate_tool": ({"sys_type": 0, "coordinate_id": 1}, None),
+    "update_coordinate_tool": ({"sys_type": 0, "coordinate_data": COORDINATE}, None),
+    "delete_coordinate_tool": ({"sys_type": 0}, _add_coordinate),
+    "get_current_payload_tool": ({}, None),
+    "get_payload_by_id_tool": ({"payload_id": 0}, None),
+    "set_current_payload_tool": ({"payload_id": 0}, None),
+    "add_payload_tool": ({}, _new_payload_info),
+    "update_payload_tool": ({"payload_info": json.dumps({"id": 1, "m_load": 2.0})}, None),
+    "delete_payload_tool": ({}, _add_payload),
+    "get_all_payload_tool": ({}, None),
+    "check_axis_three_horizontal_tool": ({}, None),
+    "get_payload_identify_state_tool": ({}, None),
+    "interference_check_for_payload_identify_tool": ({"weight": 2.0, "angle": 90.0}, None),
+    "start_payload_identify_tool": ({"weight": 2.0, "angle": 90.0}, None),
+    "get_payload_identify_result_tool": ({}, None),
+    "payload_identify_start_tool": ({}, None),
+    "payload_identify_done_tool": ({}, None),
+    "payload_identify_tool": ({"weight": 2.0, "angle": 90.0}, None),
+    "update_payload_from_identify_tool": ({"payload_id": 1, "identify_result": json.dumps(
+        {"status": "success", "data": {"m_load": 2.0}})}, None),
+    "start_trajectory_recording_tool": ({"rate": 50, "capacity": 1000}, None),
+    "get_trajectory_recording_tool": ({"max_samples": 200}, None),
+    "stop_trajectory_recording_tool": ({}, None),
+    "inspect_trajectory_file_tool": ({"path": EXAMPLE_TRAJECTORY}, None),
+    "compile_trajectory_csv_tool": ({"csv_path": EXAMPLE_CSV, "output_path": COMPILED_TRAJECTORY}, None),
+    "run_offline_trajectory_tool": ({"file_name": "bench.trajectory"}, _idle_robot),
+    "get_job_tool": ({}, _latest_job),
+    "list_jobs_tool": ({}, None),
+    "cancel_job_tool": ({}, _running_job),
+    "upload_files_tool": ({"ips": IP, "files": EXAMPLE_PROGRAM, "file_type": "program"}, None),
+    "search_files_tool": ({"file_name": "test_prog"}, None),
+    "download_file_tool": ({"file_name": "test_prog", "local_dir": DOWNLOAD_DIR, "file_type": "program"}, None),
+    "delete_file_tool": ({"file_name": "test_prog", "file_type": "program"}, _upload_program),
+    "define_robot_group_tool": ({"name": "bench", "ips": json.dumps([IP])}, None),
+    "list_robot_groups_tool": ({}, None),
+    "fleet_call_tool": ({"operation": "write_R_register", "args": json.dumps({"index": 2, "value": 2.5}),
+                         "ips": IP}, None),
+    "remove_robot_group_tool": ({"name": "bench-remove"}, _define_group),
+    "get_robot_health_tool": ({}, None),
+    "reconnect_robot_tool": ({}, _connected_robot),
+    "load_inventory_tool": ({"path": INVENTORY, "wait": True}, _inventory_file),
+    "get_inventory_status_tool": ({}, _loaded_inventory),
+    "get_kinematics_model_tool": ({}, None),
+    "forward_kinematics_tool": ({"joints": json.dumps([[0, 0, 0, 0, 90, 0], [10, 20, 30, 0, 45, 0],
+                                                       [-30, 10, -20, 15, 60, 90]])}, None),
+    "check_reachability_tool": ({"poses": json.dumps([[385.0, 0.0, 615.0, -180.0, 0.0, 0.0],
+                                                      [391.992, 69.119, 326.276, -180.0, 5.0, 10.0],
+                                                      [426.52, -225.546, 688.668, -139.655, 14.767, -117.336]]),
+                                 "posture": json.dumps({"wrist_flip": 0})}, None),
+    "convert_poses_tool": ({"poses": json.dumps([[385.0, 0.0, 615.0, -180.0, 0.0, 0.0],
+                                                 [391.992, 69.119, 326.276, -180.0, 5.0, 10.0]]),
+                            "posture": json.dumps({"arm_up_down": 0, "wrist_flip": 0})}, None),
+    "run_path_tool": ({"waypoints": json.dumps([[0, 10, 20, 0, 30, 0], {"joint": [10, 20, 30, 0, 45, 0], "blend": 50},
+                                                {"cartesian": [385.0, 0.0, 615.0, -180.0, 0.0, 0.0], "speed": 20}]),
+                       "speed": 40}, _idle_robot),
+    "run_bas_script_tool": ({"waypoints": json.dumps([[0, 10, 20, 0, 30, 0],
+                                                      {"joint": [10, 20, 30, 0, 45, 0], "smooth": 50,
+                                                       "assign": {"kind": "R", "index": 3, "value": 1.5}},
+                                                      {"cartesian": [385.0, 0.0, 615.0, -180.0, 0.0, 0.0]}]),
+                             "speed": 40}, _idle_robot),
+    "disconnect_robot_tool": ({}, _before("connect_robot_tool", {})),
+}
+
+# 并发场景中每个客户端循环执行的混合负载
+MIXED_WORKLOAD = (
+    ("get_status_tool", {}),
+    ("get_current_joint_positions_tool", {}),
+    ("read_R", {"index": 1}),
+    ("read_registers_tool", {"kind": "R", "start": 1, "end": 20}),
+    ("read_modbus_holding_regs_tool", dict(MODBUS, address=0, number=32)),
+    ("move_robot_joint", {"joint_positions": "[0, 10, 20, 0, 30, 0]"}),
+)
+
+
+async def prepare(ip):
+    """连接模拟机器人并准备各工具依赖的数据"""
+    await call_tool("connect_robot_tool", {"ip": ip})
+    await call_tool("power_on_robot_tool", {"ip": ip})
+    await call_tool("add_coordinate_tool", {"ip": ip, "sys_type": 0})
+    await call_tool("add_payload_tool", {"ip": ip, "payload_info": json.dumps({"id": 1, "m_load": 1.0})})
+
+
+def _bind(name, arguments, takes_ip, setup):
+    base = dict({"ip": IP}, **arguments) if takes_ip else dict(arguments)
+    if setup is None:
+        return (lambda: call_tool(name, base)), None
+    return (lambda extra: call_tool(name, dict(base, **extra))), setup
+
+
+async def bench_tools(args, results):
+    tools = {tool.name: tool for tool in await mcp.list_tools()}
+    missing = sorted(set(tools) - set(TOOL_CASES))
+    await prepare(IP)
+    for name, (arguments, setup) in TOOL_CASES.items():
+        if name not in tools or (args.tools and not any(part in name for part in args.tools)):
+            continue
+        takes_ip = "ip" in tools[name].inputSchema.get("properties", {})
+        call, setup = _bind(name, arguments, takes_ip, setup)
+        stats = await measure(call, args.iterations, warmup=args.warmup, setup=setup)
+        if not args.no_alloc:
+            stats.update(await measure_allocations(call, args.alloc_iterations, setup=setup))
+        results[f"tool/{name}"] = stats
+    return missing
+
+
+async def _client(ip, calls, latencies, counters):
+    for name, arguments in itertools.islice(itertools.cycle(MIXED_WORKLOAD), calls):
+        start = time.perf_counter()
+        result = await call_tool(name, dict({"ip": ip}, **arguments))
+        latencies.append(time.perf_counter() - start)
+        counters["errors"] += is_error(result)
+
+
+async def bench_concurrency(args, results):
+    robot_ips = [f"10.27.2.{i + 1}" for i in range(args.robots)]
+    for ip in robot_ips:
+        await prepare(ip)
+    scenarios = {
+        f"scenario/multi_robot_{args.robots}": [(ip, args.iterations) for ip in robot_ips],
+        f"scenario/multi_client_{args.clients}": [(robot_ips[0], args.iterations) for _ in range(args.clients)],
+    }
+    for name, clients in scenarios.items():
+        latencies, counters = [], {"errors": 0}
+        start = time.perf_counter()
+        await asyncio.gather(*(_client(ip, calls, latencies, counters) for ip, calls in clients))
+        results[name] = summarize(latencies, time.perf_counter() - start, counters["errors"])
+
+
+async def run(args):
+    results = {}
+    missing = []
+    try:
+        if "tools" in args.scenarios:
+            missing = await bench_tools(args, results)
+        if "concurrency" in args.scenarios:
+            await bench_concurrency(args, results)
+    finally:
+        poll_scheduler.stop()
+        cleanup_robot_connections()
+        robot_executor.shutdown(wait=False)
+    return results, missing
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--iterations", type=int, default=200, help="每个工具/每个客户端的计时调用次数")
+    parser.add_argument("--warmup", type=int, default=5, help="每个工具的预热次数")
+    parser.add_argument("--alloc-iterations", type=int, default=50, help="统计内存分配时的调用次数")
+    parser.add_argument("--no-alloc", action="store_true", help="不统计内存分配")
+    parser.add_argument("--latency-ms", type=float, default=1.0, help="模拟器每次SDK调用的延迟（毫秒）")
+    parser.add_argument("--jitter-ms", type=float, default=0.0, help="模拟器延迟的随机抖动上限（毫秒）")
+    parser.add_argument("--robots", type=int, default=4, help="多机器人场景的机器人数量")
+    parser.add_argument("--clients", type=int, default=8, help="多客户端场景的客户端数量")
+    parser.add_argument("--scenarios", nargs="+", default=["tools", "concurrency"], choices=["tools", "concurrency"])
+    parser.add_argument("--tools", nargs="*", help="只测试名称包含这些字符串的工具")
+    parser.add_argument("--output", help="保存结果的JSON文件")
+    parser.add_argument("--baseline", help="作为基线对比的JSON结果文件")
+    parser.add_argument("--max-regression", type=float, default=20.0, help="允许的最大退化百分比")
+    parser.add_argument("--metrics", nargs="+", default=list(DEFAULT_GATED_METRICS), help="参与基线对比的指标")
+    parser.add_argument("--min-delta-ms", type=float, default=0.05, help="延迟指标绝对变化小于该值时不视为退化")
+    args = parser.parse_args()
+
+    set_backend("sim")
+    reset_simulator()
+    configure_simulator(latency=args.latency_ms / 1000.0, jitter=args.jitter_ms / 1000.0, failure_rate=0.0, seed=0,
+                        offline_prepare_time=0.02, offline_run_time=0.02)
+
+    results, missing = asyncio.run(run(args))
+    print_results(results)
+
+    exit_code = 0
+    if missing:
+        print(f"以下工具没有登记在 TOOL_CASES 中: {', '.join(missing)}")
+        exit_code = 1
+    if args.output:
+        save_results(args.output, run_meta(args), results)
+        print(f"结果已保存到 {args.output}")
+    if args.baseline:
+        regressions = compare(results, load_results(args.baseline), args.max_regression,
+                              args.metrics, args.min_delta_ms)
+        print_regressions(regressions, args.max_regression)
+        if regressions:
+            exit_code = 1
+    sys.exit(exit_code)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,156 @@
+# -*- coding: utf-8 -*-
+"""离线轨迹文件解析基准测试
+
+生成一个合成的 .trajectory 文件（默认100万个点，约1%的点带有DO动作，其中一半为 "1|2" 形式），
+对比 trajectory.load_trajectory（按块 numpy.loadtxt）、iter_trajectory_chunks（流式，只做统计）
+和逐行 split/float 的纯Python解析的耗时、每秒点数和内存峰值。
+load_trajectory 低于 --min-rows-per-s 时以退出码1结束。
+
+运行:
+    python benchmarks/bench_trajectory.py --rows 1000000
+    python benchmarks/bench_trajectory.py --rows 1000000 --min-rows-per-s 200000 --output trajectory.json
+"""
+import argparse
+import io
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import numpy as np
+
+from agilebot_mcp.trajectory import load_trajectory, iter_trajectory_chunks
+
+from harness import run_meta, save_results
+
+AXES = 6
+PERIOD = 0.001
+BLOCK_ROWS = 10000
+
+
+def write_synthetic(path, rows, seed=0):
+    """按块生成平滑的关节轨迹（正弦）及对应的速度、加速度和力矩"""
+    rng = np.random.default_rng(seed)
+    phase = rng.uniform(0, 2 * np.pi, AXES)
+    omega = rng.uniform(0.5, 2.0, AXES)
+    start = np.sin(phase)
+    with open(path, "wb") as f:
+        f.write(f"{AXES} {PERIOD:.6f} {rows}\n".encode())
+        f.write((" ".join(f"{value:.6f}" for value in start) + "\n").encode())
+        for first in range(0, rows, BLOCK_ROWS):
+            t = (np.arange(first, min(first + BLOCK_ROWS, rows)) * PERIOD)[:, None]
+            angle = omega * t + phase
+            position = np.sin(angle)
+            velocity = omega * np.cos(angle)
+            acceleration = -omega ** 2 * position
+            torque = 20 * position + rng.normal(0, 0.5, position.shape)
+            buffer = io.BytesIO()
+            np.savetxt(buffer, np.hstack((position, velocity, acceleration, torque)), fmt="%.6f")
+            do = np.full(len(t), b"-1 -1", dtype=object)
+            events = rng.random(len(t)) < 0.01
+            do[events] = np.where(rng.random(int(events.sum())) < 0.5, b"1|2 1", b"3 0")
+            lines = buffer.getvalue().splitlines()
+            f.write(b"".join(line + b" " + field + b"\n" for line, field in zip(lines, do)))
+
+
+def parse_python(path):
+    """逐行 split/float 的纯Python解析，作为对照"""
+    rows = []
+    with open(path, "r") as f:
+        f.readline()
+        f.readline()
+        for line in f:
+            fields = line.split()
+            rows.append([float(value) for value in fields[:-2]])
+    return np.array(rows)
+
+
+def stream_stats(path):
+    peak = None
+    rows = 0
+    for chunk in iter_trajectory_chunks(path):
+        chunk_peak = np.abs(chunk.velocity).max(axis=0)
+        peak = chunk_peak if peak is None else np.maximum(peak, chunk_peak)
+        rows += chunk.rows
+    return rows
+
+
+def timed(func, path, rows, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(path)
+        best = min(best, time.perf_counter() - start)
+    tracemalloc.start()
+    func(path)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    size = os.path.getsize(path)
+    return {
+        "seconds": round(best, 3),
+        "rows_per_s": round(rows / best),
+        "mb_per_s": round(size / best / 1024 / 1024, 1),
+        "peak_mb": round(peak / 1024 / 1024, 1),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=1000000, help="合成文件的点数")
+    parser.add_argument("--repeat", type=int, default=1, help="每项测量的重复次数（取最快的一次）")
+    parser.add_argument("--min-rows-per-s", type=float, default=200000, help="load_trajectory 的最低解析速度")
+    parser.add_argument("--skip-python", action="store_true", help="不运行纯Python解析的对照")
+    parser.add_argument("--output", help="保存结果的JSON文件")
+    args = parser.parse_args()
+
+    cases = {
+        "load_trajectory": load_trajectory,
+        "iter_trajectory_chunks": stream_stats,
+    }
+    if not args.skip_python:
+        cases["python_split"] = parse_python
+
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "synthetic.trajectory")
+        start = time.perf_counter()
+        write_synthetic(path, args.rows)
+        size_mb = os.path.getsize(path) / 1024 / 1024
+        print(f"合成文件: {args.rows} 个点, {size_mb:.1f} MB, 生成耗时 {time.perf_counter() - start:.1f} s")
+
+        trajectory = load_trajectory(path)
+        issues = trajectory.validate()
+        if trajectory.rows != args.rows or issues:
+            print(f"解析结果不正确: 点数 {trajectory.rows}, 问题 {issues[:3]}")
+            sys.exit(1)
+        start = time.perf_counter()
+        trajectory.validate()
+        trajectory.summary()
+        validate_ms = (time.perf_counter() - start) * 1000
+        del trajectory
+
+        for name, func in cases.items():
+            results[f"parse/{name}"] = timed(func, path, args.rows, args.repeat)
+    results["validate_summary"] = {"ms": round(validate_ms, 1)}
+
+    print(f"{'解析方式':<26}{'耗时(s)':>10}{'点/秒':>12}{'MB/s':>10}{'内存峰值(MB)':>16}")
+    for name, stats in results.items():
+        if name.startswith("parse/"):
+            print(f"{name[6:]:<26}{stats['seconds']:>10.3f}{stats['rows_per_s']:>12}"
+                  f"{stats['mb_per_s']:>10.1f}{stats['peak_mb']:>16.1f}")
+    print(f"validate + summary: {validate_ms:.1f} ms")
+
+    if args.output:
+        save_results(args.output, run_meta(args), results)
+        print(f"结果已保存到 {args.output}")
+
+    rate = results["parse/load_trajectory"]["rows_per_s"]
+    if rate < args.min_rows_per_s:
+        print(f"load_trajectory 解析速度 {rate} 点/秒，低于目标 {args.min_rows_per_s:.0f} 点/秒")
+        sys.exit(1)
+    sys.exit(0)
+
+
+if __name__ == "__main__":
+    main()
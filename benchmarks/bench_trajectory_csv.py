@@ -0,0 +1,153 @@
+# -*- coding: utf-8 -*-
+"""CSV转离线轨迹文件的基准测试
+
+生成一个与 example/file_manager/test.csv 列相同的合成CSV（默认100万个点，时间戳约1 ms并带抖动，
+少量点带有DO动作），分阶段测量 trajectory 模块的转换耗时:
+    read: read_trajectory_csv，按块 numpy.loadtxt 读取（只转换用到的列）
+    build: build_trajectory，重采样到控制器周期（CSV带速度/加速度列）
+    build_diff: build_trajectory，去掉速度/加速度列，由有限差分补齐
+    write: write_trajectory，查表批量格式化后写文件
+并与逐行的纯Python实现（csv 模块读取、逐点插值、"%.6f" 格式化）对比，后者只在 --python-rows 个点上运行后按点数折算。
+读取+重采样+写文件的总耗时（折算到100万点）超过 --max-total-ms，或 build 超过 --max-build-ms 时以退出码1结束。
+单核上总耗时以 loadtxt 把CSV文本转换为浮点数为主，是CPU密集的，不是磁盘I/O。
+
+运行:
+    python benchmarks/bench_trajectory_csv.py --rows 1000000
+    python benchmarks/bench_trajectory_csv.py --rows 1000000 --max-total-ms 1000 --output csv.json
+"""
+import argparse
+import bisect
+import csv
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+from agilebot_mcp.trajectory import read_trajectory_csv, build_trajectory, write_trajectory
+
+from harness import run_meta, save_results
+
+AXES = 6
+PERIOD = 0.001
+
+
+def write_synthetic(path, rows, seed=0):
+    rng = np.random.default_rng(seed)
+    ts = np.cumsum(np.full(rows, PERIOD) + rng.normal(0, 2e-7, rows)) - PERIOD
+    ts[0] = 0.0
+    phase = rng.uniform(0, 2 * np.pi, AXES)
+    omega = rng.uniform(0.5, 2.0, AXES)
+    angle = omega * ts[:, None] + phase
+    position = np.sin(angle)
+    velocity = omega * np.cos(angle)
+    acceleration = -omega ** 2 * position
+    jerk = -omega ** 2 * velocity
+    do_port = np.full(rows, -1.0)
+    do_state = np.zeros(rows)
+    events = rng.random(rows) < 0.001
+    do_port[events] = 8
+    do_state[events] = rng.integers(0, 2, int(events.sum()))
+    names = ["ts"] + [f"{prefix}_J{axis + 1}" for prefix in ("pts", "vel", "acc", "jerk") for axis in range(AXES)]
+    np.savetxt(path, np.column_stack((ts, position, velocity, acceleration, jerk, do_port, do_state)),
+               fmt=["%.9f"] + ["%.9f"] * (4 * AXES) + ["%d", "%d"], delimiter=",",
+               header=",".join(names + ["do_port", "do_state"]), comments="")
+
+
+def convert_python(csv_path, output_path, limit):
+    """逐行读取、逐点线性插值和格式化的纯Python实现，作为对照"""
+    ts, rows = [], []
+    with open(csv_path, newline="") as f:
+        reader = csv.reader(f)
+        next(reader)
+        for index, record in enumerate(reader):
+            if index >= limit:
+                break
+            ts.append(float(record[0]))
+            rows.append([float(value) for value in record[1:3 * AXES + 1]])
+    count = int((ts[-1] - ts[0]) / PERIOD) + 1
+    with open(output_path, "w") as f:
+        f.write(f"{AXES} {PERIOD:.6f} {count}\n")
+        f.write(" ".join(f"{value:.6f}" for value in rows[0][:AXES]) + "\n")
+        for step in range(count):
+            t = ts[0] + step * PERIOD
+            left = min(max(bisect.bisect_right(ts, t) - 1, 0), len(ts) - 2)
+            weight = (t - ts[left]) / (ts[left + 1] - ts[left])
+            values = [a + (b - a) * weight for a, b in zip(rows[left], rows[left + 1])]
+            f.write(" ".join(f"{value:.6f}" for value in values + [0.0] * AXES) + " -1 0\n")
+
+
+def timed(func, repeat):
+    best = float("inf")
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=1000000, help="合成CSV的点数")
+    parser.add_argument("--repeat", type=int, default=1, help="每项测量的重复次数（取最快的一次）")
+    parser.add_argument("--python-rows", type=int, default=100000, help="纯Python对照处理的点数，0 表示不运行")
+    parser.add_argument("--max-build-ms", type=float, default=1000, help="build 阶段允许的最长耗时（毫秒）")
+    parser.add_argument("--max-total-ms", type=float, default=1000,
+                        help="read + build + write 允许的最长耗时（毫秒，折算到100万点）")
+    parser.add_argument("--output", help="保存结果的JSON文件")
+    args = parser.parse_args()
+
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        csv_path = os.path.join(tmp, "synthetic.csv")
+        output_path = os.path.join(tmp, "synthetic.trajectory")
+        start = time.perf_counter()
+        write_synthetic(csv_path, args.rows)
+        size_mb = os.path.getsize(csv_path) / 1024 / 1024
+        print(f"合成CSV: {args.rows} 个点, {size_mb:.1f} MB, 生成耗时 {time.perf_counter() - start:.1f} s")
+
+        read_s, (ts, columns, do_ports, do_values) = timed(lambda: read_trajectory_csv(csv_path), args.repeat)
+        build_s, trajectory = timed(lambda: build_trajectory(ts, columns, do_ports, do_values, PERIOD), args.repeat)
+        positions = {"position": columns["position"]}
+        build_diff_s, _ = timed(lambda: build_trajectory(ts, positions, do_ports, do_values, PERIOD), args.repeat)
+        write_s, _ = timed(lambda: write_trajectory(output_path, trajectory), args.repeat)
+        out_mb = os.path.getsize(output_path) / 1024 / 1024
+        stages = {"read": read_s, "build": build_s, "build_diff": build_diff_s, "write": write_s}
+        for name, seconds in stages.items():
+            results[f"csv/{name}"] = {"ms": round(seconds * 1000, 1), "rows_per_s": round(args.rows / seconds)}
+        total = read_s + build_s + write_s
+        results["csv/total"] = {"ms": round(total * 1000, 1), "rows_per_s": round(args.rows / total)}
+
+        if args.python_rows:
+            rows = min(args.python_rows, args.rows)
+            python_s, _ = timed(lambda: convert_python(csv_path, output_path + ".py", rows), 1)
+            results["csv/python_total"] = {"ms_per_1m_rows": round(python_s / rows * 1e6 * 1000, 1),
+                                           "rows_per_s": round(rows / python_s)}
+
+    print(f"输出: {trajectory.rows} 个点, {out_mb:.1f} MB")
+    print(f"{'阶段':<20}{'耗时(ms)':>12}{'点/秒':>14}")
+    for name, stats in results.items():
+        ms = stats.get("ms", stats.get("ms_per_1m_rows"))
+        label = name[4:] + ("（折算到100万点）" if "ms_per_1m_rows" in stats else "")
+        print(f"{label:<20}{ms:>12.1f}{stats['rows_per_s']:>14}")
+
+    if args.output:
+        save_results(args.output, run_meta(args), results)
+        print(f"结果已保存到 {args.output}")
+
+    failed = False
+    total_ms = results["csv/total"]["ms"] * 1e6 / args.rows
+    if total_ms > args.max_total_ms:
+        print(f"转换总耗时折算到100万点为 {total_ms:.0f} ms，超过 {args.max_total_ms:.0f} ms")
+        failed = True
+    build_ms = results["csv/build"]["ms"] * 1e6 / args.rows
+    if build_ms > args.max_build_ms:
+        print(f"build 阶段折算到100万点耗时 {build_ms:.0f} ms，超过 {args.max_build_ms:.0f} ms")
+        failed = True
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
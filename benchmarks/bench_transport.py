@@ -0,0 +1,239 @@
+# -*- coding: utf-8 -*-
+"""多客户端负载测试：一个SSE服务器进程 vs 每个客户端一个stdio服务器进程
+
+--clients 个MCP客户端同时连接同一组 --robots 台模拟机器人，每个客户端连接机器人后依次调用
+--calls 次查询工具（状态查询和读R寄存器交替）。对比两种部署方式:
+    stdio: 每个客户端通过stdio启动自己的 python -m agilebot_mcp（改造前唯一的方式）
+    sse: 启动一个 AGILEBOT_MCP_TRANSPORT=sse 的服务器，所有客户端通过HTTP连接
+测量从启动到所有客户端完成连接的时间、工具调用延迟和吞吐量、服务器进程数、
+所有服务器进程持有的机器人连接数以及服务器进程的总内存（RSS，仅Linux）。
+SSE方式出现失败的调用，或机器人连接数不等于 --robots 时以退出码1结束。
+
+运行:
+    python benchmarks/bench_transport.py
+    python benchmarks/bench_transport.py --clients 16 --robots 4 --calls 100 --output transport.json
+"""
+import argparse
+import asyncio
+import contextlib
+import json
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from mcp import ClientSession, StdioServerParameters
+from mcp.client.sse import sse_client
+from mcp.client.stdio import stdio_client
+
+from harness import summarize, is_error, run_meta, save_results, print_results
+
+SRC = Path(__file__).resolve().parent.parent / "src"
+PACKAGE = "agilebot_mcp"
+
+
+def _env(args, **extra):
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [str(SRC), env.get("PYTHONPATH")]))
+    env["AGILEBOT_MCP_BACKEND"] = "sim"
+    env["AGILEBOT_MCP_SIM_LATENCY"] = str(args.latency_ms / 1000.0)
+    env.update(extra)
+    return env
+
+
+def _free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _rss_mb(pids):
+    """进程的常驻内存之和（MB），无法读取 /proc 时返回 None"""
+    total = 0
+    for pid in pids:
+        try:
+            with open(f"/proc/{pid}/status", encoding="utf-8") as f:
+                total += next(int(line.split()[1]) for line in f if line.startswith("VmRSS:"))
+        except (OSError, StopIteration):
+            return None
+    return round(total / 1024, 1)
+
+
+def _child_pids():
+    """本进程启动的 python -m agilebot_mcp 子进程"""
+    pids = []
+    try:
+        for task in os.listdir("/proc/self/task"):
+            with open(f"/proc/self/task/{task}/children", encoding="utf-8") as f:
+                pids.extend(int(pid) for pid in f.read().split())
+    except OSError:
+        return []
+    return pids
+
+
+@contextlib.asynccontextmanager
+async def _session(transport):
+    async with transport as (read, write), ClientSession(read, write) as session:
+        yield session
+
+
+class Client:
+    """一个MCP客户端的工作负载"""
+
+    def __init__(self, index, ips, calls):
+        self.index = index
+        self.ips = ips
+        self.calls = calls
+        self.latencies = []
+        self.errors = 0
+        self.robots = 0
+
+    async def run(self, session, connected, finished, sample):
+        await session.initialize()
+        for ip in self.ips:
+            if is_error((await session.call_tool("connect_robot_tool", {"ip": ip})).content):
+                raise RuntimeError(f"客户端 {self.index} 连接机器人失败: {ip}")
+        connected()
+        for call in range(self.calls):
+            ip = self.ips[(self.index + call) % len(self.ips)]
+            name, arguments = (("get_status_tool", {"ip": ip}) if call % 2 == 0
+                               else ("read_R", {"ip": ip, "index": 1}))
+            start = time.perf_counter()
+            result = await session.call_tool(name, arguments)
+            self.latencies.append(time.perf_counter() - start)
+            self.errors += result.isError or is_error(result.content)
+        health = json.loads((await session.call_tool("get_robot_health_tool", {})).content[0].text)
+        self.robots = len(health["robots"])
+        # 所有客户端都完成后再统一采样内存并断开
+        finished()
+        await sample.wait()
+
+
+async def run_clients(args, open_session, server_pids, shared):
+    """shared 为 True 时所有客户端连接同一个服务器进程，机器人连接数按一个进程统计"""
+    ips = [f"10.33.0.{index + 1}" for index in range(args.robots)]
+    clients = [Client(index, ips, args.calls) for index in range(args.clients)]
+    counts = {"connected": 0, "finished": 0}
+    # 所有客户端都完成连接的时间
+    ready = []
+    all_finished, sample = asyncio.Event(), asyncio.Event()
+
+    def connected():
+        counts["connected"] += 1
+        if counts["connected"] == len(clients):
+            ready.append(time.perf_counter() - start)
+
+    def finished():
+        counts["finished"] += 1
+        if counts["finished"] == len(clients):
+            all_finished.set()
+
+    async def run_client(client):
+        async with open_session() as session:
+            await client.run(session, connected, finished, sample)
+
+    start = time.perf_counter()
+    tasks = [asyncio.create_task(run_client(client)) for client in clients]
+    waiter = asyncio.create_task(all_finished.wait())
+    await asyncio.wait([waiter, *tasks], return_when=asyncio.FIRST_COMPLETED)
+    if not waiter.done():
+        # 某个客户端在完成前失败
+        sample.set()
+        await asyncio.gather(*tasks)
+    elapsed = time.perf_counter() - start
+    pids = server_pids()
+    rss = _rss_mb(pids)
+    sample.set()
+    await asyncio.gather(*tasks)
+
+    latencies = [latency for client in clients for latency in client.latencies]
+    stats = summarize(latencies, elapsed - ready[0], sum(client.errors for client in clients))
+    stats.update({
+        "ready_s": round(ready[0], 3),
+        "total_s": round(elapsed, 3),
+        "server_processes": len(pids),
+        "robot_connections": clients[0].robots if shared else sum(client.robots for client in clients),
+        "server_rss_mb": rss,
+    })
+    return stats
+
+
+def run_stdio(args, workdir):
+    params = StdioServerParameters(command=sys.executable, args=["-m", PACKAGE], env=_env(args), cwd=workdir)
+
+    def open_session():
+        return _session(stdio_client(params))
+
+    return asyncio.run(run_clients(args, open_session, _child_pids, shared=False))
+
+
+def run_sse(args, workdir):
+    port = args.port or _free_port()
+    env = _env(args, AGILEBOT_MCP_TRANSPORT="sse", AGILEBOT_MCP_PORT=str(port))
+    start = time.perf_counter()
+    proc = subprocess.Popen([sys.executable, "-m", PACKAGE], cwd=workdir, env=env,
+                            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        deadline = time.monotonic() + 30
+        while True:
+            try:
+                socket.create_connection(("127.0.0.1", port), timeout=0.5).close()
+                break
+            except OSError:
+                if proc.poll() is not None or time.monotonic() > deadline:
+                    raise RuntimeError("SSE服务器启动失败")
+                time.sleep(0.02)
+        startup = time.perf_counter() - start
+
+        def open_session():
+            return _session(sse_client(f"http://127.0.0.1:{port}/sse"))
+
+        stats = asyncio.run(run_clients(args, open_session, lambda: [proc.pid], shared=True))
+        stats["ready_s"] = round(stats["ready_s"] + startup, 3)
+        stats["total_s"] = round(stats["total_s"] + startup, 3)
+        return stats
+    finally:
+        proc.terminate()
+        try:
+            proc.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            proc.kill()
+            proc.wait()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--clients", type=int, default=8, help="同时连接的MCP客户端数")
+    parser.add_argument("--robots", type=int, default=2, help="所有客户端共用的机器人数")
+    parser.add_argument("--calls", type=int, default=50, help="每个客户端的工具调用次数")
+    parser.add_argument("--latency-ms", type=float, default=2.0, help="模拟器RPC延迟（毫秒）")
+    parser.add_argument("--port", type=int, default=0, help="SSE服务器端口，0 表示自动选择空闲端口")
+    parser.add_argument("--output", help="保存结果的JSON文件")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as workdir:
+        results = {
+            f"transport/stdio_x{args.clients}": run_stdio(args, workdir),
+            "transport/sse": run_sse(args, workdir),
+        }
+
+    print(f"{args.clients} 个客户端, {args.robots} 台机器人, 每个客户端 {args.calls} 次调用")
+    print_results(results, columns=("ready_s", "p50_ms", "p95_ms", "calls_per_s", "error_rate",
+                                    "server_processes", "robot_connections", "server_rss_mb"))
+
+    if args.output:
+        save_results(args.output, run_meta(args), results)
+        print(f"结果已保存到 {args.output}")
+
+    sse = results["transport/sse"]
+    if sse["error_rate"] > 0 or sse["robot_connections"] != args.robots:
+        print(f"SSE服务器调用失败率 {sse['error_rate']}，机器人连接数 {sse['robot_connections']}")
+        sys.exit(1)
+    sys.exit(0)
+
+
+if __name__ == "__main__":
+    main()
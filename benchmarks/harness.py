@@ -0,0 +1,174 @@
+# -*- coding: utf-8 -*-
+"""基准测试公共函数：延迟统计、内存分配统计、结果保存与基线对比
+
+各 bench_*.py 脚本用 measure() 采集延迟，用 save_results()/compare() 保存结果并与基线对比。
+结果文件格式:
+    {"meta": {...}, "results": {"<名称>": {"p50_ms": ..., "calls_per_s": ..., ...}}}
+"""
+import datetime
+import json
+import platform
+import sys
+import time
+import tracemalloc
+
+# 越小越差的指标，其余指标都是越大越差
+LOWER_IS_WORSE = ("calls_per_s",)
+DEFAULT_GATED_METRICS = ("p50_ms", "p95_ms", "calls_per_s", "alloc_kb_per_call", "error_rate")
+
+
+def percentile(ordered, pct):
+    """ordered 为已排序的样本，线性插值计算百分位数"""
+    if not ordered:
+        return 0.0
+    position = (len(ordered) - 1) * pct / 100
+    lower = int(position)
+    upper = min(lower + 1, len(ordered) - 1)
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (position - lower)
+
+
+def summarize(latencies, elapsed, errors=0):
+    """把一组延迟（秒）汇总为毫秒百分位数和吞吐量"""
+    ordered = sorted(latencies)
+    calls = len(ordered)
+    return {
+        "calls": calls,
+        "p50_ms": round(percentile(ordered, 50) * 1000, 4),
+        "p95_ms": round(percentile(ordered, 95) * 1000, 4),
+        "p99_ms": round(percentile(ordered, 99) * 1000, 4),
+        "mean_ms": round(sum(ordered) / calls * 1000, 4) if calls else 0.0,
+        "calls_per_s": round(calls / elapsed, 1) if elapsed > 0 else 0.0,
+        "error_rate": round(errors / calls, 4) if calls else 0.0,
+    }
+
+
+def is_error(result):
+    """工具返回 {"status": "error"} 时视为失败"""
+    text = result[0].text if isinstance(result, (list, tuple)) and result else result
+    try:
+        return json.loads(text).get("status") == "error"
+    except (TypeError, ValueError, AttributeError):
+        return False
+
+
+async def measure(call, iterations, warmup=5, setup=None):
+    """顺序执行 call() 并统计延迟
+
+    参数:
+        call: 无参协程函数，返回工具结果
+        iterations: 计时的调用次数
+        warmup: 预热次数（不计时）
+        setup: 每次调用前执行的无参协程函数（不计时），返回值作为 call 的参数
+    """
+    for _ in range(warmup):
+        args = await setup() if setup else None
+        await (call(args) if setup else call())
+    latencies = []
+    errors = 0
+    busy = 0.0
+    for _ in range(iterations):
+        args = await setup() if setup else None
+        start = time.perf_counter()
+        result = await (call(args) if setup else call())
+        latency = time.perf_counter() - start
+        busy += latency
+        latencies.append(latency)
+        errors += is_error(result)
+    return summarize(latencies, busy, errors)
+
+
+async def measure_allocations(call, iterations, setup=None):
+    """用 tracemalloc 统计每次调用的内存分配
+
+    返回:
+        dict: alloc_kb_per_call 为每次调用期间新增内存的峰值（KB，包括调用结束后已释放的临时对象），
+              retained_kb_per_call 为调用结束后仍未释放的内存
+    """
+    tracemalloc.start()
+    try:
+        peak_total = 0
+        retained_total = 0
+        for _ in range(iterations):
+            args = await setup() if setup else None
+            before = tracemalloc.get_traced_memory()[0]
+            tracemalloc.reset_peak()
+            await (call(args) if setup else call())
+            current, peak = tracemalloc.get_traced_memory()
+            peak_total += peak - before
+            retained_total += current - before
+    finally:
+        tracemalloc.stop()
+    return {
+        "alloc_kb_per_call": round(peak_total / iterations / 1024, 3),
+        "retained_kb_per_call": round(retained_total / iterations / 1024, 3),
+    }
+
+
+def run_meta(args):
+    return {
+        "timestamp": datetime.datetime.now().isoformat(timespec="seconds"),
+        "python": sys.version.split()[0],
+        "platform": platform.platform(),
+        "args": vars(args),
+    }
+
+
+def save_results(path, meta, results):
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({"meta": meta, "results": results}, f, ensure_ascii=False, indent=2, sort_keys=True)
+
+
+def load_results(path):
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)["results"]
+
+
+def compare(current, baseline, max_regression, metrics=DEFAULT_GATED_METRICS, min_delta_ms=0.05):
+    """与基线对比，返回超过 max_regression（百分比）的退化项列表
+
+    延迟指标的绝对变化小于 min_delta_ms 时忽略，避免亚毫秒级的噪声触发失败；
+    error_rate 不按百分比计算，只要比基线高就算退化。
+    """
+    regressions = []
+    for name, values in sorted(current.items()):
+        base = baseline.get(name)
+        if base is None:
+            continue
+        for metric in metrics:
+            if metric not in values or metric not in base:
+                continue
+            new, old = values[metric], base[metric]
+            if metric == "error_rate":
+                if new > old:
+                    regressions.append((name, metric, old, new, None))
+                continue
+            if metric.endswith("_ms") and abs(new - old) < min_delta_ms:
+                continue
+            if old == 0:
+                continue
+            change = (new - old) / old * 100
+            degradation = -change if metric in LOWER_IS_WORSE else change
+            if degradation > max_regression:
+                regressions.append((name, metric, old, new, change))
+    return regressions
+
+
+def print_results(results, columns=("p50_ms", "p95_ms", "p99_ms", "calls_per_s", "alloc_kb_per_call", "error_rate")):
+    width = max(len(name) for name in results) if results else 10
+    print(f"{'name':<{width}}  " + "  ".join(f"{column:>17}" for column in columns))
+    for name, values in results.items():
+        cells = []
+        for column in columns:
+            value = values.get(column)
+            cells.append(f"{'-' if value is None else value:>17}")
+        print(f"{name:<{width}}  " + "  ".join(cells))
+
+
+def print_regressions(regressions, max_regression):
+    if not regressions:
+        print(f"与基线相比没有超过 {max_regression}% 的退化")
+        return
+    print(f"与基线相比超过 {max_regression}% 的退化:")
+    for name, metric, old, new, change in regressions:
+        detail = "" if change is None else f" ({change:+.1f}%)"
+        print(f"  {name} {metric}: {old} -> {new}{detail}")
@@ -2,6 +2,12 @@
 
 __version__ = "0.1.0"
 
-from .server import main
-
 __all__ = ["main"]
+
+
+def __getattr__(name):
+    # 导入包时不加载服务器和 mcp，只有使用 main 时才导入
+    if name == "main":
+        from .server import main
+        return main
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,58 @@
+# -*- coding: utf-8 -*-
+"""机器人后端选择
+
+sdk: 使用捷勃特SDK连接真实控制柜（默认）
+sim: 使用 simulator.SimArm，不需要SDK和控制柜
+"""
+import os
+
+from . import sdk
+
+BACKENDS = ("sdk", "sim")
+_backend = "sdk"
+
+
+def set_backend(name):
+    """切换后端，只影响之后新建立的连接"""
+    global _backend
+    name = name.lower()
+    if name not in BACKENDS:
+        raise ValueError(f"未知的机器人后端: {name}，可选: {', '.join(BACKENDS)}")
+    _backend = name
+
+
+def get_backend():
+    return _backend
+
+
+def create_arm():
+    """按当前后端创建未连接的 Arm 实例"""
+    if _backend == "sim":
+        from .simulator import SimArm
+        return SimArm()
+    if not sdk.SDK_AVAILABLE:
+        raise RuntimeError("未安装Agilebot SDK，可设置环境变量 AGILEBOT_MCP_BACKEND=sim 使用模拟器")
+    return sdk.Arm()
+
+
+def create_hardware_state(ip):
+    """按当前后端创建状态订阅对象"""
+    if _backend == "sim":
+        from .simulator import SimHardwareState
+        return SimHardwareState(ip)
+    if not sdk.SDK_AVAILABLE:
+        raise RuntimeError("未安装Agilebot SDK，无法订阅机器人状态")
+    return sdk.HardwareState(ip)
+
+
+def create_file_manager(ip):
+    """按当前后端创建文件管理服务的客户端"""
+    if _backend == "sim":
+        from .simulator import SimFileManager
+        return SimFileManager(ip)
+    if not sdk.SDK_AVAILABLE:
+        raise RuntimeError("未安装Agilebot SDK，无法使用文件管理服务")
+    return sdk.FileManager(ip)
+
+
+set_backend(os.environ.get("AGILEBOT_MCP_BACKEND", "sdk"))
@@ -0,0 +1,232 @@
+# -*- coding: utf-8 -*-
+"""把路径点编译为BAS脚本并在控制器上执行
+
+路径点格式与 run_path 相同（见 motion_path.py），编译为一个 BasScript:
+    每个路径点写入一个PR寄存器（从 pr_start 开始连续编号，批量并发写入），
+    脚本中对应一条 move_joint（MovePoseType.PR），带该段的速度和平滑距离；
+    路径点之后可以附带寄存器赋值 assign（assign_value）和等待时间 wait（wait_time）。
+整个脚本通过一次 execute_bas_script 调用发送给控制器，由控制器连续执行并按平滑距离衔接相邻的运动，
+不再逐点经过网络往返，也不会在每个路径点停下。
+BAS的运动指令没有加速度参数，路径点不接受 accel；平滑用 smooth 指定（mm，0 表示精确到位）。
+"""
+import functools
+import json
+import logging
+import os
+import time
+
+from .sdk import StatusCodeEnum, BasScript, AssignType, OtherType, MovePoseType, SpeedType, SmoothType, ValueType
+from .robot_core import robot_list, check_robot_ready, mark_robot_ready, invalidate_robot_ready, _motion_params
+from .registers import _run_batch, _write_one
+from .motion_path import PATH_MAX_WAYPOINTS, JOINT_AXES, CART_AXES, MAX_REPORTED_ERRORS, _parse_waypoint, _unreachable
+from .jobs import job_manager
+from .responses import encode, error
+
+logger = logging.getLogger(__name__)
+
+# 路径点写入的第一个PR寄存器编号，避免覆盖示教用的PR寄存器
+BAS_PR_START = int(os.environ.get("AGILEBOT_MCP_BAS_PR_START", "100"))
+# 控制器PR寄存器的最大编号，路径点使用的PR寄存器不能超出
+BAS_PR_MAX = int(os.environ.get("AGILEBOT_MCP_BAS_PR_MAX", "2000"))
+BAS_SCRIPT_NAME = "mcp_path"
+# 赋值支持的寄存器类型 -> 值的类型
+ASSIGN_KINDS = {"R": float, "MR": int}
+
+
+class Step:
+    """脚本中的一条指令，op 为 move_joint、assign_value 或 wait_time"""
+
+    __slots__ = ("op", "args")
+
+    def __init__(self, op, **args):
+        self.op = op
+        self.args = args
+
+    def describe(self):
+        return {"op": self.op, **self.args}
+
+
+def _parse_assign(item):
+    if not isinstance(item, dict):
+        raise ValueError("赋值应为JSON对象，例如 {\"kind\": \"R\", \"index\": 1, \"value\": 10}")
+    kind = str(item.get("kind", "R")).upper()
+    if kind not in ASSIGN_KINDS or getattr(AssignType, kind, None) is None:
+        raise ValueError(f"不支持赋值的寄存器类型: {kind}，可选: {', '.join(ASSIGN_KINDS)}")
+    index, value = item.get("index"), item.get("value")
+    if isinstance(index, bool) or not isinstance(index, int) or index < 1:
+        raise ValueError("寄存器编号应为正整数")
+    if isinstance(value, bool) or not isinstance(value, (int, float)):
+        raise ValueError("赋值应为数字")
+    if ASSIGN_KINDS[kind] is int and value != int(value):
+        raise ValueError(f"{kind}寄存器的值应为整数")
+    return Step("assign_value", kind=kind, index=index, value=ASSIGN_KINDS[kind](value))
+
+
+def _parse_after(item):
+    """路径点之后的赋值和等待"""
+    steps = []
+    if not isinstance(item, dict):
+        return steps
+    assigns = item.get("assign", [])
+    for assign in assigns if isinstance(assigns, list) else [assigns]:
+        steps.append(_parse_assign(assign))
+    wait = item.get("wait")
+    if wait is not None:
+        if isinstance(wait, bool) or not isinstance(wait, (int, float)) or wait < 0:
+            raise ValueError("等待时间应为非负数字（秒）")
+        if wait:
+            steps.append(Step("wait_time", seconds=wait))
+    return steps
+
+
+def _smooth(value):
+    if isinstance(value, bool) or not isinstance(value, (int, float)) or value < 0:
+        raise ValueError(f"平滑距离应为非负数字（mm）: {value}")
+    return value
+
+
+def compile_path(waypoints, pose_type, speed, smooth, assign, pr_start):
+    """解析并校验路径点，返回 (路径点列表, 指令列表, {序号: 错误})
+
+    路径点列表与 waypoints 一一对应（格式错误的为 None），第 i 个路径点写入 PR[pr_start + i]。
+    """
+    segments, steps, problems = [], [], {}
+    try:
+        for item in assign if isinstance(assign, list) else [assign] if assign else []:
+            steps.append(_parse_assign(item))
+    except ValueError as e:
+        problems[-1] = str(e)
+    for index, item in enumerate(waypoints):
+        try:
+            if isinstance(item, dict) and ("accel" in item or "blend" in item):
+                raise ValueError("BAS脚本的路径点不支持 accel/blend，平滑请使用 smooth（mm）")
+            segment = _parse_waypoint(item, pose_type, speed, 1, 0)
+            segment_smooth = _smooth(item.get("smooth", smooth) if isinstance(item, dict) else smooth)
+            after = _parse_after(item)
+        except ValueError as e:
+            problems[index] = str(e)
+            segments.append(None)
+            continue
+        segments.append(segment)
+        steps.append(Step("move_joint", pr=pr_start + index, speed=segment.speed, smooth=segment_smooth))
+        steps.extend(after)
+    return segments, steps, problems
+
+
+def _pose_register_data(segment, name):
+    """路径点 -> write_PR 使用的位姿字典（见 registers._dict_to_pose_register）"""
+    if segment.pose_type == "joint":
+        return {"name": name, "pose_type": "JOINT", "joint": dict(zip(JOINT_AXES, segment.target))}
+    data = {"name": name, "pose_type": "CART", "cartesian": dict(zip(CART_AXES, segment.target))}
+    if segment.posture:
+        data["posture"] = segment.posture
+    return data
+
+
+def build_script(name, steps):
+    """按指令列表构造 BasScript，某条指令添加失败时抛出 ValueError"""
+    script = BasScript(name=name)
+    for number, step in enumerate(steps, 1):
+        args = step.args
+        if step.op == "move_joint":
+            smooth = {"smooth_type": SmoothType.SMOOTH_DISTANCE, "smooth_distance": args["smooth"]} \
+                if args["smooth"] else {}
+            ret = script.move_joint(pose_type=MovePoseType.PR, pose_index=args["pr"], speed_type=SpeedType.VALUE,
+                                    speed_value=args["speed"], **smooth)
+        elif step.op == "assign_value":
+            ret = script.assign_value(getattr(AssignType, args["kind"]), args["index"], OtherType.VALUE,
+                                      args["value"])
+        else:
+            ret = script.wait_time(ValueType.VALUE, args["seconds"])
+        if ret != StatusCodeEnum.OK:
+            raise ValueError(f"第{number}条指令 {step.op} 添加失败, 错误代码: {ret}")
+    return script
+
+
+def run_bas_script(ip: str, waypoints, pose_type: str = "joint", speed=None, smooth=0, assign=None,
+                   name: str = BAS_SCRIPT_NAME, pr_start: int = None, dry_run: bool = False):
+    """把路径点和寄存器赋值编译为一个BAS脚本，写入路径点PR寄存器后一次调用在控制器上执行
+
+    参数:
+        ip: 机器人控制柜IP地址
+        waypoints: 路径点列表，格式同 run_path；字典形式的路径点可带 speed、smooth（mm），
+            以及到达该路径点后执行的 assign（赋值或赋值列表）和 wait（等待秒数）
+        pose_type: 数组形式路径点的类型，joint 或 cartesian
+        speed: 默认速度 (0-100]，默认使用机器人清单中的设置
+        smooth: 默认平滑距离（mm），0 表示精确到位
+        assign: 运动开始前执行的赋值，{"kind": "R"/"MR", "index": 编号, "value": 值} 或其列表
+        name: 脚本名称
+        pr_start: 第一个路径点写入的PR寄存器编号，之后连续编号，默认 BAS_PR_START；最后一个编号不能超过 BAS_PR_MAX
+        dry_run: 只编译并返回指令列表，不写寄存器也不执行
+
+    返回:
+        str: JSON格式的编译结果（指令列表、使用的PR寄存器范围）和执行结果
+    """
+    try:
+        if ip not in robot_list:
+            return error("请先连接机器人")
+        if pose_type not in ("joint", "cartesian"):
+            return error(f"无效的路径点类型: {pose_type}，可选: joint, cartesian")
+        if not isinstance(waypoints, list) or not waypoints:
+            return error("路径点应为非空数组")
+        if len(waypoints) > PATH_MAX_WAYPOINTS:
+            return error(f"一条路径最多{PATH_MAX_WAYPOINTS}个路径点")
+        if not isinstance(name, str) or not name:
+            return error("脚本名称不能为空")
+        if pr_start is None:
+            pr_start = BAS_PR_START
+        if isinstance(pr_start, bool) or not isinstance(pr_start, int) or pr_start < 1:
+            return error("PR寄存器起始编号应为正整数")
+        if pr_start + len(waypoints) - 1 > BAS_PR_MAX:
+            return error(f"路径点需要PR寄存器 {pr_start}~{pr_start + len(waypoints) - 1}，超出范围 1~{BAS_PR_MAX}")
+        speed, _ = _motion_params(ip, speed, None)
+
+        segments, steps, problems = compile_path(waypoints, pose_type, speed, smooth, assign, pr_start)
+        if not problems:
+            problems = _unreachable(ip, segments) or {}
+        if problems:
+            logger.error("BAS脚本编译失败: %s, 不合格的路径点: %s 个", ip, len(problems))
+            return error(f"路径点校验失败，共 {len(problems)} 个不合格，脚本未执行",
+                         errors=[{"index": index, "error": message} if index >= 0 else {"assign": message}
+                                 for index, message in sorted(problems.items())[:MAX_REPORTED_ERRORS]])
+        try:
+            script = build_script(name, steps)
+        except ValueError as e:
+            return error(str(e))
+        compiled = {"name": name, "waypoints": len(segments), "instructions": len(steps),
+                    "pose_registers": [pr_start, pr_start + len(segments) - 1]}
+        if dry_run:
+            return encode({"status": "success", "dry_run": True, **compiled,
+                           "steps": [step.describe() for step in steps]})
+
+        with robot_list.lease(ip) as arm:
+            if arm is None:
+                return error("请先连接机器人")
+            if job_manager.jobs(ip, active_only=True):
+                return error("该机器人有正在运行的后台任务，请等待结束或取消后再执行")
+            ready = check_robot_ready(ip)
+            if json.loads(ready)["status"] != "success":
+                return ready
+            started = time.monotonic()
+            values, errors = _run_batch(ip, functools.partial(_write_one, "PR", "write_PR"),
+                                        [(pr_start + index, _pose_register_data(segment, f"{name}_{index + 1}"))
+                                         for index, segment in enumerate(segments)])
+            if values is None:
+                return error("请先连接机器人")
+            if errors:
+                logger.error("写入路径点PR寄存器失败: %s, 失败: %s 个", ip, len(errors))
+                return error("写入路径点PR寄存器失败，脚本未执行", errors=errors)
+            written = time.monotonic()
+            ret = arm.execution.execute_bas_script(script)
+        if ret != StatusCodeEnum.OK:
+            invalidate_robot_ready(ip)
+            logger.error("执行BAS脚本失败: %s, 脚本: %s, 错误代码: %s", ip, name, ret)
+            return error(f"执行BAS脚本失败, 错误代码: {ret}")
+        mark_robot_ready(ip)
+        logger.info("BAS脚本已发送: %s, 脚本: %s, 路径点: %s, 指令: %s", ip, name, len(segments), len(steps))
+        return encode({"status": "success", "message": "BAS脚本已发送到控制器执行", **compiled,
+                       "write_s": round(written - started, 3), "execute_s": round(time.monotonic() - written, 3)})
+    except Exception as e:
+        invalidate_robot_ready(ip)
+        logger.error("执行BAS脚本时发生异常: %s, 脚本: %s, 异常信息: %s", ip, name, e)
+        return error(f"执行BAS脚本时发生异常: {str(e)}")
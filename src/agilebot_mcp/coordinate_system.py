@@ -1,26 +1,40 @@
 # -*- coding: utf-8 -*-
 import json
 import logging
-from Agilebot.IR.A.status_code import StatusCodeEnum
-from Agilebot.IR.A.sdk_types import CoordinateSystemType
-from Agilebot.IR.A.sdk_classes import GeometryPose, CoordinateInfo, Translation, Rotation
 
-from .robot_core import robot_list
+from .sdk import StatusCodeEnum, CoordinateSystemType, GeometryPose, CoordinateInfo, Translation, Rotation
+from .robot_core import robot_list, robot_lock
+from .responses import success, error, CoordinateSummary, CoordinateData
 
 logger = logging.getLogger(__name__)
 
+# 坐标系被修改或删除后调用的回调 callback(ip, sys_type, coordinate_id)，由依赖坐标系的缓存注册，
+# 这里不导入使用者（例如 pose_conversion），加载坐标系工具时不会连带加载运动学和 numpy
+_frame_hooks = []
 
+
+def on_frame_changed(callback):
+    """注册回调 callback(ip, sys_type, coordinate_id)，sys_type 0 为用户坐标系，1 为工具坐标系"""
+    _frame_hooks.append(callback)
+
+
+def _notify_frame_changed(ip, sys_type, coordinate_id):
+    for callback in _frame_hooks:
+        callback(ip, sys_type, coordinate_id)
+
+
+@robot_lock
 def get_coordinate_list(ip: str, sys_type: int):
     try:
         if ip not in robot_list:
-            return json.dumps({"status": "error", "message": "请先连接机器人"}, ensure_ascii=False)
+            return error("请先连接机器人")
         
         if sys_type == 0:
             coord_type = CoordinateSystemType.UserFrame
         elif sys_type == 1:
             coord_type = CoordinateSystemType.ToolFrame
         else:
-            return json.dumps({"status": "error", "message": "无效的坐标系类型，0=用户坐标系，1=工具坐标系"}, ensure_ascii=False)
+            return error("无效的坐标系类型，0=用户坐标系，1=工具坐标系")
         
         coord_list, ret = robot_list[ip].coordinate_system.get_coordinate_list(coord_type)
         
@@ -29,105 +43,88 @@ def get_coordinate_list(ip: str, sys_type: int):
             fields = coord_list.ListFields()
             if fields:
                 coord_container = fields[0][1]
-                for coord in coord_container:
-                    result.append({
-                        "id": coord.id,
-                        "name": coord.name,
-                        "comment": coord.comment,
-                        "group_id": coord.group_id
-                    })
-            logger.info(f"获取坐标系列表成功: {ip}, 类型: {sys_type}")
-            return json.dumps({"status": "success", "data": result}, ensure_ascii=False)
+                result = [CoordinateSummary.from_sdk(coord) for coord in coord_container]
+            logger.info("获取坐标系列表成功: %s, 类型: %s", ip, sys_type)
+            return success(data=result)
         else:
-            logger.error(f"获取坐标系列表失败: {ip}, 错误代码: {ret}")
-            return json.dumps({"status": "error", "message": "获取坐标系列表失败"}, ensure_ascii=False)
+            logger.error("获取坐标系列表失败: %s, 错误代码: %s", ip, ret)
+            return error("获取坐标系列表失败")
             
     except Exception as e:
-        logger.error(f"获取坐标系列表时发生异常: {ip}, 异常信息: {str(e)}")
-        return json.dumps({"status": "error", "message": f"获取坐标系列表时发生异常: {str(e)}"}, ensure_ascii=False)
+        logger.error("获取坐标系列表时发生异常: %s, 异常信息: %s", ip, e)
+        return error(f"获取坐标系列表时发生异常: {str(e)}")
 
 
+@robot_lock
 def add_coordinate(ip: str, sys_type: int):
     try:
         if ip not in robot_list:
-            return json.dumps({"status": "error", "message": "请先连接机器人"}, ensure_ascii=False)
+            return error("请先连接机器人")
         
         if sys_type == 0:
             coord_type = CoordinateSystemType.UserFrame
         elif sys_type == 1:
             coord_type = CoordinateSystemType.ToolFrame
         else:
-            return json.dumps({"status": "error", "message": "无效的坐标系类型，0=用户坐标系，1=工具坐标系"}, ensure_ascii=False)
+            return error("无效的坐标系类型，0=用户坐标系，1=工具坐标系")
         
         coord, ret = robot_list[ip].coordinate_system.add(coord_type)
         
         if ret == StatusCodeEnum.OK:
-            result = {
-                "id": coord.coordinate_info.coordinate_id,
-                "name": coord.coordinate_info.name,
-                "comment": coord.coordinate_info.comment,
-                "group_id": coord.coordinate_info.group_id,
-                "position": {
-                    "x": coord.position.x,
-                    "y": coord.position.y,
-                    "z": coord.position.z
-                },
-                "orientation": {
-                    "r": coord.orientation.r,
-                    "p": coord.orientation.p,
-                    "y": coord.orientation.y
-                }
-            }
-            logger.info(f"添加坐标系成功: {ip}, 类型: {sys_type}, ID: {coord.coordinate_info.coordinate_id}")
-            return json.dumps({"status": "success", "data": result}, ensure_ascii=False)
+            result = CoordinateData.from_sdk(coord)
+            logger.info("添加坐标系成功: %s, 类型: %s, ID: %s", ip, sys_type, coord.coordinate_info.coordinate_id)
+            return success(data=result)
         else:
-            logger.error(f"添加坐标系失败: {ip}, 错误代码: {ret}")
-            return json.dumps({"status": "error", "message": "添加坐标系失败"}, ensure_ascii=False)
+            logger.error("添加坐标系失败: %s, 错误代码: %s", ip, ret)
+            return error("添加坐标系失败")
             
     except Exception as e:
-        logger.error(f"添加坐标系时发生异常: {ip}, 异常信息: {str(e)}")
-        return json.dumps({"status": "error", "message": f"添加坐标系时发生异常: {str(e)}"}, ensure_ascii=False)
+        logger.error("添加坐标系时发生异常: %s, 异常信息: %s", ip, e)
+        return error(f"添加坐标系时发生异常: {str(e)}")
 
 
+@robot_lock
 def delete_coordinate(ip: str, sys_type: int, coordinate_id: int):
     try:
         if ip not in robot_list:
-            return json.dumps({"status": "error", "message": "请先连接机器人器"}, ensure_ascii=False)
+            return error("请先连接机器人器")
         
         if sys_type == 0:
             coord_type = CoordinateSystemType.UserFrame
         elif sys_type == 1:
             coord_type = CoordinateSystemType.ToolFrame
         else:
-            return json.dumps({"status": "error", "message": "无效的坐标系类型，0=用户坐标系，1=工具坐标系"}, ensure_ascii=False)
+            return error("无效的坐标系类型，0=用户坐标系，1=工具坐标系")
         
         ret = robot_list[ip].coordinate_system.delete(coord_type, coordinate_id)
         
         if ret == StatusCodeEnum.OK:
-            logger.info(f"删除坐标系成功: {ip}, 类型: {sys_type}, ID: {coordinate_id}")
-            return json.dumps({"status": "success", "message": "删除坐标系成功"}, ensure_ascii=False)
+            _notify_frame_changed(ip, sys_type, coordinate_id)
+            logger.info("删除坐标系成功: %s, 类型: %s, ID: %s", ip, sys_type, coordinate_id)
+            return success(message="删除坐标系成功")
         else:
-            logger.error(f"删除坐标系失败: {ip}, 错误代码: {ret}")
-            return json.dumps({"status": "error", "message": "删除坐标系失败"}, ensure_ascii=False)
+            logger.error("删除坐标系失败: %s, 错误代码: %s", ip, ret)
+            return error("删除坐标系失败")
             
     except Exception as e:
-        logger.error(f"删除坐标系时发生异常: {ip}, 异常信息: {str(e)}")
-        return json.dumps({"status": "error", "message": f"删除坐标系时发生异常: {str(e)}"}, ensure_ascii=False)
+        logger.error("删除坐标系时发生异常: %s, 异常信息: %s", ip, e)
+        return error(f"删除坐标系时发生异常: {str(e)}")
 
 
-def update_coordinate(ip: str, sys_type: int, coordinate_data: str):
+@robot_lock
+def update_coordinate(ip: str, sys_type: int, coordinate_data: str | dict):
     try:
         if ip not in robot_list:
-            return json.dumps({"status": "error", "message": "请先连接机器人"}, ensure_ascii=False)
+            return error("请先连接机器人")
         
         if sys_type == 0:
             coord_type = CoordinateSystemType.UserFrame
         elif sys_type == 1:
             coord_type = CoordinateSystemType.ToolFrame
         else:
-            return json.dumps({"status": "error", "message": "无效的坐标系类型，0=用户坐标系，1=工具坐标系"}, ensure_ascii=False)
+            return error("无效的坐标系类型，0=用户坐标系，1=工具坐标系")
         
-        data = json.loads(coordinate_data)
+        data = json.loads(coordinate_data) if isinstance(coordinate_data, str) else coordinate_data
         
         coord_info = CoordinateInfo()
         coord_info.coordinate_id = data.get("id", 0)
@@ -150,54 +147,41 @@ def update_coordinate(ip: str, sys_type: int, coordinate_data: str):
         ret = robot_list[ip].coordinate_system.update(coord_type, coord)
         
         if ret == StatusCodeEnum.OK:
-            logger.info(f"更新坐标系成功: {ip}, 类型: {sys_type}, ID: {coord_info.coordinate_id}")
-            return json.dumps({"status": "success", "message": "更新坐标系成功"}, ensure_ascii=False)
+            _notify_frame_changed(ip, sys_type, coord_info.coordinate_id)
+            logger.info("更新坐标系成功: %s, 类型: %s, ID: %s", ip, sys_type, coord_info.coordinate_id)
+            return success(message="更新坐标系成功")
         else:
-            logger.error(f"更新坐标系失败: {ip}, 错误代码: {ret}")
-            return json.dumps({"status": "error", "message": "更新坐标系失败"}, ensure_ascii=False)
+            logger.error("更新坐标系失败: %s, 错误代码: %s", ip, ret)
+            return error("更新坐标系失败")
             
     except Exception as e:
-        logger.error(f"更新坐标系时发生异常: {ip}, 异常信息: {str(e)}")
-        return json.dumps({"status": "error", "message": f"更新坐标系时发生异常: {str(e)}"}, ensure_ascii=False)
+        logger.error("更新坐标系时发生异常: %s, 异常信息: %s", ip, e)
+        return error(f"更新坐标系时发生异常: {str(e)}")
 
 
+@robot_lock
 def get_coordinate(ip: str, sys_type: int, coordinate_id: int):
     try:
         if ip not in robot_list:
-            return json.dumps({"status": "error", "message": "请先连接机器人"}, ensure_ascii=False)
+            return error("请先连接机器人")
         
         if sys_type == 0:
             coord_type = CoordinateSystemType.UserFrame
         elif sys_type == 1:
             coord_type = CoordinateSystemType.ToolFrame
         else:
-            return json.dumps({"status": "error", "message": "无效的坐标系类型，0=用户坐标系，1=工具坐标系"}, ensure_ascii=False)
+            return error("无效的坐标系类型，0=用户坐标系，1=工具坐标系")
         
         coord, ret = robot_list[ip].coordinate_system.get(coord_type, coordinate_id)
         
         if ret == StatusCodeEnum.OK:
-            result = {
-                "id": coord.coordinate_info.coordinate_id,
-                "name": coord.coordinate_info.name,
-                "comment": coord.coordinate_info.comment,
-                "group_id": coord.coordinate_info.group_id,
-                "position": {
-                    "x": coord.position.x,
-                    "y": coord.position.y,
-                    "z": coord.position.z
-                },
-                "orientation": {
-                    "r": coord.orientation.r,
-                    "p": coord.orientation.p,
-                    "y": coord.orientation.y
-                }
-            }
-            logger.info(f"获取坐标系成功: {ip}, 类型: {sys_type}, ID: {coordinate_id}")
-            return json.dumps({"status": "success", "data": result}, ensure_ascii=False)
+            result = CoordinateData.from_sdk(coord)
+            logger.info("获取坐标系成功: %s, 类型: %s, ID: %s", ip, sys_type, coordinate_id)
+            return success(data=result)
         else:
-            logger.error(f"获取坐标系失败: {ip}, 错误代码: {ret}")
-            return json.dumps({"status": "error", "message": "获取坐标系失败"}, ensure_ascii=False)
+            logger.error("获取坐标系失败: %s, 错误代码: %s", ip, ret)
+            return error("获取坐标系失败")
             
     except Exception as e:
-        logger.error(f"获取坐标系时发生异常: {ip}, 异常信息: {str(e)}")
-        return json.dumps({"status": "error", "message": f"获取坐标系时发生异常: {str(e)}"}, ensure_ascii=False)
+        logger.error("获取坐标系时发生异常: %s, 异常信息: %s", ip, e)
+        return error(f"获取坐标系时发生异常: {str(e)}")
@@ -1,17 +1,18 @@
 # -*- coding: utf-8 -*-
-import json
 import logging
-from Agilebot.IR.A.status_code import StatusCodeEnum
 
-from .robot_core import robot_list, check_robot_ready
+from .sdk import StatusCodeEnum
+from .robot_core import robot_list, robot_lock, check_robot_ready, invalidate_robot_ready
+from .responses import success, error
 
 logger = logging.getLogger(__name__)
 
 
+@robot_lock
 def get_drag_status(ip: str):
     try:
         if ip not in robot_list:
-            return json.dumps({"status": "error", "message": "请先连接机器人"}, ensure_ascii=False)
+            return error("请先连接机器人")
         
         drag_status, ret = robot_list[ip].motion.get_drag_set()
         
@@ -35,17 +36,18 @@ def get_drag_status(ip: str):
                 },
                 "is_continuous_drag": drag_status.is_continuous_drag
             }
-            logger.info(f"获取锁轴状态成功: {ip}")
-            return json.dumps({"status": "success", "data": result}, ensure_ascii=False)
+            logger.info("获取锁轴状态成功: %s", ip)
+            return success(data=result)
         else:
-            logger.error(f"获取锁轴状态失败: {ip}, 错误代码: {ret}")
-            return json.dumps({"status": "error", "message": "获取锁轴状态失败"}, ensure_ascii=False)
+            logger.error("获取锁轴状态失败: %s, 错误代码: %s", ip, ret)
+            return error("获取锁轴状态失败")
             
     except Exception as e:
-        logger.error(f"获取锁轴状态时发生异常: {ip}, 异常信息: {str(e)}")
-        return json.dumps({"status": "error", "message": f"获取锁轴状态时发生异常: {str(e)}"}, ensure_ascii=False)
+        logger.error("获取锁轴状态时发生异常: %s, 异常信息: %s", ip, e)
+        return error(f"获取锁轴状态时发生异常: {str(e)}")
 
 
+@robot_lock
 def set_drag_status(ip: str, cart_x: bool = None, cart_y: bool = None, cart_z: bool = None,
                    cart_a: bool = None, cart_b: bool = None, cart_c: bool = None,
                    joint_j1: bool = None, joint_j2: bool = None, joint_j3: bool = None, 
@@ -75,14 +77,14 @@ def set_drag_status(ip: str, cart_x: bool = None, cart_y: bool = None, cart_z: b
     """
     try:
         if ip not in robot_list:
-            return json.dumps({"status": "error", "message": "请先连接机器人"}, ensure_ascii=False)
+            return error("请先连接机器人")
         
         check_robot_ready(ip)
         
         drag_status, ret = robot_list[ip].motion.get_drag_set()
         if ret != StatusCodeEnum.OK:
-            logger.error(f"获取当前锁轴状态失败: {ip}, 错误代码: {ret}")
-            return json.dumps({"status": "error", "message": "获取当前锁轴状态失败"}, ensure_ascii=False)
+            logger.error("获取当前锁轴状态失败: %s, 错误代码: %s", ip, ret)
+            return error("获取当前锁轴状态失败")
         
         if cart_x is not None:
             drag_status.cart_status.x = not cart_x
@@ -116,39 +118,42 @@ def set_drag_status(ip: str, cart_x: bool = None, cart_y: bool = None, cart_z: b
         ret = robot_list[ip].motion.set_drag_set(drag_status)
         
         if ret == StatusCodeEnum.OK:
-            logger.info(f"设置锁轴状态成功: {ip}")
+            logger.info("设置锁轴状态成功: %s", ip)
             
             enable_ret = robot_list[ip].motion.enable_drag(True)
+            invalidate_robot_ready(ip)
             if enable_ret == StatusCodeEnum.OK:
-                logger.info(f"自动启用拖动示教成功: {ip}")
-                return json.dumps({"status": "success", "message": "设置锁轴状态成功并自动启用拖动示教"}, ensure_ascii=False)
+                logger.info("自动启用拖动示教成功: %s", ip)
+                return success(message="设置锁轴状态成功并自动启用拖动示教")
             else:
-                logger.warning(f"设置锁轴状态成功但启用拖动示教失败: {ip}, 错误代码: {enable_ret}")
-                return json.dumps({"status": "success", "message": "设置锁轴状态成功（拖动示教启用失败）"}, ensure_ascii=False)
+                logger.warning("设置锁轴状态成功但启用拖动示教失败: %s, 错误代码: %s", ip, enable_ret)
+                return success(message="设置锁轴状态成功（拖动示教启用失败）")
         else:
-            logger.error(f"设置锁轴状态失败: {ip}, 错误代码: {ret}")
-            return json.dumps({"status": "error", "message": "设置锁轴状态失败"}, ensure_ascii=False)
+            logger.error("设置锁轴状态失败: %s, 错误代码: %s", ip, ret)
+            return error("设置锁轴状态失败")
             
     except Exception as e:
-        logger.error(f"设置锁轴状态时发生异常: {ip}, 异常信息: {str(e)}")
-        return json.dumps({"status": "error", "message": f"设置锁轴状态时发生异常: {str(e)}"}, ensure_ascii=False)
+        logger.error("设置锁轴状态时发生异常: %s, 异常信息: %s", ip, e)
+        return error(f"设置锁轴状态时发生异常: {str(e)}")
 
 
+@robot_lock
 def enable_drag(ip: str, enable: bool):
     try:
         if ip not in robot_list:
-            return json.dumps({"status": "error", "message": "请先连接机器人"}, ensure_ascii=False)
+            return error("请先连接机器人")
         
         ret = robot_list[ip].motion.enable_drag(enable)
+        invalidate_robot_ready(ip)
         
         if ret == StatusCodeEnum.OK:
             action = "启用" if enable else "禁用"
-            logger.info(f"{action}拖动示教成功: {ip}")
-            return json.dumps({"status": "success", "message": f"{action}拖动示教成功"}, ensure_ascii=False)
+            logger.info("%s拖动示教成功: %s", action, ip)
+            return success(message=f"{action}拖动示教成功")
         else:
-            logger.error(f"设置拖动示教失败: {ip}, 错误代码: {ret}")
-            return json.dumps({"status": "error", "message": "设置拖动示教失败"}, ensure_ascii=False)
+            logger.error("设置拖动示教失败: %s, 错误代码: %s", ip, ret)
+            return error("设置拖动示教失败")
             
     except Exception as e:
-        logger.error(f"设置拖动示教时发生异常: {ip}, 异常信息: {str(e)}")
-        return json.dumps({"status": "error", "message": f"设置拖动示教时发生异常: {str(e)}"}, ensure_ascii=False)
+        logger.error("设置拖动示教时发生异常: %s, 异常信息: %s", ip, e)
+        return error(f"设置拖动示教时发生异常: {str(e)}")
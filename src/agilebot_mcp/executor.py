@@ -0,0 +1,103 @@
+# -*- coding: utf-8 -*-
+import asyncio
+import functools
+import logging
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from .robot_core import robot_list
+from .responses import error
+
+logger = logging.getLogger(__name__)
+
+# 每个机器人的工作线程数与排队深度，可通过环境变量配置
+ROBOT_POOL_SIZE = int(os.environ.get("AGILEBOT_MCP_POOL_SIZE", "2"))
+ROBOT_QUEUE_DEPTH = int(os.environ.get("AGILEBOT_MCP_QUEUE_DEPTH", "16"))
+# 未连接的IP（连接请求、拼写错误或探测）共用的线程数
+SHARED_POOL_SIZE = int(os.environ.get("AGILEBOT_MCP_SHARED_POOL_SIZE", "4"))
+
+
+class RobotExecutor:
+    """按机器人IP划分的有界线程池
+
+    阻塞的SDK调用在对应机器人的线程池中执行，不再占用 FastMCP 的事件循环；
+    慢机器人只会占满自己的线程池，不会拖慢其他机器人的状态查询。
+    每个机器人同时在执行和排队的调用数不超过 pool_size + queue_depth，超出时直接拒绝。
+    只有已连接的机器人才有自己的线程池，机器人被移除时关闭并删除；
+    未连接的IP（例如连接请求）共用一个线程池，不会为每个IP各建一个。
+    """
+
+    def __init__(self, pool_size=ROBOT_POOL_SIZE, queue_depth=ROBOT_QUEUE_DEPTH):
+        self.pool_size = pool_size
+        self.queue_depth = queue_depth
+        self._lock = threading.Lock()
+        self._pools = {}
+        self._slots = {}
+        self._shared = None
+
+    def configure(self, pool_size=None, queue_depth=None):
+        """修改线程池配置，仅对之后新建的机器人线程池生效"""
+        with self._lock:
+            if pool_size is not None:
+                self.pool_size = pool_size
+            if queue_depth is not None:
+                self.queue_depth = queue_depth
+
+    def _pool_for(self, ip):
+        with self._lock:
+            pool = self._pools.get(ip)
+            if pool is None and ip not in robot_list:
+                if self._shared is None:
+                    pool = ThreadPoolExecutor(max_workers=SHARED_POOL_SIZE, thread_name_prefix="robot-shared")
+                    self._shared = (pool, threading.BoundedSemaphore(SHARED_POOL_SIZE + self.queue_depth))
+                return self._shared
+            if pool is None:
+                pool = ThreadPoolExecutor(max_workers=self.pool_size, thread_name_prefix=f"robot-{ip}")
+                self._pools[ip] = pool
+                self._slots[ip] = threading.BoundedSemaphore(self.pool_size + self.queue_depth)
+            return pool, self._slots[ip]
+
+    async def run(self, ip, func, *args, **kwargs):
+        """在机器人线程池中执行 func(ip, *args, **kwargs)
+
+        返回:
+            str: func 的返回值；排队已满时返回JSON格式的错误信息
+        """
+        pool, slots = self._pool_for(ip)
+        if not slots.acquire(blocking=False):
+            logger.warning("机器人请求队列已满: %s, 调用: %s", ip, func.__name__)
+            return error("机器人请求队列已满，请稍后重试")
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(pool, functools.partial(func, ip, *args, **kwargs))
+        finally:
+            slots.release()
+
+    def drop(self, ip):
+        """关闭并删除机器人的线程池，已提交的调用仍会执行完"""
+        with self._lock:
+            pool = self._pools.pop(ip, None)
+            self._slots.pop(ip, None)
+        if pool is not None:
+            pool.shutdown(wait=False)
+
+    def shutdown(self, wait=True):
+        with self._lock:
+            pools = list(self._pools.values())
+            if self._shared is not None:
+                pools.append(self._shared[0])
+            self._pools.clear()
+            self._slots.clear()
+            self._shared = None
+        for pool in pools:
+            pool.shutdown(wait=wait)
+
+
+robot_executor = RobotExecutor()
+robot_list.on_remove(robot_executor.drop)
+
+
+async def run_robot_call(ip, func, *args, **kwargs):
+    """在 ip 对应机器人的线程池中执行阻塞调用"""
+    return await robot_executor.run(ip, func, *args, **kwargs)
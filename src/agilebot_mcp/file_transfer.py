@@ -0,0 +1,386 @@
+# -*- coding: utf-8 -*-
+"""控制柜文件传输
+
+通过SDK的 FileManager 上传、下载、搜索和删除控制柜上的程序、离线轨迹和临时文件。
+
+- 每台机器人缓存一个 FileManager 实例，不再每次操作新建；传输失败或机器人断开时丢弃，下次重新创建
+- 每台机器人同时进行的传输数不超过 FILE_TRANSFERS_PER_ROBOT
+- 上传前计算本地文件的 SHA-256（按路径、修改时间和大小缓存），与该机器人上次成功上传的内容一致
+  且控制柜上仍能搜索到该文件时跳过；中断的批量上传重新提交时已完成的文件会被跳过
+- 多个文件、多台机器人的上传在同一个线程池中并行执行，部署到多台控制柜的总耗时取决于最慢的一台
+- 下载先写入目标目录下的临时目录，完成后再移动到目标位置，中断的下载不会留下不完整的文件
+"""
+import hashlib
+import json
+import logging
+import os
+import shutil
+import tempfile
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+from . import sdk
+from .sdk import StatusCodeEnum
+from .backend import create_file_manager
+from .robot_core import robot_list
+from .responses import encode, success, error
+
+logger = logging.getLogger(__name__)
+
+FILE_TRANSFERS_PER_ROBOT = int(os.environ.get("AGILEBOT_MCP_FILE_TRANSFERS_PER_ROBOT", "2"))
+FILE_TRANSFER_WORKERS = int(os.environ.get("AGILEBOT_MCP_FILE_TRANSFER_WORKERS", "64"))
+# 记录每台机器人上已上传文件哈希的JSON文件，为空时只保存在内存中
+FILE_MANIFEST = os.environ.get("AGILEBOT_MCP_FILE_MANIFEST", "")
+MAX_TRANSFER_FILES = 200
+HASH_BLOCK_BYTES = 1024 * 1024
+
+# 文件类型名 -> SDK常量名
+FILE_TYPES = {
+    "program": "USER_PROGRAM",
+    "trajectory": "TRAJECTORY",
+    "trajectory_csv": "TRAJECTORY_CSV",
+    "tmp": "ROBOT_TMP",
+}
+PROGRAM_SUFFIXES = (".json", ".xml")
+
+_transfer_pool = ThreadPoolExecutor(max_workers=FILE_TRANSFER_WORKERS, thread_name_prefix="file-transfer")
+
+
+class _FileManagers:
+    """每台机器人一个缓存的 FileManager 和一个限制并发传输数的信号量"""
+
+    def __init__(self, per_robot=FILE_TRANSFERS_PER_ROBOT):
+        self.per_robot = per_robot
+        self._lock = threading.Lock()
+        self._managers = {}
+        self._slots = {}
+
+    def slots(self, ip):
+        with self._lock:
+            slots = self._slots.get(ip)
+            if slots is None:
+                slots = self._slots[ip] = threading.BoundedSemaphore(self.per_robot)
+            return slots
+
+    def get(self, ip):
+        with self._lock:
+            manager = self._managers.get(ip)
+        if manager is not None:
+            return manager
+        # 建立连接可能较慢，不在锁内创建；并发创建时保留先放入的实例
+        manager = create_file_manager(ip)
+        with self._lock:
+            manager = self._managers.setdefault(ip, manager)
+        return manager
+
+    def drop(self, ip):
+        with self._lock:
+            self._managers.pop(ip, None)
+
+    def clear(self):
+        with self._lock:
+            self._managers.clear()
+
+
+file_managers = _FileManagers()
+robot_list.on_remove(file_managers.drop)
+robot_list.on_reconnect(file_managers.drop)
+
+
+class _Manifest:
+    """每台机器人上已上传文件的内容哈希：{ip: {"类型:文件名": sha256}}"""
+
+    def __init__(self, path=FILE_MANIFEST):
+        self.path = path
+        self._lock = threading.Lock()
+        self._entries = {}
+        if path and os.path.isfile(path):
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    self._entries = json.load(f)
+            except (OSError, ValueError) as e:
+                logger.warning("读取文件传输记录失败: %s, 异常信息: %s", path, e)
+
+    def get(self, ip, key):
+        with self._lock:
+            return self._entries.get(ip, {}).get(key)
+
+    def set(self, ip, key, digest):
+        with self._lock:
+            if digest is None:
+                self._entries.get(ip, {}).pop(key, None)
+            else:
+                self._entries.setdefault(ip, {})[key] = digest
+
+    def save(self):
+        if not self.path:
+            return
+        with self._lock:
+            data = encode(self._entries)
+        tmp = f"{self.path}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            f.write(data)
+        os.replace(tmp, self.path)
+
+
+manifest = _Manifest()
+
+# 绝对路径 -> (修改时间, 大小, sha256)
+_hash_cache = {}
+_hash_lock = threading.Lock()
+
+
+def _file_hash(path):
+    stat = os.stat(path)
+    with _hash_lock:
+        cached = _hash_cache.get(path)
+    if cached is not None and cached[:2] == (stat.st_mtime_ns, stat.st_size):
+        return cached[2]
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(HASH_BLOCK_BYTES), b""):
+            digest.update(block)
+    digest = digest.hexdigest()
+    with _hash_lock:
+        _hash_cache[path] = (stat.st_mtime_ns, stat.st_size, digest)
+    return digest
+
+
+def _file_type(name):
+    if name not in FILE_TYPES:
+        raise ValueError(f"不支持的文件类型: {name}，可选: {', '.join(FILE_TYPES)}")
+    return getattr(sdk, FILE_TYPES[name])
+
+
+class _LocalFile:
+    """一个待上传的本地文件；程序由同名的 .json 和 .xml 文件组成，按不带扩展名的路径上传"""
+
+    def __init__(self, path, file_type):
+        self.sdk_type = _file_type(file_type)
+        path = os.path.abspath(path)
+        if file_type == "program":
+            stem, suffix = os.path.splitext(path)
+            if suffix.lower() in PROGRAM_SUFFIXES:
+                path = stem
+            parts = [path + suffix for suffix in PROGRAM_SUFFIXES if os.path.isfile(path + suffix)]
+            if not parts:
+                raise FileNotFoundError(f"找不到程序文件: {path}.json / {path}.xml")
+        else:
+            if not os.path.isfile(path):
+                raise FileNotFoundError(f"文件不存在: {path}")
+            parts = [path]
+        self.path = path
+        self.name = os.path.basename(path)
+        self.key = f"{file_type}:{self.name}"
+        # 控制柜上用于确认文件存在的文件名
+        self.remote_name = os.path.basename(parts[0])
+        self.size = sum(os.path.getsize(part) for part in parts)
+        if len(parts) == 1:
+            self.digest = _file_hash(parts[0])
+        else:
+            self.digest = hashlib.sha256("".join(_file_hash(part) for part in parts).encode()).hexdigest()
+
+
+def _remote_exists(manager, name):
+    found = []
+    ret = manager.search(name, found)
+    return ret == StatusCodeEnum.OK and any(os.path.basename(str(item)) == name for item in found)
+
+
+def _upload_one(ip, local, overwrite, skip_unchanged):
+    start = time.perf_counter()
+    result = {"file": local.name, "key": local.key, "bytes": local.size, "sha256": local.digest}
+    with file_managers.slots(ip):
+        try:
+            manager = file_managers.get(ip)
+            if skip_unchanged and manifest.get(ip, local.key) == local.digest \
+                    and _remote_exists(manager, local.remote_name):
+                result["status"] = "skipped"
+                return result
+            ret = manager.upload(local.path, local.sdk_type, overwrite)
+        except Exception as e:
+            file_managers.drop(ip)
+            result.update(status="error", message=f"上传时发生异常: {str(e)}")
+            return result
+    if ret != StatusCodeEnum.OK:
+        result.update(status="error", message=f"上传失败, 错误代码: {ret}")
+        return result
+    manifest.set(ip, local.key, local.digest)
+    result.update(status="uploaded", seconds=round(time.perf_counter() - start, 3))
+    return result
+
+
+def _upload_robot(ip, queue, results, overwrite, skip_unchanged):
+    """从该机器人的文件队列中依次取文件上传；每台机器人最多 FILE_TRANSFERS_PER_ROBOT 个这样的任务"""
+    while True:
+        try:
+            local = queue.popleft()
+        except IndexError:
+            return
+        results.append(_upload_one(ip, local, overwrite, skip_unchanged))
+
+
+def upload_files(ips, files, file_type: str = "tmp", overwrite: bool = True, skip_unchanged: bool = True):
+    """把本地文件并行上传到一台或多台机器人控制柜
+
+    参数:
+        ips: 机器人控制柜IP地址列表（或单个IP）
+        files: 服务器本地文件路径列表（或单个路径）；程序文件可省略 .json/.xml 扩展名。
+            列表项也可以是 {"path": 路径, "file_type": 类型}，一次部署不同类型的文件
+        file_type: 列表项未指定类型时的文件类型 (program, trajectory, trajectory_csv, tmp)
+        overwrite: 控制柜上已有同名文件时是否覆盖
+        skip_unchanged: 内容与上次上传到该机器人的一致且控制柜上仍存在时跳过
+
+    返回:
+        str: JSON格式的结果，按IP列出每个文件的状态（uploaded、skipped、error）
+    """
+    try:
+        ips = [ips] if isinstance(ips, str) else list(dict.fromkeys(ips))
+        files = [files] if isinstance(files, (str, dict)) else list(files)
+        if not ips or not files:
+            return error("请提供机器人IP和文件路径")
+        if len(ips) * len(files) > MAX_TRANSFER_FILES:
+            return encode({"status": "error", "message": f"单次传输不能超过{MAX_TRANSFER_FILES}个文件（IP数×文件数）"})
+        # 本地文件只读取和计算哈希一次，所有机器人共用
+        local_files = [_LocalFile(item["path"], item.get("file_type", file_type)) if isinstance(item, dict)
+                       else _LocalFile(item, file_type) for item in files]
+    except (ValueError, OSError, KeyError, TypeError) as e:
+        return error(str(e))
+
+    start = time.perf_counter()
+    results = {ip: [] for ip in ips}
+    futures = []
+    for ip in ips:
+        queue = deque(local_files)
+        for _ in range(min(file_managers.per_robot, len(local_files))):
+            futures.append(_transfer_pool.submit(_upload_robot, ip, queue, results[ip], overwrite, skip_unchanged))
+    for future in futures:
+        future.result()
+    try:
+        manifest.save()
+    except OSError as e:
+        logger.warning("保存文件传输记录失败: %s, 异常信息: %s", manifest.path, e)
+
+    order = {local.key: index for index, local in enumerate(local_files)}
+    counts = {"uploaded": 0, "skipped": 0, "error": 0}
+    failed_ips = []
+    for ip, items in results.items():
+        items.sort(key=lambda item: order[item["key"]])
+        for item in items:
+            counts[item["status"]] += 1
+        if any(item["status"] == "error" for item in items):
+            failed_ips.append(ip)
+    elapsed = round(time.perf_counter() - start, 3)
+    if failed_ips:
+        logger.warning("文件上传部分失败, 失败的IP: %s", failed_ips)
+    else:
+        logger.info("文件上传完成, 机器人数: %s, 上传: %s, 跳过: %s", len(ips), counts["uploaded"], counts["skipped"])
+    status = "error" if counts["error"] == len(ips) * len(local_files) else "success"
+    return encode({"status": status, "uploaded": counts["uploaded"], "skipped": counts["skipped"],
+                   "failed": counts["error"], "failed_ips": failed_ips, "seconds": elapsed, "results": results})
+
+
+def download_file(ip: str, file_name: str, local_dir: str, file_type: str = "tmp"):
+    """从机器人控制柜下载文件到服务器本地目录
+
+    参数:
+        ip: 机器人控制柜IP地址
+        file_name: 控制柜上的文件名（程序和轨迹可不带扩展名）
+        local_dir: 服务器本地目标目录
+        file_type: 文件类型 (program, trajectory, trajectory_csv, tmp)
+
+    返回:
+        str: JSON格式的结果，包含下载的文件路径、大小和SHA-256
+    """
+    try:
+        sdk_type = _file_type(file_type)
+        os.makedirs(local_dir, exist_ok=True)
+        start = time.perf_counter()
+        staging = tempfile.mkdtemp(prefix=".download-", dir=local_dir)
+        try:
+            with file_managers.slots(ip):
+                try:
+                    ret = file_managers.get(ip).download(file_name, staging, file_type=sdk_type)
+                except Exception:
+                    file_managers.drop(ip)
+                    raise
+            if ret != StatusCodeEnum.OK:
+                logger.error("下载文件失败: %s, 文件: %s, 错误代码: %s", ip, file_name, ret)
+                return error(f"下载文件失败, 错误代码: {ret}")
+            downloaded = []
+            for name in sorted(os.listdir(staging)):
+                target = os.path.join(os.path.abspath(local_dir), name)
+                os.replace(os.path.join(staging, name), target)
+                downloaded.append({"path": target, "bytes": os.path.getsize(target), "sha256": _file_hash(target)})
+        finally:
+            shutil.rmtree(staging, ignore_errors=True)
+        logger.info("下载文件成功: %s, 文件: %s", ip, file_name)
+        return encode({"status": "success", "files": downloaded, "seconds": round(time.perf_counter() - start, 3)})
+    except ValueError as e:
+        return error(str(e))
+    except Exception as e:
+        logger.error("下载文件时发生异常: %s, 文件: %s, 异常信息: %s", ip, file_name, e)
+        return error(f"下载文件时发生异常: {str(e)}")
+
+
+def search_files(ip: str, file_name: str):
+    """在机器人控制柜上搜索文件
+
+    参数:
+        ip: 机器人控制柜IP地址
+        file_name: 文件名或关键字
+
+    返回:
+        str: JSON格式的文件列表
+    """
+    try:
+        found = []
+        with file_managers.slots(ip):
+            try:
+                ret = file_managers.get(ip).search(file_name, found)
+            except Exception:
+                file_managers.drop(ip)
+                raise
+        if ret != StatusCodeEnum.OK:
+            return error(f"搜索文件失败, 错误代码: {ret}")
+        return success(files=[str(item) for item in found])
+    except Exception as e:
+        logger.error("搜索文件时发生异常: %s, 文件: %s, 异常信息: %s", ip, file_name, e)
+        return error(f"搜索文件时发生异常: {str(e)}")
+
+
+def delete_file(ip: str, file_name: str, file_type: str = "tmp"):
+    """删除机器人控制柜上的文件
+
+    参数:
+        ip: 机器人控制柜IP地址
+        file_name: 控制柜上的文件名
+        file_type: 文件类型 (program, trajectory, trajectory_csv, tmp)
+
+    返回:
+        str: JSON格式的删除结果
+    """
+    try:
+        sdk_type = _file_type(file_type)
+        with file_managers.slots(ip):
+            try:
+                ret = file_managers.get(ip).delete(file_name, sdk_type)
+            except Exception:
+                file_managers.drop(ip)
+                raise
+        if ret != StatusCodeEnum.OK:
+            logger.error("删除文件失败: %s, 文件: %s, 错误代码: %s", ip, file_name, ret)
+            return error(f"删除文件失败, 错误代码: {ret}")
+        stem = os.path.splitext(file_name)[0]
+        for name in {file_name, stem}:
+            manifest.set(ip, f"{file_type}:{name}", None)
+        manifest.save()
+        logger.info("删除文件成功: %s, 文件: %s", ip, file_name)
+        return success(message="删除文件成功")
+    except ValueError as e:
+        return error(str(e))
+    except Exception as e:
+        logger.error("删除文件时发生异常: %s, 文件: %s, 异常信息: %s", ip, file_name, e)
+        return error(f"删除文件时发生异常: {str(e)}")
@@ -0,0 +1,211 @@
+# -*- coding: utf-8 -*-
+"""多机器人批量操作
+
+对一组机器人（IP列表或命名分组）并发执行同一个操作，操作直接复用 robot_core、registers、
+modbus、drag_control、coordinate_system、payload、recorder 中的单机实现，每台机器人的调用
+在各自的线程池中执行（见 executor.py）。整体并发数受 concurrency 限制，单台机器人超过 timeout
+未返回时记为超时（已经发出的SDK调用不会被中断，仍占用该机器人的线程池直到返回）。
+"""
+import asyncio
+import importlib
+import inspect
+import json
+import logging
+import os
+import threading
+import time
+
+from .executor import run_robot_call
+from .responses import encode, success, error
+
+logger = logging.getLogger(__name__)
+
+FLEET_CONCURRENCY = int(os.environ.get("AGILEBOT_MCP_FLEET_CONCURRENCY", "16"))
+FLEET_TIMEOUT = float(os.environ.get("AGILEBOT_MCP_FLEET_TIMEOUT", "10"))
+MAX_FLEET_SIZE = 256
+
+# 模块 -> 可批量执行的函数；函数的第一个参数都是 ip，返回JSON字符串
+_OPERATION_MODULES = {
+    "robot_core": (
+        "connect_robot", "disconnect_robot", "get_status", "get_controller_info", "get_current_joint_positions",
+        "get_current_cartesian_position", "get_servo_status", "get_robot_info", "power_on_robot", "power_off_robot",
+        "servo_reset", "acquire_access", "release_access",
+    ),
+    "registers": (
+        "read_R_register", "write_R_register", "delete_R_register", "read_MR_register", "write_MR_register",
+        "delete_MR_register", "read_PR_register", "write_PR_register", "delete_PR_register",
+        "read_registers", "write_registers",
+    ),
+    "modbus": (
+        "read_modbus_coils", "write_modbus_coils", "read_modbus_holding_regs", "write_modbus_holding_regs",
+        "read_modbus_discrete_inputs", "read_modbus_input_regs",
+    ),
+    "drag_control": ("get_drag_status", "set_drag_status", "enable_drag"),
+    "coordinate_system": (
+        "get_coordinate_list", "add_coordinate", "delete_coordinate", "update_coordinate", "get_coordinate",
+    ),
+    "payload": (
+        "get_current_payload", "get_payload_by_id", "set_current_payload", "add_payload", "delete_payload",
+        "update_payload", "get_all_payload", "check_axis_three_horizontal", "get_payload_identify_state",
+        "get_payload_identify_result",
+    ),
+    "recorder": ("start_recording", "stop_recording"),
+}
+# 操作名 -> (模块, 函数)
+OPERATIONS = {name: (module, name) for module, names in _OPERATION_MODULES.items() for name in names}
+# 运动指令与单机工具一样先检查就绪状态
+OPERATIONS["move_joint"] = ("robot_core", "move_joint_when_ready")
+OPERATIONS["move_cartesian"] = ("robot_core", "move_cartesian_when_ready")
+# 状态快照足够新时直接返回，不占用机器人线程池
+SNAPSHOT_OPERATIONS = frozenset((
+    "get_status", "get_controller_info", "get_current_joint_positions", "get_current_cartesian_position",
+    "get_servo_status",
+))
+
+_groups = {}
+_groups_lock = threading.Lock()
+
+
+def _resolve_operation(operation):
+    if operation not in OPERATIONS:
+        raise ValueError(f"不支持的批量操作: {operation}，可选: {', '.join(sorted(OPERATIONS))}")
+    module, name = OPERATIONS[operation]
+    return getattr(importlib.import_module(f".{module}", __package__), name)
+
+
+def _resolve_targets(ips=None, group=None):
+    if (ips is None) == (group is None):
+        raise ValueError("请提供IP列表或分组名（二选一）")
+    if group is not None:
+        with _groups_lock:
+            if group not in _groups:
+                raise ValueError(f"分组不存在: {group}")
+            targets = list(_groups[group])
+    else:
+        targets = [ips] if isinstance(ips, str) else list(dict.fromkeys(ips))
+    if not targets:
+        raise ValueError("机器人列表为空")
+    if len(targets) > MAX_FLEET_SIZE:
+        raise ValueError(f"单次批量操作不能超过{MAX_FLEET_SIZE}台机器人")
+    return targets
+
+
+def define_group(name: str, ips: list):
+    """定义或替换一个机器人分组
+
+    参数:
+        name: 分组名
+        ips: 机器人控制柜IP地址列表
+
+    返回:
+        str: JSON格式的分组信息
+    """
+    ips = [ips] if isinstance(ips, str) else list(dict.fromkeys(ips))
+    if not name or not ips:
+        return error("分组名和IP列表不能为空")
+    if len(ips) > MAX_FLEET_SIZE:
+        return error(f"分组不能超过{MAX_FLEET_SIZE}台机器人")
+    with _groups_lock:
+        _groups[name] = tuple(ips)
+    logger.info("定义机器人分组: %s, 数量: %s", name, len(ips))
+    return success(name=name, ips=ips)
+
+
+def remove_group(name: str):
+    """删除机器人分组"""
+    with _groups_lock:
+        removed = _groups.pop(name, None)
+    if removed is None:
+        return error(f"分组不存在: {name}")
+    logger.info("删除机器人分组: %s", name)
+    return success(message="删除分组成功")
+
+
+def list_groups():
+    """列出所有机器人分组"""
+    with _groups_lock:
+        groups = {name: list(ips) for name, ips in _groups.items()}
+    return success(groups=groups)
+
+
+def get_group(name):
+    """返回分组中的IP列表，分组不存在时返回 None"""
+    with _groups_lock:
+        ips = _groups.get(name)
+    return None if ips is None else list(ips)
+
+
+async def _call_one(semaphore, ip, operation, func, args, timeout):
+    async with semaphore:
+        start = time.perf_counter()
+        try:
+            response = func(ip, allow_rpc=False) if operation in SNAPSHOT_OPERATIONS else None
+            if response is None:
+                response = await asyncio.wait_for(run_robot_call(ip, func, **args), timeout)
+            data = json.loads(response)
+            status = data.get("status", "success") if isinstance(data, dict) else "success"
+            entry = {"status": "success" if status == "success" else "error", "response": data}
+        except asyncio.TimeoutError:
+            entry = {"status": "timeout", "message": f"超过{timeout}秒未返回"}
+        except Exception as e:
+            logger.error("批量操作时发生异常: %s, 操作: %s, 异常信息: %s", ip, operation, e)
+            entry = {"status": "error", "message": f"执行时发生异常: {str(e)}"}
+        entry["latency_ms"] = round((time.perf_counter() - start) * 1000, 2)
+        return ip, entry
+
+
+async def fan_out(operation: str, args: dict = None, ips: list = None, group: str = None,
+                  concurrency: int = None, timeout: float = None):
+    """对一组机器人并发执行同一个操作
+
+    参数:
+        operation: 操作名，即单机实现的函数名，例如 get_status、write_R_register、set_current_payload
+        args: 除 ip 外的参数，例如 {"index": 1, "value": 1.5}
+        ips: 机器人IP列表，与 group 二选一
+        group: 分组名
+        concurrency: 同时执行的机器人数上限，默认 FLEET_CONCURRENCY
+        timeout: 单台机器人的超时时间（秒），默认 FLEET_TIMEOUT
+
+    返回:
+        str: JSON格式的汇总结果，results 中按IP给出状态、延迟和单机操作的返回值
+    """
+    concurrency = FLEET_CONCURRENCY if concurrency is None else concurrency
+    timeout = FLEET_TIMEOUT if timeout is None else timeout
+    try:
+        targets = _resolve_targets(ips, group)
+        func = _resolve_operation(operation)
+        args = dict(args or {})
+        # 参数错误在分发之前报告，而不是每台机器人各报一次
+        inspect.signature(func).bind("ip", **args)
+        if concurrency < 1 or timeout <= 0:
+            raise ValueError("concurrency 必须不小于1，timeout 必须大于0")
+    except TypeError as e:
+        return error(f"操作参数错误: {str(e)}")
+    except ValueError as e:
+        return error(str(e))
+
+    start = time.perf_counter()
+    semaphore = asyncio.Semaphore(concurrency)
+    results = dict(await asyncio.gather(*(_call_one(semaphore, ip, operation, func, args, timeout) for ip in targets)))
+    elapsed = (time.perf_counter() - start) * 1000
+
+    counts = {"success": 0, "error": 0, "timeout": 0}
+    for entry in results.values():
+        counts[entry["status"]] += 1
+    latencies = sorted(entry["latency_ms"] for entry in results.values())
+    if counts["success"] == len(targets):
+        logger.info("批量操作完成: %s, 机器人数: %s, 耗时: %.1f ms", operation, len(targets), elapsed)
+    else:
+        logger.warning("批量操作部分失败: %s, 成功: %s, 失败: %s, 超时: %s",
+                       operation, counts["success"], counts["error"], counts["timeout"])
+    return encode({
+        "status": "success" if counts["success"] else "error",
+        "operation": operation,
+        "total": len(targets),
+        "succeeded": counts["success"],
+        "failed": counts["error"],
+        "timed_out": counts["timeout"],
+        "elapsed_ms": round(elapsed, 2),
+        "latency_ms": {"p50": latencies[len(latencies) // 2], "max": latencies[-1]},
+        "results": results,
+    })
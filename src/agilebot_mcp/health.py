@@ -0,0 +1,293 @@
+# -*- coding: utf-8 -*-
+"""连接健康检查与自动重连
+
+后台线程每 HEALTH_INTERVAL 秒检查一次所有已连接的机器人：状态订阅快照在一个检查周期内刷新过
+即视为连接正常，不发RPC；否则调用一次 get_ctrl_status。机器人正被其他调用占用时本轮跳过，
+不与正常调用争用机器人锁。
+
+连续 HEALTH_FAILURES 次检查失败后判定连接失效（例如控制柜重启），在独立线程中按指数退避重连。
+重连期间该机器人的新调用在注册表中排队最多 RECONNECT_HOLD 秒，重连成功后使用新连接继续执行；
+超过排队时间仍未重连成功的调用照常执行并返回错误。重连成功后替换注册表中的连接（清理Modbus
+从机句柄等与旧连接绑定的缓存），重新订阅状态并清除就绪缓存。录制、轮询和后台任务每次访问时
+从注册表取连接，无需重新创建。
+"""
+import logging
+import os
+import threading
+import time
+
+from .sdk import StatusCodeEnum
+from .backend import create_arm
+from .robot_core import robot_list, invalidate_robot_ready
+from .telemetry import start_telemetry, stop_telemetry, get_telemetry
+from .responses import encode, success, error
+
+logger = logging.getLogger(__name__)
+
+HEALTH_ENABLED = os.environ.get("AGILEBOT_MCP_HEALTH", "1") != "0"
+HEALTH_INTERVAL = float(os.environ.get("AGILEBOT_MCP_HEALTH_INTERVAL", "2"))
+HEALTH_FAILURES = int(os.environ.get("AGILEBOT_MCP_HEALTH_FAILURES", "2"))
+# 重连的退避间隔从 RECONNECT_INITIAL 秒开始加倍，最长 RECONNECT_MAX 秒
+RECONNECT_INITIAL = float(os.environ.get("AGILEBOT_MCP_RECONNECT_INITIAL", "0.5"))
+RECONNECT_MAX = float(os.environ.get("AGILEBOT_MCP_RECONNECT_MAX", "30"))
+# 重连期间新调用的最长排队时间（秒）
+RECONNECT_HOLD = float(os.environ.get("AGILEBOT_MCP_RECONNECT_HOLD", "5"))
+# 检查时获取机器人锁的最长等待时间，拿不到说明机器人正忙，本轮跳过
+PING_LOCK_TIMEOUT = 0.05
+
+
+class RobotHealth:
+    """单台机器人的健康状态"""
+
+    def __init__(self, ip):
+        self.ip = ip
+        # healthy / suspect / reconnecting
+        self.state = "healthy"
+        self.failures = 0
+        self.last_ok = time.monotonic()
+        self.last_error = None
+        self.reconnects = 0
+        self.attempts = 0
+        self.next_attempt = None
+        self.down_since = None
+
+    def describe(self):
+        now = time.monotonic()
+        info = {
+            "ip": self.ip,
+            "state": self.state,
+            "consecutive_failures": self.failures,
+            "last_ok_s": round(now - self.last_ok, 2),
+            "reconnects": self.reconnects,
+            "last_error": self.last_error,
+        }
+        if self.state == "reconnecting":
+            info["attempts"] = self.attempts
+            info["down_s"] = round(now - self.down_since, 2)
+            if self.next_attempt is not None:
+                info["next_attempt_s"] = round(max(self.next_attempt - now, 0.0), 2)
+        return info
+
+
+class HealthMonitor:
+    """检查所有已连接机器人的连接状态，失效时自动重连"""
+
+    def __init__(self, interval=HEALTH_INTERVAL, failures=HEALTH_FAILURES):
+        self.interval = interval
+        self.failures = failures
+        self._robots = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def ensure_started(self):
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="robot-health", daemon=True)
+            self._thread.start()
+        logger.info("启动连接健康检查，检查间隔: %s 秒", self.interval)
+
+    def stop(self):
+        self._stop.set()
+        with self._lock:
+            thread, self._thread = self._thread, None
+        if thread is not None:
+            thread.join(timeout=self.interval + 1)
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            try:
+                self.check_all()
+            except Exception as e:
+                logger.error("连接健康检查时发生异常: %s", e)
+
+    def _health(self, ip):
+        with self._lock:
+            health = self._robots.get(ip)
+            if health is None:
+                health = self._robots[ip] = RobotHealth(ip)
+            return health
+
+    def check_all(self):
+        """检查一轮所有已连接的机器人"""
+        connected = set(robot_list.keys())
+        with self._lock:
+            for ip in list(self._robots):
+                if ip not in connected and self._robots[ip].state != "reconnecting":
+                    del self._robots[ip]
+        for ip in connected:
+            health = self._health(ip)
+            if health.state == "reconnecting":
+                continue
+            alive, error = self._ping(ip)
+            if alive is None:
+                continue
+            if alive:
+                if health.failures:
+                    logger.info("机器人连接恢复正常: %s", ip)
+                health.state, health.failures, health.last_ok = "healthy", 0, time.monotonic()
+                continue
+            health.failures += 1
+            health.last_error = error
+            if health.failures < self.failures:
+                health.state = "suspect"
+                logger.warning("机器人健康检查失败: %s, 连续失败: %s, 原因: %s", ip, health.failures, error)
+            else:
+                logger.error("机器人连接失效: %s, 连续失败: %s, 原因: %s", ip, health.failures, error)
+                self.reconnect(ip)
+
+    def _ping(self, ip):
+        """返回 (是否正常, 失败原因)；机器人正忙或已断开时返回 (None, None)"""
+        if get_telemetry(ip, "ctrl_status", self.interval) is not None:
+            return True, None
+        # 直接使用机器人锁，不受重连排队影响；拿不到锁说明有调用正在进行，本轮不检查
+        lock = robot_list.lock_for(ip)
+        if not lock.acquire(timeout=PING_LOCK_TIMEOUT):
+            return None, None
+        try:
+            arm = robot_list.get(ip)
+            if arm is None:
+                return None, None
+            _, ret = arm.get_ctrl_status()
+            if ret != StatusCodeEnum.OK:
+                return False, f"获取控制器状态失败, 错误代码: {ret}"
+            return True, None
+        except Exception as e:
+            return False, f"获取控制器状态时发生异常: {str(e)}"
+        finally:
+            lock.release()
+
+    def reconnect(self, ip):
+        """开始重连，返回是否新启动了重连（已在重连中时返回 False）"""
+        if ip not in robot_list:
+            raise KeyError(ip)
+        health = self._health(ip)
+        with self._lock:
+            if health.state == "reconnecting":
+                return False
+            health.state = "reconnecting"
+            health.attempts = 0
+            health.next_attempt = None
+            health.down_since = time.monotonic()
+        robot_list.hold(ip, RECONNECT_HOLD)
+        threading.Thread(target=self._reconnect_loop, args=(ip, health), name=f"reconnect-{ip}", daemon=True).start()
+        return True
+
+    def _reconnect_loop(self, ip, health):
+        delay = RECONNECT_INITIAL
+        try:
+            while not self._stop.is_set() and ip in robot_list:
+                health.attempts += 1
+                ok, error = self._reconnect_once(ip)
+                if ok:
+                    logger.info("机器人重连成功: %s, 尝试次数: %s, 中断时间: %.2f 秒",
+                                ip, health.attempts, time.monotonic() - health.down_since)
+                    with self._lock:
+                        health.state, health.failures, health.last_ok = "healthy", 0, time.monotonic()
+                        health.reconnects += 1
+                        health.last_error = None
+                        health.next_attempt = None
+                    return
+                health.last_error = error
+                health.next_attempt = time.monotonic() + delay
+                logger.warning("机器人重连失败: %s, 第 %s 次, 原因: %s, %.1f 秒后重试", ip, health.attempts, error, delay)
+                if self._stop.wait(delay):
+                    break
+                delay = min(delay * 2, RECONNECT_MAX)
+            logger.info("停止重连机器人: %s", ip)
+            with self._lock:
+                self._robots.pop(ip, None)
+        finally:
+            robot_list.resume(ip)
+
+    def _reconnect_once(self, ip):
+        try:
+            arm = create_arm()
+            ret = arm.connect(ip)
+        except Exception as e:
+            return False, f"连接时发生异常: {str(e)}"
+        if ret != StatusCodeEnum.OK:
+            return False, f"连接失败, 错误代码: {ret}"
+        # 重连线程本身不受排队影响，直接使用机器人锁替换连接
+        with robot_list.lock_for(ip):
+            previous = robot_list.swap(ip, arm)
+            if previous is None:
+                # 重连期间机器人已被断开，丢弃新连接
+                try:
+                    arm.disconnect()
+                except Exception:
+                    pass
+                return False, "机器人已断开"
+            try:
+                previous.disconnect()
+            except Exception:
+                pass
+            invalidate_robot_ready(ip)
+            stop_telemetry(ip)
+            start_telemetry(ip)
+        return True, None
+
+    def describe(self, ip=None):
+        with self._lock:
+            robots = dict(self._robots)
+        if ip is not None:
+            health = robots.get(ip)
+            if health is None:
+                health = RobotHealth(ip) if ip in robot_list else None
+            return None if health is None else health.describe()
+        for connected in robot_list.keys():
+            robots.setdefault(connected, RobotHealth(connected))
+        return [robots[key].describe() for key in sorted(robots)]
+
+
+health_monitor = HealthMonitor()
+
+
+def start_health_monitor():
+    """连接第一台机器人时由 robot_core 调用；AGILEBOT_MCP_HEALTH=0 时不启动"""
+    if HEALTH_ENABLED:
+        health_monitor.ensure_started()
+
+
+def get_robot_health(ip: str = None):
+    """查询机器人的连接健康状态
+
+    参数:
+        ip: 机器人控制柜IP地址，不指定时返回所有已连接的机器人
+
+    返回:
+        str: JSON格式的健康状态，state 为 healthy、suspect 或 reconnecting
+    """
+    if ip is not None:
+        info = health_monitor.describe(ip)
+        if info is None:
+            return error("机器人未连接")
+        return success(health=info)
+    return encode({
+        "status": "success",
+        "monitor_running": health_monitor._thread is not None and health_monitor._thread.is_alive(),
+        "interval": health_monitor.interval,
+        "robots": health_monitor.describe(),
+    })
+
+
+def reconnect_robot(ip: str):
+    """立即重连机器人，不等待健康检查判定失效
+
+    参数:
+        ip: 机器人控制柜IP地址
+
+    返回:
+        str: JSON格式的结果，重连在后台进行，通过 get_robot_health 查询进度
+    """
+    try:
+        started = health_monitor.reconnect(ip)
+    except KeyError:
+        return error("机器人未连接")
+    logger.info("手动重连机器人: %s", ip)
+    return encode({
+        "status": "success",
+        "message": "开始重连" if started else "机器人正在重连",
+    })
@@ -0,0 +1,293 @@
+# -*- coding: utf-8 -*-
+"""机器人清单与启动时批量连接
+
+清单是一个JSON文件，列出机器人的IP、名称、所属分组和默认运动速度/加速度，例如:
+
+    {
+        "speed": 50, "accel": 0.5,
+        "concurrency": 16, "timeout": 10,
+        "robots": [
+            {"ip": "192.168.1.10", "name": "welder-1", "groups": ["line1"], "speed": 30},
+            {"ip": "192.168.1.11", "name": "welder-2", "groups": ["line1"]}
+        ],
+        "groups": {"welders": ["welder-1", "welder-2"]}
+    }
+
+设置 AGILEBOT_MCP_INVENTORY 后，服务器启动时在后台加载清单：定义分组（groups 中可以使用名称或IP），
+为清单中的每台机器人设置默认速度/加速度，并以 concurrency 的并发数连接所有机器人，
+单台超过 timeout 秒未连上记为超时（连接仍在后台继续，之后连上时状态更新为 connected）。
+机器人自己的 speed/accel 优先，其次是清单顶层的值，只作用于清单中的机器人，不修改全局默认值；
+速度范围为 (0, 100]，加速度范围为 (0, 1]。连接完成前对清单中机器人的调用在注册表中排队，
+不会因为连接尚未建立而失败。
+"""
+import json
+import logging
+import math
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from .robot_core import robot_list, connect_robot, set_motion_defaults
+from .fleet import define_group, MAX_FLEET_SIZE
+from .telemetry import get_snapshot
+from .responses import encode, error
+
+logger = logging.getLogger(__name__)
+
+INVENTORY_PATH = os.environ.get("AGILEBOT_MCP_INVENTORY", "")
+INVENTORY_CONCURRENCY = int(os.environ.get("AGILEBOT_MCP_INVENTORY_CONCURRENCY", "16"))
+INVENTORY_TIMEOUT = float(os.environ.get("AGILEBOT_MCP_INVENTORY_TIMEOUT", "10"))
+
+
+class _RobotEntry:
+    """清单中的一台机器人及其连接状态"""
+
+    def __init__(self, ip, name=None, groups=(), speed=None, accel=None):
+        self.ip = ip
+        self.name = name
+        self.groups = list(groups)
+        self.speed = speed
+        self.accel = accel
+        # pending / connecting / connected / failed / timeout
+        self.state = "pending"
+        self.message = None
+        self.started_at = None
+        self.connect_ms = None
+
+    def finish(self, response):
+        self.connect_ms = round((time.monotonic() - self.started_at) * 1000, 1)
+        if response.get("status") == "success":
+            self.state = "connected"
+            self.message = None
+        else:
+            self.state = "failed"
+            self.message = response.get("message")
+
+    def describe(self):
+        info = {"ip": self.ip, "name": self.name, "groups": self.groups, "state": self.state}
+        if self.connect_ms is not None:
+            info["connect_ms"] = self.connect_ms
+        if self.message:
+            info["message"] = self.message
+        if self.state == "connected":
+            snapshot = get_snapshot(self.ip) or {}
+            for field in ("ctrl_status", "servo_status", "robot_status"):
+                if field in snapshot:
+                    info[field] = snapshot[field]["value"]
+            info["ready"] = "CTRL_ESTOP" not in str(info.get("ctrl_status", ""))
+        return info
+
+
+def _motion_default(value, name, high, where):
+    """校验清单中的默认速度 (0, 100] 或加速度 (0, 1]，未设置时返回 None"""
+    if value is None:
+        return None
+    if isinstance(value, bool) or not isinstance(value, (int, float)) or not 0 < value <= high:
+        raise ValueError(f"清单格式错误：{where}的 {name} 应在 (0, {high}] 之间: {value}")
+    return value
+
+
+def _parse_inventory(data):
+    """校验清单内容，返回 (机器人列表, 分组 -> IP列表, 选项)"""
+    if not isinstance(data, dict) or not isinstance(data.get("robots"), list) or not data["robots"]:
+        raise ValueError("清单格式错误：robots 应为非空数组")
+    if len(data["robots"]) > MAX_FLEET_SIZE:
+        raise ValueError(f"清单中的机器人不能超过{MAX_FLEET_SIZE}台")
+    speed = _motion_default(data.get("speed"), "speed", 100, "清单")
+    accel = _motion_default(data.get("accel"), "accel", 1, "清单")
+    entries, by_name = [], {}
+    for item in data["robots"]:
+        if isinstance(item, str):
+            item = {"ip": item}
+        if not isinstance(item, dict) or not item.get("ip"):
+            raise ValueError(f"清单格式错误：机器人缺少 ip: {item}")
+        groups = item.get("groups", [])
+        groups = [groups] if isinstance(groups, str) else list(groups)
+        where = f"机器人 {item['ip']} "
+        entry = _RobotEntry(item["ip"], item.get("name"), groups,
+                            _motion_default(item.get("speed", speed), "speed", 100, where),
+                            _motion_default(item.get("accel", accel), "accel", 1, where))
+        if any(other.ip == entry.ip for other in entries):
+            raise ValueError(f"清单中的IP重复: {entry.ip}")
+        if entry.name is not None:
+            if entry.name in by_name:
+                raise ValueError(f"清单中的名称重复: {entry.name}")
+            by_name[entry.name] = entry.ip
+        entries.append(entry)
+
+    groups = {}
+    for entry in entries:
+        for group in entry.groups:
+            groups.setdefault(group, []).append(entry.ip)
+    for group, members in (data.get("groups") or {}).items():
+        members = [members] if isinstance(members, str) else members
+        # 分组成员可以是清单中的名称或IP
+        groups.setdefault(group, []).extend(by_name.get(member, member) for member in members)
+
+    options = {
+        "concurrency": int(data.get("concurrency", INVENTORY_CONCURRENCY)),
+        "timeout": float(data.get("timeout", INVENTORY_TIMEOUT)),
+    }
+    if options["concurrency"] < 1 or options["timeout"] <= 0:
+        raise ValueError("concurrency 必须不小于1，timeout 必须大于0")
+    return entries, {name: list(dict.fromkeys(ips)) for name, ips in groups.items()}, options
+
+
+class Bootstrap:
+    """一次按清单批量连接的过程"""
+
+    def __init__(self, path, entries, groups, options):
+        self.path = path
+        self.entries = entries
+        self.groups = groups
+        self.options = options
+        self.started_at = None
+        self.elapsed_ms = None
+        self._done = threading.Event()
+
+    @property
+    def done(self):
+        return self._done.is_set()
+
+    def wait(self, timeout=None):
+        return self._done.wait(timeout)
+
+    def run(self):
+        """定义分组、设置清单中各机器人的默认速度并并发连接，所有机器人连接完成或超时后返回"""
+        self.started_at = time.monotonic()
+        for name, ips in self.groups.items():
+            define_group(name, ips)
+        for entry in self.entries:
+            set_motion_defaults(entry.ip, entry.speed, entry.accel)
+
+        concurrency, timeout = self.options["concurrency"], self.options["timeout"]
+        pending = [entry for entry in self.entries if entry.ip not in robot_list]
+        for entry in self.entries:
+            if entry.ip in robot_list:
+                entry.state = "connected"
+        # 排在后面的机器人要等前面的连接完成，排队时间按轮数估算
+        hold = timeout * math.ceil(len(pending) / concurrency)
+        for entry in pending:
+            robot_list.hold(entry.ip, hold)
+        logger.info("开始按清单连接机器人: %s, 数量: %s, 并发数: %s", self.path, len(pending), concurrency)
+        try:
+            with ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="inventory") as pool:
+                for entry in pending:
+                    pool.submit(self._connect, entry, timeout)
+        finally:
+            for entry in pending:
+                robot_list.resume(entry.ip)
+            self.elapsed_ms = round((time.monotonic() - self.started_at) * 1000, 1)
+            self._done.set()
+        counts = self.counts()
+        if counts.get("connected", 0) == len(self.entries):
+            logger.info("清单中的机器人全部连接成功, 数量: %s, 耗时: %.1f ms", len(self.entries), self.elapsed_ms)
+        else:
+            logger.warning("清单中的机器人未全部连接成功: %s, 耗时: %.1f ms", counts, self.elapsed_ms)
+
+    def _connect(self, entry, timeout):
+        entry.state = "connecting"
+        entry.started_at = time.monotonic()
+        finished = threading.Event()
+
+        def attempt():
+            try:
+                # 连接线程不受 hold 影响，其他调用排队等待连接完成
+                with robot_list.bypass_hold():
+                    response = json.loads(connect_robot(entry.ip))
+            except Exception as e:
+                logger.error("按清单连接机器人时发生异常: %s, 异常信息: %s", entry.ip, e)
+                response = {"status": "error", "message": f"连接时发生异常: {str(e)}"}
+            entry.finish(response)
+            robot_list.resume(entry.ip)
+            finished.set()
+
+        threading.Thread(target=attempt, name=f"inventory-connect-{entry.ip}", daemon=True).start()
+        if not finished.wait(timeout) and entry.state == "connecting":
+            # SDK的连接调用无法中断，超时后继续在后台等待，释放并发名额给下一台机器人
+            entry.state = "timeout"
+            entry.message = f"超过{timeout}秒未连接成功"
+            robot_list.resume(entry.ip)
+            logger.warning("按清单连接机器人超时: %s, 超时时间: %s 秒", entry.ip, timeout)
+
+    def counts(self):
+        counts = {}
+        for entry in self.entries:
+            counts[entry.state] = counts.get(entry.state, 0) + 1
+        return counts
+
+    def describe(self):
+        counts = self.counts()
+        robots = [entry.describe() for entry in self.entries]
+        return {
+            "path": self.path,
+            "done": self.done,
+            "total": len(self.entries),
+            "connected": counts.get("connected", 0),
+            "ready": sum(1 for robot in robots if robot.get("ready")),
+            "counts": counts,
+            "elapsed_ms": self.elapsed_ms,
+            "groups": self.groups,
+            "robots": robots,
+        }
+
+
+_current = None
+_current_lock = threading.Lock()
+
+
+def start_bootstrap(path=INVENTORY_PATH, wait=False):
+    """加载清单并在后台线程中批量连接
+
+    参数:
+        path: 清单JSON文件路径
+        wait: 是否等待所有机器人连接完成或超时后再返回
+
+    返回:
+        Bootstrap: 本次批量连接
+    """
+    global _current
+    with open(path, "r", encoding="utf-8") as f:
+        entries, groups, options = _parse_inventory(json.load(f))
+    bootstrap = Bootstrap(path, entries, groups, options)
+    with _current_lock:
+        if _current is not None and not _current.done:
+            raise RuntimeError("上一次按清单连接尚未完成")
+        _current = bootstrap
+    threading.Thread(target=bootstrap.run, name="inventory-bootstrap", daemon=True).start()
+    if wait:
+        bootstrap.wait()
+    return bootstrap
+
+
+def load_inventory(path: str = None, wait: bool = False):
+    """加载机器人清单并批量连接
+
+    参数:
+        path: 清单JSON文件路径，默认使用 AGILEBOT_MCP_INVENTORY
+        wait: 是否等待连接完成后再返回
+
+    返回:
+        str: JSON格式的结果，wait 为 True 时包含每台机器人的连接状态
+    """
+    path = path or INVENTORY_PATH
+    if not path:
+        return error("未指定清单文件")
+    try:
+        bootstrap = start_bootstrap(path, wait)
+    except FileNotFoundError:
+        return error(f"清单文件不存在: {path}")
+    except json.JSONDecodeError as e:
+        return error(f"清单文件不是有效的JSON: {str(e)}")
+    except (ValueError, TypeError, RuntimeError) as e:
+        return error(str(e))
+    return encode({"status": "success", **bootstrap.describe()})
+
+
+def get_inventory_status():
+    """查询最近一次按清单连接的进度和每台机器人的就绪状态"""
+    bootstrap = _current
+    if bootstrap is None:
+        return error("没有加载机器人清单")
+    return encode({"status": "success", **bootstrap.describe()})
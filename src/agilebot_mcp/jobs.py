@@ -0,0 +1,243 @@
+# -*- coding: utf-8 -*-
+"""后台任务
+
+耗时较长的机器人流程（例如离线轨迹的准备、等待就绪和执行）在后台线程中运行，
+MCP工具提交后立即返回任务ID，之后通过任务ID查询阶段、进度和结果，或者取消任务。
+任务线程只在每次RPC时短暂持有机器人锁，等待期间其他工具可以正常访问该机器人。
+同一台机器人同时只能有一个未结束的任务。
+"""
+import logging
+import os
+import threading
+import time
+import uuid
+
+from .robot_core import robot_list
+from .responses import encode, success, error
+
+logger = logging.getLogger(__name__)
+
+# 保留的已结束任务数，超过后删除最早结束的任务
+JOB_HISTORY = int(os.environ.get("AGILEBOT_MCP_JOB_HISTORY", "100"))
+
+ACTIVE_STATES = ("pending", "running")
+
+
+class JobCancelled(Exception):
+    pass
+
+
+class JobFailed(Exception):
+    pass
+
+
+class Job:
+    """一个后台任务及其阶段、进度和结果"""
+
+    def __init__(self, kind, ip, params, stages):
+        self.id = uuid.uuid4().hex[:12]
+        self.kind = kind
+        self.ip = ip
+        self.params = params
+        self.stages = list(stages)
+        self.state = "pending"
+        self.stage = None
+        self.progress = {}
+        self.result = None
+        self.error = None
+        self.created_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+        self._stage_started = None
+        self._lock = threading.Lock()
+        self._cancel = threading.Event()
+        self._done = threading.Event()
+
+    @property
+    def active(self):
+        return self.state in ACTIVE_STATES
+
+    @property
+    def cancel_requested(self):
+        return self._cancel.is_set()
+
+    def set_stage(self, stage, **progress):
+        with self._lock:
+            self.stage = stage
+            self._stage_started = time.monotonic()
+            self.progress = progress
+        logger.info("任务进入阶段: %s, %s, %s", self.id, self.kind, stage)
+
+    def update(self, **progress):
+        with self._lock:
+            self.progress.update(progress)
+
+    def check_cancelled(self):
+        """已请求取消时抛出 JobCancelled，在每个阶段之间和等待循环中调用"""
+        if self._cancel.is_set():
+            raise JobCancelled()
+
+    def sleep(self, seconds):
+        """可被取消打断的等待"""
+        if self._cancel.wait(seconds):
+            raise JobCancelled()
+
+    def wait(self, timeout=None):
+        """等待任务结束，返回是否已结束"""
+        return self._done.wait(timeout)
+
+    def describe(self):
+        with self._lock:
+            stage_elapsed = None if self._stage_started is None or not self.active \
+                else round(time.monotonic() - self._stage_started, 3)
+            return {
+                "job_id": self.id,
+                "kind": self.kind,
+                "ip": self.ip,
+                "state": self.state,
+                "stage": self.stage,
+                "stage_index": self.stages.index(self.stage) + 1 if self.stage in self.stages else None,
+                "stages": self.stages,
+                "stage_elapsed_s": stage_elapsed,
+                "progress": dict(self.progress),
+                "params": self.params,
+                "result": self.result,
+                "error": self.error,
+                "cancel_requested": self._cancel.is_set(),
+                "created_at": self.created_at,
+                "started_at": self.started_at,
+                "finished_at": self.finished_at,
+            }
+
+    def _run(self, func):
+        self.state = "running"
+        self.started_at = time.time()
+        state, error = "succeeded", None
+        try:
+            self.result = func(self)
+        except JobCancelled as e:
+            state, error = "cancelled", str(e) or "任务已取消"
+        except JobFailed as e:
+            state, error = "failed", str(e)
+        except Exception as e:
+            state, error = "failed", f"任务执行时发生异常: {str(e)}"
+            logger.error("任务执行时发生异常: %s, %s, 异常信息: %s", self.id, self.ip, e)
+        # 先记录结束时间再切换状态，已结束的任务总有 finished_at
+        self.finished_at = time.time()
+        self.error = error
+        self.state = state
+        self._done.set()
+        logger.info("任务结束: %s, %s, %s, 状态: %s, 阶段: %s", self.id, self.kind, self.ip, self.state, self.stage)
+
+
+class JobManager:
+    """任务注册表：每个任务一个后台线程，保留最近 JOB_HISTORY 个已结束的任务"""
+
+    def __init__(self, history=JOB_HISTORY):
+        self.history = history
+        self._jobs = {}
+        self._lock = threading.Lock()
+
+    def submit(self, kind, ip, func, params=None, stages=()):
+        """在后台线程中运行 func(job)，返回值作为任务结果
+
+        返回:
+            Job: 新任务；该机器人已有未结束的任务时抛出 RuntimeError
+        """
+        job = Job(kind, ip, params or {}, stages)
+        with self._lock:
+            for other in self._jobs.values():
+                if other.ip == ip and other.active:
+                    raise RuntimeError(f"机器人已有未结束的任务: {other.id}（{other.kind}）")
+            self._jobs[job.id] = job
+            self._prune()
+        thread = threading.Thread(target=job._run, args=(func,), name=f"job-{kind}-{job.id}", daemon=True)
+        thread.start()
+        logger.info("提交任务: %s, %s, %s", job.id, kind, ip)
+        return job
+
+    def get(self, job_id):
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def jobs(self, ip=None, active_only=False):
+        with self._lock:
+            jobs = list(self._jobs.values())
+        return [job for job in jobs if (ip is None or job.ip == ip) and (not active_only or job.active)]
+
+    def cancel(self, job_id):
+        job = self.get(job_id)
+        if job is not None and job.active:
+            job._cancel.set()
+        return job
+
+    def cancel_all(self, ip=None):
+        for job in self.jobs(ip, active_only=True):
+            job._cancel.set()
+
+    def _prune(self):
+        finished = sorted((job for job in self._jobs.values() if not job.active), key=lambda job: job.finished_at)
+        for job in finished[:max(len(finished) - self.history, 0)]:
+            del self._jobs[job.id]
+
+
+job_manager = JobManager()
+
+
+def _on_robot_removed(ip):
+    # 断开连接时任务线程的下一次RPC会失败，这里让等待中的任务尽快结束
+    job_manager.cancel_all(ip)
+
+
+robot_list.on_remove(_on_robot_removed)
+
+
+def get_job(job_id: str):
+    """查询任务的状态、阶段、进度和结果
+
+    参数:
+        job_id: 提交任务时返回的任务ID
+
+    返回:
+        str: JSON格式的任务信息
+    """
+    job = job_manager.get(job_id)
+    if job is None:
+        return error(f"任务不存在: {job_id}")
+    return success(data=job.describe())
+
+
+def list_jobs(ip: str = None, active_only: bool = False):
+    """列出任务，按创建时间先后排列
+
+    参数:
+        ip: 只列出该机器人的任务，默认全部
+        active_only: 只列出未结束的任务
+
+    返回:
+        str: JSON格式的任务列表
+    """
+    jobs = sorted(job_manager.jobs(ip, active_only), key=lambda job: job.created_at)
+    return success(data=[job.describe() for job in jobs])
+
+
+def cancel_job(job_id: str):
+    """请求取消任务，任务在当前RPC返回或下一次等待时结束
+
+    参数:
+        job_id: 任务ID
+
+    返回:
+        str: JSON格式的任务信息
+    """
+    job = job_manager.cancel(job_id)
+    if job is None:
+        return error(f"任务不存在: {job_id}")
+    if not job.active:
+        return encode({"status": "error", "message": f"任务已结束: {job.state}", "data": job.describe()})
+    logger.info("请求取消任务: %s, %s", job_id, job.ip)
+    return success(data=job.describe())
+
+
+def cancel_all_jobs():
+    job_manager.cancel_all()
@@ -0,0 +1,562 @@
+# -*- coding: utf-8 -*-
+"""基于DH参数的本地正/逆运动学
+
+用 arm.motion.get_DH_param() 返回的每个关节的 a（mm）、alpha（度）、d（mm）、offset（度）建立运动学模型，
+在服务器本地计算法兰在基坐标系（UF0/TF0）中的位姿，不需要与控制器往返:
+    forward: 一次计算任意多组关节值的笛卡尔位姿和姿态（numpy 向量化）
+    inverse: 球形手腕（J4~J6轴交于一点）的 standard DH 机器人用解析解，每个目标一次得到全部8组解；
+             其他构型用阻尼最小二乘迭代，从多个初值同时求解。按姿态和离参考关节值的距离选择解
+
+约定:
+    关节值单位为度；笛卡尔位姿为 x、y、z（mm）和 a、b、c（度），R = Rz(c)·Ry(b)·Rx(a)
+    standard DH: T_i = Rz(θ_i)·Tz(d_i)·Tx(a_i)·Rx(α_i)；modified DH: T_i = Rx(α_i)·Tx(a_i)·Rz(θ_i)·Tz(d_i)，θ_i = j_i + offset_i
+    姿态: wrist_flip 为 sin(θ5) < 0；arm_up_down 为肘部（J3轴）低于肩部（J2轴）到腕部中心的连线；
+         arm_back_front 为腕部中心在J1转向的反方向；arm_left_right 对6轴机器人不适用，固定为0
+SDK没有说明控制器使用哪种DH约定和姿态定义。第一次为某组DH参数建立模型时用 convert_joint_to_cart
+在几组关节值上与控制器对比，选用结果一致的约定（verified 为 true）；都不一致时 verified 为 false，
+本地结果只能作为参考。模型按（型号, DH参数）缓存，同型号且DH参数相同的机器人共用一个模型。
+需要安装 numpy（pip install "agilebot-mcp[analysis]"）。
+"""
+import logging
+import threading
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+from .sdk import StatusCodeEnum, PoseType, MotionPose
+from .robot_core import robot_list
+from .responses import Joint, Cartesian, Posture, encode, error
+
+logger = logging.getLogger(__name__)
+
+CONVENTIONS = ("standard", "modified")
+POSTURE_FIELDS = ("arm_back_front", "arm_left_right", "arm_up_down", "wrist_flip")
+# 与控制器对比的关节值（度）
+VERIFY_JOINTS = ((0, 0, 0, 0, 0, 0), (30, -20, 40, 60, -45, 90), (-120, 35, -60, -90, 70, -30))
+VERIFY_POSITION_TOLERANCE = 0.05
+VERIFY_ANGLE_TOLERANCE = 0.05
+# 逆解的收敛阈值（mm、度）
+IK_POSITION_TOLERANCE = 0.01
+IK_ANGLE_TOLERANCE = 0.01
+IK_MAX_ITERATIONS = 100
+# 阻尼系数和单次迭代的最大关节步长（弧度），位置误差按米计算，与弧度量级相当
+IK_DAMPING = 1e-3
+IK_MAX_STEP = 0.5
+# 一次逆解请求最多的目标数
+MAX_POSES = 10000
+
+
+class KinematicsError(Exception):
+    pass
+
+
+def _rotation(abc):
+    """(N, 3) 的 a、b、c（度）-> (N, 3, 3) 旋转矩阵"""
+    a, b, c = np.radians(abc).T
+    ca, sa, cb, sb, cc, sc = np.cos(a), np.sin(a), np.cos(b), np.sin(b), np.cos(c), np.sin(c)
+    rotation = np.empty((len(abc), 3, 3))
+    rotation[:, 0, 0] = cc * cb
+    rotation[:, 0, 1] = cc * sb * sa - sc * ca
+    rotation[:, 0, 2] = cc * sb * ca + sc * sa
+    rotation[:, 1, 0] = sc * cb
+    rotation[:, 1, 1] = sc * sb * sa + cc * ca
+    rotation[:, 1, 2] = sc * sb * ca - cc * sa
+    rotation[:, 2, 0] = -sb
+    rotation[:, 2, 1] = cb * sa
+    rotation[:, 2, 2] = cb * ca
+    return rotation
+
+
+def _euler(rotation):
+    """(N, 3, 3) 旋转矩阵 -> (N, 3) 的 a、b、c（度），b = ±90° 时 a 取0"""
+    cb = np.hypot(rotation[:, 0, 0], rotation[:, 1, 0])
+    b = np.arctan2(-rotation[:, 2, 0], cb)
+    regular = cb > 1e-9
+    a = np.where(regular, np.arctan2(rotation[:, 2, 1], rotation[:, 2, 2]), 0.0)
+    c = np.where(regular, np.arctan2(rotation[:, 1, 0], rotation[:, 0, 0]),
+                 np.arctan2(-rotation[:, 0, 1], rotation[:, 1, 1]))
+    return np.degrees(np.stack((a, b, c), axis=1))
+
+
+def pose_matrices(poses):
+    """(N, 6) 的 x、y、z、a、b、c -> (N, 4, 4) 齐次变换矩阵"""
+    poses = np.asarray(poses, dtype=np.float64).reshape(-1, 6)
+    matrices = np.zeros((len(poses), 4, 4))
+    matrices[:, :3, :3] = _rotation(poses[:, 3:])
+    matrices[:, :3, 3] = poses[:, :3]
+    matrices[:, 3, 3] = 1.0
+    return matrices
+
+
+def matrix_poses(matrices):
+    """(N, 4, 4) 齐次变换矩阵 -> (N, 6) 的 x、y、z、a、b、c"""
+    return np.concatenate((matrices[:, :3, 3], _euler(matrices[:, :3, :3])), axis=1)
+
+
+def _rotation_error(target, current):
+    """current 转到 target 的旋转向量（弧度），(N, 3, 3) -> (N, 3)"""
+    delta = target @ np.swapaxes(current, 1, 2)
+    vector = 0.5 * np.stack((delta[:, 2, 1] - delta[:, 1, 2],
+                             delta[:, 0, 2] - delta[:, 2, 0],
+                             delta[:, 1, 0] - delta[:, 0, 1]), axis=1)
+    sin_angle = np.linalg.norm(vector, axis=1)
+    cos_angle = np.clip((np.trace(delta, axis1=1, axis2=2) - 1) / 2, -1.0, 1.0)
+    angle = np.arctan2(sin_angle, cos_angle)
+    scale = np.where(sin_angle > 1e-12, angle / np.maximum(sin_angle, 1e-12), 1.0)
+    return vector * scale[:, None]
+
+
+def _wrap(degrees):
+    return (degrees + 180.0) % 360.0 - 180.0
+
+
+class KinematicModel:
+    """一组DH参数对应的运动学模型"""
+
+    def __init__(self, model, dh, convention="standard"):
+        if np is None:
+            raise KinematicsError("本地运动学需要安装numpy: pip install \"agilebot-mcp[analysis]\"")
+        if convention not in CONVENTIONS:
+            raise KinematicsError(f"未知的DH约定: {convention}")
+        self.model = model
+        self.dh = np.asarray(dh, dtype=np.float64).reshape(-1, 4)
+        if len(self.dh) != 6:
+            raise KinematicsError(f"只支持6轴机器人，DH参数有 {len(self.dh)} 行")
+        self.convention = convention
+        self.verified = None
+        self.verify_error = None
+        self.posture_verified = None
+        self._a, self._alpha, self._d, self._offset = self.dh.T
+        self._cos_alpha, self._sin_alpha = np.cos(np.radians(self._alpha)), np.sin(np.radians(self._alpha))
+
+    @property
+    def analytic(self):
+        """是否可以用解析解：standard DH，α = (±90, 0, ±90, ±90, ±90, 0)，a4 = a5 = a6 = 0，d5 = 0"""
+        alpha = self._alpha
+        right = np.abs(np.abs(alpha[[0, 2, 3, 4]]) - 90.0) < 1e-6
+        return bool(self.convention == "standard" and right.all() and abs(alpha[1]) < 1e-6 and abs(alpha[5]) < 1e-6
+                    and np.allclose(self._a[3:], 0.0) and abs(self._d[4]) < 1e-9)
+
+    def frames(self, joints):
+        """(N, 6) 关节值（度）-> (N, 7, 4, 4)，依次为基坐标系和每个连杆坐标系"""
+        theta = np.radians(np.asarray(joints, dtype=np.float64) + self._offset)
+        ct, st = np.cos(theta), np.sin(theta)
+        ca, sa, a, d = self._cos_alpha, self._sin_alpha, self._a, self._d
+        links = np.zeros(theta.shape + (4, 4))
+        if self.convention == "standard":
+            links[..., 0, 0], links[..., 0, 1], links[..., 0, 2], links[..., 0, 3] = ct, -st * ca, st * sa, a * ct
+            links[..., 1, 0], links[..., 1, 1], links[..., 1, 2], links[..., 1, 3] = st, ct * ca, -ct * sa, a * st
+            links[..., 2, 1], links[..., 2, 2], links[..., 2, 3] = sa, ca, d
+        else:
+            links[..., 0, 0], links[..., 0, 1], links[..., 0, 3] = ct, -st, a
+            links[..., 1, 0], links[..., 1, 1], links[..., 1, 2], links[..., 1, 3] = st * ca, ct * ca, -sa, -sa * d
+            links[..., 2, 0], links[..., 2, 1], links[..., 2, 2], links[..., 2, 3] = st * sa, ct * sa, ca, ca * d
+        links[..., 3, 3] = 1.0
+        frames = np.empty((len(theta), 7, 4, 4))
+        frames[:, 0] = np.eye(4)
+        for axis in range(6):
+            frames[:, axis + 1] = frames[:, axis] @ links[:, axis]
+        return frames
+
+    def _axis_frame(self, frames, axis):
+        """第 axis 轴（1~6）所在的坐标系：standard DH 为 axis-1 号坐标系，modified DH 为 axis 号坐标系"""
+        return frames[:, axis - 1] if self.convention == "standard" else frames[:, axis]
+
+    def postures(self, joints, frames):
+        """(N, 4) 的 arm_back_front、arm_left_right、arm_up_down、wrist_flip（0 或 1）"""
+        theta = np.radians(np.asarray(joints, dtype=np.float64) + self._offset)
+        shoulder = self._axis_frame(frames, 2)[:, :3, 3]
+        elbow = self._axis_frame(frames, 3)[:, :3, 3]
+        wrist = self._axis_frame(frames, 5)[:, :3, 3]
+        heading = np.stack((np.cos(theta[:, 0]), np.sin(theta[:, 0])), axis=1)
+        back = np.einsum("ij,ij->i", wrist[:, :2], heading) < 0
+        # 肘部相对肩部-腕部连线的垂直分量
+        line = wrist - shoulder
+        offset = elbow - shoulder
+        length = np.maximum(np.einsum("ij,ij->i", line, line), 1e-12)
+        normal = offset - line * (np.einsum("ij,ij->i", offset, line) / length)[:, None]
+        down = normal[:, 2] < 0
+        flip = np.sin(theta[:, 4]) < 0
+        return np.stack((back, np.zeros(len(theta), dtype=bool), down, flip), axis=1).astype(np.int64)
+
+    def forward(self, joints):
+        """关节值（度）-> ((N, 6) 的 x、y、z、a、b、c, (N, 4) 的姿态)"""
+        joints = np.asarray(joints, dtype=np.float64).reshape(-1, 6)
+        frames = self.frames(joints)
+        flange = frames[:, 6]
+        return np.hstack((flange[:, :3, 3], _euler(flange[:, :3, :3]))), self.postures(joints, frames)
+
+    def _analytic(self, targets):
+        """球形手腕机器人的解析逆解，每个目标8组解（J1两种 × 肘部两种 × 腕部两种），(M*8, 6)，无解处为 nan"""
+        a, d, sign = self._a, self._d, np.sign(self._alpha)
+        rotation = targets[:, :3, :3]
+        # 腕部中心 = 法兰中心沿法兰z轴退回 d6
+        wrist = targets[:, :3, 3] - d[5] * rotation[:, :, 2]
+        px, py, pz = wrist.T
+        # J2、J3 所在平面到 J1 轴的距离为 d2 + d3
+        ratio = (d[1] + d[2]) * sign[0] / np.maximum(np.hypot(px, py), 1e-12)
+        heading = np.arctan2(py, px)
+        shift = np.arcsin(np.where(np.abs(ratio) <= 1.0, ratio, np.nan))
+        theta1 = np.stack((heading + shift, heading + np.pi - shift), axis=1)
+        # 腕部中心在J2、J3平面内的坐标，J3到腕部中心等效为长度 forearm、偏角 bend 的连杆
+        x = px[:, None] * np.cos(theta1) + py[:, None] * np.sin(theta1) - a[0]
+        y = np.broadcast_to(((pz - d[0]) * sign[0])[:, None], x.shape)
+        forearm, bend = np.hypot(a[2], d[3]), np.arctan2(d[3] * sign[2], a[2])
+        cos_elbow = (x ** 2 + y ** 2 - a[1] ** 2 - forearm ** 2) / (2 * a[1] * forearm)
+        elbow = np.arccos(np.where(np.abs(cos_elbow) <= 1.0, cos_elbow, np.nan))
+        theta = np.zeros((len(targets), 2, 2, 2, 6))
+        for branch, sign_elbow in enumerate((1.0, -1.0)):
+            theta3 = sign_elbow * elbow
+            theta[:, :, branch, :, 0] = theta1[:, :, None]
+            theta[:, :, branch, :, 1] = (np.arctan2(y, x) - np.arctan2(forearm * np.sin(theta3),
+                                                                        a[1] + forearm * np.cos(theta3)))[:, :, None]
+            theta[:, :, branch, :, 2] = (theta3 + bend)[:, :, None]
+        theta = theta.reshape(-1, 6)
+        valid = ~np.isnan(theta).any(axis=1)
+        theta[~valid] = 0.0
+        # 手腕: R36 = R03ᵀ·R，由第三列求 θ4、θ5，再由 R05ᵀ·R 求 θ6
+        repeated = np.repeat(rotation, 8, axis=0)
+        local = np.swapaxes(self.frames(np.degrees(theta) - self._offset)[:, 3, :3, :3], 1, 2) @ repeated
+        sin5 = np.hypot(local[:, 0, 2], local[:, 1, 2]) * np.tile([1.0, -1.0], len(theta) // 2)
+        cos5 = -sign[3] * sign[4] * local[:, 2, 2]
+        theta[:, 4] = np.arctan2(sin5, cos5)
+        direction = np.where(sin5 < 0, -1.0, 1.0) * sign[4]
+        singular = np.abs(sin5) < 1e-9
+        theta[:, 3] = np.where(singular, 0.0, np.arctan2(direction * local[:, 1, 2], direction * local[:, 0, 2]))
+        theta[:, 5] = 0.0
+        residual = np.swapaxes(self.frames(np.degrees(theta) - self._offset)[:, 6, :3, :3], 1, 2) @ repeated
+        theta[:, 5] = np.arctan2(residual[:, 1, 0], residual[:, 0, 0])
+        joints = np.degrees(theta) - self._offset
+        joints[~valid] = np.nan
+        return joints
+
+    def _errors(self, targets, joints):
+        """每组关节值与目标的位置误差（mm）和姿态误差（度），无解（nan）时为 inf"""
+        valid = ~np.isnan(joints).any(axis=1)
+        flange = self.frames(np.where(valid[:, None], joints, 0.0))[:, 6]
+        position_error = np.linalg.norm(targets[:, :3, 3] - flange[:, :3, 3], axis=1)
+        angle_error = np.degrees(np.linalg.norm(_rotation_error(targets[:, :3, :3], flange[:, :3, :3]), axis=1))
+        return np.where(valid, position_error, np.inf), np.where(valid, angle_error, np.inf)
+
+    def _seeds(self, targets, reference):
+        """每个目标的初值：J1 朝向/背向目标 × 肘部两种 × 腕部两种，再加上参考关节值"""
+        heading = np.degrees(np.arctan2(targets[:, 1, 3], targets[:, 0, 3]))
+        seeds = []
+        for turn in (0.0, 180.0):
+            for elbow in (-60.0, 60.0):
+                for wrist in (-60.0, 60.0):
+                    theta = np.zeros((len(targets), 6))
+                    theta[:, 0] = heading + turn
+                    theta[:, 2] = elbow
+                    theta[:, 4] = wrist
+                    seeds.append(theta - self._offset)
+        seeds.append(np.broadcast_to(reference, (len(targets), 6)))
+        # (目标数, 初值数, 6)
+        return np.stack(seeds, axis=1)
+
+    def _jacobian(self, frames):
+        """(N, 6, 6) 几何雅可比矩阵，位置行按米计算"""
+        end = frames[:, 6, :3, 3]
+        jacobian = np.empty((len(frames), 6, 6))
+        for axis in range(6):
+            frame = self._axis_frame(frames, axis + 1)
+            z = frame[:, :3, 2]
+            jacobian[:, :3, axis] = np.cross(z, end - frame[:, :3, 3]) / 1000.0
+            jacobian[:, 3:, axis] = z
+        return jacobian
+
+    def solve(self, targets, seeds):
+        """从 seeds（(N, 6) 关节值，度）出发迭代求 targets（(N, 4, 4)）的逆解
+
+        返回:
+            (关节值, 位置误差mm, 姿态误差度)
+        """
+        joints = np.array(seeds, dtype=np.float64)
+        rotation_target = targets[:, :3, :3]
+        active = np.arange(len(joints))
+        position_error = np.full(len(joints), np.inf)
+        angle_error = np.full(len(joints), np.inf)
+        for iteration in range(IK_MAX_ITERATIONS + 1):
+            frames = self.frames(joints[active])
+            flange = frames[:, 6]
+            delta_position = targets[active, :3, 3] - flange[:, :3, 3]
+            delta_rotation = _rotation_error(rotation_target[active], flange[:, :3, :3])
+            position_error[active] = np.linalg.norm(delta_position, axis=1)
+            angle_error[active] = np.degrees(np.linalg.norm(delta_rotation, axis=1))
+            pending = (position_error[active] > IK_POSITION_TOLERANCE) | (angle_error[active] > IK_ANGLE_TOLERANCE)
+            active, frames = active[pending], frames[pending]
+            if not len(active) or iteration == IK_MAX_ITERATIONS:
+                break
+            residual = np.hstack((delta_position[pending] / 1000.0, delta_rotation[pending]))
+            jacobian = self._jacobian(frames)
+            normal = jacobian @ np.swapaxes(jacobian, 1, 2) + IK_DAMPING * np.eye(6)
+            step = np.einsum("nji,nj->ni", jacobian, np.linalg.solve(normal, residual[..., None])[..., 0])
+            largest = np.abs(step).max(axis=1, keepdims=True)
+            step *= np.minimum(1.0, IK_MAX_STEP / np.maximum(largest, 1e-12))
+            joints[active] += np.degrees(step)
+        return joints, position_error, angle_error
+
+    def inverse(self, poses, posture=None, reference=None, joint_limits=None):
+        """笛卡尔位姿 -> 关节值
+
+        参数:
+            poses: (M, 6) 的 x、y、z、a、b、c
+            posture: 要求的姿态 {字段: 0/1}，未给出的字段不限制
+            reference: 参考关节值（度），多个解中选离它最近的，默认全0
+            joint_limits: (6, 2) 的关节下限、上限（度），默认 ±180
+
+        返回:
+            list: 每个目标一个 dict，reachable、joint、posture 以及不可达时的 reason
+        """
+        poses = np.asarray(poses, dtype=np.float64).reshape(-1, 6)
+        reference = np.zeros(6) if reference is None else np.asarray(reference, dtype=np.float64).reshape(6)
+        limits = np.tile([-180.0, 180.0], (6, 1)) if joint_limits is None \
+            else np.asarray(joint_limits, dtype=np.float64).reshape(6, 2)
+        targets = pose_matrices(poses)
+        if self.analytic:
+            count = 8
+            joints = self._analytic(targets)
+            position_error, angle_error = self._errors(np.repeat(targets, count, axis=0), joints)
+            joints = np.nan_to_num(joints)
+        else:
+            seeds = self._seeds(targets, reference)
+            count = seeds.shape[1]
+            joints, position_error, angle_error = self.solve(np.repeat(targets, count, axis=0), seeds.reshape(-1, 6))
+        joints = _wrap(joints)
+        # 参考关节值附近的解可能超出 ±180，保留离参考值最近的等价角度
+        joints += 360.0 * np.round((reference - joints) / 360.0)
+        postures = self.postures(joints, self.frames(joints))
+        converged = (position_error <= IK_POSITION_TOLERANCE) & (angle_error <= IK_ANGLE_TOLERANCE)
+        in_limits = np.all((joints >= limits[:, 0]) & (joints <= limits[:, 1]), axis=1)
+        wanted = np.ones(len(joints), dtype=bool)
+        for index, field in enumerate(POSTURE_FIELDS):
+            value = (posture or {}).get(field)
+            if value is not None and field != "arm_left_right":
+                wanted &= postures[:, index] == int(value)
+        distance = np.abs(joints - reference).sum(axis=1)
+
+        results = []
+        for target in range(len(poses)):
+            rows = slice(target * count, (target + 1) * count)
+            ok = converged[rows] & in_limits[rows]
+            usable = ok & wanted[rows]
+            if usable.any():
+                best = target * count + int(np.argmin(np.where(usable, distance[rows], np.inf)))
+                results.append({"reachable": True, "joint": Joint(*(np.round(joints[best], 4) + 0.0).tolist()),
+                                "posture": Posture(*postures[best].tolist())})
+                continue
+            result = {"reachable": False}
+            if ok.any():
+                result["reason"] = "目标可达，但没有指定姿态的解"
+                result["available_postures"] = [Posture(*item) for item in
+                                                sorted(set(map(tuple, postures[rows][ok].tolist())))]
+            elif converged[rows].any():
+                result["reason"] = "所有解都超出关节限位"
+            else:
+                nearest = float(position_error[rows].min())
+                result["reason"] = "超出工作空间或处于奇异位置"
+                # 解析解在工作空间外没有候选解，不给出误差
+                if np.isfinite(nearest):
+                    result["position_error_mm"] = round(nearest, 3)
+            results.append(result)
+        return results
+
+    def verify(self, arm):
+        """用控制器的 convert_joint_to_cart 检查本地模型，选用与控制器一致的DH约定"""
+        expected = []
+        for joints in VERIFY_JOINTS:
+            pose = MotionPose()
+            pose.pt = PoseType.JOINT
+            pose.joint.j1, pose.joint.j2, pose.joint.j3, pose.joint.j4, pose.joint.j5, pose.joint.j6 = joints
+            cart, ret = arm.motion.convert_joint_to_cart(pose)
+            if ret != StatusCodeEnum.OK:
+                logger.warning("无法与控制器对比运动学模型: %s, 错误代码: %s", self.model, ret)
+                return
+            position, posture = cart.cartData.position, cart.cartData.posture
+            expected.append(([position.x, position.y, position.z, position.a, position.b, position.c],
+                             [getattr(posture, field) for field in POSTURE_FIELDS]))
+        expected_poses = np.array([pose for pose, _ in expected])
+        expected_postures = np.array([posture for _, posture in expected])
+        targets = pose_matrices(expected_poses)
+        best = None
+        for convention in CONVENTIONS:
+            self.convention = convention
+            # 按旋转矩阵比较姿态，b = ±90° 时 a、c 的分配方式不唯一
+            position_errors, angle_errors = self._errors(targets, np.array(VERIFY_JOINTS, dtype=np.float64))
+            position_error, angle_error = float(position_errors.max()), float(angle_errors.max())
+            postures = self.postures(VERIFY_JOINTS, self.frames(VERIFY_JOINTS))
+            # arm_left_right 不参与比较
+            posture_ok = bool(np.all(postures[:, [0, 2, 3]] == expected_postures[:, [0, 2, 3]]))
+            candidate = (position_error + angle_error, convention, position_error, angle_error, posture_ok)
+            if best is None or candidate < best:
+                best = candidate
+        _, self.convention, position_error, angle_error, self.posture_verified = best
+        self.verified = position_error <= VERIFY_POSITION_TOLERANCE and angle_error <= VERIFY_ANGLE_TOLERANCE
+        self.verify_error = {"position_mm": round(position_error, 4), "angle_deg": round(angle_error, 4)}
+        if self.verified:
+            logger.info("运动学模型与控制器一致: %s, DH约定: %s", self.model, self.convention)
+        else:
+            logger.warning("运动学模型与控制器不一致: %s, 误差: %s", self.model, self.verify_error)
+
+    def describe(self):
+        return {
+            "model": self.model,
+            "convention": self.convention,
+            "verified": self.verified,
+            "posture_verified": self.posture_verified,
+            "verify_error": self.verify_error,
+            "dh": [{"a": a, "alpha": alpha, "d": d, "offset": offset} for a, alpha, d, offset in self.dh.tolist()],
+        }
+
+
+# (型号, DH参数) -> 模型，同型号且DH参数相同的机器人共用
+_models = dict()
+# IP -> 模型，机器人断开或重连时清除
+_robot_models = dict()
+_models_lock = threading.Lock()
+
+
+def _drop_robot(ip):
+    with _models_lock:
+        _robot_models.pop(ip, None)
+
+
+robot_list.on_remove(_drop_robot)
+robot_list.on_reconnect(_drop_robot)
+
+
+def get_model(ip, refresh=False):
+    """返回机器人的运动学模型，第一次使用时读取DH参数（同型号且DH参数相同时复用已有模型）"""
+    if np is None:
+        raise KinematicsError("本地运动学需要安装numpy: pip install \"agilebot-mcp[analysis]\"")
+    if not refresh:
+        with _models_lock:
+            model = _robot_models.get(ip)
+        if model is not None:
+            return model
+    with robot_list.lease(ip) as arm:
+        if arm is None:
+            raise KinematicsError("请先连接机器人")
+        model_name, ret = arm.get_arm_model_info()
+        if ret != StatusCodeEnum.OK:
+            raise KinematicsError(f"获取机器人型号失败, 错误代码: {ret}")
+        params, ret = arm.motion.get_DH_param()
+        if ret != StatusCodeEnum.OK:
+            raise KinematicsError(f"获取DH参数失败, 错误代码: {ret}")
+        rows = tuple((float(param.a), float(param.alpha), float(param.d), float(param.offset))
+                     for param in sorted(params, key=lambda param: param.id))
+        key = (str(model_name), rows)
+        with _models_lock:
+            model = None if refresh else _models.get(key)
+        if model is None:
+            model = KinematicModel(str(model_name), rows)
+            model.verify(arm)
+            logger.info("建立运动学模型: %s, 型号: %s", ip, model_name)
+    with _models_lock:
+        _models[key] = model
+        _robot_models[ip] = model
+    return model
+
+
+def _joint_rows(joints):
+    """[j1..j6]、[[j1..j6], ...] 或 [{"j1": ...}, ...] -> (N, 6)"""
+    if isinstance(joints, dict) or (joints and not isinstance(joints[0], (list, tuple, dict))):
+        joints = [joints]
+    return np.array([[item[f"j{axis}"] for axis in range(1, 7)] if isinstance(item, dict) else item
+                     for item in joints], dtype=np.float64).reshape(-1, 6)
+
+
+def _pose_rows(poses):
+    """[x..c]、[[x..c], ...] 或 [{"x": ...}, ...] -> (N, 6)"""
+    if isinstance(poses, dict) or (poses and not isinstance(poses[0], (list, tuple, dict))):
+        poses = [poses]
+    return np.array([[item[axis] for axis in ("x", "y", "z", "a", "b", "c")] if isinstance(item, dict) else item
+                     for item in poses], dtype=np.float64).reshape(-1, 6)
+
+
+def get_kinematics_model(ip: str, refresh: bool = False):
+    """获取机器人的本地运动学模型（DH参数、DH约定、是否与控制器一致）
+
+    参数:
+        ip: 机器人控制柜IP地址
+        refresh: 是否重新读取DH参数并与控制器对比
+
+    返回:
+        str: JSON格式的模型信息
+    """
+    try:
+        model = get_model(ip, refresh)
+    except KinematicsError as e:
+        return error(str(e))
+    except Exception as e:
+        logger.error("建立运动学模型时发生异常: %s, 异常信息: %s", ip, e)
+        return error(f"建立运动学模型时发生异常: {str(e)}")
+    return encode({"status": "success", **model.describe()})
+
+
+def forward_kinematics(ip: str, joints):
+    """在本地计算关节值对应的法兰位姿（基坐标系）和姿态，不向控制器发送请求
+
+    参数:
+        ip: 机器人控制柜IP地址
+        joints: 一组或多组关节值（度）
+
+    返回:
+        str: JSON格式的结果，poses 与 joints 一一对应
+    """
+    try:
+        model = get_model(ip)
+        rows = _joint_rows(joints)
+    except KinematicsError as e:
+        return error(str(e))
+    except (KeyError, TypeError, ValueError) as e:
+        return error(f"关节值格式错误: {str(e)}")
+    if len(rows) > MAX_POSES:
+        return error(f"一次最多计算{MAX_POSES}组关节值")
+    poses, postures = model.forward(rows)
+    # 加 0.0 把 -0.0 变为 0.0
+    poses = (np.round(poses, 4) + 0.0).tolist()
+    return encode({
+        "status": "success",
+        "verified": model.verified,
+        "poses": [{"cartesian": Cartesian(*pose), "posture": Posture(*posture)}
+                  for pose, posture in zip(poses, postures.tolist())],
+    })
+
+
+def check_reachability(ip: str, poses, posture=None, reference=None, joint_limits=None):
+    """在本地求逆解，检查笛卡尔位姿是否可达，不向控制器发送请求
+
+    参数:
+        ip: 机器人控制柜IP地址
+        poses: 一个或多个笛卡尔位姿（基坐标系下的法兰位姿）
+        posture: 要求的姿态，例如 {"arm_up_down": 0, "wrist_flip": 0}
+        reference: 参考关节值（度），有多个解时返回离它最近的
+        joint_limits: 每个轴的 [下限, 上限]（度），默认 ±180
+
+    返回:
+        str: JSON格式的结果，results 与 poses 一一对应
+    """
+    try:
+        model = get_model(ip)
+        rows = _pose_rows(poses)
+        if reference is not None:
+            reference = _joint_rows(reference)[0]
+    except KinematicsError as e:
+        return error(str(e))
+    except (KeyError, TypeError, ValueError) as e:
+        return error(f"位姿格式错误: {str(e)}")
+    if len(rows) > MAX_POSES:
+        return error(f"一次最多检查{MAX_POSES}个位姿")
+    try:
+        results = model.inverse(rows, posture, reference, joint_limits)
+    except (TypeError, ValueError) as e:
+        return error(f"参数错误: {str(e)}")
+    return encode({
+        "status": "success",
+        "verified": model.verified,
+        "reachable": sum(result["reachable"] for result in results),
+        "results": results,
+    })
@@ -0,0 +1,199 @@
+# -*- coding: utf-8 -*-
+"""非阻塞的日志管道
+
+调用线程只创建 LogRecord 并放入有界队列，格式化和写文件都在后台线程中完成；
+日志参数使用 % 占位符延迟格式化，被过滤或丢弃的日志不会格式化。
+同一模板的 INFO 日志（例如每次工具调用成功的日志）按模板限速，超过速率后只抽样写入，
+写入的那一条注明省略了多少条。WARNING 及以上级别的日志不限速。
+"""
+import atexit
+import logging
+import os
+import queue
+import threading
+import time
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+from pathlib import Path
+
+LOG_DIR = os.environ.get("AGILEBOT_MCP_LOG_DIR", "logs")
+LOG_LEVEL = os.environ.get("AGILEBOT_MCP_LOG_LEVEL", "INFO").upper()
+LOG_MAX_BYTES = int(os.environ.get("AGILEBOT_MCP_LOG_MAX_BYTES", str(1024 * 1024)))
+LOG_BACKUP_COUNT = 3
+# 队列满时直接丢弃日志而不是阻塞调用线程
+LOG_QUEUE_SIZE = int(os.environ.get("AGILEBOT_MCP_LOG_QUEUE_SIZE", "10000"))
+# 每个日志模板每秒允许写入的 INFO 日志条数及突发上限，0 表示不限速
+LOG_RATE = float(os.environ.get("AGILEBOT_MCP_LOG_RATE", "20"))
+LOG_BURST = int(os.environ.get("AGILEBOT_MCP_LOG_BURST", "50"))
+# 超过速率后每 N 条写入 1 条，0 表示全部省略
+LOG_SAMPLE = int(os.environ.get("AGILEBOT_MCP_LOG_SAMPLE", "100"))
+
+LOG_FORMAT = "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+
+_listener = None
+
+
+class RateLimitFilter(logging.Filter):
+    """按 (日志器, 模板) 对 WARNING 以下的日志做令牌桶限速和抽样"""
+
+    def __init__(self, rate=LOG_RATE, burst=LOG_BURST, sample=LOG_SAMPLE):
+        super().__init__()
+        self.rate = rate
+        self.burst = burst
+        self.sample = sample
+        self._lock = threading.Lock()
+        # (日志器, 模板) -> [剩余令牌, 上次补充时间, 已省略条数]
+        self._buckets = {}
+
+    def filter(self, record):
+        if record.levelno >= logging.WARNING:
+            return True
+        key = (record.name, record.msg)
+        now = time.monotonic()
+        with self._lock:
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                bucket = self._buckets[key] = [float(self.burst), now, 0]
+            else:
+                bucket[0] = min(float(self.burst), bucket[0] + (now - bucket[1]) * self.rate)
+                bucket[1] = now
+            if bucket[0] >= 1:
+                bucket[0] -= 1
+                suppressed, bucket[2] = bucket[2], 0
+            else:
+                bucket[2] += 1
+                if not self.sample or bucket[2] % self.sample:
+                    return False
+                suppressed, bucket[2] = bucket[2] - 1, 0
+        if suppressed:
+            record.msg = f"{record.msg}（省略了 {suppressed} 条相同日志）"
+        return True
+
+
+class BackgroundQueueHandler(QueueHandler):
+    """把日志记录原样放入队列，由 QueueListener 在后台线程格式化并写入
+
+    标准 QueueHandler 会在调用线程中格式化消息，这里推迟到后台线程；
+    日志参数在写入前不应再被修改。
+    """
+
+    def __init__(self, log_queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record):
+        return record
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+            return
+        if self.dropped:
+            dropped, self.dropped = self.dropped, 0
+            try:
+                self.queue.put_nowait(logging.makeLogRecord({
+                    "name": __name__, "levelno": logging.WARNING, "levelname": "WARNING",
+                    "msg": "日志队列已满，丢弃了 %d 条日志", "args": (dropped,),
+                }))
+            except queue.Full:
+                self.dropped += dropped
+
+
+class SizeRotatingFileHandler(RotatingFileHandler):
+    """按已写入字节数轮转的日志文件
+
+    RotatingFileHandler 每条日志都要额外格式化一次并 seek 到文件末尾来判断是否轮转，
+    这里在格式化时累计写入的字节数，判断轮转不再访问文件。
+    """
+
+    def _open(self):
+        stream = super()._open()
+        try:
+            self._size = os.path.getsize(self.baseFilename)
+        except OSError:
+            self._size = 0
+        return stream
+
+    def shouldRollover(self, record):
+        if self.stream is None:
+            self.stream = self._open()
+        return 0 < self.maxBytes <= self._size
+
+    def doRollover(self):
+        super().doRollover()
+        self._size = 0
+
+    def format(self, record):
+        msg = super().format(record)
+        self._size += len(msg.encode(self.encoding or "utf-8")) + len(self.terminator)
+        return msg
+
+
+class _Listener(QueueListener):
+    def enqueue_sentinel(self):
+        # 队列满时等待后台线程腾出位置，保证停止前的日志都被写入
+        self.queue.put(self._sentinel)
+
+
+def configure_logging(log_dir=LOG_DIR, level=LOG_LEVEL, max_bytes=LOG_MAX_BYTES,
+                      queue_size=LOG_QUEUE_SIZE, rate=LOG_RATE, burst=LOG_BURST, sample=LOG_SAMPLE):
+    """为根日志器安装队列日志处理器并启动后台写入线程
+
+    参数:
+        log_dir: 日志目录，日志文件为 agilebot_mcp_server.log
+        level: 根日志器级别
+        max_bytes: 单个日志文件的最大字节数，超过后轮转（保留3个备份）
+        queue_size: 日志队列长度，队列满时丢弃新日志
+        rate: 每个日志模板每秒允许写入的 INFO 日志条数，0 表示不限速
+        burst: 限速的突发上限
+        sample: 超过速率后每 N 条写入 1 条，0 表示全部省略
+
+    返回:
+        BackgroundQueueHandler: 安装到根日志器上的处理器
+    """
+    global _listener
+    stop_logging()
+
+    Path(log_dir).mkdir(parents=True, exist_ok=True)
+    file_handler = SizeRotatingFileHandler(
+        str(Path(log_dir) / "agilebot_mcp_server.log"),
+        maxBytes=max_bytes,
+        backupCount=LOG_BACKUP_COUNT,
+        encoding="utf-8"
+    )
+    file_handler.setFormatter(logging.Formatter(LOG_FORMAT))
+
+    handler = BackgroundQueueHandler(queue.Queue(queue_size))
+    if rate > 0:
+        handler.addFilter(RateLimitFilter(rate, burst, sample))
+
+    # 日志格式中没有用到进程和线程信息，不必在调用线程中采集
+    logging.logProcesses = False
+    logging.logMultiprocessing = False
+
+    root = logging.getLogger()
+    root.addHandler(handler)
+    root.setLevel(level)
+
+    _listener = _Listener(handler.queue, file_handler)
+    _listener.start()
+    return handler
+
+
+def stop_logging():
+    """写完队列中剩余的日志后停止后台线程，并移除 configure_logging 安装的处理器"""
+    global _listener
+    if _listener is None:
+        return
+    listener, _listener = _listener, None
+    listener.stop()
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        if isinstance(handler, BackgroundQueueHandler):
+            root.removeHandler(handler)
+    for handler in listener.handlers:
+        handler.close()
+
+
+atexit.register(stop_logging)
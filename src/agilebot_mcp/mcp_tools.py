@@ -1,40 +1,12 @@
 # -*- coding: utf-8 -*-
+import asyncio
+import importlib
 import json
 import logging
 from mcp.server.fastmcp import FastMCP
 
-from .robot_core import (
-    connect_robot, disconnect_robot, get_status, get_controller_info,
-    get_current_joint_positions, get_current_cartesian_position,
-    move_joint, move_cartesian, power_off_robot, power_on_robot,
-    get_servo_status, get_robot_info, servo_reset,
-    acquire_access, release_access, check_robot_ready
-)
-from .registers import (
-    read_R_register, write_R_register, delete_R_register,
-    read_MR_register, write_MR_register, delete_MR_register,
-    read_PR_register, write_PR_register, delete_PR_register
-)
-from .modbus import (
-    read_modbus_coils, write_modbus_coils,
-    read_modbus_holding_regs, write_modbus_holding_regs,
-    read_modbus_discrete_inputs, read_modbus_input_regs
-)
-from .drag_control import (
-    get_drag_status, set_drag_status, enable_drag
-)
-from .coordinate_system import (
-    get_coordinate_list, add_coordinate, delete_coordinate,
-    update_coordinate, get_coordinate
-)
-from .payload import (
-    get_current_payload, get_payload_by_id, set_current_payload,
-    add_payload, delete_payload, update_payload, get_all_payload,
-    check_axis_three_horizontal, get_payload_identify_state,
-    start_payload_identify, get_payload_identify_result,
-    interference_check_for_payload_identify, payload_identify_start,
-    payload_identify_done, payload_identify
-)
+from .executor import run_robot_call
+from .responses import error
 
 logger = logging.getLogger(__name__)
 
@@ -44,8 +16,68 @@ mcp = FastMCP(
 )
 
 
+def _json_arg(value):
+    """解析JSON字符串参数；FastMCP 会先把JSON字符串预解析为列表/字典，此时直接使用"""
+    if isinstance(value, str):
+        return json.loads(value)
+    return value
+
+
+def _list_arg(value):
+    """解析列表参数：JSON数组字符串、列表或单个值"""
+    if isinstance(value, str) and value.lstrip().startswith("["):
+        return json.loads(value)
+    return value
+
+
+async def _from_snapshot_or_rpc(ip, func):
+    """快照足够新时直接在事件循环中返回，否则到机器人线程池中发起RPC"""
+    cached = func(ip, allow_rpc=False)
+    if cached is not None:
+        return cached
+    return await run_robot_call(ip, func)
+
+
+class _LazyModule:
+    """第一次访问属性时才导入的工具实现模块
+
+    各类工具的实现模块（以及它们用到的SDK子模块）不在服务器启动时导入，
+    客户端握手和列出工具不需要加载SDK，某类工具第一次被调用时才加载。
+    """
+
+    def __init__(self, name):
+        self._name = name
+        self._module = None
+
+    def __getattr__(self, attr):
+        if self._module is None:
+            self._module = importlib.import_module(f".{self._name}", __package__)
+        return getattr(self._module, attr)
+
+
+_robot_core = _LazyModule("robot_core")
+_registers = _LazyModule("registers")
+_modbus = _LazyModule("modbus")
+_modbus_poll = _LazyModule("modbus_poll")
+_drag_control = _LazyModule("drag_control")
+_coordinate_system = _LazyModule("coordinate_system")
+_payload = _LazyModule("payload")
+_recorder = _LazyModule("recorder")
+_trajectory = _LazyModule("trajectory")
+_jobs = _LazyModule("jobs")
+_offline_trajectory = _LazyModule("offline_trajectory")
+_file_transfer = _LazyModule("file_transfer")
+_fleet = _LazyModule("fleet")
+_health = _LazyModule("health")
+_inventory = _LazyModule("inventory")
+_kinematics = _LazyModule("kinematics")
+_pose_conversion = _LazyModule("pose_conversion")
+_motion_path = _LazyModule("motion_path")
+_bas_script = _LazyModule("bas_script")
+
+
 @mcp.tool()
-def connect_robot_tool(ip: str):
+async def connect_robot_tool(ip: str):
     """连接捷勃特机器人
     
     参数:
@@ -54,11 +86,11 @@ def connect_robot_tool(ip: str):
     返回:
         str: 连接结果
     """
-    return connect_robot(ip)
+    return await run_robot_call(ip, _robot_core.connect_robot)
 
 
 @mcp.tool()
-def disconnect_robot_tool(ip: str):
+async def disconnect_robot_tool(ip: str):
     """断开与捷勃特机器人的连接
     
     参数:
@@ -67,11 +99,11 @@ def disconnect_robot_tool(ip: str):
     返回:
         str: 断开结果
     """
-    return disconnect_robot(ip)
+    return await run_robot_call(ip, _robot_core.disconnect_robot)
 
 
 @mcp.tool()
-def get_status_tool(ip: str):
+async def get_status_tool(ip: str):
     """获取机器人运行状态
     
     参数:
@@ -80,11 +112,11 @@ def get_status_tool(ip: str):
     返回:
         str: 机器人状态信息
     """
-    return get_status(ip)
+    return await _from_snapshot_or_rpc(ip, _robot_core.get_status)
 
 
 @mcp.tool()
-def get_controller_info_tool(ip: str):
+async def get_controller_info_tool(ip: str):
     """获取控制器运行状态
     
     参数:
@@ -93,11 +125,24 @@ def get_controller_info_tool(ip: str):
     返回:
         str: 控制器状态信息
     """
-    return get_controller_info(ip)
+    return await _from_snapshot_or_rpc(ip, _robot_core.get_controller_info)
 
 
 @mcp.tool()
-def get_current_joint_positions_tool(ip: str):
+async def get_robot_snapshot_tool(ip: str):
+    """获取后台订阅的机器人状态快照（机器人/伺服/控制器状态、位姿、IO）
+    
+    参数:
+        ip: 机器人控制柜IP地址
+        
+    返回:
+        str: 快照信息，包含各字段距上次刷新的时间(age_ms)和过期阈值(max_age_ms)
+    """
+    return _robot_core.get_robot_snapshot(ip)
+
+
+@mcp.tool()
+async def get_current_joint_positions_tool(ip: str):
     """获取机器人当前关节位置
     
     参数:
@@ -106,11 +151,11 @@ def get_current_joint_positions_tool(ip: str):
     返回:
         str: 关节位置信息
     """
-    return get_current_joint_positions(ip)
+    return await _from_snapshot_or_rpc(ip, _robot_core.get_current_joint_positions)
 
 
 @mcp.tool()
-def get_current_cartesian_position_tool(ip: str):
+async def get_current_cartesian_position_tool(ip: str):
     """获取机器人当前笛卡尔位置
     
     参数:
@@ -119,71 +164,69 @@ def get_current_cartesian_position_tool(ip: str):
     返回:
         str: 笛卡尔位置信息
     """
-    return get_current_cartesian_position(ip)
+    return await _from_snapshot_or_rpc(ip, _robot_core.get_current_cartesian_position)
 
 
 @mcp.tool()
-def move_robot_joint(ip: str, joint_positions: str, speed: int = 50, accel: float = 0.5):
+async def move_robot_joint(ip: str, joint_positions: str | list, speed: int | None = None, accel: float | None = None):
     """关节空间运动
     
     参数:
         ip: 机器人控制柜IP地址
         joint_positions: JSON字符串格式的关节位置 [j1, j2, j3, j4, j5, j6]
-        speed: 运动速度 (0-100)，默认50
-        accel: 运动加速度 (0-1)，默认0.5
+        speed: 运动速度 (0-100)，默认使用机器人清单中的设置，未设置时为50
+        accel: 运动加速度 (0-1)，默认使用机器人清单中的设置，未设置时为0.5
         
     返回:
         str: 运动结果
     """
     try:
-        positions = json.loads(joint_positions)
+        positions = _json_arg(joint_positions)
         if not isinstance(positions, list) or len(positions) != 6:
-            return json.dumps({"status": "error", "message": "关节位置格式错误，应为长度为6的数组"}, ensure_ascii=False)
+            return error("关节位置格式错误，应为长度为6的数组")
         if not all(isinstance(pos, (int, float)) for pos in positions):
-            return json.dumps({"status": "error", "message": "关节位置格式错误，所有元素应为数字"}, ensure_ascii=False)
+            return error("关节位置格式错误，所有元素应为数字")
         
-        check_robot_ready(ip)
-        return move_joint(ip, positions, speed, accel)
+        return await run_robot_call(ip, _robot_core.move_joint_when_ready, positions, speed, accel)
         
     except json.JSONDecodeError:
-        return json.dumps({"status": "error", "message": "关节位置格式错误，应为JSON字符串"}, ensure_ascii=False)
+        return error("关节位置格式错误，应为JSON字符串")
     except Exception as e:
-        logger.error(f"关节运动时发生异常: {ip}, 异常信息: {str(e)}")
-        return json.dumps({"status": "error", "message": f"关节运动时发生异常: {str(e)}"}, ensure_ascii=False)
+        logger.error("关节运动时发生异常: %s, 异常信息: %s", ip, e)
+        return error(f"关节运动时发生异常: {str(e)}")
 
 
 @mcp.tool()
-def move_robot_cartesian(ip: str, position: str, posture: str = None, speed: int = 50, accel: float = 0.5):
+async def move_robot_cartesian(ip: str, position: str | list, posture: str | dict = None, speed: int | None = None, accel: float | None = None):
     """笛卡尔空间运动
     
     参数:
         ip: 机器人控制柜IP地址
         position: JSON字符串格式的笛卡尔位置 [x, y, z, a, b, c]
         posture: JSON字符串格式的机器人形态参数（可选）
-        speed: 运动速度 (0-100)，默认50
-        accel: 运动加速度 (0-1)，默认0.5
+        speed: 运动速度 (0-100)，默认使用机器人清单中的设置，未设置时为50
+        accel: 运动加速度 (0-1)，默认使用机器人清单中的设置，未设置时为0.5
         
     返回:
         str: 运动结果
     """
     try:
-        positions = json.loads(position)
+        positions = _json_arg(position)
         if not isinstance(positions, list) or len(positions) != 6:
-            return json.dumps({"status": "error", "message": "笛卡尔位置格式错误，应为长度为6的数组"}, ensure_ascii=False)
+            return error("笛卡尔位置格式错误，应为长度为6的数组")
         
-        posture_dict = json.loads(posture) if posture else None
-        check_robot_ready(ip)
-        return move_cartesian(ip, positions, posture_dict, speed, accel)
+        posture_dict = _json_arg(posture) if posture else None
+        return await run_robot_call(ip, _robot_core.move_cartesian_when_ready, positions, posture_dict, speed, accel)
         
     except json.JSONDecodeError:
-        return json.dumps({"status": "error", "message": "位置格式错误，应为JSON字符串"}, ensure_ascii=False)
+        return error("位置格式错误，应为JSON字符串")
     except Exception as e:
-        logger.error(f"笛卡尔运动时发生异常: {ip}, 异常信息: {str(e)}")
-        return json.dumps({"status": "error", "message": f"笛卡尔运动时发生异常: {str(e)}"}, ensure_ascii=False)
+        logger.error("笛卡尔运动时发生异常: %s, 异常信息: %s", ip, e)
+        return error(f"笛卡尔运动时发生异常: {str(e)}")
 
 
 @mcp.tool()
-def power_off_robot_tool(ip: str):
+async def power_off_robot_tool(ip: str):
     """机器人断电
     
     参数:
@@ -192,11 +235,11 @@ def power_off_robot_tool(ip: str):
     返回:
         str: 断电结果
     """
-    return power_off_robot(ip)
+    return await run_robot_call(ip, _robot_core.power_off_robot)
 
 
 @mcp.tool()
-def power_on_robot_tool(ip: str):
+async def power_on_robot_tool(ip: str):
     """机器人上电
     
     参数:
@@ -205,11 +248,11 @@ def power_on_robot_tool(ip: str):
     返回:
         str: 上电结果
     """
-    return power_on_robot(ip)
+    return await run_robot_call(ip, _robot_core.power_on_robot)
 
 
 @mcp.tool()
-def get_servo_status_tool(ip: str):
+async def get_servo_status_tool(ip: str):
     """获取伺服控制器状态
     
     参数:
@@ -218,11 +261,11 @@ def get_servo_status_tool(ip: str):
     返回:
         str: 伺服状态信息
     """
-    return get_servo_status(ip)
+    return await _from_snapshot_or_rpc(ip, _robot_core.get_servo_status)
 
 
 @mcp.tool()
-def get_robot_info_tool(ip: str):
+async def get_robot_info_tool(ip: str):
     """获取机器人型号信息
     
     参数:
@@ -231,11 +274,11 @@ def get_robot_info_tool(ip: str):
     返回:
         str: 机器人型号信息
     """
-    return get_robot_info(ip)
+    return await run_robot_call(ip, _robot_core.get_robot_info)
 
 
 @mcp.tool()
-def servo_reset_tool(ip: str):
+async def servo_reset_tool(ip: str):
     """复位伺服状态
     
     参数:
@@ -244,11 +287,11 @@ def servo_reset_tool(ip: str):
     返回:
         str: 复位结果
     """
-    return servo_reset(ip)
+    return await run_robot_call(ip, _robot_core.servo_reset)
 
 
 @mcp.tool()
-def acquire_access_tool(ip: str):
+async def acquire_access_tool(ip: str):
     """上位机获取操作权限
     
     参数:
@@ -257,11 +300,11 @@ def acquire_access_tool(ip: str):
     返回:
         str: 获取权限结果
     """
-    return acquire_access(ip)
+    return await run_robot_call(ip, _robot_core.acquire_access)
 
 
 @mcp.tool()
-def release_access_tool(ip: str):
+async def release_access_tool(ip: str):
     """上位机返还操作权限
     
     参数:
@@ -270,11 +313,11 @@ def release_access_tool(ip: str):
     返回:
         str: 返还权限结果
     """
-    return release_access(ip)
+    return await run_robot_call(ip, _robot_core.release_access)
 
 
 @mcp.tool()
-def read_R(ip: str, index: int):
+async def read_R(ip: str, index: int):
     """读取R寄存器（数值寄存器）的值
     
     参数:
@@ -284,11 +327,11 @@ def read_R(ip: str, index: int):
     返回:
         str: R寄存器的值
     """
-    return read_R_register(ip, index)
+    return await run_robot_call(ip, _registers.read_R_register, index)
 
 
 @mcp.tool()
-def write_R(ip: str, index: int, value: float):
+async def write_R(ip: str, index: int, value: float):
     """写入R寄存器（数值寄存器）的值
     
     参数:
@@ -299,11 +342,11 @@ def write_R(ip: str, index: int, value: float):
     返回:
         str: 写入结果
     """
-    return write_R_register(ip, index, value)
+    return await run_robot_call(ip, _registers.write_R_register, index, value)
 
 
 @mcp.tool()
-def delete_R(ip: str, index: int):
+async def delete_R(ip: str, index: int):
     """删除R寄存器（数值寄存器）
     
     参数:
@@ -313,11 +356,11 @@ def delete_R(ip: str, index: int):
     返回:
         str: 删除结果
     """
-    return delete_R_register(ip, index)
+    return await run_robot_call(ip, _registers.delete_R_register, index)
 
 
 @mcp.tool()
-def read_MR(ip: str, index: int):
+async def read_MR(ip: str, index: int):
     """读取MR寄存器（运动寄存器）的值
     
     参数:
@@ -327,11 +370,11 @@ def read_MR(ip: str, index: int):
     返回:
         str: MR寄存器的值
     """
-    return read_MR_register(ip, index)
+    return await run_robot_call(ip, _registers.read_MR_register, index)
 
 
 @mcp.tool()
-def write_MR(ip: str, index: int, value: int):
+async def write_MR(ip: str, index: int, value: int):
     """写入MR寄存器（运动寄存器）的值
     
     参数:
@@ -342,11 +385,11 @@ def write_MR(ip: str, index: int, value: int):
     返回:
         str: 写入结果
     """
-    return write_MR_register(ip, index, value)
+    return await run_robot_call(ip, _registers.write_MR_register, index, value)
 
 
 @mcp.tool()
-def delete_MR(ip: str, index: int):
+async def delete_MR(ip: str, index: int):
     """删除MR寄存器（运动寄存器）
     
     参数:
@@ -356,11 +399,11 @@ def delete_MR(ip: str, index: int):
     返回:
         str: 删除结果
     """
-    return delete_MR_register(ip, index)
+    return await run_robot_call(ip, _registers.delete_MR_register, index)
 
 
 @mcp.tool()
-def read_PR(ip: str, index: int):
+async def read_PR(ip: str, index: int):
     """读取PR寄存器（位姿寄存器）的值
     
     参数:
@@ -370,11 +413,11 @@ def read_PR(ip: str, index: int):
     返回:
         str: PR寄存器的位姿数据
     """
-    return read_PR_register(ip, index)
+    return await run_robot_call(ip, _registers.read_PR_register, index)
 
 
 @mcp.tool()
-def write_PR(ip: str, index: int, pose_data: str):
+async def write_PR(ip: str, index: int, pose_data: str | dict):
     """写入PR寄存器（位姿寄存器）的值
     
     参数:
@@ -385,11 +428,11 @@ def write_PR(ip: str, index: int, pose_data: str):
     返回:
         str: 写入结果
     """
-    return write_PR_register(ip, index, pose_data)
+    return await run_robot_call(ip, _registers.write_PR_register, index, pose_data)
 
 
 @mcp.tool()
-def delete_PR(ip: str, index: int):
+async def delete_PR(ip: str, index: int):
     """删除PR寄存器（位姿寄存器）
     
     参数:
@@ -399,11 +442,55 @@ def delete_PR(ip: str, index: int):
     返回:
         str: 删除结果
     """
-    return delete_PR_register(ip, index)
+    return await run_robot_call(ip, _registers.delete_PR_register, index)
+
+
+@mcp.tool()
+async def read_registers_tool(ip: str, kind: str, indices: str | list = None, start: int = None, end: int = None):
+    """批量读取寄存器
+    
+    参数:
+        ip: 机器人控制柜IP地址
+        kind: 寄存器类型 (R, MR, SR, MH, MI, PR)
+        indices: JSON字符串格式的寄存器编号列表，例如 [1, 5, 9]（与 start/end 二选一）
+        start: 起始编号（含）
+        end: 结束编号（含）
+        
+    返回:
+        str: 各编号的值及失败的编号
+    """
+    try:
+        indices_list = _json_arg(indices) if indices else None
+        if indices_list is not None and not isinstance(indices_list, list):
+            return error("寄存器编号格式错误，应为数组")
+        return await run_robot_call(ip, _registers.read_registers, kind, indices_list, start, end)
+    except json.JSONDecodeError:
+        return error("寄存器编号格式错误，应为JSON字符串")
+
+
+@mcp.tool()
+async def write_registers_tool(ip: str, kind: str, values: str | dict):
+    """批量写入寄存器
+    
+    参数:
+        ip: 机器人控制柜IP地址
+        kind: 寄存器类型 (R, MR, SR, MH, MI, PR)
+        values: JSON字符串格式的 {编号: 值}，PR寄存器的值为与 write_PR 相同格式的位姿数据
+        
+    返回:
+        str: 写入结果及失败的编号
+    """
+    try:
+        values_dict = _json_arg(values)
+        if not isinstance(values_dict, dict):
+            return error("寄存器值格式错误，应为JSON对象")
+        return await run_robot_call(ip, _registers.write_registers, kind, values_dict)
+    except json.JSONDecodeError:
+        return error("寄存器值格式错误，应为JSON字符串")
 
 
 @mcp.tool()
-def read_modbus_coils_tool(ip: str, channel: int, slave_id: int, address: int, number: int, master_id: int = 0):
+async def read_modbus_coils_tool(ip: str, channel: int, slave_id: int, address: int, number: int, master_id: int = 0):
     """读取Modbus线圈寄存器
     
     参数:
@@ -411,17 +498,17 @@ def read_modbus_coils_tool(ip: str, channel: int, slave_id: int, address: int, n
         channel: Modbus通道
         slave_id: 从机ID
         address: 寄存器地址
-        number: 寄存器数量 (最大120)
+        number: 寄存器数量 (超过120个时自动分段读取)
         master_id: 主机ID (默认0)
         
     返回:
         str: 寄存器值
     """
-    return read_modbus_coils(ip, channel, slave_id, address, number, master_id)
+    return await run_robot_call(ip, _modbus.read_modbus_coils, channel, slave_id, address, number, master_id)
 
 
 @mcp.tool()
-def write_modbus_coils_tool(ip: str, channel: int, slave_id: int, address: int, values: str, master_id: int = 0):
+async def write_modbus_coils_tool(ip: str, channel: int, slave_id: int, address: int, values: str | list, master_id: int = 0):
     """写入Modbus线圈寄存器
     
     参数:
@@ -436,14 +523,14 @@ def write_modbus_coils_tool(ip: str, channel: int, slave_id: int, address: int,
         str: 写入结果
     """
     try:
-        values_list = json.loads(values)
-        return write_modbus_coils(ip, channel, slave_id, address, values_list, master_id)
+        values_list = _json_arg(values)
+        return await run_robot_call(ip, _modbus.write_modbus_coils, channel, slave_id, address, values_list, master_id)
     except json.JSONDecodeError:
-        return json.dumps({"status": "error", "message": "寄存器值格式错误，应为JSON字符串"}, ensure_ascii=False)
+        return error("寄存器值格式错误，应为JSON字符串")
 
 
 @mcp.tool()
-def read_modbus_holding_regs_tool(ip: str, channel: int, slave_id: int, address: int, number: int, master_id: int = 0):
+async def read_modbus_holding_regs_tool(ip: str, channel: int, slave_id: int, address: int, number: int, master_id: int = 0):
     """读取Modbus保持寄存器
     
     参数:
@@ -451,17 +538,17 @@ def read_modbus_holding_regs_tool(ip: str, channel: int, slave_id: int, address:
         channel: Modbus通道
         slave_id: 从机ID
         address: 寄存器地址
-        number: 寄存器数量 (最大120)
+        number: 寄存器数量 (超过120个时自动分段读取)
         master_id: 主机ID (默认0)
         
     返回:
         str: 寄存器值
     """
-    return read_modbus_holding_regs(ip, channel, slave_id, address, number, master_id)
+    return await run_robot_call(ip, _modbus.read_modbus_holding_regs, channel, slave_id, address, number, master_id)
 
 
 @mcp.tool()
-def write_modbus_holding_regs_tool(ip: str, channel: int, slave_id: int, address: int, values: str, master_id: int = 0):
+async def write_modbus_holding_regs_tool(ip: str, channel: int, slave_id: int, address: int, values: str | list, master_id: int = 0):
     """写入Modbus保持寄存器
     
     参数:
@@ -476,14 +563,14 @@ def write_modbus_holding_regs_tool(ip: str, channel: int, slave_id: int, address
         str: 写入结果
     """
     try:
-        values_list = json.loads(values)
-        return write_modbus_holding_regs(ip, channel, slave_id, address, values_list, master_id)
+        values_list = _json_arg(values)
+        return await run_robot_call(ip, _modbus.write_modbus_holding_regs, channel, slave_id, address, values_list, master_id)
     except json.JSONDecodeError:
-        return json.dumps({"status": "error", "message": "寄存器值格式错误，应为JSON字符串"}, ensure_ascii=False)
+        return error("寄存器值格式错误，应为JSON字符串")
 
 
 @mcp.tool()
-def read_modbus_discrete_inputs_tool(ip: str, channel: int, slave_id: int, address: int, number: int, master_id: int = 0):
+async def read_modbus_discrete_inputs_tool(ip: str, channel: int, slave_id: int, address: int, number: int, master_id: int = 0):
     """读取Modbus离散寄存器
     
     参数:
@@ -491,17 +578,17 @@ def read_modbus_discrete_inputs_tool(ip: str, channel: int, slave_id: int, addre
         channel: Modbus通道
         slave_id: 从机ID
         address: 寄存器地址
-        number: 寄存器数量 (最大120)
+        number: 寄存器数量 (超过120个时自动分段读取)
         master_id: 主机ID (默认0)
         
     返回:
         str: 寄存器值
     """
-    return read_modbus_discrete_inputs(ip, channel, slave_id, address, number, master_id)
+    return await run_robot_call(ip, _modbus.read_modbus_discrete_inputs, channel, slave_id, address, number, master_id)
 
 
 @mcp.tool()
-def read_modbus_input_regs_tool(ip: str, channel: int, slave_id: int, address: int, number: int, master_id: int = 0):
+async def read_modbus_input_regs_tool(ip: str, channel: int, slave_id: int, address: int, number: int, master_id: int = 0):
     """读取Modbus输入寄存器
     
     参数:
@@ -509,17 +596,81 @@ def read_modbus_input_regs_tool(ip: str, channel: int, slave_id: int, address: i
         channel: Modbus通道
         slave_id: 从机ID
         address: 寄存器地址
-        number: 寄存器数量 (最大120)
+        number: 寄存器数量 (超过120个时自动分段读取)
         master_id: 主机ID (默认0)
         
     返回:
         str: 寄存器值
     """
-    return read_modbus_input_regs(ip, channel, slave_id, address, number, master_id)
+    return await run_robot_call(ip, _modbus.read_modbus_input_regs, channel, slave_id, address, number, master_id)
+
+
+@mcp.tool()
+async def define_modbus_poll_group_tool(ip: str, name: str, channel: int, slave_id: int, ranges: str | list, period: float, master_id: int = 0):
+    """定义Modbus轮询组，由服务器按周期在后台读取，相邻或重叠的地址段会合并为尽量少的请求
+    
+    参数:
+        ip: 机器人控制柜IP地址
+        name: 轮询组名称，同名时替换原有轮询组
+        channel: Modbus通道
+        slave_id: 从机ID
+        ranges: JSON字符串格式的地址段列表，例如 [{"kind": "coils", "address": 0, "number": 16}]，
+                kind 可选 coils、holding_regs、discrete_inputs、input_regs
+        period: 轮询周期（秒）
+        master_id: 主机ID (默认0)
+        
+    返回:
+        str: 轮询组信息
+    """
+    try:
+        ranges_list = _json_arg(ranges)
+        if not isinstance(ranges_list, list):
+            return error("地址段格式错误，应为数组")
+        return _modbus_poll.define_poll_group(ip, name, channel, slave_id, ranges_list, period, master_id)
+    except json.JSONDecodeError:
+        return error("地址段格式错误，应为JSON字符串")
 
 
 @mcp.tool()
-def get_drag_status_tool(ip: str):
+async def remove_modbus_poll_group_tool(name: str):
+    """删除Modbus轮询组
+    
+    参数:
+        name: 轮询组名称
+        
+    返回:
+        str: 删除结果
+    """
+    return _modbus_poll.remove_poll_group(name)
+
+
+@mcp.tool()
+async def list_modbus_poll_groups_tool():
+    """列出所有Modbus轮询组及其最近一次读取的时间和错误
+    
+    返回:
+        str: 轮询组列表
+    """
+    return _modbus_poll.list_poll_groups()
+
+
+@mcp.tool()
+async def get_modbus_poll_changes_tool(name: str, cursor: int = 0):
+    """获取Modbus轮询组自上次游标以来发生变化的值
+    
+    参数:
+        name: 轮询组名称
+        cursor: 上次调用返回的游标，0 表示获取全部当前值
+        
+    返回:
+        str: 变化的值 changes ({类型: {地址: 值}}) 和下次调用使用的游标 cursor；
+            游标无效时 resync 为 true，changes 为全部当前值
+    """
+    return _modbus_poll.get_poll_changes(name, cursor)
+
+
+@mcp.tool()
+async def get_drag_status_tool(ip: str):
     """获取当前机器人轴锁定状态
     
     参数:
@@ -528,11 +679,11 @@ def get_drag_status_tool(ip: str):
     返回:
         str: 轴锁定状态
     """
-    return get_drag_status(ip)
+    return await run_robot_call(ip, _drag_control.get_drag_status)
 
 
 @mcp.tool()
-def set_drag_status_tool(ip: str, cart_x: bool = None, cart_y: bool = None, cart_z: bool = None,
+async def set_drag_status_tool(ip: str, cart_x: bool = None, cart_y: bool = None, cart_z: bool = None,
                        cart_a: bool = None, cart_b: bool = None, cart_c: bool = None,
                        joint_j1: bool = None, joint_j2: bool = None, joint_j3: bool = None, 
                        joint_j4: bool = None, joint_j5: bool = None, joint_j6: bool = None, 
@@ -558,11 +709,11 @@ def set_drag_status_tool(ip: str, cart_x: bool = None, cart_y: bool = None, cart
     返回:
         str: 设置结果
     """
-    return set_drag_status(ip, cart_x, cart_y, cart_z, cart_a, cart_b, cart_c, joint_j1, joint_j2, joint_j3, joint_j4, joint_j5, joint_j6, is_continuous_drag)
+    return await run_robot_call(ip, _drag_control.set_drag_status, cart_x, cart_y, cart_z, cart_a, cart_b, cart_c, joint_j1, joint_j2, joint_j3, joint_j4, joint_j5, joint_j6, is_continuous_drag)
 
 
 @mcp.tool()
-def enable_drag_tool(ip: str, enable: bool):
+async def enable_drag_tool(ip: str, enable: bool):
     """启用或禁用拖动示教模式
     
     参数:
@@ -572,11 +723,11 @@ def enable_drag_tool(ip: str, enable: bool):
     返回:
         str: 设置结果
     """
-    return enable_drag(ip, enable)
+    return await run_robot_call(ip, _drag_control.enable_drag, enable)
 
 
 @mcp.tool()
-def get_coordinate_list_tool(ip: str, sys_type: int):
+async def get_coordinate_list_tool(ip: str, sys_type: int):
     """获取用户坐标系或工具坐标系列表
     
     参数:
@@ -586,11 +737,11 @@ def get_coordinate_list_tool(ip: str, sys_type: int):
     返回:
         str: 坐标系列表
     """
-    return get_coordinate_list(ip, sys_type)
+    return await run_robot_call(ip, _coordinate_system.get_coordinate_list, sys_type)
 
 
 @mcp.tool()
-def add_coordinate_tool(ip: str, sys_type: int):
+async def add_coordinate_tool(ip: str, sys_type: int):
     """添加用户/工具坐标系
     
     参数:
@@ -600,11 +751,11 @@ def add_coordinate_tool(ip: str, sys_type: int):
     返回:
         str: 新建坐标系信息
     """
-    return add_coordinate(ip, sys_type)
+    return await run_robot_call(ip, _coordinate_system.add_coordinate, sys_type)
 
 
 @mcp.tool()
-def delete_coordinate_tool(ip: str, sys_type: int, coordinate_id: int):
+async def delete_coordinate_tool(ip: str, sys_type: int, coordinate_id: int):
     """删除用户/工具坐标系
     
     参数:
@@ -615,11 +766,11 @@ def delete_coordinate_tool(ip: str, sys_type: int, coordinate_id: int):
     返回:
         str: 删除结果
     """
-    return delete_coordinate(ip, sys_type, coordinate_id)
+    return await run_robot_call(ip, _coordinate_system.delete_coordinate, sys_type, coordinate_id)
 
 
 @mcp.tool()
-def update_coordinate_tool(ip: str, sys_type: int, coordinate_data: str):
+async def update_coordinate_tool(ip: str, sys_type: int, coordinate_data: str | dict):
     """更新用户/工具坐标系
     
     参数:
@@ -630,11 +781,11 @@ def update_coordinate_tool(ip: str, sys_type: int, coordinate_data: str):
     返回:
         str: 更新结果
     """
-    return update_coordinate(ip, sys_type, coordinate_data)
+    return await run_robot_call(ip, _coordinate_system.update_coordinate, sys_type, coordinate_data)
 
 
 @mcp.tool()
-def get_coordinate_tool(ip: str, sys_type: int, coordinate_id: int):
+async def get_coordinate_tool(ip: str, sys_type: int, coordinate_id: int):
     """获取指定的用户/工具坐标系
     
     参数:
@@ -645,11 +796,11 @@ def get_coordinate_tool(ip: str, sys_type: int, coordinate_id: int):
     返回:
         str: 坐标系信息
     """
-    return get_coordinate(ip, sys_type, coordinate_id)
+    return await run_robot_call(ip, _coordinate_system.get_coordinate, sys_type, coordinate_id)
 
 
 @mcp.tool()
-def get_current_payload_tool(ip: str):
+async def get_current_payload_tool(ip: str):
     """获取当前激活的负载编号
     
     参数:
@@ -658,11 +809,11 @@ def get_current_payload_tool(ip: str):
     返回:
         str: 负载编号信息
     """
-    return get_current_payload(ip)
+    return await run_robot_call(ip, _payload.get_current_payload)
 
 
 @mcp.tool()
-def get_payload_by_id_tool(ip: str, payload_id: int):
+async def get_payload_by_id_tool(ip: str, payload_id: int):
     """根据指定编号获取负载信息
     
     参数:
@@ -672,11 +823,11 @@ def get_payload_by_id_tool(ip: str, payload_id: int):
     返回:
         str: 负载信息
     """
-    return get_payload_by_id(ip, payload_id)
+    return await run_robot_call(ip, _payload.get_payload_by_id, payload_id)
 
 
 @mcp.tool()
-def set_current_payload_tool(ip: str, payload_id: int):
+async def set_current_payload_tool(ip: str, payload_id: int):
     """根据指定编号激活负载
     
     参数:
@@ -686,11 +837,11 @@ def set_current_payload_tool(ip: str, payload_id: int):
     返回:
         str: 操作结果
     """
-    return set_current_payload(ip, payload_id)
+    return await run_robot_call(ip, _payload.set_current_payload, payload_id)
 
 
 @mcp.tool()
-def add_payload_tool(ip: str, payload_info: str):
+async def add_payload_tool(ip: str, payload_info: str | dict):
     """向机器人控制柜添加一个用户自定义负载信息
     
     参数:
@@ -701,16 +852,16 @@ def add_payload_tool(ip: str, payload_info: str):
         str: 操作结果
     """
     try:
-        payload_data = json.loads(payload_info)
-        return add_payload(ip, payload_data)
+        payload_data = _json_arg(payload_info)
+        return await run_robot_call(ip, _payload.add_payload, payload_data)
     except json.JSONDecodeError:
-        return json.dumps({"status": "error", "message": "负载信息格式错误，应为JSON字符串"}, ensure_ascii=False)
+        return error("负载信息格式错误，应为JSON字符串")
     except Exception as e:
-        return json.dumps({"status": "error", "message": f"添加负载时发生异常: {str(e)}"}, ensure_ascii=False)
+        return error(f"添加负载时发生异常: {str(e)}")
 
 
 @mcp.tool()
-def delete_payload_tool(ip: str, payload_id: int):
+async def delete_payload_tool(ip: str, payload_id: int):
     """根据指定编号删除对应的负载信息
     
     参数:
@@ -720,11 +871,11 @@ def delete_payload_tool(ip: str, payload_id: int):
     返回:
         str: 操作结果
     """
-    return delete_payload(ip, payload_id)
+    return await run_robot_call(ip, _payload.delete_payload, payload_id)
 
 
 @mcp.tool()
-def update_payload_tool(ip: str, payload_info: str):
+async def update_payload_tool(ip: str, payload_info: str | dict):
     """更新一个已存在负载信息
     
     参数:
@@ -735,16 +886,16 @@ def update_payload_tool(ip: str, payload_info: str):
         str: 操作结果
     """
     try:
-        payload_data = json.loads(payload_info)
-        return update_payload(ip, payload_data)
+        payload_data = _json_arg(payload_info)
+        return await run_robot_call(ip, _payload.update_payload, payload_data)
     except json.JSONDecodeError:
-        return json.dumps({"status": "error", "message": "负载信息格式错误，应为JSON字符串"}, ensure_ascii=False)
+        return error("负载信息格式错误，应为JSON字符串")
     except Exception as e:
-        return json.dumps({"status": "error", "message": f"更新负载时发生异常: {str(e)}"}, ensure_ascii=False)
+        return error(f"更新负载时发生异常: {str(e)}")
 
 
 @mcp.tool()
-def get_all_payload_tool(ip: str):
+async def get_all_payload_tool(ip: str):
     """获取所有负载信息
     
     参数:
@@ -753,11 +904,11 @@ def get_all_payload_tool(ip: str):
     返回:
         str: 所有负载信息
     """
-    return get_all_payload(ip)
+    return await run_robot_call(ip, _payload.get_all_payload)
 
 
 @mcp.tool()
-def check_axis_three_horizontal_tool(ip: str):
+async def check_axis_three_horizontal_tool(ip: str):
     """检测3轴是否水平
     
     参数:
@@ -766,11 +917,11 @@ def check_axis_three_horizontal_tool(ip: str):
     返回:
         str: 3轴水平角度信息
     """
-    return check_axis_three_horizontal(ip)
+    return await run_robot_call(ip, _payload.check_axis_three_horizontal)
 
 
 @mcp.tool()
-def get_payload_identify_state_tool(ip: str):
+async def get_payload_identify_state_tool(ip: str):
     """获取负载测定状态
     
     参数:
@@ -779,11 +930,11 @@ def get_payload_identify_state_tool(ip: str):
     返回:
         str: 负载测定状态信息
     """
-    return get_payload_identify_state(ip)
+    return await run_robot_call(ip, _payload.get_payload_identify_state)
 
 
 @mcp.tool()
-def start_payload_identify_tool(ip: str, weight: float, angle: float):
+async def start_payload_identify_tool(ip: str, weight: float, angle: float):
     """开始负载测定
     
     参数:
@@ -794,11 +945,11 @@ def start_payload_identify_tool(ip: str, weight: float, angle: float):
     返回:
         str: 操作结果
     """
-    return start_payload_identify(ip, weight, angle)
+    return await run_robot_call(ip, _payload.start_payload_identify, weight, angle)
 
 
 @mcp.tool()
-def get_payload_identify_result_tool(ip: str):
+async def get_payload_identify_result_tool(ip: str):
     """获取负载测定结果
     
     参数:
@@ -807,11 +958,11 @@ def get_payload_identify_result_tool(ip: str):
     返回:
         str: 负载测定结果
     """
-    return get_payload_identify_result(ip)
+    return await run_robot_call(ip, _payload.get_payload_identify_result)
 
 
 @mcp.tool()
-def interference_check_for_payload_identify_tool(ip: str, weight: float, angle: float):
+async def interference_check_for_payload_identify_tool(ip: str, weight: float, angle: float):
     """开始负载测定的干涉检查
     
     参数:
@@ -822,11 +973,11 @@ def interference_check_for_payload_identify_tool(ip: str, weight: float, angle:
     返回:
         str: 操作结果
     """
-    return interference_check_for_payload_identify(ip, weight, angle)
+    return await run_robot_call(ip, _payload.interference_check_for_payload_identify, weight, angle)
 
 
 @mcp.tool()
-def payload_identify_start_tool(ip: str):
+async def payload_identify_start_tool(ip: str):
     """进入负载测定状态
     
     参数:
@@ -835,11 +986,11 @@ def payload_identify_start_tool(ip: str):
     返回:
         str: 操作结果
     """
-    return payload_identify_start(ip)
+    return await run_robot_call(ip, _payload.payload_identify_start)
 
 
 @mcp.tool()
-def payload_identify_done_tool(ip: str):
+async def payload_identify_done_tool(ip: str):
     """结束负载测定状态
     
     参数:
@@ -848,11 +999,11 @@ def payload_identify_done_tool(ip: str):
     返回:
         str: 操作结果
     """
-    return payload_identify_done(ip)
+    return await run_robot_call(ip, _payload.payload_identify_done)
 
 
 @mcp.tool()
-def payload_identify_tool(ip: str, weight: float, angle: float):
+async def payload_identify_tool(ip: str, weight: float, angle: float):
     """负载测定全流程
     
     参数:
@@ -863,11 +1014,11 @@ def payload_identify_tool(ip: str, weight: float, angle: float):
     返回:
         str: 负载测定结果
     """
-    return payload_identify(ip, weight, angle)
+    return await run_robot_call(ip, _payload.payload_identify, weight, angle)
 
 
 @mcp.tool()
-def update_payload_from_identify_tool(ip: str, payload_id: int, identify_result: str):
+async def update_payload_from_identify_tool(ip: str, payload_id: int, identify_result: str | dict):
     """将负载测定结果更新到指定负载
     
     参数:
@@ -878,4 +1029,472 @@ def update_payload_from_identify_tool(ip: str, payload_id: int, identify_result:
     返回:
         str: 操作结果
     """
-    return update_payload_from_identify(ip, payload_id, json.loads(identify_result))
+    try:
+        identify_data = _json_arg(identify_result)
+    except json.JSONDecodeError:
+        return error("负载测定结果格式错误，应为JSON字符串")
+    return await run_robot_call(ip, _payload.update_payload_from_identify, payload_id, identify_data)
+
+
+@mcp.tool()
+async def start_trajectory_recording_tool(ip: str, rate: float = 50, capacity: int = 60000):
+    """开始在服务器端录制机器人轨迹（关节位置、笛卡尔位置、伺服/控制器状态），替换之前的录制数据
+    
+    参数:
+        ip: 机器人控制柜IP地址
+        rate: 采样频率（Hz，默认50）
+        capacity: 最多保留的采样点数（默认60000），超过后覆盖最旧的采样点
+        
+    返回:
+        str: 录制信息
+    """
+    return await run_robot_call(ip, _recorder.start_recording, rate, capacity)
+
+
+@mcp.tool()
+async def stop_trajectory_recording_tool(ip: str):
+    """停止录制机器人轨迹，已录制的数据可继续通过 get_trajectory_recording_tool 获取
+    
+    参数:
+        ip: 机器人控制柜IP地址
+        
+    返回:
+        str: 录制信息（采样点数、时长、错过的采样节拍等）
+    """
+    return await run_robot_call(ip, _recorder.stop_recording)
+
+
+@mcp.tool()
+async def get_trajectory_recording_tool(ip: str, start: float | None = None, end: float | None = None, max_samples: int = 1000):
+    """获取录制的轨迹数据，可按时间窗口截取，采样点过多时等间隔抽取
+    
+    参数:
+        ip: 机器人控制柜IP地址
+        start: 窗口起始时间（秒，相对录制开始，默认最早的采样点）
+        end: 窗口结束时间（秒，相对录制开始，默认最新的采样点）
+        max_samples: 最多返回的采样点数（默认1000）
+        
+    返回:
+        str: 按时间先后排列的 t、joint、cart、servo_status、ctrl_status 列数据及抽取间隔
+    """
+    return await run_robot_call(ip, _recorder.get_recording, start, end, max_samples)
+
+
+@mcp.tool()
+async def inspect_trajectory_file_tool(path: str, joint_limits: str | list | None = None, max_velocity: float | None = None,
+                                       max_acceleration: float | None = None, max_torque: float | None = None):
+    """解析并校验服务器本地的离线轨迹文件（.trajectory），返回统计信息和发现的问题
+    
+    参数:
+        path: 服务器本地的 .trajectory 文件路径
+        joint_limits: 每个轴的 [下限, 上限]（弧度）的JSON数组，例如 "[[-3.14, 3.14], ...]"，默认 ±2π
+        max_velocity: 速度上限（弧度/秒，默认2π）
+        max_acceleration: 加速度上限（弧度/秒²，默认30）
+        max_torque: 力矩上限（默认不检查）
+        
+    返回:
+        str: 点数、周期、时长、各轴位置范围和最大速度/加速度/力矩、DO动作，以及校验问题列表
+    """
+    if joint_limits is not None:
+        joint_limits = _json_arg(joint_limits)
+    # 大文件解析耗时较长，放到线程中执行，不阻塞事件循环
+    return await asyncio.to_thread(_trajectory.inspect_trajectory_file, path, joint_limits,
+                                   max_velocity, max_acceleration, max_torque)
+
+
+@mcp.tool()
+async def compile_trajectory_csv_tool(csv_path: str, output_path: str | None = None, period: float = 0.001,
+                                      joint_limits: str | list | None = None):
+    """把服务器本地带时间戳的轨迹CSV转换为离线轨迹文件（.trajectory），按控制器周期重采样，缺少的速度/加速度用有限差分补齐
+    
+    参数:
+        csv_path: CSV文件路径，需要 ts、pts_J1... 列，可选 vel_J*、acc_J*、tor_J*、do_port、do_state 列
+        output_path: 输出的 .trajectory 文件路径（默认与CSV同名）
+        period: 控制器周期（秒，默认0.001）
+        joint_limits: 每个轴的 [下限, 上限]（弧度）的JSON数组，用于校验，默认 ±2π
+        
+    返回:
+        str: 输出路径、统计信息和校验问题列表
+    """
+    if joint_limits is not None:
+        joint_limits = _json_arg(joint_limits)
+    return await asyncio.to_thread(_trajectory.compile_trajectory_csv, csv_path, output_path, period, joint_limits)
+
+
+@mcp.tool()
+async def run_offline_trajectory_tool(ip: str, file_name: str, wait_finish: bool = True, ready_timeout: float = 60.0):
+    """在后台运行控制柜上的离线轨迹文件：设置文件、准备、等待机器人和伺服空闲、执行，立即返回任务ID
+    
+    参数:
+        ip: 机器人控制柜IP地址
+        file_name: 控制柜上的离线轨迹文件名，例如 "test_torque.trajectory"
+        wait_finish: 执行后是否继续等待轨迹执行完成（默认是）
+        ready_timeout: 准备后等待就绪的超时时间（秒，默认60）
+        
+    返回:
+        str: 任务ID和任务信息，之后用 get_job_tool 查询阶段、进度和结果
+    """
+    return _offline_trajectory.run_offline_trajectory(ip, file_name, wait_finish, ready_timeout)
+
+
+@mcp.tool()
+async def get_job_tool(job_id: str):
+    """查询后台任务的状态、当前阶段、进度和结果
+    
+    参数:
+        job_id: 任务ID
+        
+    返回:
+        str: 任务状态（pending/running/succeeded/failed/cancelled）、阶段、进度、结果或错误信息
+    """
+    return _jobs.get_job(job_id)
+
+
+@mcp.tool()
+async def list_jobs_tool(ip: str | None = None, active_only: bool = False):
+    """列出后台任务
+    
+    参数:
+        ip: 只列出该机器人的任务（默认全部）
+        active_only: 只列出未结束的任务
+        
+    返回:
+        str: 任务列表
+    """
+    return _jobs.list_jobs(ip, active_only)
+
+
+@mcp.tool()
+async def cancel_job_tool(job_id: str):
+    """取消后台任务；离线轨迹已经开始执行后取消只会停止等待，不会停止机器人运动
+    
+    参数:
+        job_id: 任务ID
+        
+    返回:
+        str: 取消请求结果
+    """
+    return _jobs.cancel_job(job_id)
+
+
+@mcp.tool()
+async def upload_files_tool(ips: str | list, files: str | list, file_type: str = "tmp", overwrite: bool = True,
+                            skip_unchanged: bool = True):
+    """把服务器本地文件并行上传到一台或多台机器人控制柜，内容未变化的文件自动跳过
+    
+    参数:
+        ips: 机器人控制柜IP地址，单个IP或JSON数组，例如 "[\"10.27.1.254\", \"10.27.1.253\"]"
+        files: 服务器本地文件路径，单个路径或JSON数组；程序文件可省略 .json/.xml 扩展名；
+            数组项也可以是 {"path": 路径, "file_type": 类型}，一次部署不同类型的文件
+        file_type: 未指定类型的文件的类型 (program: 程序, trajectory: 离线轨迹, trajectory_csv: 轨迹CSV, tmp: 临时文件)
+        overwrite: 控制柜上已有同名文件时是否覆盖（默认是）
+        skip_unchanged: 内容与上次上传到该机器人的一致时跳过（默认是）
+        
+    返回:
+        str: 上传、跳过、失败的文件数和按IP列出的每个文件的结果
+    """
+    return await asyncio.to_thread(_file_transfer.upload_files, _list_arg(ips), _list_arg(files), file_type,
+                                   overwrite, skip_unchanged)
+
+
+@mcp.tool()
+async def download_file_tool(ip: str, file_name: str, local_dir: str, file_type: str = "tmp"):
+    """从机器人控制柜下载文件到服务器本地目录
+    
+    参数:
+        ip: 机器人控制柜IP地址
+        file_name: 控制柜上的文件名（程序和轨迹可不带扩展名）
+        local_dir: 服务器本地目标目录
+        file_type: 文件类型 (program, trajectory, trajectory_csv, tmp)
+        
+    返回:
+        str: 下载的文件路径、大小和SHA-256
+    """
+    return await asyncio.to_thread(_file_transfer.download_file, ip, file_name, local_dir, file_type)
+
+
+@mcp.tool()
+async def search_files_tool(ip: str, file_name: str):
+    """在机器人控制柜上搜索文件
+    
+    参数:
+        ip: 机器人控制柜IP地址
+        file_name: 文件名或关键字
+        
+    返回:
+        str: 找到的文件列表
+    """
+    return await asyncio.to_thread(_file_transfer.search_files, ip, file_name)
+
+
+@mcp.tool()
+async def delete_file_tool(ip: str, file_name: str, file_type: str = "tmp"):
+    """删除机器人控制柜上的文件
+    
+    参数:
+        ip: 机器人控制柜IP地址
+        file_name: 控制柜上的文件名
+        file_type: 文件类型 (program, trajectory, trajectory_csv, tmp)
+        
+    返回:
+        str: 删除结果
+    """
+    return await asyncio.to_thread(_file_transfer.delete_file, ip, file_name, file_type)
+
+
+@mcp.tool()
+async def fleet_call_tool(operation: str, args: str | dict | None = None, ips: str | list | None = None,
+                          group: str | None = None, concurrency: int | None = None, timeout: float | None = None):
+    """对多台机器人并发执行同一个操作，返回每台机器人的结果和延迟
+    
+    参数:
+        operation: 操作名，与单机功能的实现函数同名，例如 get_status、get_servo_status、power_on_robot、
+            read_R_register、write_R_register、write_registers、set_current_payload、update_payload、
+            move_joint、read_modbus_holding_regs、get_coordinate_list
+        args: 除 ip 外的参数，JSON对象，例如 "{\"index\": 1, \"value\": 1.5}"
+        ips: 机器人IP或JSON数组，与 group 二选一
+        group: 用 define_robot_group_tool 定义的分组名
+        concurrency: 同时执行的机器人数上限（默认16，可由 AGILEBOT_MCP_FLEET_CONCURRENCY 修改）
+        timeout: 单台机器人的超时时间（秒，默认10，可由 AGILEBOT_MCP_FLEET_TIMEOUT 修改）
+        
+    返回:
+        str: 成功、失败、超时的数量，总耗时，延迟中位数/最大值，以及按IP列出的状态、延迟和返回值
+    """
+    if args is not None:
+        args = _json_arg(args)
+    if ips is not None:
+        ips = _list_arg(ips)
+    return await _fleet.fan_out(operation, args, ips, group, concurrency, timeout)
+
+
+@mcp.tool()
+async def define_robot_group_tool(name: str, ips: str | list):
+    """定义或替换一个机器人分组，供批量操作使用
+    
+    参数:
+        name: 分组名
+        ips: 机器人IP的JSON数组
+        
+    返回:
+        str: 分组信息
+    """
+    return _fleet.define_group(name, _list_arg(ips))
+
+
+@mcp.tool()
+async def list_robot_groups_tool():
+    """列出所有机器人分组
+    
+    返回:
+        str: 分组名及其IP列表
+    """
+    return _fleet.list_groups()
+
+
+@mcp.tool()
+async def remove_robot_group_tool(name: str):
+    """删除机器人分组
+    
+    参数:
+        name: 分组名
+        
+    返回:
+        str: 删除结果
+    """
+    return _fleet.remove_group(name)
+
+
+@mcp.tool()
+async def get_robot_health_tool(ip: str | None = None):
+    """查询机器人的连接健康状态和自动重连进度
+    
+    参数:
+        ip: 机器人控制柜IP地址，不指定时返回所有已连接的机器人
+        
+    返回:
+        str: 健康状态（healthy/suspect/reconnecting）、连续失败次数、重连次数和最近一次错误
+    """
+    return _health.get_robot_health(ip)
+
+
+@mcp.tool()
+async def reconnect_robot_tool(ip: str):
+    """立即重连机器人（例如控制柜重启后），重连期间对该机器人的调用会短暂排队
+    
+    参数:
+        ip: 机器人控制柜IP地址
+        
+    返回:
+        str: 是否已开始重连，进度通过 get_robot_health_tool 查询
+    """
+    return await asyncio.to_thread(_health.reconnect_robot, ip)
+
+
+@mcp.tool()
+async def load_inventory_tool(path: str | None = None, wait: bool = False):
+    """加载机器人清单：定义分组、设置默认速度/加速度，并发连接清单中的所有机器人
+    
+    参数:
+        path: 清单JSON文件路径，默认使用环境变量 AGILEBOT_MCP_INVENTORY
+        wait: 是否等待所有机器人连接完成或超时后再返回，默认 False（后台连接）
+        
+    返回:
+        str: 每台机器人的连接状态，之后通过 get_inventory_status_tool 查询进度
+    """
+    return await asyncio.to_thread(_inventory.load_inventory, path, wait)
+
+
+@mcp.tool()
+async def get_inventory_status_tool():
+    """查询按清单连接的进度和每台机器人的就绪状态
+    
+    返回:
+        str: 已连接数、就绪数、耗时，以及每台机器人的名称、分组、连接状态和控制器/伺服状态
+    """
+    return _inventory.get_inventory_status()
+
+
+@mcp.tool()
+async def get_kinematics_model_tool(ip: str, refresh: bool = False):
+    """获取机器人的本地运动学模型：DH参数、DH约定以及与控制器正解对比的结果
+    
+    参数:
+        ip: 机器人控制柜IP地址
+        refresh: 是否重新读取DH参数并与控制器对比（默认否）
+        
+    返回:
+        str: 型号、DH参数、DH约定、verified（与控制器是否一致）和对比误差
+    """
+    return await run_robot_call(ip, _kinematics.get_kinematics_model, refresh)
+
+
+@mcp.tool()
+async def forward_kinematics_tool(ip: str, joints: str | list):
+    """在本地批量计算正运动学（关节值 -> 法兰位姿和姿态），不向控制器逐个发送请求
+    
+    参数:
+        ip: 机器人控制柜IP地址
+        joints: 一组或多组关节值（度），JSON数组，例如 "[[0, 0, 0, 0, 90, 0], [10, 20, 30, 0, 45, 0]]"
+        
+    返回:
+        str: 每组关节值对应的基坐标系下法兰位姿 cartesian 和姿态 posture
+    """
+    try:
+        return await run_robot_call(ip, _kinematics.forward_kinematics, _list_arg(joints))
+    except json.JSONDecodeError:
+        return error("关节值格式错误，应为JSON数组")
+
+
+@mcp.tool()
+async def check_reachability_tool(ip: str, poses: str | list, posture: str | dict | None = None,
+                                  reference: str | list | None = None, joint_limits: str | list | None = None):
+    """在本地批量求逆解，检查笛卡尔位姿是否可达，不向控制器逐个发送请求
+    
+    参数:
+        ip: 机器人控制柜IP地址
+        poses: 一个或多个基坐标系下的法兰位姿 [x, y, z, a, b, c]，JSON数组
+        posture: 要求的姿态（可选），例如 "{\"arm_up_down\": 0, \"wrist_flip\": 0}"
+        reference: 参考关节值（可选），有多个解时返回离它最近的，默认全0
+        joint_limits: 每个轴的 [下限, 上限]（度，可选），默认 ±180
+        
+    返回:
+        str: 可达的数量，以及每个位姿的 reachable、关节值 joint、姿态 posture 或不可达原因 reason
+    """
+    try:
+        posture = _json_arg(posture) if posture else None
+        if reference is not None:
+            reference = _list_arg(reference)
+        if joint_limits is not None:
+            joint_limits = _list_arg(joint_limits)
+        return await run_robot_call(ip, _kinematics.check_reachability, _list_arg(poses), posture, reference,
+                                    joint_limits)
+    except json.JSONDecodeError:
+        return error("参数格式错误，应为JSON字符串")
+
+
+@mcp.tool()
+async def convert_poses_tool(ip: str, poses: str | list, direction: str = "cart_to_joint",
+                             posture: str | dict | None = None, uf: int = 0, tf: int = 0,
+                             reference: str | list | None = None, joint_limits: str | list | None = None,
+                             refresh: bool = False):
+    """批量转换位姿（笛卡尔位姿 <-> 关节值），一次请求完成整组位姿，结果按机器人缓存
+    
+    参数:
+        ip: 机器人控制柜IP地址
+        poses: 一个或多个位姿的JSON数组，cart_to_joint 时为 [x, y, z, a, b, c]，joint_to_cart 时为 [j1, ..., j6]
+        direction: cart_to_joint（笛卡尔位姿 -> 关节值，默认）或 joint_to_cart（关节值 -> 笛卡尔位姿）
+        posture: cart_to_joint 时要求的姿态（可选），例如 "{\"arm_up_down\": 0, \"wrist_flip\": 0}"
+        uf: 用户坐标系编号，默认0（基坐标系）
+        tf: 工具坐标系编号，默认0（法兰）
+        reference: cart_to_joint 时的参考关节值（可选），有多个解时返回离它最近的
+        joint_limits: cart_to_joint 时每个轴的 [下限, 上限]（度，可选），默认 ±180
+        refresh: 是否先清除该机器人的转换缓存（在示教器上修改了坐标系后使用）
+        
+    返回:
+        str: 计算方式 method（cache/local/controller）、缓存命中数，以及与 poses 一一对应的结果
+    """
+    try:
+        posture = _json_arg(posture) if posture else None
+        if reference is not None:
+            reference = _list_arg(reference)
+        if joint_limits is not None:
+            joint_limits = _list_arg(joint_limits)
+        return await run_robot_call(ip, _pose_conversion.convert_poses, _list_arg(poses), direction, posture, uf, tf,
+                                    reference, joint_limits, refresh)
+    except json.JSONDecodeError:
+        return error("参数格式错误，应为JSON字符串")
+
+
+@mcp.tool()
+async def run_path_tool(ip: str, waypoints: str | list, pose_type: str = "joint", speed: float | None = None,
+                        accel: float | None = None, blend: float = 0, arrive_timeout: float | None = None):
+    """在后台连续执行一整条路径：先校验全部路径点，只检查一次就绪状态，再逐段发送运动指令，立即返回任务ID
+    
+    参数:
+        ip: 机器人控制柜IP地址
+        waypoints: 路径点的JSON数组，每个路径点为 [6个值]（类型由 pose_type 指定），
+            或 {"joint": [...]} / {"cartesian": [...], "posture": {...}}，可单独指定 speed、accel、blend
+        pose_type: 数组形式路径点的类型，joint（关节，默认）或 cartesian（笛卡尔）
+        speed: 默认速度 (0-100]，不填时使用该机器人的默认速度
+        accel: 默认加速度 (0-1]，不填时使用该机器人的默认加速度
+        blend: 默认平滑度 [0-100]，0 表示在路径点精确到位后再发送下一段（默认），大于0 时不等待到位
+        arrive_timeout: 每个精确到位的路径点等待到位的超时时间（秒，默认60）
+        
+    返回:
+        str: 任务ID和任务信息，之后用 get_job_tool 查询已发送/已到达的路径点数；校验失败时返回不合格的路径点
+    """
+    try:
+        return await run_robot_call(ip, _motion_path.run_path, _list_arg(waypoints), pose_type, speed, accel, blend,
+                                    arrive_timeout)
+    except json.JSONDecodeError:
+        return error("参数格式错误，应为JSON字符串")
+
+
+@mcp.tool()
+async def run_bas_script_tool(ip: str, waypoints: str | list, pose_type: str = "joint", speed: float | None = None,
+                              smooth: float = 0, assign: str | list | dict | None = None, name: str = "mcp_path",
+                              pr_start: int | None = None, dry_run: bool = False):
+    """把路径点和寄存器赋值编译为一个BAS脚本，在控制器上一次执行，相邻运动按平滑距离连续衔接
+    
+    参数:
+        ip: 机器人控制柜IP地址
+        waypoints: 路径点的JSON数组，格式同 run_path_tool；对象形式的路径点可带 speed、smooth（mm），
+            以及到达后执行的 assign（例如 {"kind": "R", "index": 1, "value": 10}，可为列表）和 wait（秒）
+        pose_type: 数组形式路径点的类型，joint（关节，默认）或 cartesian（笛卡尔）
+        speed: 默认速度 (0-100]，不填时使用该机器人的默认速度
+        smooth: 默认平滑距离（mm），0 表示在路径点精确到位（默认）
+        assign: 运动开始前执行的赋值（JSON对象或数组，可选）
+        name: 脚本名称（默认 mcp_path）
+        pr_start: 路径点写入的第一个PR寄存器编号，之后连续编号（默认100，可通过环境变量修改），使用的编号不能超过 AGILEBOT_MCP_BAS_PR_MAX（默认2000）
+        dry_run: 只编译并返回指令列表，不写寄存器也不执行
+        
+    返回:
+        str: 编译出的指令数、使用的PR寄存器范围和执行结果；校验失败时返回不合格的路径点
+    """
+    try:
+        if assign is not None:
+            assign = _json_arg(assign)
+        return await run_robot_call(ip, _bas_script.run_bas_script, _list_arg(waypoints), pose_type, speed, smooth,
+                                    assign, name, pr_start, dry_run)
+    except json.JSONDecodeError:
+        return error("参数格式错误，应为JSON字符串")
@@ -1,141 +1,217 @@
 # -*- coding: utf-8 -*-
-import json
 import logging
-from Agilebot.IR.A.status_code import StatusCodeEnum
-from Agilebot.IR.A.sdk_types import ModbusChannel
+import threading
 
-from .robot_core import robot_list
+from .sdk import StatusCodeEnum, ModbusChannel
+from .robot_core import robot_list, robot_lock
+from .responses import success, error
 
 logger = logging.getLogger(__name__)
 
+# 单次Modbus请求的最大寄存器数量，超出时自动分段
+MODBUS_CHUNK_SIZE = 120
 
+# (ip, channel, slave_id, master_id) -> 从机句柄，机器人断开或重连时清除
+_slave_cache = dict()
+_slave_cache_lock = threading.Lock()
+
+
+def _get_slave(ip, channel, slave_id, master_id):
+    key = (ip, channel, slave_id, master_id)
+    with _slave_cache_lock:
+        slave = _slave_cache.get(key)
+    if slave is None:
+        slave = robot_list[ip].modbus.get_slave(ModbusChannel(channel), slave_id, master_id)
+        with _slave_cache_lock:
+            _slave_cache[key] = slave
+    return slave
+
+
+def invalidate_slave_cache(ip, channel=None, slave_id=None, master_id=None):
+    """清除从机句柄缓存，未指定的条件视为匹配全部"""
+    with _slave_cache_lock:
+        for key in list(_slave_cache):
+            if key[0] == ip and all(want is None or want == got
+                                    for want, got in zip((channel, slave_id, master_id), key[1:])):
+                del _slave_cache[key]
+
+
+robot_list.on_remove(invalidate_slave_cache)
+robot_list.on_reconnect(invalidate_slave_cache)
+
+
+def _read_chunked(read, address, number):
+    """按 MODBUS_CHUNK_SIZE 分段连续读取并拼接结果，任一段失败即返回该段的错误代码"""
+    values = []
+    for offset in range(0, number, MODBUS_CHUNK_SIZE):
+        chunk, ret = read(address + offset, min(MODBUS_CHUNK_SIZE, number - offset))
+        if ret != StatusCodeEnum.OK:
+            return None, ret
+        values.extend(chunk)
+    return values, StatusCodeEnum.OK
+
+
+def _write_chunked(write, address, values):
+    """按 MODBUS_CHUNK_SIZE 分段连续写入，任一段失败即停止
+
+    返回:
+        (状态码, 已写入的数量)：失败时之前的分段已经写入设备，失败的分段从 address + 已写入的数量 开始
+    """
+    for offset in range(0, len(values), MODBUS_CHUNK_SIZE):
+        ret = write(address + offset, values[offset:offset + MODBUS_CHUNK_SIZE])
+        if ret != StatusCodeEnum.OK:
+            return ret, offset
+    return StatusCodeEnum.OK, len(values)
+
+
+def _partial_write_error(message, address, values, written):
+    """分段写入失败的响应：给出已写入的数量和失败的起始地址，调用方据此判断设备上是否已有部分新值"""
+    if written:
+        message = f"{message}，前 {written} 个已写入"
+    return error(message, written=written, total=len(values), failed_address=address + written)
+
+
+@robot_lock
 def read_modbus_coils(ip: str, channel: int, slave_id: int, address: int, number: int, master_id: int = 0):
     try:
         if ip not in robot_list:
-            return json.dumps({"status": "error", "message": "请先连接机器人"}, ensure_ascii=False)
+            return error("请先连接机器人")
+        if number <= 0:
+            return error("读取数量必须大于0")
         
-        if number > 120:
-            return json.dumps({"status": "error", "message": "寄存器数量不能超过120个"}, ensure_ascii=False)
-        
-        slave = robot_list[ip].modbus.get_slave(ModbusChannel(channel), slave_id, master_id)
-        values, ret = slave.read_coils(address, number)
+        slave = _get_slave(ip, channel, slave_id, master_id)
+        values, ret = _read_chunked(slave.read_coils, address, number)
         
         if ret == StatusCodeEnum.OK:
-            logger.info(f"读取Modbus线圈寄存器成功: {ip}, 通道: {channel}, 从机ID: {slave_id}, 地址: {address}, 数量: {number}")
-            return json.dumps({"status": "success", "channel": channel, "slave_id": slave_id, "address": address, "values": values}, ensure_ascii=False)
+            logger.info("读取Modbus线圈寄存器成功: %s, 通道: %s, 从机ID: %s, 地址: %s, 数量: %s", ip, channel, slave_id, address, number)
+            return success(channel=channel, slave_id=slave_id, address=address, values=values)
         else:
-            logger.error(f"读取Modbus线圈寄存器失败: {ip}, 错误代码: {ret}")
-            return json.dumps({"status": "error", "message": "读取Modbus线圈寄存器失败"}, ensure_ascii=False)
+            logger.error("读取Modbus线圈寄存器失败: %s, 错误代码: %s", ip, ret)
+            return error("读取Modbus线圈寄存器失败")
             
     except Exception as e:
-        logger.error(f"读取Modbus线圈寄存器时发生异常: {ip}, 异常信息: {str(e)}")
-        return json.dumps({"status": "error", "message": f"读取Modbus线圈寄存器时发生异常: {str(e)}"}, ensure_ascii=False)
+        invalidate_slave_cache(ip, channel, slave_id, master_id)
+        logger.error("读取Modbus线圈寄存器时发生异常: %s, 异常信息: %s", ip, e)
+        return error(f"读取Modbus线圈寄存器时发生异常: {str(e)}")
 
 
+@robot_lock
 def write_modbus_coils(ip: str, channel: int, slave_id: int, address: int, values: list, master_id: int = 0):
     try:
         if ip not in robot_list:
-            return json.dumps({"status": "error", "message": "请先连接机器人"}, ensure_ascii=False)
+            return error("请先连接机器人")
+        if not values:
+            return error("写入的值不能为空")
         
-        slave = robot_list[ip].modbus.get_slave(ModbusChannel(channel), slave_id, master_id)
-        ret = slave.write_coils(address, values)
+        slave = _get_slave(ip, channel, slave_id, master_id)
+        ret, written = _write_chunked(slave.write_coils, address, values)
         
         if ret == StatusCodeEnum.OK:
-            logger.info(f"写入Modbus线圈寄存器成功: {ip}, 通道: {channel}, 从机ID: {slave_id}, 地址: {address}, 值: {values}")
-            return json.dumps({"status": "success", "message": "写入Modbus线圈寄存器成功"}, ensure_ascii=False)
+            logger.info("写入Modbus线圈寄存器成功: %s, 通道: %s, 从机ID: %s, 地址: %s, 值: %s", ip, channel, slave_id, address, values)
+            return success(message="写入Modbus线圈寄存器成功")
         else:
-            logger.error(f"写入Modbus线圈寄存器失败: {ip}, 错误代码: {ret}")
-            return json.dumps({"status": "error", "message": "写入Modbus线圈寄存器失败"}, ensure_ascii=False)
+            logger.error("写入Modbus线圈寄存器失败: %s, 地址: %s, 已写入: %s/%s, 错误代码: %s",
+                         ip, address + written, written, len(values), ret)
+            return _partial_write_error("写入Modbus线圈寄存器失败", address, values, written)
             
     except Exception as e:
-        logger.error(f"写入Modbus线圈寄存器时发生异常: {ip}, 异常信息: {str(e)}")
-        return json.dumps({"status": "error", "message": f"写入Modbus线圈寄存器时发生异常: {str(e)}"}, ensure_ascii=False)
+        invalidate_slave_cache(ip, channel, slave_id, master_id)
+        logger.error("写入Modbus线圈寄存器时发生异常: %s, 异常信息: %s", ip, e)
+        return error(f"写入Modbus线圈寄存器时发生异常: {str(e)}")
 
 
+@robot_lock
 def read_modbus_holding_regs(ip: str, channel: int, slave_id: int, address: int, number: int, master_id: int = 0):
     try:
         if ip not in robot_list:
-            return json.dumps({"status": "error", "message": "请先连接机器人"}, ensure_ascii=False)
+            return error("请先连接机器人")
+        if number <= 0:
+            return error("读取数量必须大于0")
         
-        if number > 120:
-            return json.dumps({"status": "error", "message": "寄存器数量不能超过120个"}, ensure_ascii=False)
-        
-        slave = robot_list[ip].modbus.get_slave(ModbusChannel(channel), slave_id, master_id)
-        values, ret = slave.read_holding_regs(address, number)
+        slave = _get_slave(ip, channel, slave_id, master_id)
+        values, ret = _read_chunked(slave.read_holding_regs, address, number)
         
         if ret == StatusCodeEnum.OK:
-            logger.info(f"读取Modbus保持寄存器成功: {ip}, 通道: {channel}, 从机ID: {slave_id}, 地址: {address}, 数量: {number}")
-            return json.dumps({"status": "success", "channel": channel, "slave_id": slave_id, "address": address, "values": values}, ensure_ascii=False)
+            logger.info("读取Modbus保持寄存器成功: %s, 通道: %s, 从机ID: %s, 地址: %s, 数量: %s", ip, channel, slave_id, address, number)
+            return success(channel=channel, slave_id=slave_id, address=address, values=values)
         else:
-            logger.error(f"读取Modbus保持寄存器失败: {ip}, 错误代码: {ret}")
-            return json.dumps({"status": "error", "message": "读取Modbus保持寄存器失败"}, ensure_ascii=False)
+            logger.error("读取Modbus保持寄存器失败: %s, 错误代码: %s", ip, ret)
+            return error("读取Modbus保持寄存器失败")
             
     except Exception as e:
-        logger.error(f"读取Modbus保持寄存器时发生异常: {ip}, 异常信息: {str(e)}")
-        return json.dumps({"status": "error", "message": f"读取Modbus保持寄存器时发生异常: {str(e)}"}, ensure_ascii=False)
+        invalidate_slave_cache(ip, channel, slave_id, master_id)
+        logger.error("读取Modbus保持寄存器时发生异常: %s, 异常信息: %s", ip, e)
+        return error(f"读取Modbus保持寄存器时发生异常: {str(e)}")
 
 
+@robot_lock
 def write_modbus_holding_regs(ip: str, channel: int, slave_id: int, address: int, values: list, master_id: int = 0):
     try:
         if ip not in robot_list:
-            return json.dumps({"status": "error", "message": "请先连接机器人"}, ensure_ascii=False)
+            return error("请先连接机器人")
+        if not values:
+            return error("写入的值不能为空")
         
-        slave = robot_list[ip].modbus.get_slave(ModbusChannel(channel), slave_id, master_id)
-        ret = slave.write_holding_regs(address, values)
+        slave = _get_slave(ip, channel, slave_id, master_id)
+        ret, written = _write_chunked(slave.write_holding_regs, address, values)
         
         if ret == StatusCodeEnum.OK:
-            logger.info(f"写入Modbus保持寄存器成功: {ip}, 通道: {channel}, 从机ID: {slave_id}, 地址: {address}, 值: {values}")
-            return json.dumps({"status": "success", "message": "写入Modbus保持寄存器成功"}, ensure_ascii=False)
+            logger.info("写入Modbus保持寄存器成功: %s, 通道: %s, 从机ID: %s, 地址: %s, 值: %s", ip, channel, slave_id, address, values)
+            return success(message="写入Modbus保持寄存器成功")
         else:
-            logger.error(f"写入Modbus保持寄存器失败: {ip}, 错误代码: {ret}")
-            return json.dumps({"status": "error", "message": "写入Modbus保持寄存器失败"}, ensure_ascii=False)
+            logger.error("写入Modbus保持寄存器失败: %s, 地址: %s, 已写入: %s/%s, 错误代码: %s",
+                         ip, address + written, written, len(values), ret)
+            return _partial_write_error("写入Modbus保持寄存器失败", address, values, written)
             
     except Exception as e:
-        logger.error(f"写入Modbus保持寄存器时发生异常: {ip}, 异常信息: {str(e)}")
-        return json.dumps({"status": "error", "message": f"写入Modbus保持寄存器时发生异常: {str(e)}"}, ensure_ascii=False)
+        invalidate_slave_cache(ip, channel, slave_id, master_id)
+        logger.error("写入Modbus保持寄存器时发生异常: %s, 异常信息: %s", ip, e)
+        return error(f"写入Modbus保持寄存器时发生异常: {str(e)}")
 
 
+@robot_lock
 def read_modbus_discrete_inputs(ip: str, channel: int, slave_id: int, address: int, number: int, master_id: int = 0):
     try:
         if ip not in robot_list:
-            return json.dumps({"status": "error", "message": "请先连接机器人"}, ensure_ascii=False)
-        
-        if number > 120:
-            return json.dumps({"status": "error", "message": "寄存器数量不能超过120个"}, ensure_ascii=False)
+            return error("请先连接机器人")
+        if number <= 0:
+            return error("读取数量必须大于0")
         
-        slave = robot_list[ip].modbus.get_slave(ModbusChannel(channel), slave_id, master_id)
-        values, ret = slave.read_discrete_inputs(address, number)
+        slave = _get_slave(ip, channel, slave_id, master_id)
+        values, ret = _read_chunked(slave.read_discrete_inputs, address, number)
         
         if ret == StatusCodeEnum.OK:
-            logger.info(f"读取Modbus离散寄存器成功: {ip}, 通道: {channel}, 从机ID: {slave_id}, 地址: {address}, 数量: {number}")
-            return json.dumps({"status": "success", "channel": channel, "slave_id": slave_id, "address": address, "values": values}, ensure_ascii=False)
+            logger.info("读取Modbus离散寄存器成功: %s, 通道: %s, 从机ID: %s, 地址: %s, 数量: %s", ip, channel, slave_id, address, number)
+            return success(channel=channel, slave_id=slave_id, address=address, values=values)
         else:
-            logger.error(f"读取Modbus离散寄存器失败: {ip}, 错误代码: {ret}")
-            return json.dumps({"status": "error", "message": "读取Modbus离散寄存器失败"}, ensure_ascii=False)
+            logger.error("读取Modbus离散寄存器失败: %s, 错误代码: %s", ip, ret)
+            return error("读取Modbus离散寄存器失败")
             
     except Exception as e:
-        logger.error(f"读取Modbus离散寄存器时发生异常: {ip}, 异常信息: {str(e)}")
-        return json.dumps({"status": "error", "message": f"读取Modbus离散寄存器时发生异常: {str(e)}"}, ensure_ascii=False)
+        invalidate_slave_cache(ip, channel, slave_id, master_id)
+        logger.error("读取Modbus离散寄存器时发生异常: %s, 异常信息: %s", ip, e)
+        return error(f"读取Modbus离散寄存器时发生异常: {str(e)}")
 
 
+@robot_lock
 def read_modbus_input_regs(ip: str, channel: int, slave_id: int, address: int, number: int, master_id: int = 0):
     try:
         if ip not in robot_list:
-            return json.dumps({"status": "error", "message": "请先连接机器人"}, ensure_ascii=False)
-        
-        if number > 120:
-            return json.dumps({"status": "error", "message": "寄存器数量不能超过120个"}, ensure_ascii=False)
+            return error("请先连接机器人")
+        if number <= 0:
+            return error("读取数量必须大于0")
         
-        slave = robot_list[ip].modbus.get_slave(ModbusChannel(channel), slave_id, master_id)
-        values, ret = slave.read_input_regs(address, number)
+        slave = _get_slave(ip, channel, slave_id, master_id)
+        values, ret = _read_chunked(slave.read_input_regs, address, number)
         
         if ret == StatusCodeEnum.OK:
-            logger.info(f"读取Modbus输入寄存器成功: {ip}, 通道: {channel}, 从机ID: {slave_id}, 地址: {address}, 数量: {number}")
-            return json.dumps({"status": "success", "channel": channel, "slave_id": slave_id, "address": address, "values": values}, ensure_ascii=False)
+            logger.info("读取Modbus输入寄存器成功: %s, 通道: %s, 从机ID: %s, 地址: %s, 数量: %s", ip, channel, slave_id, address, number)
+            return success(channel=channel, slave_id=slave_id, address=address, values=values)
         else:
-            logger.error(f"读取Modbus输入寄存器失败: {ip}, 错误代码: {ret}")
-            return json.dumps({"status": "error", "message": "读取Modbus输入寄存器失败"}, ensure_ascii=False)
+            logger.error("读取Modbus输入寄存器失败: %s, 错误代码: %s", ip, ret)
+            return error("读取Modbus输入寄存器失败")
             
     except Exception as e:
-        logger.error(f"读取Modbus输入寄存器时发生异常: {ip}, 异常信息: {str(e)}")
-        return json.dumps({"status": "error", "message": f"读取Modbus输入寄存器时发生异常: {str(e)}"}, ensure_ascii=False)
+        invalidate_slave_cache(ip, channel, slave_id, master_id)
+        logger.error("读取Modbus输入寄存器时发生异常: %s, 异常信息: %s", ip, e)
+        return error(f"读取Modbus输入寄存器时发生异常: {str(e)}")
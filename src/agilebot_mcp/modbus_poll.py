@@ -0,0 +1,283 @@
+# -*- coding: utf-8 -*-
+import heapq
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from .sdk import StatusCodeEnum
+from .robot_core import robot_list
+from .modbus import _get_slave, _read_chunked, invalidate_slave_cache
+from .responses import encode, success, error
+
+logger = logging.getLogger(__name__)
+
+# 轮询组中的寄存器类型 -> Modbus从机读方法
+POLL_KINDS = {
+    "coils": "read_coils",
+    "holding_regs": "read_holding_regs",
+    "discrete_inputs": "read_discrete_inputs",
+    "input_regs": "read_input_regs",
+}
+MIN_POLL_PERIOD = 0.05
+POLL_WORKERS = 4
+
+
+def merge_ranges(ranges):
+    """把同类型中重叠或相邻的地址段合并为尽量少的请求
+
+    参数:
+        ranges: [(类型, 起始地址, 数量), ...]
+
+    返回:
+        dict: {类型: [(起始地址, 数量), ...]}
+    """
+    merged = {}
+    for kind, address, number in sorted(ranges):
+        spans = merged.setdefault(kind, [])
+        if spans and address <= spans[-1][0] + spans[-1][1]:
+            start, count = spans[-1]
+            spans[-1] = (start, max(count, address + number - start))
+        else:
+            spans.append((address, number))
+    return merged
+
+
+class PollGroup:
+    """一组定期读取的Modbus地址段，只保留每个地址的最新值及其变化序号"""
+
+    def __init__(self, name, ip, channel, slave_id, master_id, ranges, period):
+        self.name = name
+        self.ip = ip
+        self.channel = channel
+        self.slave_id = slave_id
+        self.master_id = master_id
+        self.ranges = ranges
+        self.requests = merge_ranges(ranges)
+        self.period = period
+        self.sequence = 0
+        self.values = {}
+        self.last_poll = None
+        self.last_error = None
+        self.running = False
+        self._lock = threading.Lock()
+
+    def poll(self):
+        results = {}
+        with robot_list.lease(self.ip) as arm:
+            if arm is None:
+                raise RuntimeError("机器人未连接")
+            slave = _get_slave(self.ip, self.channel, self.slave_id, self.master_id)
+            for kind, spans in self.requests.items():
+                read = getattr(slave, POLL_KINDS[kind])
+                for address, number in spans:
+                    values, ret = _read_chunked(read, address, number)
+                    if ret != StatusCodeEnum.OK:
+                        raise RuntimeError(f"读取{kind}失败, 地址: {address}, 错误代码: {ret}")
+                    results[kind, address] = values
+        self._merge(results)
+
+    def _merge(self, results):
+        with self._lock:
+            self.sequence += 1
+            for (kind, address), values in results.items():
+                for offset, value in enumerate(values):
+                    key = (kind, address + offset)
+                    previous = self.values.get(key)
+                    if previous is None or previous[0] != value:
+                        self.values[key] = (value, self.sequence)
+            self.last_poll = time.monotonic()
+            self.last_error = None
+
+    def changes_since(self, cursor):
+        """返回序号大于 cursor 的地址值、新的游标，以及是否为全量重新同步
+
+        cursor 大于当前序号（不是本组发出的游标，例如服务器重启后）时返回全部当前值，而不是静默地什么都不返回。
+        """
+        changes = {}
+        with self._lock:
+            resync = cursor > self.sequence
+            if resync:
+                cursor = 0
+            for (kind, address), (value, sequence) in self.values.items():
+                if sequence > cursor:
+                    changes.setdefault(kind, {})[address] = value
+            return changes, self.sequence, resync
+
+    def describe(self):
+        with self._lock:
+            return {
+                "name": self.name,
+                "ip": self.ip,
+                "channel": self.channel,
+                "slave_id": self.slave_id,
+                "master_id": self.master_id,
+                "period": self.period,
+                "ranges": [{"kind": kind, "address": address, "number": number} for kind, address, number in self.ranges],
+                "requests": sum(len(spans) for spans in self.requests.values()),
+                "cursor": self.sequence,
+                "last_poll_age_ms": None if self.last_poll is None else round((time.monotonic() - self.last_poll) * 1000, 1),
+                "last_error": self.last_error,
+            }
+
+
+class PollScheduler:
+    """后台调度线程：按周期把到期的轮询组交给线程池读取，上一次未完成的组本轮跳过"""
+
+    def __init__(self):
+        self._groups = {}
+        self._queue = []
+        self._cond = threading.Condition()
+        self._thread = None
+        self._pool = None
+        self._stopped = False
+
+    def add(self, group):
+        with self._cond:
+            # 替换同名组时延续序号，持有旧游标的客户端在新组第一次读取后收到全部新值
+            replaced = self._groups.get(group.name)
+            if replaced is not None:
+                with replaced._lock:
+                    group.sequence = replaced.sequence
+            self._groups[group.name] = group
+            heapq.heappush(self._queue, (time.monotonic(), group.name, group))
+            if self._thread is None:
+                self._stopped = False
+                self._pool = ThreadPoolExecutor(max_workers=POLL_WORKERS, thread_name_prefix="modbus-poll")
+                self._thread = threading.Thread(target=self._run, name="modbus-poll-scheduler", daemon=True)
+                self._thread.start()
+            self._cond.notify()
+
+    def remove(self, name):
+        with self._cond:
+            return self._groups.pop(name, None)
+
+    def get(self, name):
+        with self._cond:
+            return self._groups.get(name)
+
+    def groups(self):
+        with self._cond:
+            return list(self._groups.values())
+
+    def stop(self):
+        with self._cond:
+            self._stopped = True
+            self._cond.notify()
+            thread, pool = self._thread, self._pool
+            self._thread = self._pool = None
+        if thread is not None:
+            thread.join(timeout=1)
+            pool.shutdown(wait=False)
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while not self._stopped and (not self._queue or self._queue[0][0] > time.monotonic()):
+                    self._cond.wait(None if not self._queue else self._queue[0][0] - time.monotonic())
+                if self._stopped:
+                    return
+                due, name, group = heapq.heappop(self._queue)
+                # 已被删除或被同名新组替换的条目直接丢弃
+                if self._groups.get(name) is not group:
+                    continue
+                heapq.heappush(self._queue, (max(due + group.period, time.monotonic()), name, group))
+                if group.running:
+                    continue
+                group.running = True
+                pool = self._pool
+            pool.submit(self._poll, group)
+
+    @staticmethod
+    def _poll(group):
+        try:
+            group.poll()
+        except Exception as e:
+            invalidate_slave_cache(group.ip, group.channel, group.slave_id, group.master_id)
+            group.last_error = str(e)
+            logger.warning("Modbus轮询组读取失败: %s, %s, 异常信息: %s", group.name, group.ip, e)
+        finally:
+            group.running = False
+
+
+poll_scheduler = PollScheduler()
+
+
+def define_poll_group(ip: str, name: str, channel: int, slave_id: int, ranges: list, period: float, master_id: int = 0):
+    """定义（或替换）一个Modbus轮询组
+
+    参数:
+        ip: 机器人控制柜IP地址
+        name: 轮询组名称
+        channel: Modbus通道
+        slave_id: 从机ID
+        ranges: 地址段列表，每项为 {"kind": 类型, "address": 起始地址, "number": 数量}，
+                类型为 coils、holding_regs、discrete_inputs、input_regs
+        period: 轮询周期（秒）
+        master_id: 主机ID (默认0)
+
+    返回:
+        str: JSON格式的轮询组信息
+    """
+    try:
+        parsed = []
+        for item in ranges:
+            kind = item.get("kind")
+            if kind not in POLL_KINDS:
+                return error(f"无效的寄存器类型: {kind}，可选: {', '.join(POLL_KINDS)}")
+            address, number = int(item["address"]), int(item["number"])
+            if address < 0 or number <= 0:
+                return error("地址不能为负数，数量必须大于0")
+            parsed.append((kind, address, number))
+        if not parsed:
+            return error("轮询组至少需要一个地址段")
+        if period < MIN_POLL_PERIOD:
+            return error(f"轮询周期不能小于{MIN_POLL_PERIOD}秒")
+
+        group = PollGroup(name, ip, channel, slave_id, master_id, parsed, period)
+        poll_scheduler.add(group)
+        logger.info("定义Modbus轮询组成功: %s, %s, 地址段: %s, 合并后请求数: %s", name, ip, len(parsed), group.describe()['requests'])
+        return success(data=group.describe())
+    except (KeyError, TypeError, ValueError, AttributeError):
+        return error("地址段格式错误，应为 {\"kind\", \"address\", \"number\"} 组成的数组")
+    except Exception as e:
+        logger.error("定义Modbus轮询组时发生异常: %s, 异常信息: %s", name, e)
+        return error(f"定义Modbus轮询组时发生异常: {str(e)}")
+
+
+def remove_poll_group(name: str):
+    if poll_scheduler.remove(name) is None:
+        return error("轮询组不存在")
+    logger.info("删除Modbus轮询组成功: %s", name)
+    return success(message="删除轮询组成功")
+
+
+def list_poll_groups():
+    return success(data=[group.describe() for group in poll_scheduler.groups()])
+
+
+def get_poll_changes(name: str, cursor: int = 0):
+    """获取轮询组自 cursor 以来发生变化的地址值
+
+    参数:
+        name: 轮询组名称
+        cursor: 上次调用返回的游标，0 表示获取全部当前值
+
+    返回:
+        str: JSON格式的结果，changes 为 {类型: {地址: 值}}，cursor 为下次调用使用的游标；
+            cursor 不是本组发出的游标时 resync 为 true，changes 为全部当前值
+    """
+    group = poll_scheduler.get(name)
+    if group is None:
+        return error("轮询组不存在")
+    changes, sequence, resync = group.changes_since(cursor)
+    info = group.describe()
+    return encode({
+        "status": "success",
+        "name": name,
+        "cursor": sequence,
+        "changes": changes,
+        "resync": resync,
+        "last_poll_age_ms": info["last_poll_age_ms"],
+        "last_error": info["last_error"],
+    })
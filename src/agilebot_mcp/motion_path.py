@@ -0,0 +1,276 @@
+# -*- coding: utf-8 -*-
+"""路径点运动任务
+
+一次提交一整条由关节或笛卡尔路径点组成的路径，作为后台任务（见 jobs.py）连续发送给控制器:
+    提交时校验所有路径点（格式、速度/加速度/平滑度范围；本地运动学模型可用时检查笛卡尔路径点是否可达），
+    有任何一个不合格时整条路径都不执行；
+    任务开始时检查一次就绪状态（急停复位、伺服上电），之后逐段发送 move_line，不再每段重复检查。
+每段可以单独指定速度 speed、加速度 accel 和平滑度 blend（0~100）。SDK的 move_line 没有平滑参数，
+blend 在这里决定是否在该路径点停下: 0 表示精确到位，等待机器人到达该路径点后再发送下一段；
+大于0 表示发送后立即发送下一段，由控制器衔接相邻的运动指令。
+到位判断优先使用发送之后刷新过的状态订阅快照，没有时通过RPC查询当前位姿，查询间隔按倍数增大。
+"""
+import functools
+import json
+import logging
+import os
+import time
+
+from .sdk import StatusCodeEnum, PoseType, MotionPose, Posture
+from .robot_core import robot_list, check_robot_ready, mark_robot_ready, invalidate_robot_ready, _motion_params
+from .telemetry import TELEMETRY_MAX_AGE, get_telemetry, wait_for_telemetry
+from .jobs import job_manager, JobCancelled, JobFailed
+from .kinematics import np, get_model, POSTURE_FIELDS
+from .responses import success, error
+
+logger = logging.getLogger(__name__)
+
+# 一条路径最多的路径点数
+PATH_MAX_WAYPOINTS = int(os.environ.get("AGILEBOT_MCP_PATH_MAX_WAYPOINTS", "1000"))
+# 每个精确到位的路径点等待到位的超时时间（秒）
+PATH_ARRIVE_TIMEOUT = float(os.environ.get("AGILEBOT_MCP_PATH_ARRIVE_TIMEOUT", "60"))
+# 到位判断的关节角度（度）和位置（mm）容差
+ARRIVE_JOINT_TOLERANCE = 0.01
+ARRIVE_POSITION_TOLERANCE = 0.1
+WAIT_POLL_INITIAL = 0.02
+WAIT_POLL_MAX = 0.5
+# 校验失败时最多返回的错误数
+MAX_REPORTED_ERRORS = 20
+
+POSE_TYPES = ("joint", "cartesian")
+JOINT_AXES = ("j1", "j2", "j3", "j4", "j5", "j6")
+CART_AXES = ("x", "y", "z", "a", "b", "c")
+STAGES = ("wait_ready", "moving")
+
+
+class Segment:
+    """一段运动：目标路径点及其速度、加速度和平滑度"""
+
+    __slots__ = ("pose_type", "target", "posture", "speed", "accel", "blend")
+
+    def __init__(self, pose_type, target, posture, speed, accel, blend):
+        self.pose_type = pose_type
+        self.target = target
+        self.posture = posture
+        self.speed = speed
+        self.accel = accel
+        self.blend = blend
+
+    def motion_pose(self):
+        pose = MotionPose()
+        if self.pose_type == "joint":
+            pose.pt = PoseType.JOINT
+            pose.joint.j1, pose.joint.j2, pose.joint.j3, pose.joint.j4, pose.joint.j5, pose.joint.j6 = self.target
+            return pose
+        pose.pt = PoseType.CART
+        position = pose.cartData.position
+        position.x, position.y, position.z, position.a, position.b, position.c = self.target
+        if self.posture:
+            posture = Posture()
+            for field in POSTURE_FIELDS:
+                setattr(posture, field, self.posture.get(field, 0))
+            pose.cartData.posture = posture
+        return pose
+
+    def reached(self, current):
+        """current 为 {轴名: 值}，判断是否已到达该路径点"""
+        axes = JOINT_AXES if self.pose_type == "joint" else CART_AXES
+        if any(axis not in current for axis in axes):
+            return False
+        if self.pose_type == "joint":
+            return all(abs(current[axis] - value) <= ARRIVE_JOINT_TOLERANCE for axis, value in zip(axes, self.target))
+        distance = sum((current[axis] - value) ** 2 for axis, value in zip(axes[:3], self.target[:3])) ** 0.5
+        angles = all(abs((current[axis] - value + 180.0) % 360.0 - 180.0) <= ARRIVE_JOINT_TOLERANCE * 10
+                     for axis, value in zip(axes[3:], self.target[3:]))
+        return distance <= ARRIVE_POSITION_TOLERANCE and angles
+
+
+def _number(value, name, low, high, low_open=False):
+    if isinstance(value, bool) or not isinstance(value, (int, float)):
+        raise ValueError(f"{name}应为数字")
+    if value < low or value > high or (low_open and value == low):
+        raise ValueError(f"{name}超出范围: {value}，应为{'(' if low_open else '['}{low}, {high}]")
+    return value
+
+
+def _parse_waypoint(item, pose_type, speed, accel, blend):
+    """把一个路径点解析为 Segment，格式错误时抛出 ValueError"""
+    posture = None
+    if isinstance(item, dict):
+        kinds = [kind for kind in POSE_TYPES if kind in item]
+        if len(kinds) != 1:
+            raise ValueError("路径点应包含 joint 或 cartesian 之一")
+        pose_type, target = kinds[0], item[kinds[0]]
+        posture = item.get("posture")
+        if posture is not None and (pose_type != "cartesian" or not isinstance(posture, dict)):
+            raise ValueError("posture 只能用于笛卡尔路径点，且应为JSON对象")
+        speed, accel, blend = item.get("speed", speed), item.get("accel", accel), item.get("blend", blend)
+    else:
+        target = item
+    if isinstance(target, dict):
+        target = [target.get(axis) for axis in (JOINT_AXES if pose_type == "joint" else CART_AXES)]
+    if not isinstance(target, (list, tuple)) or len(target) != 6:
+        raise ValueError("位置应为长度为6的数组")
+    if not all(isinstance(value, (int, float)) and not isinstance(value, bool) for value in target):
+        raise ValueError("位置的所有元素应为数字")
+    return Segment(pose_type, [float(value) for value in target], posture, _number(speed, "速度", 0, 100, True),
+                   _number(accel, "加速度", 0, 1, True), _number(blend, "平滑度", 0, 100))
+
+
+def _unreachable(ip, segments):
+    """本地运动学模型与控制器一致时检查笛卡尔路径点是否可达，返回 {序号: 原因}；无法检查时返回 None"""
+    cartesian = [index for index, segment in enumerate(segments) if segment.pose_type == "cartesian"]
+    if not cartesian or np is None:
+        return None
+    try:
+        model = get_model(ip)
+    except Exception as e:
+        logger.warning("无法检查路径点是否可达: %s, 原因: %s", ip, e)
+        return None
+    if not model.verified:
+        return None
+    groups = {}
+    for index in cartesian:
+        groups.setdefault(tuple(sorted((segments[index].posture or {}).items())), []).append(index)
+    problems = {}
+    for posture, indexes in groups.items():
+        results = model.inverse([segments[index].target for index in indexes], dict(posture) or None)
+        for index, result in zip(indexes, results):
+            if not result["reachable"]:
+                problems[index] = result["reason"]
+    return problems
+
+
+def _read_position(job, segment, since):
+    """读取当前关节值或笛卡尔位置 {轴名: 值}；快照只在 since 之后刷新过时使用"""
+    field = "joint" if segment.pose_type == "joint" else "cartesian"
+    cached = get_telemetry(job.ip, field, min(TELEMETRY_MAX_AGE, time.monotonic() - since))
+    if cached is not None:
+        value = cached[0]
+        return (value if field == "joint" else value.get("position", {})), False
+    with robot_list.lease(job.ip) as arm:
+        if arm is None:
+            raise JobFailed("机器人已断开")
+        pose, ret = arm.motion.get_current_pose(PoseType.JOINT if field == "joint" else PoseType.CART)
+    if ret != StatusCodeEnum.OK:
+        raise JobFailed(f"查询当前位姿失败, 错误代码: {ret}")
+    if field == "joint":
+        return {axis: getattr(pose.joint, axis) for axis in JOINT_AXES}, True
+    return {axis: getattr(pose.cartData.position, axis) for axis in CART_AXES}, True
+
+
+def _wait_arrival(job, number, segment, timeout, counters):
+    since = time.monotonic()
+    deadline = since + timeout
+    delay = WAIT_POLL_INITIAL
+    while True:
+        job.check_cancelled()
+        current, rpc = _read_position(job, segment, since)
+        counters["checks"] += 1
+        counters["rpc_checks"] += rpc
+        if segment.reached(current):
+            return
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            raise JobFailed(f"第{number}个路径点等待到位超时（{timeout}秒），当前位置: {current}")
+        if wait_for_telemetry(job.ip, min(delay, remaining)) is None:
+            job.sleep(min(delay, remaining))
+        delay = min(delay * 2, WAIT_POLL_MAX)
+
+
+def _run_path(job, segments, arrive_timeout):
+    job.set_stage("wait_ready")
+    with robot_list.lease(job.ip) as arm:
+        if arm is None:
+            raise JobFailed("机器人未连接")
+        ready = json.loads(check_robot_ready(job.ip))
+    if ready["status"] != "success":
+        raise JobFailed(ready["message"])
+
+    total = len(segments)
+    job.set_stage("moving", segments=total, sent=0, reached=0)
+    counters = {"checks": 0, "rpc_checks": 0}
+    started = time.monotonic()
+    try:
+        for index, segment in enumerate(segments):
+            job.check_cancelled()
+            with robot_list.lease(job.ip) as arm:
+                if arm is None:
+                    raise JobFailed("机器人已断开")
+                ret = arm.motion.move_line(segment.motion_pose(), segment.speed, segment.accel)
+            if ret != StatusCodeEnum.OK:
+                invalidate_robot_ready(job.ip)
+                raise JobFailed(f"第{index + 1}段运动指令发送失败, 错误代码: {ret}")
+            job.update(sent=index + 1)
+            if segment.blend == 0:
+                _wait_arrival(job, index + 1, segment, arrive_timeout, counters)
+                job.update(reached=index + 1, **counters)
+    except JobCancelled:
+        raise JobCancelled("任务已取消，停止发送后续路径点；已发送的运动指令不会因此停止")
+    mark_robot_ready(job.ip)
+    logger.info("路径发送完成: %s, 路径点: %s, 耗时: %.3f 秒", job.ip, total, time.monotonic() - started)
+    return {"segments": total, "stops": sum(segment.blend == 0 for segment in segments),
+            "elapsed_s": round(time.monotonic() - started, 3), **counters}
+
+
+def run_path(ip: str, waypoints, pose_type: str = "joint", speed=None, accel=None, blend=0,
+             arrive_timeout: float = None):
+    """校验整条路径后以后台任务方式连续发送
+
+    参数:
+        ip: 机器人控制柜IP地址
+        waypoints: 路径点列表，每个路径点为长度为6的数组（类型由 pose_type 指定），或
+            {"joint": [...]} / {"cartesian": [...], "posture": {...}}，可带 speed、accel、blend
+        pose_type: 数组形式路径点的类型，joint 或 cartesian
+        speed: 默认速度 (0-100]，默认使用机器人清单中的设置
+        accel: 默认加速度 (0-1]，默认使用机器人清单中的设置
+        blend: 默认平滑度 [0-100]，0 表示精确到位
+        arrive_timeout: 每个精确到位的路径点等待到位的超时时间（秒），默认 PATH_ARRIVE_TIMEOUT
+
+    返回:
+        str: JSON格式的任务信息，job_id 用于查询进度和结果；校验失败时返回所有不合格的路径点
+    """
+    if ip not in robot_list:
+        return error("请先连接机器人")
+    if pose_type not in POSE_TYPES:
+        return error(f"无效的路径点类型: {pose_type}，可选: {', '.join(POSE_TYPES)}")
+    if not isinstance(waypoints, list) or not waypoints:
+        return error("路径点应为非空数组")
+    if len(waypoints) > PATH_MAX_WAYPOINTS:
+        return error(f"一条路径最多{PATH_MAX_WAYPOINTS}个路径点")
+    if arrive_timeout is None:
+        arrive_timeout = PATH_ARRIVE_TIMEOUT
+    if arrive_timeout <= 0:
+        return error("超时时间必须大于0")
+    speed, accel = _motion_params(ip, speed, accel)
+
+    segments, problems = [], {}
+    for index, item in enumerate(waypoints):
+        try:
+            segments.append(_parse_waypoint(item, pose_type, speed, accel, blend))
+        except ValueError as e:
+            problems[index] = str(e)
+            segments.append(None)
+    reachability_checked = False
+    if not problems:
+        unreachable = _unreachable(ip, segments)
+        reachability_checked = unreachable is not None
+        problems = unreachable or {}
+    if problems:
+        logger.error("路径点校验失败: %s, 不合格的路径点: %s 个", ip, len(problems))
+        return error(f"路径点校验失败，共 {len(problems)} 个不合格，整条路径未执行",
+                     errors=[{"index": index, "error": message}
+                             for index, message in sorted(problems.items())[:MAX_REPORTED_ERRORS]])
+    try:
+        job = job_manager.submit(
+            "path", ip, functools.partial(_run_path, segments=segments, arrive_timeout=arrive_timeout),
+            params={"waypoints": len(segments), "stops": sum(segment.blend == 0 for segment in segments),
+                    "reachability_checked": reachability_checked, "arrive_timeout": arrive_timeout},
+            stages=STAGES
+        )
+        return success(job_id=job.id, data=job.describe())
+    except RuntimeError as e:
+        return error(str(e))
+    except Exception as e:
+        logger.error("提交路径任务时发生异常: %s, 异常信息: %s", ip, e)
+        return error(f"提交路径任务时发生异常: {str(e)}")
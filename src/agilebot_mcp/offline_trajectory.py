@@ -0,0 +1,190 @@
+# -*- coding: utf-8 -*-
+"""离线轨迹执行
+
+按SDK示例的流程运行控制柜上的离线轨迹文件:
+    set_offline_trajectory_file → prepare_offline_trajectory →
+    等待机器人和伺服都进入空闲状态（ROBOT_IDLE、SERVO_IDLE）→ execute_offline_trajectory →
+    （可选）等待轨迹执行完成
+整个流程作为后台任务运行（见 jobs.py），工具调用立即返回任务ID。
+
+等待阶段不再固定每2秒查询一次：状态订阅快照在等待开始之后刷新过时直接使用快照，
+并在每次快照刷新时重新判断；没有订阅或快照过期时通过RPC查询，
+查询间隔从 WAIT_POLL_INITIAL 开始按倍数增大到 WAIT_POLL_MAX。
+"""
+import functools
+import logging
+import os
+import time
+
+from .sdk import StatusCodeEnum
+from .robot_core import robot_list
+from .telemetry import TELEMETRY_MAX_AGE, get_telemetry, wait_for_telemetry
+from .jobs import job_manager, JobCancelled, JobFailed
+from .responses import success, error
+
+logger = logging.getLogger(__name__)
+
+OFFLINE_READY_TIMEOUT = float(os.environ.get("AGILEBOT_MCP_OFFLINE_READY_TIMEOUT", "60"))
+OFFLINE_RUN_TIMEOUT = float(os.environ.get("AGILEBOT_MCP_OFFLINE_RUN_TIMEOUT", "600"))
+WAIT_POLL_INITIAL = 0.02
+WAIT_POLL_MAX = 0.5
+# 执行后在该时间内没有看到机器人离开空闲状态，视为轨迹已经执行完
+START_GRACE = 1.0
+
+STAGES = ("set_file", "prepare", "wait_ready", "execute", "running")
+
+
+def _status_name(status):
+    """状态枚举的名称，例如 RobotStatusEnum.ROBOT_IDLE -> ROBOT_IDLE"""
+    return str(status).rsplit(".", 1)[-1]
+
+
+def _is_ready(statuses):
+    return statuses["robot_status"] == "ROBOT_IDLE" and statuses["servo_status"] == "SERVO_IDLE"
+
+
+def _is_running(statuses):
+    return statuses["robot_status"] != "ROBOT_IDLE"
+
+
+def _is_idle(statuses):
+    return statuses["robot_status"] == "ROBOT_IDLE"
+
+
+def _call_trajectory(job, method, action, *args):
+    with robot_list.lease(job.ip) as arm:
+        if arm is None:
+            raise JobFailed("机器人未连接")
+        ret = getattr(arm.trajectory, method)(*args)
+    if ret != StatusCodeEnum.OK:
+        raise JobFailed(f"{action}失败, 错误代码: {ret}")
+    logger.info("%s成功: %s", action, job.ip)
+
+
+class _StatusWaiter:
+    """读取机器人/伺服/控制器状态并等待其满足条件，记录快照和RPC查询次数"""
+
+    def __init__(self, job):
+        self.job = job
+        self.checks = 0
+        self.rpc_checks = 0
+        self.statuses = {}
+
+    def read(self, since):
+        """读取状态；快照只在 since 之后刷新过（且未过期）时使用，避免用到准备/执行之前的状态"""
+        statuses = {}
+        max_age = min(TELEMETRY_MAX_AGE, time.monotonic() - since)
+        for field, method in (("robot_status", "get_robot_status"), ("servo_status", "get_servo_status")):
+            cached = get_telemetry(self.job.ip, field, max_age)
+            if cached is not None:
+                statuses[field] = _status_name(cached[0])
+                continue
+            with robot_list.lease(self.job.ip) as arm:
+                if arm is None:
+                    raise JobFailed("机器人已断开")
+                value, ret = getattr(arm, method)()
+            if ret != StatusCodeEnum.OK:
+                raise JobFailed(f"查询{field}失败, 错误代码: {ret}")
+            statuses[field] = _status_name(value)
+            self.rpc_checks += 1
+        ctrl = get_telemetry(self.job.ip, "ctrl_status", max_age)
+        if ctrl is not None:
+            statuses["ctrl_status"] = _status_name(ctrl[0])
+        self.checks += 1
+        self.statuses = statuses
+        return statuses
+
+    def wait(self, predicate, timeout, raise_on_timeout=True):
+        """等待状态满足 predicate，返回是否满足；超时且 raise_on_timeout 时抛出 JobFailed"""
+        since = time.monotonic()
+        deadline = since + timeout
+        delay = WAIT_POLL_INITIAL
+        while True:
+            self.job.check_cancelled()
+            statuses = self.read(since)
+            self.job.update(checks=self.checks, rpc_checks=self.rpc_checks,
+                            waited_s=round(time.monotonic() - since, 3), **statuses)
+            if statuses.get("ctrl_status") == "CTRL_ESTOP":
+                raise JobFailed("控制器处于急停状态")
+            if predicate(statuses):
+                return True
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                if raise_on_timeout:
+                    raise JobFailed(f"等待超时（{timeout}秒），机器人状态: {statuses['robot_status']}, "
+                                    f"伺服状态: {statuses['servo_status']}")
+                return False
+            # 有状态订阅时在快照刷新后立即重新判断，否则按退避间隔等待
+            if wait_for_telemetry(self.job.ip, min(delay, remaining)) is None:
+                self.job.sleep(min(delay, remaining))
+            delay = min(delay * 2, WAIT_POLL_MAX)
+
+
+def _run_offline_trajectory(job, file_name, wait_finish, ready_timeout, run_timeout):
+    waiter = _StatusWaiter(job)
+    job.set_stage("set_file", file_name=file_name)
+    _call_trajectory(job, "set_offline_trajectory_file", "设置离线轨迹文件", file_name)
+    job.check_cancelled()
+
+    job.set_stage("prepare")
+    _call_trajectory(job, "prepare_offline_trajectory", "准备离线轨迹")
+
+    job.set_stage("wait_ready")
+    started = time.monotonic()
+    waiter.wait(_is_ready, ready_timeout)
+    ready_wait = time.monotonic() - started
+    job.check_cancelled()
+
+    job.set_stage("execute")
+    _call_trajectory(job, "execute_offline_trajectory", "执行离线轨迹")
+    result = {"file_name": file_name, "ready_wait_s": round(ready_wait, 3)}
+    if not wait_finish:
+        result.update(checks=waiter.checks, rpc_checks=waiter.rpc_checks)
+        return result
+
+    job.set_stage("running")
+    started = time.monotonic()
+    try:
+        if waiter.wait(_is_running, START_GRACE, raise_on_timeout=False):
+            waiter.wait(_is_idle, run_timeout)
+    except JobCancelled:
+        raise JobCancelled("任务已取消，停止等待；控制柜上已经开始的离线轨迹不会因此停止")
+    result.update(run_s=round(time.monotonic() - started, 3), checks=waiter.checks, rpc_checks=waiter.rpc_checks)
+    return result
+
+
+def run_offline_trajectory(ip: str, file_name: str, wait_finish: bool = True,
+                           ready_timeout: float = OFFLINE_READY_TIMEOUT, run_timeout: float = OFFLINE_RUN_TIMEOUT):
+    """以后台任务方式运行控制柜上的离线轨迹文件
+
+    参数:
+        ip: 机器人控制柜IP地址
+        file_name: 控制柜上的离线轨迹文件名，例如 "test_torque.trajectory"
+        wait_finish: 执行后是否继续等待轨迹执行完成（机器人回到空闲状态）
+        ready_timeout: 准备后等待机器人和伺服进入空闲状态的超时时间（秒）
+        run_timeout: 等待轨迹执行完成的超时时间（秒）
+
+    返回:
+        str: JSON格式的任务信息，job_id 用于查询进度和结果
+    """
+    if ip not in robot_list:
+        return error("请先连接机器人")
+    if not file_name:
+        return error("离线轨迹文件名不能为空")
+    if ready_timeout <= 0 or run_timeout <= 0:
+        return error("超时时间必须大于0")
+    try:
+        job = job_manager.submit(
+            "offline_trajectory", ip,
+            functools.partial(_run_offline_trajectory, file_name=file_name, wait_finish=wait_finish,
+                              ready_timeout=ready_timeout, run_timeout=run_timeout),
+            params={"file_name": file_name, "wait_finish": wait_finish,
+                    "ready_timeout": ready_timeout, "run_timeout": run_timeout},
+            stages=STAGES if wait_finish else STAGES[:-1]
+        )
+        return success(job_id=job.id, data=job.describe())
+    except RuntimeError as e:
+        return error(str(e))
+    except Exception as e:
+        logger.error("提交离线轨迹任务时发生异常: %s, 异常信息: %s", ip, e)
+        return error(f"提交离线轨迹任务时发生异常: {str(e)}")
@@ -1,13 +1,14 @@
 # -*- coding: utf-8 -*-
-import json
 import logging
-from Agilebot.IR.A.arm import Arm
-from Agilebot.IR.A.status_code import StatusCodeEnum
-from .robot_core import robot_list
+
+from .sdk import StatusCodeEnum, Payload
+from .robot_core import robot_list, robot_lock
+from .responses import encode, success, error, PayloadData, IdentifiedPayload
 
 logger = logging.getLogger(__name__)
 
 
+@robot_lock
 def get_current_payload(ip):
     """获取当前激活的负载编号
     
@@ -20,18 +21,19 @@ def get_current_payload(ip):
     try:
         robot = robot_list.get(ip)
         if not robot:
-            return json.dumps({"status": "error", "message": "机器人未连接"}, ensure_ascii=False)
+            return error("机器人未连接")
         
         payload_id, ret = robot.motion.payload.get_current_payload()
         if ret != StatusCodeEnum.OK:
-            return json.dumps({"status": "error", "message": f"获取当前负载失败: {ret.errmsg}"}, ensure_ascii=False)
+            return error(f"获取当前负载失败: {ret.errmsg}")
         
-        return json.dumps({"status": "success", "data": {"payload_id": payload_id}}, ensure_ascii=False)
+        return success(data={"payload_id": payload_id})
     except Exception as e:
-        logger.error(f"获取当前负载时发生异常: {ip}, 异常信息: {str(e)}")
-        return json.dumps({"status": "error", "message": f"获取当前负载时发生异常: {str(e)}"}, ensure_ascii=False)
+        logger.error("获取当前负载时发生异常: %s, 异常信息: %s", ip, e)
+        return error(f"获取当前负载时发生异常: {str(e)}")
 
 
+@robot_lock
 def get_payload_by_id(ip, payload_id):
     """根据指定编号获取负载信息
     
@@ -45,30 +47,21 @@ def get_payload_by_id(ip, payload_id):
     try:
         robot = robot_list.get(ip)
         if not robot:
-            return json.dumps({"status": "error", "message": "机器人未连接"}, ensure_ascii=False)
+            return error("机器人未连接")
         
         payload_info, ret = robot.motion.payload.get_payload_by_id(payload_id)
         if ret != StatusCodeEnum.OK:
-            return json.dumps({"status": "error", "message": f"获取负载信息失败: {ret.errmsg}"}, ensure_ascii=False)
-        
-        payload_data = {
-            "id": payload_info.id,
-            "m_load": payload_info.m_load,
-            "lcx_load": payload_info.lcx_load,
-            "lcy_load": payload_info.lcy_load,
-            "lcz_load": payload_info.lcz_load,
-            "Ixx_load": payload_info.Ixx_load,
-            "Iyy_load": payload_info.Iyy_load,
-            "Izz_load": payload_info.Izz_load,
-            "comment": payload_info.comment.decode('utf-8') if payload_info.comment else ""
-        }
-        
-        return json.dumps({"status": "success", "data": payload_data}, ensure_ascii=False)
+            return error(f"获取负载信息失败: {ret.errmsg}")
+        
+        payload_data = PayloadData.from_sdk(payload_info)
+        
+        return success(data=payload_data)
     except Exception as e:
-        logger.error(f"获取负载信息时发生异常: {ip}, 异常信息: {str(e)}")
-        return json.dumps({"status": "error", "message": f"获取负载信息时发生异常: {str(e)}"}, ensure_ascii=False)
+        logger.error("获取负载信息时发生异常: %s, 异常信息: %s", ip, e)
+        return error(f"获取负载信息时发生异常: {str(e)}")
 
 
+@robot_lock
 def set_current_payload(ip, payload_id):
     """根据指定编号激活负载
     
@@ -82,18 +75,19 @@ def set_current_payload(ip, payload_id):
     try:
         robot = robot_list.get(ip)
         if not robot:
-            return json.dumps({"status": "error", "message": "机器人未连接"}, ensure_ascii=False)
+            return error("机器人未连接")
         
         ret = robot.motion.payload.set_current_payload(payload_id)
         if ret != StatusCodeEnum.OK:
-            return json.dumps({"status": "error", "message": f"激活负载失败: {ret.errmsg}"}, ensure_ascii=False)
+            return error(f"激活负载失败: {ret.errmsg}")
         
-        return json.dumps({"status": "success", "message": f"成功激活负载 {payload_id}"}, ensure_ascii=False)
+        return success(message=f"成功激活负载 {payload_id}")
     except Exception as e:
-        logger.error(f"激活负载时发生异常: {ip}, 异常信息: {str(e)}")
-        return json.dumps({"status": "error", "message": f"激活负载时发生异常: {str(e)}"}, ensure_ascii=False)
+        logger.error("激活负载时发生异常: %s, 异常信息: %s", ip, e)
+        return error(f"激活负载时发生异常: {str(e)}")
 
 
+@robot_lock
 def add_payload(ip, payload_info):
     """向机器人控制柜添加一个用户自定义负载信息
     
@@ -105,11 +99,9 @@ def add_payload(ip, payload_info):
         str: JSON格式的操作结果
     """
     try:
-        from Agilebot.IR.A.flyshot import Payload
-        
         robot = robot_list.get(ip)
         if not robot:
-            return json.dumps({"status": "error", "message": "机器人未连接"}, ensure_ascii=False)
+            return error("机器人未连接")
         
         new_payload = Payload()
         new_payload.id = payload_info.get("id", 0)
@@ -127,14 +119,15 @@ def add_payload(ip, payload_info):
         
         ret = robot.motion.payload.add_payload(new_payload)
         if ret != StatusCodeEnum.OK:
-            return json.dumps({"status": "error", "message": f"添加负载失败: {ret.errmsg}"}, ensure_ascii=False)
+            return error(f"添加负载失败: {ret.errmsg}")
         
-        return json.dumps({"status": "success", "message": f"成功添加负载 {new_payload.id}"}, ensure_ascii=False)
+        return success(message=f"成功添加负载 {new_payload.id}")
     except Exception as e:
-        logger.error(f"添加负载时发生异常: {ip}, 异常信息: {str(e)}")
-        return json.dumps({"status": "error", "message": f"添加负载时发生异常: {str(e)}"}, ensure_ascii=False)
+        logger.error("添加负载时发生异常: %s, 异常信息: %s", ip, e)
+        return error(f"添加负载时发生异常: {str(e)}")
 
 
+@robot_lock
 def delete_payload(ip, payload_id):
     """根据指定编号删除对应的负载信息
     
@@ -148,18 +141,19 @@ def delete_payload(ip, payload_id):
     try:
         robot = robot_list.get(ip)
         if not robot:
-            return json.dumps({"status": "error", "message": "机器人未连接"}, ensure_ascii=False)
+            return error("机器人未连接")
         
         ret = robot.motion.payload.delete_payload(payload_id)
         if ret != StatusCodeEnum.OK:
-            return json.dumps({"status": "error", "message": f"删除负载失败: {ret.errmsg}"}, ensure_ascii=False)
+            return error(f"删除负载失败: {ret.errmsg}")
         
-        return json.dumps({"status": "success", "message": f"成功删除负载 {payload_id}"}, ensure_ascii=False)
+        return success(message=f"成功删除负载 {payload_id}")
     except Exception as e:
-        logger.error(f"删除负载时发生异常: {ip}, 异常信息: {str(e)}")
-        return json.dumps({"status": "error", "message": f"删除负载时发生异常: {str(e)}"}, ensure_ascii=False)
+        logger.error("删除负载时发生异常: %s, 异常信息: %s", ip, e)
+        return error(f"删除负载时发生异常: {str(e)}")
 
 
+@robot_lock
 def update_payload(ip, payload_info):
     """更新一个已存在负载信息
     
@@ -171,19 +165,17 @@ def update_payload(ip, payload_info):
         str: JSON格式的操作结果
     """
     try:
-        from Agilebot.IR.A.flyshot import Payload
-        
         robot = robot_list.get(ip)
         if not robot:
-            return json.dumps({"status": "error", "message": "机器人未连接"}, ensure_ascii=False)
+            return error("机器人未连接")
         
         payload_id = payload_info.get("id")
         if not payload_id:
-            return json.dumps({"status": "error", "message": "负载ID不能为空"}, ensure_ascii=False)
+            return error("负载ID不能为空")
         
         existing_payload, ret = robot.motion.payload.get_payload_by_id(payload_id)
         if ret != StatusCodeEnum.OK:
-            return json.dumps({"status": "error", "message": f"获取负载信息失败: {ret.errmsg}"}, ensure_ascii=False)
+            return error(f"获取负载信息失败: {ret.errmsg}")
         
         if "m_load" in payload_info:
             existing_payload.m_load = payload_info["m_load"]
@@ -204,14 +196,15 @@ def update_payload(ip, payload_info):
         
         ret = robot.motion.payload.update_payload(existing_payload)
         if ret != StatusCodeEnum.OK:
-            return json.dumps({"status": "error", "message": f"更新负载失败: {ret.errmsg}"}, ensure_ascii=False)
+            return error(f"更新负载失败: {ret.errmsg}")
         
-        return json.dumps({"status": "success", "message": f"成功更新负载 {payload_id}"}, ensure_ascii=False)
+        return success(message=f"成功更新负载 {payload_id}")
     except Exception as e:
-        logger.error(f"更新负载时发生异常: {ip}, 异常信息: {str(e)}")
-        return json.dumps({"status": "error", "message": f"更新负载时发生异常: {str(e)}"}, ensure_ascii=False)
+        logger.error("更新负载时发生异常: %s, 异常信息: %s", ip, e)
+        return error(f"更新负载时发生异常: {str(e)}")
 
 
+@robot_lock
 def get_all_payload(ip):
     """获取所有负载信息
     
@@ -224,11 +217,11 @@ def get_all_payload(ip):
     try:
         robot = robot_list.get(ip)
         if not robot:
-            return json.dumps({"status": "error", "message": "机器人未连接"}, ensure_ascii=False)
+            return error("机器人未连接")
         
         payloads, ret = robot.motion.payload.get_all_payload()
         if ret != StatusCodeEnum.OK:
-            return json.dumps({"status": "error", "message": f"获取所有负载失败: {ret.errmsg}"}, ensure_ascii=False)
+            return error(f"获取所有负载失败: {ret.errmsg}")
         
         payload_list = []
         for payload in payloads:
@@ -237,12 +230,13 @@ def get_all_payload(ip):
                 "comment": payload[1].decode('utf-8') if payload[1] else ""
             })
         
-        return json.dumps({"status": "success", "data": {"payloads": payload_list}}, ensure_ascii=False)
+        return success(data={"payloads": payload_list})
     except Exception as e:
-        logger.error(f"获取所有负载时发生异常: {ip}, 异常信息: {str(e)}")
-        return json.dumps({"status": "error", "message": f"获取所有负载时发生异常: {str(e)}"}, ensure_ascii=False)
+        logger.error("获取所有负载时发生异常: %s, 异常信息: %s", ip, e)
+        return error(f"获取所有负载时发生异常: {str(e)}")
 
 
+@robot_lock
 def check_axis_three_horizontal(ip):
     """检测3轴是否水平
     
@@ -255,26 +249,27 @@ def check_axis_three_horizontal(ip):
     try:
         robot = robot_list.get(ip)
         if not robot:
-            return json.dumps({"status": "error", "message": "机器人未连接"}, ensure_ascii=False)
+            return error("机器人未连接")
         
         angle, ret = robot.motion.payload.check_axis_three_horizontal()
         if ret != StatusCodeEnum.OK:
-            return json.dumps({"status": "error", "message": f"检测3轴水平失败: {ret.errmsg}"}, ensure_ascii=False)
+            return error(f"检测3轴水平失败: {ret.errmsg}")
         
         is_horizontal = -1 <= angle <= 1
-        return json.dumps({
+        return encode({
             "status": "success",
             "data": {
                 "angle": angle,
                 "is_horizontal": is_horizontal,
                 "message": "3轴水平" if is_horizontal else "3轴不水平"
             }
-        }, ensure_ascii=False)
+        })
     except Exception as e:
-        logger.error(f"检测3轴水平时发生异常: {ip}, 异常信息: {str(e)}")
-        return json.dumps({"status": "error", "message": f"检测3轴水平时发生异常: {str(e)}"}, ensure_ascii=False)
+        logger.error("检测3轴水平时发生异常: %s, 异常信息: %s", ip, e)
+        return error(f"检测3轴水平时发生异常: {str(e)}")
 
 
+@robot_lock
 def get_payload_identify_state(ip):
     """获取负载测定状态
     
@@ -287,23 +282,24 @@ def get_payload_identify_state(ip):
     try:
         robot = robot_list.get(ip)
         if not robot:
-            return json.dumps({"status": "error", "message": "机器人未连接"}, ensure_ascii=False)
+            return error("机器人未连接")
         
         state, ret = robot.motion.payload.get_payload_identify_state()
         if ret != StatusCodeEnum.OK:
-            return json.dumps({"status": "error", "message": f"获取负载测定状态失败: {ret.errmsg}"}, ensure_ascii=False)
+            return error(f"获取负载测定状态失败: {ret.errmsg}")
         
-        return json.dumps({
+        return encode({
             "status": "success",
             "data": {
                 "state": str(state)
             }
-        }, ensure_ascii=False)
+        })
     except Exception as e:
-        logger.error(f"获取负载测定状态时发生异常: {ip}, 异常信息: {str(e)}")
-        return json.dumps({"status": "error", "message": f"获取负载测定状态时发生异常: {str(e)}"}, ensure_ascii=False)
+        logger.error("获取负载测定状态时发生异常: %s, 异常信息: %s", ip, e)
+        return error(f"获取负载测定状态时发生异常: {str(e)}")
 
 
+@robot_lock
 def start_payload_identify(ip, weight, angle):
     """开始负载测定
     
@@ -318,21 +314,22 @@ def start_payload_identify(ip, weight, angle):
     try:
         robot = robot_list.get(ip)
         if not robot:
-            return json.dumps({"status": "error", "message": "机器人未连接"}, ensure_ascii=False)
+            return error("机器人未连接")
         
         if not (30 <= angle <= 90):
-            return json.dumps({"status": "error", "message": "角度必须在30-90度之间"}, ensure_ascii=False)
+            return error("角度必须在30-90度之间")
         
         ret = robot.motion.payload.start_payload_identify(weight, angle)
         if ret != StatusCodeEnum.OK:
-            return json.dumps({"status": "error", "message": f"开始负载测定失败: {ret.errmsg}"}, ensure_ascii=False)
+            return error(f"开始负载测定失败: {ret.errmsg}")
         
-        return json.dumps({"status": "success", "message": "开始负载测定成功"}, ensure_ascii=False)
+        return success(message="开始负载测定成功")
     except Exception as e:
-        logger.error(f"开始负载测定时发生异常: {ip}, 异常信息: {str(e)}")
-        return json.dumps({"status": "error", "message": f"开始负载测定时发生异常: {str(e)}"}, ensure_ascii=False)
+        logger.error("开始负载测定时发生异常: %s, 异常信息: %s", ip, e)
+        return error(f"开始负载测定时发生异常: {str(e)}")
 
 
+@robot_lock
 def get_payload_identify_result(ip):
     """获取负载测定结果
     
@@ -345,28 +342,21 @@ def get_payload_identify_result(ip):
     try:
         robot = robot_list.get(ip)
         if not robot:
-            return json.dumps({"status": "error", "message": "机器人未连接"}, ensure_ascii=False)
+            return error("机器人未连接")
         
         payload_info, ret = robot.motion.payload.payload_identify_result()
         if ret != StatusCodeEnum.OK:
-            return json.dumps({"status": "error", "message": f"获取负载测定结果失败: {ret.errmsg}"}, ensure_ascii=False)
-        
-        payload_data = {
-            "m_load": payload_info.m_load,
-            "lcx_load": payload_info.lcx_load,
-            "lcy_load": payload_info.lcy_load,
-            "lcz_load": payload_info.lcz_load,
-            "Ixx_load": payload_info.Ixx_load,
-            "Iyy_load": payload_info.Iyy_load,
-            "Izz_load": payload_info.Izz_load
-        }
-        
-        return json.dumps({"status": "success", "data": payload_data}, ensure_ascii=False)
+            return error(f"获取负载测定结果失败: {ret.errmsg}")
+        
+        payload_data = IdentifiedPayload.from_sdk(payload_info)
+        
+        return success(data=payload_data)
     except Exception as e:
-        logger.error(f"获取负载测定结果时发生异常: {ip}, 异常信息: {str(e)}")
-        return json.dumps({"status": "error", "message": f"获取负载测定结果时发生异常: {str(e)}"}, ensure_ascii=False)
+        logger.error("获取负载测定结果时发生异常: %s, 异常信息: %s", ip, e)
+        return error(f"获取负载测定结果时发生异常: {str(e)}")
 
 
+@robot_lock
 def interference_check_for_payload_identify(ip, weight, angle):
     """开始负载测定的干涉检查
     
@@ -381,21 +371,22 @@ def interference_check_for_payload_identify(ip, weight, angle):
     try:
         robot = robot_list.get(ip)
         if not robot:
-            return json.dumps({"status": "error", "message": "机器人未连接"}, ensure_ascii=False)
+            return error("机器人未连接")
         
         if not (30 <= angle <= 90):
-            return json.dumps({"status": "error", "message": "角度必须在30-90度之间"}, ensure_ascii=False)
+            return error("角度必须在30-90度之间")
         
         ret = robot.motion.payload.interference_check_for_payload_identify(weight, angle)
         if ret != StatusCodeEnum.OK:
-            return json.dumps({"status": "error", "message": f"干涉检查失败: {ret.errmsg}"}, ensure_ascii=False)
+            return error(f"干涉检查失败: {ret.errmsg}")
         
-        return json.dumps({"status": "success", "message": "干涉检查成功"}, ensure_ascii=False)
+        return success(message="干涉检查成功")
     except Exception as e:
-        logger.error(f"干涉检查时发生异常: {ip}, 异常信息: {str(e)}")
-        return json.dumps({"status": "error", "message": f"干涉检查时发生异常: {str(e)}"}, ensure_ascii=False)
+        logger.error("干涉检查时发生异常: %s, 异常信息: %s", ip, e)
+        return error(f"干涉检查时发生异常: {str(e)}")
 
 
+@robot_lock
 def payload_identify_start(ip):
     """进入负载测定状态
     
@@ -408,18 +399,19 @@ def payload_identify_start(ip):
     try:
         robot = robot_list.get(ip)
         if not robot:
-            return json.dumps({"status": "error", "message": "机器人未连接"}, ensure_ascii=False)
+            return error("机器人未连接")
         
         ret = robot.motion.payload.payload_identify_start()
         if ret != StatusCodeEnum.OK:
-            return json.dumps({"status": "error", "message": f"进入负载测定状态失败: {ret.errmsg}"}, ensure_ascii=False)
+            return error(f"进入负载测定状态失败: {ret.errmsg}")
         
-        return json.dumps({"status": "success", "message": "成功进入负载测定状态"}, ensure_ascii=False)
+        return success(message="成功进入负载测定状态")
     except Exception as e:
-        logger.error(f"进入负载测定状态时发生异常: {ip}, 异常信息: {str(e)}")
-        return json.dumps({"status": "error", "message": f"进入负载测定状态时发生异常: {str(e)}"}, ensure_ascii=False)
+        logger.error("进入负载测定状态时发生异常: %s, 异常信息: %s", ip, e)
+        return error(f"进入负载测定状态时发生异常: {str(e)}")
 
 
+@robot_lock
 def payload_identify_done(ip):
     """结束负载测定状态
     
@@ -432,18 +424,19 @@ def payload_identify_done(ip):
     try:
         robot = robot_list.get(ip)
         if not robot:
-            return json.dumps({"status": "error", "message": "机器人未连接"}, ensure_ascii=False)
+            return error("机器人未连接")
         
         ret = robot.motion.payload.payload_identify_done()
         if ret != StatusCodeEnum.OK:
-            return json.dumps({"status": "error", "message": f"结束负载测定状态失败: {ret.errmsg}"}, ensure_ascii=False)
+            return error(f"结束负载测定状态失败: {ret.errmsg}")
         
-        return json.dumps({"status": "success", "message": "成功结束负载测定状态"}, ensure_ascii=False)
+        return success(message="成功结束负载测定状态")
     except Exception as e:
-        logger.error(f"结束负载测定状态时发生异常: {ip}, 异常信息: {str(e)}")
-        return json.dumps({"status": "error", "message": f"结束负载测定状态时发生异常: {str(e)}"}, ensure_ascii=False)
+        logger.error("结束负载测定状态时发生异常: %s, 异常信息: %s", ip, e)
+        return error(f"结束负载测定状态时发生异常: {str(e)}")
 
 
+@robot_lock
 def payload_identify(ip, weight, angle):
     """负载测定全流程
     
@@ -458,31 +451,24 @@ def payload_identify(ip, weight, angle):
     try:
         robot = robot_list.get(ip)
         if not robot:
-            return json.dumps({"status": "error", "message": "机器人未连接"}, ensure_ascii=False)
+            return error("机器人未连接")
         
         if not (30 <= angle <= 90):
-            return json.dumps({"status": "error", "message": "角度必须在30-90度之间"}, ensure_ascii=False)
+            return error("角度必须在30-90度之间")
         
         payload_info, ret = robot.motion.payload.payload_identify(weight, angle)
         if ret != StatusCodeEnum.OK:
-            return json.dumps({"status": "error", "message": f"负载测定失败: {ret.errmsg}"}, ensure_ascii=False)
-        
-        payload_data = {
-            "m_load": payload_info.m_load,
-            "lcx_load": payload_info.lcx_load,
-            "lcy_load": payload_info.lcy_load,
-            "lcz_load": payload_info.lcz_load,
-            "Ixx_load": payload_info.Ixx_load,
-            "Iyy_load": payload_info.Iyy_load,
-            "Izz_load": payload_info.Izz_load
-        }
-        
-        return json.dumps({"status": "success", "data": payload_data, "message": "负载测定成功"}, ensure_ascii=False)
+            return error(f"负载测定失败: {ret.errmsg}")
+        
+        payload_data = IdentifiedPayload.from_sdk(payload_info)
+        
+        return success(data=payload_data, message="负载测定成功")
     except Exception as e:
-        logger.error(f"负载测定时发生异常: {ip}, 异常信息: {str(e)}")
-        return json.dumps({"status": "error", "message": f"负载测定时发生异常: {str(e)}"}, ensure_ascii=False)
+        logger.error("负载测定时发生异常: %s, 异常信息: %s", ip, e)
+        return error(f"负载测定时发生异常: {str(e)}")
 
 
+@robot_lock
 def update_payload_from_identify(ip, payload_id, identify_result):
     """将负载测定结果更新到指定负载
     
@@ -496,7 +482,7 @@ def update_payload_from_identify(ip, payload_id, identify_result):
     """
     try:
         if identify_result.get("status") != "success":
-            return json.dumps({"status": "error", "message": "负载测定结果无效"}, ensure_ascii=False)
+            return error("负载测定结果无效")
         
         payload_data = identify_result.get("data", {})
         payload_data["id"] = payload_id
@@ -506,5 +492,5 @@ def update_payload_from_identify(ip, payload_id, identify_result):
         
         return update_payload(ip, payload_data)
     except Exception as e:
-        logger.error(f"从测定结果更新负载时发生异常: {ip}, 异常信息: {str(e)}")
-        return json.dumps({"status": "error", "message": f"从测定结果更新负载时发生异常: {str(e)}"}, ensure_ascii=False)
+        logger.error("从测定结果更新负载时发生异常: %s, 异常信息: %s", ip, e)
+        return error(f"从测定结果更新负载时发生异常: {str(e)}")
@@ -0,0 +1,381 @@
+# -*- coding: utf-8 -*-
+"""批量位姿转换与按机器人的转换结果缓存
+
+convert_poses 一次请求转换一组位姿:
+    cart_to_joint: 工具坐标系 tf 在用户坐标系 uf 中的笛卡尔位姿 -> 关节值（逆解）
+    joint_to_cart: 关节值 -> 工具坐标系 tf 在用户坐标系 uf 中的笛卡尔位姿和姿态（正解）
+本地运动学模型与控制器一致（kinematics.py 中 verified 为 true）时整批在本地计算；用户/工具坐标系第一次
+使用时读取其位姿，并用一组关节值与控制器的 convert_joint_to_cart 对比，一致才在本地计算。模型未通过对比、
+坐标系与控制器不一致或未安装numpy时，逐个调用控制器的 convert_cart_to_joint / convert_joint_to_cart。
+
+转换结果按机器人保存在 LRU 缓存中（每台最多 POSE_CACHE_SIZE 条），键为
+（方向, 用户坐标系, 工具坐标系, 姿态/参考关节值/关节限位, 按 POSE_QUANTUM 量化的位姿），
+对同一组工件点反复规划时直接从内存返回。控制器转换失败的结果不缓存。以下情况清除缓存:
+    机器人断开或重连: 该机器人的全部缓存
+    通过本服务器修改或删除坐标系: 用到该坐标系的缓存
+    DH参数变化（运动学模型被重新建立）: 该机器人的全部缓存
+    调用时指定 refresh（例如在示教器上修改了坐标系之后）: 该机器人的全部缓存
+"""
+import logging
+import os
+import threading
+from collections import OrderedDict
+
+from .sdk import StatusCodeEnum, PoseType, MotionPose, CoordinateSystemType
+from .robot_core import robot_list
+from .coordinate_system import on_frame_changed
+from .responses import Joint, Cartesian, Posture, encode, error
+from .kinematics import (np, KinematicsError, POSTURE_FIELDS, VERIFY_JOINTS, VERIFY_POSITION_TOLERANCE,
+                         VERIFY_ANGLE_TOLERANCE, MAX_POSES, get_model, pose_matrices, matrix_poses, _rotation_error)
+
+logger = logging.getLogger(__name__)
+
+# 每台机器人缓存的转换结果数
+POSE_CACHE_SIZE = int(os.environ.get("AGILEBOT_MCP_POSE_CACHE_SIZE", "4096"))
+# 缓存键的量化步长（mm / 度），差别小于步长的位姿视为同一个位姿
+POSE_QUANTUM = float(os.environ.get("AGILEBOT_MCP_POSE_QUANTUM", "0.001"))
+DIRECTIONS = ("cart_to_joint", "joint_to_cart")
+CART_FIELDS = ("x", "y", "z", "a", "b", "c")
+JOINT_FIELDS = ("j1", "j2", "j3", "j4", "j5", "j6")
+# 对比用户/工具坐标系时使用的关节值
+FRAME_VERIFY_JOINTS = VERIFY_JOINTS[1]
+
+
+class RobotCache:
+    """单台机器人的转换结果和已读取的坐标系"""
+
+    def __init__(self):
+        # 缓存键 -> 单个位姿的转换结果，按最近使用排序
+        self.entries = OrderedDict()
+        # (用户坐标系, 工具坐标系) -> (用户坐标系矩阵, 工具坐标系矩阵)，与控制器不一致时为 None
+        self.frames = {}
+        # 计算缓存结果时使用的运动学模型，模型变化（DH参数变化）时清空
+        self.model = None
+        self.hits = 0
+        self.misses = 0
+
+
+class ConversionCache:
+    """按机器人划分的 LRU 缓存，缓存键的第2、3个元素为用户坐标系和工具坐标系"""
+
+    def __init__(self, size=POSE_CACHE_SIZE):
+        self.size = size
+        self._robots = {}
+        self._lock = threading.Lock()
+
+    def _robot(self, ip):
+        cache = self._robots.get(ip)
+        if cache is None:
+            cache = self._robots[ip] = RobotCache()
+        return cache
+
+    def bind_model(self, ip, model):
+        """记录计算使用的模型，与之前的不是同一个模型时清空该机器人的缓存"""
+        with self._lock:
+            cache = self._robot(ip)
+            if cache.model is not model:
+                if cache.model is not None:
+                    logger.info("运动学模型已变化，清除位姿转换缓存: %s", ip)
+                cache.entries.clear()
+                cache.frames.clear()
+                cache.model = model
+
+    def lookup(self, ip, keys):
+        """返回与 keys 对应的缓存结果列表，未命中的位置为 None"""
+        with self._lock:
+            cache = self._robot(ip)
+            results = []
+            for key in keys:
+                value = cache.entries.get(key)
+                if value is not None:
+                    cache.entries.move_to_end(key)
+                results.append(value)
+            hits = sum(value is not None for value in results)
+            cache.hits += hits
+            cache.misses += len(keys) - hits
+            return results
+
+    def store(self, ip, items):
+        with self._lock:
+            entries = self._robot(ip).entries
+            for key, value in items:
+                entries[key] = value
+                entries.move_to_end(key)
+            while len(entries) > self.size:
+                entries.popitem(last=False)
+
+    def get_frames(self, ip, frames):
+        with self._lock:
+            return self._robot(ip).frames.get(frames, False)
+
+    def set_frames(self, ip, frames, matrices):
+        with self._lock:
+            self._robot(ip).frames[frames] = matrices
+
+    def invalidate(self, ip, user_frame=None, tool_frame=None):
+        """清除缓存；只指定坐标系时只清除用到该坐标系的结果"""
+        with self._lock:
+            if user_frame is None and tool_frame is None:
+                self._robots.pop(ip, None)
+                return
+            cache = self._robots.get(ip)
+            if cache is None:
+                return
+            for key in [key for key in cache.entries if key[1] == user_frame or key[2] == tool_frame]:
+                del cache.entries[key]
+            for frames in [frames for frames in cache.frames if frames[0] == user_frame or frames[1] == tool_frame]:
+                del cache.frames[frames]
+
+    def describe(self, ip):
+        with self._lock:
+            cache = self._robots.get(ip)
+            if cache is None:
+                return {"size": 0, "hits": 0, "misses": 0}
+            return {"size": len(cache.entries), "hits": cache.hits, "misses": cache.misses}
+
+
+conversion_cache = ConversionCache()
+robot_list.on_remove(conversion_cache.invalidate)
+robot_list.on_reconnect(conversion_cache.invalidate)
+
+
+def invalidate_frame(ip, sys_type, coordinate_id):
+    """坐标系被修改或删除后清除相关的转换结果，sys_type 0 为用户坐标系，1 为工具坐标系
+
+    注册为 coordinate_system 的坐标系变更回调，coordinate_system 不需要导入本模块。
+    """
+    if sys_type == 0:
+        conversion_cache.invalidate(ip, user_frame=coordinate_id)
+    else:
+        conversion_cache.invalidate(ip, tool_frame=coordinate_id)
+
+
+on_frame_changed(invalidate_frame)
+
+
+def _rows(values, fields):
+    """[v1..v6]、[[v1..v6], ...] 或 [{字段: 值}, ...] -> 每个位姿6个浮点数的列表"""
+    if isinstance(values, dict) or (values and not isinstance(values[0], (list, tuple, dict))):
+        values = [values]
+    rows = []
+    for item in values:
+        row = [item[field] for field in fields] if isinstance(item, dict) else list(item)
+        if len(row) != 6:
+            raise ValueError(f"每个位姿应有6个值: {item}")
+        rows.append([float(value) for value in row])
+    return rows
+
+
+def _quantize(row):
+    return tuple(round(value / POSE_QUANTUM) for value in row)
+
+
+def _read_frame(arm, coord_type, coordinate_id):
+    """坐标系的位姿矩阵 (1, 4, 4)，0号为单位矩阵"""
+    if not coordinate_id:
+        return np.eye(4)[None]
+    frame, ret = arm.coordinate_system.get(coord_type, coordinate_id)
+    if ret != StatusCodeEnum.OK:
+        kind = "用户" if coord_type == CoordinateSystemType.UserFrame else "工具"
+        raise KinematicsError(f"读取{kind}坐标系 {coordinate_id} 失败, 错误代码: {ret}")
+    position, orientation = frame.position, frame.orientation
+    return pose_matrices([position.x, position.y, position.z, orientation.r, orientation.p, orientation.y])
+
+
+def _local_frames(ip, arm, model, user_frame, tool_frame):
+    """本地计算使用的 (用户坐标系矩阵, 工具坐标系矩阵)，不能在本地计算时返回 None"""
+    if model is None or not model.verified:
+        return None
+    frames = conversion_cache.get_frames(ip, (user_frame, tool_frame))
+    if frames is not False:
+        return frames
+    user = _read_frame(arm, CoordinateSystemType.UserFrame, user_frame)
+    tool = _read_frame(arm, CoordinateSystemType.ToolFrame, tool_frame)
+    frames = (user, tool)
+    if user_frame or tool_frame:
+        # SDK没有说明坐标系 r、p、y 的旋转顺序，按 a、b、c 的顺序计算后与控制器对比一次
+        expected, ret = _controller_forward(arm, FRAME_VERIFY_JOINTS, user_frame, tool_frame)
+        if ret != StatusCodeEnum.OK:
+            raise KinematicsError(f"控制器正解失败, 错误代码: {ret}")
+        local = np.linalg.inv(user) @ model.frames([FRAME_VERIFY_JOINTS])[:, 6] @ tool
+        target = pose_matrices([getattr(expected.cartData.position, field) for field in CART_FIELDS])
+        position_error = float(np.linalg.norm(target[0, :3, 3] - local[0, :3, 3]))
+        angle_error = float(np.degrees(np.linalg.norm(_rotation_error(target[:, :3, :3], local[:, :3, :3]))))
+        if position_error > VERIFY_POSITION_TOLERANCE or angle_error > VERIFY_ANGLE_TOLERANCE:
+            logger.warning("坐标系与控制器不一致，改用控制器转换: %s, UF%s/TF%s, 误差: %.4f mm, %.4f 度",
+                           ip, user_frame, tool_frame, position_error, angle_error)
+            frames = None
+    conversion_cache.set_frames(ip, (user_frame, tool_frame), frames)
+    return frames
+
+
+def _controller_forward(arm, joint, user_frame, tool_frame):
+    pose = MotionPose()
+    pose.pt = PoseType.JOINT
+    pose.joint.j1, pose.joint.j2, pose.joint.j3, pose.joint.j4, pose.joint.j5, pose.joint.j6 = joint
+    return arm.motion.convert_joint_to_cart(pose, uf_index=user_frame, tf_index=tool_frame)
+
+
+def _controller_inverse(arm, row, posture, user_frame, tool_frame):
+    pose = MotionPose()
+    pose.pt = PoseType.CART
+    position = pose.cartData.position
+    position.x, position.y, position.z, position.a, position.b, position.c = row
+    for field in POSTURE_FIELDS:
+        setattr(pose.cartData.posture, field, int((posture or {}).get(field) or 0))
+    return arm.motion.convert_cart_to_joint(pose, uf_index=user_frame, tf_index=tool_frame)
+
+
+def _convert_local(model, frames, direction, rows, posture, reference, joint_limits):
+    user, tool = frames
+    if direction == "joint_to_cart":
+        links = model.frames(rows)
+        poses = matrix_poses(np.linalg.inv(user) @ links[:, 6] @ tool)
+        # 加 0.0 把 -0.0 变为 0.0
+        poses = (np.round(poses, 4) + 0.0).tolist()
+        return [{"cartesian": Cartesian(*pose), "posture": Posture(*item)}
+                for pose, item in zip(poses, model.postures(rows, links).tolist())]
+    targets = user @ pose_matrices(rows) @ np.linalg.inv(tool)
+    return model.inverse(matrix_poses(targets), posture, reference, joint_limits)
+
+
+def _convert_controller(arm, direction, rows, posture, user_frame, tool_frame):
+    """逐个调用控制器转换，返回 (结果, 是否可以缓存)"""
+    results = []
+    for row in rows:
+        if direction == "joint_to_cart":
+            cart, ret = _controller_forward(arm, row, user_frame, tool_frame)
+            if ret != StatusCodeEnum.OK:
+                results.append(({"error": f"控制器正解失败, 错误代码: {ret}"}, False))
+                continue
+            results.append(({"cartesian": Cartesian.from_sdk(cart.cartData.position),
+                             "posture": Posture.from_sdk(cart.cartData.posture)}, True))
+            continue
+        joint, ret = _controller_inverse(arm, row, posture, user_frame, tool_frame)
+        if ret != StatusCodeEnum.OK:
+            results.append(({"reachable": False, "reason": f"控制器求逆解失败, 错误代码: {ret}"}, False))
+            continue
+        results.append(({"reachable": True, "joint": Joint.from_sdk(joint.joint),
+                         "posture": Posture(*(int((posture or {}).get(field) or 0) for field in POSTURE_FIELDS))},
+                        True))
+    return results
+
+
+def _posture_arg(posture):
+    """校验姿态参数，返回 {字段: 整数} 或 None；用作缓存键的一部分，所以必须在构造键之前校验"""
+    if posture is None:
+        return None
+    if not isinstance(posture, dict):
+        raise ValueError("posture 应为JSON对象，例如 {\"arm_up_down\": 0, \"wrist_flip\": 0}")
+    unknown = [field for field in posture if field not in POSTURE_FIELDS]
+    if unknown:
+        raise ValueError(f"未知的姿态字段: {', '.join(map(str, unknown))}，可选: {', '.join(POSTURE_FIELDS)}")
+    if any(isinstance(value, bool) or not isinstance(value, int) for value in posture.values()):
+        raise ValueError("姿态字段的值应为整数")
+    return posture
+
+
+def _limits_arg(joint_limits):
+    """校验关节限位参数，返回 6 个 [下限, 上限] 或 None"""
+    if joint_limits is None:
+        return None
+    if not isinstance(joint_limits, (list, tuple)) or len(joint_limits) != 6 or any(
+            not isinstance(pair, (list, tuple)) or len(pair) != 2 for pair in joint_limits):
+        raise ValueError("joint_limits 应为 6 个 [下限, 上限] 组成的数组")
+    limits = [[float(low), float(high)] for low, high in joint_limits]
+    if any(low > high for low, high in limits):
+        raise ValueError("关节限位的下限不能大于上限")
+    return limits
+
+
+def convert_poses(ip: str, poses, direction: str = "cart_to_joint", posture=None, uf: int = 0, tf: int = 0,
+                  reference=None, joint_limits=None, refresh: bool = False):
+    """批量转换位姿，结果按机器人缓存
+
+    参数:
+        ip: 机器人控制柜IP地址
+        poses: cart_to_joint 时为笛卡尔位姿 [x, y, z, a, b, c]，joint_to_cart 时为关节值 [j1..j6]，一个或多个
+        direction: cart_to_joint（逆解）或 joint_to_cart（正解）
+        posture: cart_to_joint 时要求的姿态，例如 {"arm_up_down": 0, "wrist_flip": 0}
+        uf: 用户坐标系编号，0 为基坐标系
+        tf: 工具坐标系编号，0 为法兰
+        reference: cart_to_joint 时的参考关节值，有多个解时返回离它最近的（只在本地计算时使用）
+        joint_limits: cart_to_joint 时每个轴的 [下限, 上限]（度，只在本地计算时使用）
+        refresh: 转换前清除该机器人的缓存（例如在示教器上修改了坐标系之后）
+
+    返回:
+        str: JSON格式的结果，results 与 poses 一一对应
+    """
+    if direction not in DIRECTIONS:
+        return error(f"无效的转换方向: {direction}，可选: {', '.join(DIRECTIONS)}")
+    try:
+        rows = _rows(poses, JOINT_FIELDS if direction == "joint_to_cart" else CART_FIELDS)
+        if reference is not None:
+            reference = _rows(reference, JOINT_FIELDS)[0]
+        posture = _posture_arg(posture)
+        joint_limits = _limits_arg(joint_limits)
+        uf, tf = int(uf or 0), int(tf or 0)
+    except (KeyError, TypeError, ValueError, IndexError) as e:
+        return error(f"参数格式错误: {str(e)}")
+    if len(rows) > MAX_POSES:
+        return error(f"一次最多转换{MAX_POSES}个位姿")
+    if ip not in robot_list:
+        return error("请先连接机器人")
+    if refresh:
+        conversion_cache.invalidate(ip)
+
+    model = None
+    if np is not None:
+        try:
+            model = get_model(ip)
+        except Exception as e:
+            logger.warning("无法使用本地运动学，改用控制器转换: %s, 原因: %s", ip, e)
+    conversion_cache.bind_model(ip, model)
+
+    if direction == "cart_to_joint":
+        context = (tuple(sorted((posture or {}).items())), None if reference is None else _quantize(reference),
+                   None if joint_limits is None else tuple(map(tuple, joint_limits)))
+    else:
+        context = None
+    keys = [(direction, uf, tf, context, _quantize(row)) for row in rows]
+    results = conversion_cache.lookup(ip, keys)
+    missing = [index for index, result in enumerate(results) if result is None]
+    method = "cache"
+    if missing:
+        try:
+            with robot_list.lease(ip) as arm:
+                if arm is None:
+                    return error("请先连接机器人")
+                frames = _local_frames(ip, arm, model, uf, tf)
+                if frames is None:
+                    method = "controller"
+                    computed = _convert_controller(arm, direction, [rows[index] for index in missing], posture, uf, tf)
+            if frames is not None:
+                method = "local"
+                computed = [(result, True) for result in _convert_local(
+                    model, frames, direction, [rows[index] for index in missing], posture, reference, joint_limits)]
+        except KinematicsError as e:
+            return error(str(e))
+        except (TypeError, ValueError) as e:
+            return error(f"参数错误: {str(e)}")
+        except Exception as e:
+            logger.error("批量转换位姿时发生异常: %s, 异常信息: %s", ip, e)
+            return error(f"批量转换位姿时发生异常: {str(e)}")
+        for index, (result, _) in zip(missing, computed):
+            results[index] = result
+        conversion_cache.store(ip, [(keys[index], result) for index, (result, cacheable) in zip(missing, computed)
+                                    if cacheable])
+        logger.info("批量转换位姿: %s, 方向: %s, 数量: %s, 缓存命中: %s, 计算方式: %s",
+                    ip, direction, len(rows), len(rows) - len(missing), method)
+
+    response = {
+        "status": "success",
+        "direction": direction,
+        "method": method,
+        "cached": len(rows) - len(missing),
+        "cache": conversion_cache.describe(ip),
+        "results": results,
+    }
+    if direction == "cart_to_joint":
+        response["reachable"] = sum(result["reachable"] for result in results)
+    return encode(response)
@@ -0,0 +1,378 @@
+# -*- coding: utf-8 -*-
+"""服务器端轨迹录制
+
+按设定频率采集机器人的关节位置、笛卡尔位置和伺服/控制器状态，写入预分配的环形缓冲区。
+缓冲区容量固定，长时间录制只保留最近的 capacity 个采样点；读取时在缓冲区上按时间窗口二分查找，
+只复制抽取后的采样点，不复制整个缓冲区。
+
+状态订阅快照足够新时直接使用快照，否则通过RPC读取位姿；伺服/控制器状态每 STATUS_PERIOD 秒读取一次。
+RPC读取不等待机器人锁：运动等调用正持有锁时跳过该节拍，并把没有采样的时间段记录为间隙（gaps）。
+需要安装 numpy（pip install "agilebot-mcp[analysis]"）。
+"""
+import logging
+import math
+import os
+import threading
+import time
+from collections import deque
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+from .sdk import StatusCodeEnum, PoseType
+from .robot_core import robot_list
+from .telemetry import get_telemetry, JOINT_AXES, CART_AXES
+from .responses import encode, success, error
+
+logger = logging.getLogger(__name__)
+
+RECORDER_MAX_RATE = float(os.environ.get("AGILEBOT_MCP_RECORDER_MAX_RATE", "250"))
+RECORDER_MAX_SAMPLES = int(os.environ.get("AGILEBOT_MCP_RECORDER_MAX_SAMPLES", "1000000"))
+DEFAULT_CAPACITY = 60000
+DEFAULT_FETCH_SAMPLES = 1000
+STATUS_PERIOD = 0.5
+STATUS_UNKNOWN = "UNKNOWN"
+# 最多保留的间隙记录数，更早的间隙丢弃
+MAX_GAPS = 1000
+
+
+class _RobotDisconnected(Exception):
+    pass
+
+
+class PoseRingBuffer:
+    """预分配的定长采样缓冲区，按列存储（时间戳、6个关节、6个笛卡尔分量、伺服/控制器状态码），
+    写满后覆盖最旧的采样点"""
+
+    def __init__(self, capacity):
+        self.capacity = capacity
+        self.t = np.zeros(capacity, dtype=np.float64)
+        self.joint = np.zeros((capacity, len(JOINT_AXES)), dtype=np.float64)
+        self.cart = np.zeros((capacity, len(CART_AXES)), dtype=np.float64)
+        self.status = np.zeros((capacity, 2), dtype=np.int16)
+        self.written = 0
+        self._lock = threading.Lock()
+
+    @property
+    def nbytes(self):
+        return self.t.nbytes + self.joint.nbytes + self.cart.nbytes + self.status.nbytes
+
+    def __len__(self):
+        return min(self.written, self.capacity)
+
+    def append(self, t, joint, cart, servo, ctrl):
+        with self._lock:
+            index = self.written % self.capacity
+            self.t[index] = t
+            self.joint[index] = joint
+            self.cart[index] = cart
+            self.status[index] = (servo, ctrl)
+            self.written += 1
+
+    def _oldest(self):
+        return self.written % self.capacity if self.written > self.capacity else 0
+
+    def _position(self, value, side):
+        """时间戳 value 在按时间先后排列的采样点中的插入位置；缓冲区回绕时分两段二分查找"""
+        count = len(self)
+        oldest = self._oldest()
+        if oldest == 0:
+            return int(np.searchsorted(self.t[:count], value, side))
+        older = self.t[oldest:]
+        position = int(np.searchsorted(older, value, side))
+        if position < older.size:
+            return position
+        return older.size + int(np.searchsorted(self.t[:oldest], value, side))
+
+    def select(self, start=None, end=None, max_samples=DEFAULT_FETCH_SAMPLES):
+        """按时间窗口 [start, end] 选取采样点，超过 max_samples 时等间隔抽取
+
+        返回:
+            tuple: (时间戳, 关节, 笛卡尔, 状态码, 窗口内的采样点数, 抽取间隔)，数组为选中采样点的副本
+        """
+        with self._lock:
+            count = len(self)
+            lo = 0 if start is None else self._position(start, "left")
+            hi = count if end is None else self._position(end, "right")
+            in_window = max(hi - lo, 0)
+            step = max(1, math.ceil(in_window / max_samples)) if max_samples > 0 else 1
+            indices = (np.arange(lo, max(hi, lo), step) + self._oldest()) % self.capacity
+            return (self.t[indices], self.joint[indices], self.cart[indices], self.status[indices],
+                    in_window, step)
+
+
+class Recorder:
+    """单台机器人的录制线程和采样缓冲区"""
+
+    def __init__(self, ip, rate, capacity):
+        self.ip = ip
+        self.rate = rate
+        self.period = 1.0 / rate
+        self.buffer = PoseRingBuffer(capacity)
+        self.status_names = [STATUS_UNKNOWN]
+        self._status_codes = {STATUS_UNKNOWN: 0}
+        self.state = "recording"
+        self.started_at = time.time()
+        self.stopped_at = None
+        self.missed = 0
+        self.rpc_samples = 0
+        self.cache_samples = 0
+        self.errors = 0
+        self.last_error = None
+        self.busy_ticks = 0
+        # (开始, 结束) 相对录制开始的秒数；进行中的间隙开始时间记在 _gap_start
+        self.gaps = deque(maxlen=MAX_GAPS)
+        self._gap_start = None
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name=f"recorder-{ip}", daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self, state="stopped", wait=True):
+        if self.state == "recording":
+            self.state = state
+            self.stopped_at = time.time()
+        self._stop.set()
+        if wait and self._thread.is_alive() and self._thread is not threading.current_thread():
+            self._thread.join(timeout=max(1.0, 2 * self.period))
+
+    def _status_code(self, status):
+        code = self._status_codes.get(status)
+        if code is None:
+            code = self._status_codes[status] = len(self.status_names)
+            self.status_names.append(status)
+        return code
+
+    def _try_lease(self):
+        """不等待地获取机器人锁，机器人正忙时返回 False；已断开时抛出 _RobotDisconnected"""
+        lock = robot_list.lock_for(self.ip)
+        if not lock.acquire(blocking=False):
+            return False
+        if self.ip not in robot_list:
+            lock.release()
+            raise _RobotDisconnected()
+        return True
+
+    def _read_pose(self):
+        """返回 (关节, 笛卡尔)；没有新的快照且机器人正忙时返回 None"""
+        joint = get_telemetry(self.ip, "joint", self.period)
+        cart = get_telemetry(self.ip, "cartesian", self.period)
+        if joint is not None and cart is not None:
+            self.cache_samples += 1
+            return ([joint[0][axis] for axis in JOINT_AXES],
+                    [cart[0]["position"][axis] for axis in CART_AXES])
+        if not self._try_lease():
+            return None
+        try:
+            arm = robot_list[self.ip]
+            joint_pose, ret = arm.motion.get_current_pose(PoseType.JOINT)
+            if ret != StatusCodeEnum.OK:
+                raise RuntimeError(f"获取关节位置失败, 错误代码: {ret}")
+            cart_pose, ret = arm.motion.get_current_pose(PoseType.CART)
+            if ret != StatusCodeEnum.OK:
+                raise RuntimeError(f"获取笛卡尔位置失败, 错误代码: {ret}")
+        finally:
+            robot_list.release(self.ip)
+        self.rpc_samples += 1
+        position = cart_pose.cartData.position
+        return ([getattr(joint_pose.joint, axis) for axis in JOINT_AXES],
+                [getattr(position, axis) for axis in CART_AXES])
+
+    def _read_status(self):
+        """返回 [伺服状态码, 控制器状态码]；需要RPC读取但机器人正忙时返回 None"""
+        statuses = []
+        for field, method in (("servo_status", "get_servo_status"), ("ctrl_status", "get_ctrl_status")):
+            cached = get_telemetry(self.ip, field, STATUS_PERIOD)
+            if cached is not None:
+                statuses.append(self._status_code(cached[0]))
+                continue
+            if not self._try_lease():
+                return None
+            try:
+                status, ret = getattr(robot_list[self.ip], method)()
+            finally:
+                robot_list.release(self.ip)
+            statuses.append(self._status_code(str(status) if ret == StatusCodeEnum.OK else STATUS_UNKNOWN))
+        return statuses
+
+    def _run(self):
+        start = time.monotonic()
+        next_tick = start
+        status_due = start
+        status = (0, 0)
+        while not self._stop.is_set():
+            delay = next_tick - time.monotonic()
+            if delay > 0 and self._stop.wait(delay):
+                break
+            sampled_at = time.monotonic()
+            try:
+                pose = self._read_pose()
+                if pose is None:
+                    self.busy_ticks += 1
+                    if self._gap_start is None:
+                        self._gap_start = sampled_at - start
+                else:
+                    if sampled_at >= status_due:
+                        # 机器人正忙读不到状态时沿用上一次的状态，下个节拍再试
+                        statuses = self._read_status()
+                        if statuses is not None:
+                            status = statuses
+                            status_due = sampled_at + STATUS_PERIOD
+                    self.buffer.append(sampled_at - start, *pose, *status)
+                    if self._gap_start is not None:
+                        self.gaps.append((self._gap_start, sampled_at - start))
+                        self._gap_start = None
+            except _RobotDisconnected:
+                logger.warning("机器人已断开，停止轨迹录制: %s", self.ip)
+                self.stop("disconnected", wait=False)
+                break
+            except Exception as e:
+                self.errors += 1
+                self.last_error = str(e)
+            next_tick += self.period
+            behind = time.monotonic() - next_tick
+            if behind > 0:
+                # 采样跟不上设定频率时跳过错过的节拍，而不是连续补采
+                skipped = int(behind / self.period) + 1
+                self.missed += skipped
+                next_tick += skipped * self.period
+
+    def gaps_in(self, start=None, end=None):
+        """与时间窗口 [start, end] 重叠的间隙 [开始, 结束]，进行中的间隙结束时间为 None"""
+        gaps = list(self.gaps)
+        if self._gap_start is not None:
+            gaps.append((self._gap_start, None))
+        return [[round(gap_start, 4), None if gap_end is None else round(gap_end, 4)]
+                for gap_start, gap_end in gaps
+                if (end is None or gap_start <= end) and (start is None or gap_end is None or gap_end >= start)]
+
+    def describe(self):
+        buffer = self.buffer
+        duration = float(buffer.t[(buffer.written - 1) % buffer.capacity]) if buffer.written else 0.0
+        return {
+            "ip": self.ip,
+            "state": self.state,
+            "rate": self.rate,
+            "capacity": buffer.capacity,
+            "samples": len(buffer),
+            "total_samples": buffer.written,
+            "overwritten": max(buffer.written - buffer.capacity, 0),
+            "duration_s": round(duration, 4),
+            "missed_ticks": self.missed,
+            "rpc_samples": self.rpc_samples,
+            "cache_samples": self.cache_samples,
+            "errors": self.errors,
+            "last_error": self.last_error,
+            "busy_ticks": self.busy_ticks,
+            "buffer_kb": round(buffer.nbytes / 1024, 1),
+            "started_at": self.started_at,
+            "stopped_at": self.stopped_at,
+        }
+
+
+_recorders = dict()
+_recorders_lock = threading.Lock()
+
+
+def _on_robot_removed(ip):
+    recorder = _recorders.get(ip)
+    if recorder is not None:
+        # 断开连接时可能正持有该机器人的锁，不等待录制线程退出
+        recorder.stop("disconnected", wait=False)
+
+
+robot_list.on_remove(_on_robot_removed)
+
+
+def start_recording(ip: str, rate: float = 50, capacity: int = DEFAULT_CAPACITY):
+    """开始录制机器人轨迹，替换该机器人之前的录制数据
+
+    参数:
+        ip: 机器人控制柜IP地址
+        rate: 采样频率（Hz）
+        capacity: 缓冲区容量（采样点数），录制时间超过 capacity/rate 秒后覆盖最旧的采样点
+
+    返回:
+        str: JSON格式的录制信息
+    """
+    if np is None:
+        return error("轨迹录制需要安装numpy: pip install \"agilebot-mcp[analysis]\"")
+    if ip not in robot_list:
+        return error("请先连接机器人")
+    if not 0 < rate <= RECORDER_MAX_RATE:
+        return error(f"采样频率必须在0到{RECORDER_MAX_RATE}Hz之间")
+    if not 0 < capacity <= RECORDER_MAX_SAMPLES:
+        return error(f"缓冲区容量必须在1到{RECORDER_MAX_SAMPLES}之间")
+
+    try:
+        with _recorders_lock:
+            previous = _recorders.pop(ip, None)
+            if previous is not None:
+                previous.stop()
+            recorder = Recorder(ip, rate, int(capacity))
+            _recorders[ip] = recorder
+            recorder.start()
+        logger.info("开始轨迹录制: %s, 频率: %sHz, 容量: %s", ip, rate, capacity)
+        return success(data=recorder.describe())
+    except Exception as e:
+        logger.error("开始轨迹录制时发生异常: %s, 异常信息: %s", ip, e)
+        return error(f"开始轨迹录制时发生异常: {str(e)}")
+
+
+def stop_recording(ip: str):
+    """停止录制，已录制的数据保留到下次开始录制"""
+    recorder = _recorders.get(ip)
+    if recorder is None:
+        return error("该机器人没有轨迹录制")
+    recorder.stop()
+    logger.info("停止轨迹录制: %s, 采样点数: %s", ip, recorder.buffer.written)
+    return success(data=recorder.describe())
+
+
+def get_recording(ip: str, start: float = None, end: float = None, max_samples: int = DEFAULT_FETCH_SAMPLES):
+    """获取录制数据的一段
+
+    参数:
+        ip: 机器人控制柜IP地址
+        start: 窗口起始时间（秒，相对录制开始），默认最早的采样点
+        end: 窗口结束时间（秒，相对录制开始），默认最新的采样点
+        max_samples: 最多返回的采样点数，窗口内采样点更多时等间隔抽取
+
+    返回:
+        str: JSON格式的结果，t/joint/cart/servo_status/ctrl_status 为按时间先后排列的各列数据，
+            gaps 为窗口内因机器人正忙而没有采样的时间段 [开始, 结束]
+    """
+    recorder = _recorders.get(ip)
+    if recorder is None:
+        return error("该机器人没有轨迹录制")
+    if max_samples <= 0:
+        return error("max_samples 必须大于0")
+    try:
+        t, joint, cart, status, in_window, step = recorder.buffer.select(start, end, max_samples)
+        names = recorder.status_names
+        return encode({
+            "status": "success",
+            "recording": recorder.describe(),
+            "window_samples": in_window,
+            "step": step,
+            "returned": int(t.size),
+            "t": np.round(t, 4).tolist(),
+            "joint": joint.tolist(),
+            "cart": cart.tolist(),
+            "servo_status": [names[code] for code in status[:, 0].tolist()],
+            "ctrl_status": [names[code] for code in status[:, 1].tolist()],
+            "gaps": recorder.gaps_in(start, end),
+        })
+    except Exception as e:
+        logger.error("获取轨迹录制数据时发生异常: %s, 异常信息: %s", ip, e)
+        return error(f"获取轨迹录制数据时发生异常: {str(e)}")
+
+
+def stop_all_recordings():
+    with _recorders_lock:
+        recorders = list(_recorders.values())
+    for recorder in recorders:
+        recorder.stop()
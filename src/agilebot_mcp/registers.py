@@ -1,252 +1,396 @@
 # -*- coding: utf-8 -*-
+import functools
 import json
 import logging
-from Agilebot.IR.A.status_code import StatusCodeEnum
-from Agilebot.IR.A.sdk_types import PoseType
-from Agilebot.IR.A.sdk_classes import PoseRegister
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
 
-from .robot_core import robot_list
+from .sdk import StatusCodeEnum, PoseType, PoseRegister
+from .robot_core import robot_list, robot_lock
+from .responses import encode, success, error, PoseRegisterData
 
 logger = logging.getLogger(__name__)
 
 
+@robot_lock
 def read_R_register(ip: str, index: int):
     try:
         if ip not in robot_list:
-            return json.dumps({"status": "error", "message": "请先连接机器人"}, ensure_ascii=False)
+            return error("请先连接机器人")
         
         value, ret = robot_list[ip].register.read_R(index)
         
         if ret == StatusCodeEnum.OK:
-            logger.info(f"读取R寄存器成功: {ip}, 索引: {index}, 值: {value}")
-            return json.dumps({"status": "success", "index": index, "value": value}, ensure_ascii=False)
+            logger.info("读取R寄存器成功: %s, 索引: %s, 值: %s", ip, index, value)
+            return success(index=index, value=value)
         else:
-            logger.error(f"读取R寄存器失败: {ip}, 索引: {index}, 错误代码: {ret}")
-            return json.dumps({"status": "error", "message": "读取R寄存器失败"}, ensure_ascii=False)
+            logger.error("读取R寄存器失败: %s, 索引: %s, 错误代码: %s", ip, index, ret)
+            return error("读取R寄存器失败")
             
     except Exception as e:
-        logger.error(f"读取R寄存器时发生异常: {ip}, 索引: {index}, 异常信息: {str(e)}")
-        return json.dumps({"status": "error", "message": f"读取R寄存器时发生异常: {str(e)}"}, ensure_ascii=False)
+        logger.error("读取R寄存器时发生异常: %s, 索引: %s, 异常信息: %s", ip, index, e)
+        return error(f"读取R寄存器时发生异常: {str(e)}")
 
 
+@robot_lock
 def write_R_register(ip: str, index: int, value: float):
     try:
         if ip not in robot_list:
-            return json.dumps({"status": "error", "message": "请先连接机器人"}, ensure_ascii=False)
+            return error("请先连接机器人")
         
         ret = robot_list[ip].register.write_R(index, value)
         
         if ret == StatusCodeEnum.OK:
-            logger.info(f"写入R寄存器成功: {ip}, 索引: {index}, 值: {value}")
-            return json.dumps({"status": "success", "message": "写入R寄存器成功"}, ensure_ascii=False)
+            logger.info("写入R寄存器成功: %s, 索引: %s, 值: %s", ip, index, value)
+            return success(message="写入R寄存器成功")
         else:
-            logger.error(f"写入R寄存器失败: {ip}, 索引: {index}, 错误代码: {ret}")
-            return json.dumps({"status": "error", "message": "写入R寄存器失败"}, ensure_ascii=False)
+            logger.error("写入R寄存器失败: %s, 索引: %s, 错误代码: %s", ip, index, ret)
+            return error("写入R寄存器失败")
             
     except Exception as e:
-        logger.error(f"写入R寄存器时发生异常: {ip}, 索引: {index}, 异常信息: {str(e)}")
-        return json.dumps({"status": "error", "message": f"写入R寄存器时发生异常: {str(e)}"}, ensure_ascii=False)
+        logger.error("写入R寄存器时发生异常: %s, 索引: %s, 异常信息: %s", ip, index, e)
+        return error(f"写入R寄存器时发生异常: {str(e)}")
 
 
+@robot_lock
 def delete_R_register(ip: str, index: int):
     try:
         if ip not in robot_list:
-            return json.dumps({"status": "error", "message": "请先连接机器人"}, ensure_ascii=False)
+            return error("请先连接机器人")
         
         ret = robot_list[ip].register.delete_R(index)
         
         if ret == StatusCodeEnum.OK:
-            logger.info(f"删除R寄存器成功: {ip}, 索引: {index}")
-            return json.dumps({"status": "success", "message": "删除R寄存器成功"}, ensure_ascii=False)
+            logger.info("删除R寄存器成功: %s, 索引: %s", ip, index)
+            return success(message="删除R寄存器成功")
         else:
-            logger.error(f"删除R寄存器失败: {ip}, 索引: {index}, 错误代码: {ret}")
-            return json.dumps({"status": "error", "message": "删除R寄存器失败"}, ensure_ascii=False)
+            logger.error("删除R寄存器失败: %s, 索引: %s, 错误代码: %s", ip, index, ret)
+            return error("删除R寄存器失败")
             
     except Exception as e:
-        logger.error(f"删除R寄存器时发生异常: {ip}, 索引: {index}, 异常信息: {str(e)}")
-        return json.dumps({"status": "error", "message": f"删除R寄存器时发生异常: {str(e)}"}, ensure_ascii=False)
+        logger.error("删除R寄存器时发生异常: %s, 索引: %s, 异常信息: %s", ip, index, e)
+        return error(f"删除R寄存器时发生异常: {str(e)}")
 
 
+@robot_lock
 def read_MR_register(ip: str, index: int):
     try:
         if ip not in robot_list:
-            return json.dumps({"status": "error", "message": "请先连接机器人"}, ensure_ascii=False)
+            return error("请先连接机器人")
         
         value, ret = robot_list[ip].register.read_MR(index)
         
         if ret == StatusCodeEnum.OK:
-            logger.info(f"读取MR寄存器成功: {ip}, 索引: {index}, 值: {value}")
-            return json.dumps({"status": "success", "index": index, "value": value}, ensure_ascii=False)
+            logger.info("读取MR寄存器成功: %s, 索引: %s, 值: %s", ip, index, value)
+            return success(index=index, value=value)
         else:
-            logger.error(f"读取MR寄存器失败: {ip}, 索引: {index}, 错误代码: {ret}")
-            return json.dumps({"status": "error", "message": "读取MR寄存器失败"}, ensure_ascii=False)
+            logger.error("读取MR寄存器失败: %s, 索引: %s, 错误代码: %s", ip, index, ret)
+            return error("读取MR寄存器失败")
             
     except Exception as e:
-        logger.error(f"读取MR寄存器时发生异常: {ip}, 索引: {index}, 异常信息: {str(e)}")
-        return json.dumps({"status": "error", "message": f"读取MR寄存器时发生异常: {str(e)}"}, ensure_ascii=False)
+        logger.error("读取MR寄存器时发生异常: %s, 索引: %s, 异常信息: %s", ip, index, e)
+        return error(f"读取MR寄存器时发生异常: {str(e)}")
 
 
+@robot_lock
 def write_MR_register(ip: str, index: int, value: int):
     try:
         if ip not in robot_list:
-            return json.dumps({"status": "error", "message": "请先连接机器人"}, ensure_ascii=False)
+            return error("请先连接机器人")
         
         ret = robot_list[ip].register.write_MR(index, value)
         
         if ret == StatusCodeEnum.OK:
-            logger.info(f"写入MR寄存器成功: {ip}, 索引: {index}, 值: {value}")
-            return json.dumps({"status": "success", "message": "写入MR寄存器成功"}, ensure_ascii=False)
+            logger.info("写入MR寄存器成功: %s, 索引: %s, 值: %s", ip, index, value)
+            return success(message="写入MR寄存器成功")
         else:
-            logger.error(f"写入MR寄存器失败: {ip}, 索引: {index}, 错误代码: {ret}")
-            return json.dumps({"status": "error", "message": "写入MR寄存器失败"}, ensure_ascii=False)
+            logger.error("写入MR寄存器失败: %s, 索引: %s, 错误代码: %s", ip, index, ret)
+            return error("写入MR寄存器失败")
             
     except Exception as e:
-        logger.error(f"写入MR寄存器时发生异常: {ip}, 索引: {index}, 异常信息: {str(e)}")
-        return json.dumps({"status": "error", "message": f"写入MR寄存器时发生异常: {str(e)}"}, ensure_ascii=False)
+        logger.error("写入MR寄存器时发生异常: %s, 索引: %s, 异常信息: %s", ip, index, e)
+        return error(f"写入MR寄存器时发生异常: {str(e)}")
 
 
+@robot_lock
 def delete_MR_register(ip: str, index: int):
     try:
         if ip not in robot_list:
-            return json.dumps({"status": "error", "message": "请先连接机器人"}, ensure_ascii=False)
+            return error("请先连接机器人")
         
         ret = robot_list[ip].register.delete_MR(index)
         
         if ret == StatusCodeEnum.OK:
-            logger.info(f"删除MR寄存器成功: {ip}, 索引: {index}")
-            return json.dumps({"status": "success", "message": "删除MR寄存器成功"}, ensure_ascii=False)
+            logger.info("删除MR寄存器成功: %s, 索引: %s", ip, index)
+            return success(message="删除MR寄存器成功")
         else:
-            logger.error(f"删除MR寄存器失败: {ip}, 索引: {index}, 错误代码: {ret}")
-            return json.dumps({"status": "error", "message": "删除MR寄存器失败"}, ensure_ascii=False)
+            logger.error("删除MR寄存器失败: %s, 索引: %s, 错误代码: %s", ip, index, ret)
+            return error("删除MR寄存器失败")
             
     except Exception as e:
-        logger.error(f"删除MR寄存器时发生异常: {ip}, 索引: {index}, 异常信息: {str(e)}")
-        return json.dumps({"status": "error", "message": f"删除MR寄存器时发生异常: {str(e)}"}, ensure_ascii=False)
+        logger.error("删除MR寄存器时发生异常: %s, 索引: %s, 异常信息: %s", ip, index, e)
+        return error(f"删除MR寄存器时发生异常: {str(e)}")
 
 
+def _dict_to_pose_register(index, data):
+    pose_register = PoseRegister()
+    pose_register.id = index
+    pose_register.name = data.get("name", "")
+    pose_register.comment = data.get("comment", "")
+
+    if "pose_type" in data:
+        pose_type_str = data["pose_type"].upper()
+        if "JOINT" in pose_type_str:
+            pose_register.poseRegisterData.pt = PoseType.JOINT
+            if "joint" in data:
+                joint = data["joint"]
+                pose_register.poseRegisterData.joint.j1 = joint.get("j1", 0)
+                pose_register.poseRegisterData.joint.j2 = joint.get("j2", 0)
+                pose_register.poseRegisterData.joint.j3 = joint.get("j3", 0)
+                pose_register.poseRegisterData.joint.j4 = joint.get("j4", 0)
+                pose_register.poseRegisterData.joint.j5 = joint.get("j5", 0)
+                pose_register.poseRegisterData.joint.j6 = joint.get("j6", 0)
+        elif "CART" in pose_type_str:
+            pose_register.poseRegisterData.pt = PoseType.CART
+            if "cartesian" in data:
+                cartesian = data["cartesian"]
+                pose_register.poseRegisterData.cartData.position.x = cartesian.get("x", 0)
+                pose_register.poseRegisterData.cartData.position.y = cartesian.get("y", 0)
+                pose_register.poseRegisterData.cartData.position.z = cartesian.get("z", 0)
+                pose_register.poseRegisterData.cartData.position.a = cartesian.get("a", 0)
+                pose_register.poseRegisterData.cartData.position.b = cartesian.get("b", 0)
+                pose_register.poseRegisterData.cartData.position.c = cartesian.get("c", 0)
+            if "posture" in data:
+                posture = data["posture"]
+                pose_register.poseRegisterData.cartData.posture.arm_back_front = posture.get("arm_back_front", 0)
+                pose_register.poseRegisterData.cartData.posture.arm_left_right = posture.get("arm_left_right", 0)
+                pose_register.poseRegisterData.cartData.posture.arm_up_down = posture.get("arm_up_down", 0)
+                pose_register.poseRegisterData.cartData.posture.wrist_flip = posture.get("wrist_flip", 0)
+    return pose_register
+
+
+@robot_lock
 def read_PR_register(ip: str, index: int):
     try:
         if ip not in robot_list:
-            return json.dumps({"status": "error", "message": "请先连接机器人"}, ensure_ascii=False)
+            return error("请先连接机器人")
         
         pose_register, ret = robot_list[ip].register.read_PR(index)
         
         if ret == StatusCodeEnum.OK:
-            pose_data = pose_register.poseRegisterData
-            result = {
-                "index": index,
-                "id": pose_register.id,
-                "name": pose_register.name,
-                "comment": pose_register.comment,
-                "pose_type": str(pose_data.pt)
-            }
-            
-            if pose_data.pt == PoseType.JOINT:
-                result["joint"] = {
-                    "j1": pose_data.joint.j1,
-                    "j2": pose_data.joint.j2,
-                    "j3": pose_data.joint.j3,
-                    "j4": pose_data.joint.j4,
-                    "j5": pose_data.joint.j5,
-                    "j6": pose_data.joint.j6
-                }
-            elif pose_data.pt == PoseType.CART:
-                result["cartesian"] = {
-                    "x": pose_data.cartData.position.x,
-                    "y": pose_data.cartData.position.y,
-                    "z": pose_data.cartData.position.z,
-                    "a": pose_data.cartData.position.a,
-                    "b": pose_data.cartData.position.b,
-                    "c": pose_data.cartData.position.c
-                }
-                result["posture"] = {
-                    "arm_back_front": pose_data.cartData.posture.arm_back_front,
-                    "arm_left_right": pose_data.cartData.posture.arm_left_right,
-                    "arm_up_down": pose_data.cartData.posture.arm_up_down,
-                    "wrist_flip": pose_data.cartData.posture.wrist_flip
-                }
-            
-            logger.info(f"读取PR寄存器成功: {ip}, 索引: {index}")
-            return json.dumps({"status": "success", "data": result}, ensure_ascii=False)
+            result = PoseRegisterData.from_sdk(index, pose_register, PoseType.JOINT, PoseType.CART)
+            logger.info("读取PR寄存器成功: %s, 索引: %s", ip, index)
+            return success(data=result)
         else:
-            logger.error(f"读取PR寄存器失败: {ip}, 索引: {index}, 错误代码: {ret}")
-            return json.dumps({"status": "error", "message": "读取PR寄存器失败"}, ensure_ascii=False)
+            logger.error("读取PR寄存器失败: %s, 索引: %s, 错误代码: %s", ip, index, ret)
+            return error("读取PR寄存器失败")
             
     except Exception as e:
-        logger.error(f"读取PR寄存器时发生异常: {ip}, 索引: {index}, 异常信息: {str(e)}")
-        return json.dumps({"status": "error", "message": f"读取PR寄存器时发生异常: {str(e)}"}, ensure_ascii=False)
+        logger.error("读取PR寄存器时发生异常: %s, 索引: %s, 异常信息: %s", ip, index, e)
+        return error(f"读取PR寄存器时发生异常: {str(e)}")
 
 
-def write_PR_register(ip: str, index: int, pose_data: str):
+@robot_lock
+def write_PR_register(ip: str, index: int, pose_data: str | dict):
     try:
         if ip not in robot_list:
-            return json.dumps({"status": "error", "message": "请先连接机器人"}, ensure_ascii=False)
-        
-        data = json.loads(pose_data)
-        pose_register = PoseRegister()
-        pose_register.id = index
-        pose_register.name = data.get("name", "")
-        pose_register.comment = data.get("comment", "")
-        
-        if "pose_type" in data:
-            pose_type_str = data["pose_type"].upper()
-            if "JOINT" in pose_type_str:
-                pose_register.poseRegisterData.pt = PoseType.JOINT
-                if "joint" in data:
-                    joint = data["joint"]
-                    pose_register.poseRegisterData.joint.j1 = joint.get("j1", 0)
-                    pose_register.poseRegisterData.joint.j2 = joint.get("j2", 0)
-                    pose_register.poseRegisterData.joint.j3 = joint.get("j3", 0)
-                    pose_register.poseRegisterData.joint.j4 = joint.get("j4", 0)
-                    pose_register.poseRegisterData.joint.j5 = joint.get("j5", 0)
-                    pose_register.poseRegisterData.joint.j6 = joint.get("j6", 0)
-            elif "CART" in pose_type_str:
-                pose_register.poseRegisterData.pt = PoseType.CART
-                if "cartesian" in data:
-                    cartesian = data["cartesian"]
-                    pose_register.poseRegisterData.cartData.position.x = cartesian.get("x", 0)
-                    pose_register.poseRegisterData.cartData.position.y = cartesian.get("y", 0)
-                    pose_register.poseRegisterData.cartData.position.z = cartesian.get("z", 0)
-                    pose_register.poseRegisterData.cartData.position.a = cartesian.get("a", 0)
-                    pose_register.poseRegisterData.cartData.position.b = cartesian.get("b", 0)
-                    pose_register.poseRegisterData.cartData.position.c = cartesian.get("c", 0)
-                if "posture" in data:
-                    posture = data["posture"]
-                    pose_register.poseRegisterData.cartData.posture.arm_back_front = posture.get("arm_back_front", 0)
-                    pose_register.poseRegisterData.cartData.posture.arm_left_right = posture.get("arm_left_right", 0)
-                    pose_register.poseRegisterData.cartData.posture.arm_up_down = posture.get("arm_up_down", 0)
-                    pose_register.poseRegisterData.cartData.posture.wrist_flip = posture.get("wrist_flip", 0)
+            return error("请先连接机器人")
+        
+        pose_register = _dict_to_pose_register(index, json.loads(pose_data) if isinstance(pose_data, str) else pose_data)
         
         ret = robot_list[ip].register.write_PR(pose_register)
         
         if ret == StatusCodeEnum.OK:
-            logger.info(f"写入PR寄存器成功: {ip}, 索引: {index}")
-            return json.dumps({"status": "success", "message": "写入PR寄存器成功"}, ensure_ascii=False)
+            logger.info("写入PR寄存器成功: %s, 索引: %s", ip, index)
+            return success(message="写入PR寄存器成功")
         else:
-            logger.error(f"写入PR寄存器失败: {ip}, 索引: {index}, 错误代码: {ret}")
-            return json.dumps({"status": "error", "message": "写入PR寄存器失败"}, ensure_ascii=False)
+            logger.error("写入PR寄存器失败: %s, 索引: %s, 错误代码: %s", ip, index, ret)
+            return error("写入PR寄存器失败")
             
     except json.JSONDecodeError:
-        return json.dumps({"status": "error", "message": "位姿数据格式错误，应为JSON字符串"}, ensure_ascii=False)
+        return error("位姿数据格式错误，应为JSON字符串")
     except Exception as e:
-        logger.error(f"写入PR寄存器时发生异常: {ip}, 索引: {index}, 异常信息: {str(e)}")
-        return json.dumps({"status": "error", "message": f"写入PR寄存器时发生异常: {str(e)}"}, ensure_ascii=False)
+        logger.error("写入PR寄存器时发生异常: %s, 索引: %s, 异常信息: %s", ip, index, e)
+        return error(f"写入PR寄存器时发生异常: {str(e)}")
 
 
+@robot_lock
 def delete_PR_register(ip: str, index: int):
     try:
         if ip not in robot_list:
-            return json.dumps({"status": "error", "message": "请先连接机器人"}, ensure_ascii=False)
+            return error("请先连接机器人")
         
         ret = robot_list[ip].register.delete_PR(index)
         
         if ret == StatusCodeEnum.OK:
-            logger.info(f"删除PR寄存器成功: {ip}, 索引: {index}")
-            return json.dumps({"status": "success", "message": "删除PR寄存器成功"}, ensure_ascii=False)
+            logger.info("删除PR寄存器成功: %s, 索引: %s", ip, index)
+            return success(message="删除PR寄存器成功")
         else:
-            logger.error(f"删除PR寄存器失败: {ip}, 索引: {index}, 错误代码: {ret}")
-            return json.dumps({"status": "error", "message": "删除PR寄存器失败"}, ensure_ascii=False)
+            logger.error("删除PR寄存器失败: %s, 索引: %s, 错误代码: %s", ip, index, ret)
+            return error("删除PR寄存器失败")
             
     except Exception as e:
-        logger.error(f"删除PR寄存器时发生异常: {ip}, 索引: {index}, 异常信息: {str(e)}")
-        return json.dumps({"status": "error", "message": f"删除PR寄存器时发生异常: {str(e)}"}, ensure_ascii=False)
+        logger.error("删除PR寄存器时发生异常: %s, 索引: %s, 异常信息: %s", ip, index, e)
+        return error(f"删除PR寄存器时发生异常: {str(e)}")
+
+
+# 批量读写支持的寄存器类型 -> (SDK读方法, SDK写方法)
+REGISTER_KINDS = {
+    "R": ("read_R", "write_R"),
+    "MR": ("read_MR", "write_MR"),
+    "SR": ("read_SR", "write_SR"),
+    "MH": ("read_MH", "write_MH"),
+    "MI": ("read_MI", "write_MI"),
+    "PR": ("read_PR", "write_PR"),
+}
+# 每台机器人批量读写的并发线程数；每台机器人一个线程池，慢控制柜上的大批量不会占用其他机器人的线程
+BATCH_WORKERS = int(os.environ.get("AGILEBOT_MCP_BATCH_WORKERS", "8"))
+MAX_BATCH_SIZE = 1000
+
+_batch_pools = dict()
+_batch_pools_lock = threading.Lock()
+
+
+def _batch_pool_for(ip):
+    with _batch_pools_lock:
+        pool = _batch_pools.get(ip)
+        if pool is None:
+            pool = ThreadPoolExecutor(max_workers=BATCH_WORKERS, thread_name_prefix=f"register-batch-{ip}")
+            _batch_pools[ip] = pool
+        return pool
+
+
+def _drop_batch_pool(ip):
+    with _batch_pools_lock:
+        pool = _batch_pools.pop(ip, None)
+    if pool is not None:
+        pool.shutdown(wait=False)
+
+
+robot_list.on_remove(_drop_batch_pool)
+
+
+def _read_one(kind, read_method, register, index):
+    value, ret = getattr(register, read_method)(index)
+    if ret != StatusCodeEnum.OK:
+        return None, f"错误代码: {ret}"
+    if kind == "PR":
+        value = PoseRegisterData.from_sdk(index, value, PoseType.JOINT, PoseType.CART)
+    return value, None
+
+
+def _write_one(kind, write_method, register, index, value):
+    if kind == "PR":
+        ret = register.write_PR(_dict_to_pose_register(index, value))
+    else:
+        ret = getattr(register, write_method)(index, value)
+    if ret != StatusCodeEnum.OK:
+        return None, f"错误代码: {ret}"
+    return value, None
+
+
+def _run_batch(ip, call, items):
+    """持有机器人租约，在该机器人的批量线程池中并发执行 call(register, *item)，按索引汇总结果和错误
+
+    租约只挡住其他调用方；线程池中的调用直接使用SDK连接，不经过按机器人的串行化，
+    同一台机器人上最多同时有 BATCH_WORKERS 个寄存器调用。
+    """
+    values, errors = {}, {}
+    with robot_list.lease(ip) as arm:
+        if arm is None:
+            return None, None
+        register = arm.register
+        pool = _batch_pool_for(ip)
+        futures = {pool.submit(call, register, *item): item[0] for item in items}
+        for future, index in futures.items():
+            try:
+                value, message = future.result()
+            except Exception as e:
+                value, message = None, str(e)
+            if message is None:
+                values[index] = value
+            else:
+                errors[index] = message
+    return values, errors
+
+
+def _batch_response(ip, action, kind, values, errors, total, with_values):
+    if values is None:
+        return error("请先连接机器人")
+    if errors:
+        logger.warning("批量%s%s寄存器部分失败: %s, 成功: %s, 失败: %s", action, kind, ip, len(values), len(errors))
+    else:
+        logger.info("批量%s%s寄存器成功: %s, 数量: %s", action, kind, ip, total)
+    status = "error" if total and len(errors) == total else "success"
+    response = {"status": status, "kind": kind, "succeeded": len(values), "failed": len(errors)}
+    if with_values:
+        response["values"] = values
+    response["errors"] = errors
+    return encode(response)
+
+
+def read_registers(ip: str, kind: str, indices=None, start=None, end=None):
+    """批量读取同一类型的寄存器
+
+    参数:
+        ip: 机器人控制柜IP地址
+        kind: 寄存器类型 (R, MR, SR, MH, MI, PR)
+        indices: 寄存器编号列表，与 start/end 二选一
+        start: 起始编号（含）
+        end: 结束编号（含）
+
+    返回:
+        str: JSON格式的结果，values 为 {编号: 值}，errors 为 {编号: 错误信息}
+    """
+    try:
+        kind = kind.upper()
+        if kind not in REGISTER_KINDS:
+            return error(f"不支持的寄存器类型，可选: {', '.join(REGISTER_KINDS)}")
+        if indices is None:
+            if start is None or end is None:
+                return error("请提供寄存器编号列表或起止编号")
+            if start > end:
+                return error("起始编号不能大于结束编号")
+            if end - start + 1 > MAX_BATCH_SIZE:
+                return error(f"单次批量操作不能超过{MAX_BATCH_SIZE}个寄存器")
+            indices = range(start, end + 1)
+        elif len(indices) > MAX_BATCH_SIZE:
+            return error(f"单次批量操作不能超过{MAX_BATCH_SIZE}个寄存器")
+        indices = list(dict.fromkeys(indices))
+        
+        read_method = REGISTER_KINDS[kind][0]
+        values, errors = _run_batch(ip, functools.partial(_read_one, kind, read_method), [(index,) for index in indices])
+        return _batch_response(ip, "读取", kind, values, errors, len(indices), with_values=True)
+        
+    except Exception as e:
+        logger.error("批量读取寄存器时发生异常: %s, 类型: %s, 异常信息: %s", ip, kind, e)
+        return error(f"批量读取寄存器时发生异常: {str(e)}")
+
+
+def write_registers(ip: str, kind: str, values: dict):
+    """批量写入同一类型的寄存器
+
+    参数:
+        ip: 机器人控制柜IP地址
+        kind: 寄存器类型 (R, MR, SR, MH, MI, PR)
+        values: {编号: 值}，PR寄存器的值为与 write_PR 相同格式的位姿字典
+
+    返回:
+        str: JSON格式的结果，errors 为 {编号: 错误信息}
+    """
+    try:
+        kind = kind.upper()
+        if kind not in REGISTER_KINDS:
+            return error(f"不支持的寄存器类型，可选: {', '.join(REGISTER_KINDS)}")
+        if len(values) > MAX_BATCH_SIZE:
+            return error(f"单次批量操作不能超过{MAX_BATCH_SIZE}个寄存器")
+        
+        write_method = REGISTER_KINDS[kind][1]
+        items = [(int(index), value) for index, value in values.items()]
+        written, errors = _run_batch(ip, functools.partial(_write_one, kind, write_method), items)
+        return _batch_response(ip, "写入", kind, written, errors, len(items), with_values=False)
+        
+    except Exception as e:
+        logger.error("批量写入寄存器时发生异常: %s, 类型: %s, 异常信息: %s", ip, kind, e)
+        return error(f"批量写入寄存器时发生异常: {str(e)}")
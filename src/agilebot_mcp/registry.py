@@ -0,0 +1,255 @@
+# -*- coding: utf-8 -*-
+import functools
+import threading
+import time
+from contextlib import contextmanager
+
+
+class _RWLock:
+    """读写锁：允许多个读者并发，写者独占"""
+
+    def __init__(self):
+        self._cond = threading.Condition(threading.Lock())
+        self._readers = 0
+        self._writer = False
+        self._writers_waiting = 0
+
+    def acquire_read(self):
+        with self._cond:
+            while self._writer or self._writers_waiting:
+                self._cond.wait()
+            self._readers += 1
+
+    def release_read(self):
+        with self._cond:
+            self._readers -= 1
+            if self._readers == 0:
+                self._cond.notify_all()
+
+    def acquire_write(self):
+        with self._cond:
+            self._writers_waiting += 1
+            try:
+                while self._writer or self._readers:
+                    self._cond.wait()
+            finally:
+                self._writers_waiting -= 1
+            self._writer = True
+
+    def release_write(self):
+        with self._cond:
+            self._writer = False
+            self._cond.notify_all()
+
+    @contextmanager
+    def read(self):
+        self.acquire_read()
+        try:
+            yield
+        finally:
+            self.release_read()
+
+    @contextmanager
+    def write(self):
+        self.acquire_write()
+        try:
+            yield
+        finally:
+            self.release_write()
+
+
+class RobotRegistry:
+    """线程安全的机器人连接注册表
+
+    注册表本身由读写锁保护，每个机器人IP另有一把可重入锁：
+    对不同机器人的调用可以完全并行，对同一机器人的调用被串行化。
+    保留了原 robot_list 字典的常用接口（in、[]、get、keys、clear 等）。
+    重连或启动时批量连接期间可以用 hold 暂停某台机器人的新调用，调用在 acquire 中排队等待，
+    而不是用失效的连接（或尚未建立的连接）立即失败；建立连接的线程在 bypass_hold 中不受影响。
+    """
+
+    def __init__(self):
+        self._rwlock = _RWLock()
+        self._arms = {}
+        # 每个IP的锁在首次使用时创建且不再删除，保证断开重连前后使用的是同一把锁
+        self._locks = {}
+        self._remove_hooks = []
+        self._reconnect_hooks = []
+        # IP -> (恢复事件, 截止时间)
+        self._holds = {}
+        self._local = threading.local()
+
+    def on_remove(self, callback):
+        """注册回调 callback(ip)，在机器人被移除或被新连接替换后调用，用于清理与连接绑定的缓存"""
+        self._remove_hooks.append(callback)
+
+    def on_reconnect(self, callback):
+        """注册回调 callback(ip)，在 swap 换上重连后的新连接后调用
+
+        与 on_remove 不同，录制、后台任务等只通过注册表访问机器人的使用者不受影响，
+        只有直接持有旧连接对象的缓存（例如Modbus从机句柄）需要在这里清理。
+        """
+        self._reconnect_hooks.append(callback)
+
+    def _notify_removed(self, ips):
+        for ip in ips:
+            for callback in self._remove_hooks:
+                callback(ip)
+
+    def hold(self, ip, seconds):
+        """暂停该机器人的新调用：之后 seconds 秒内的 acquire 等待 resume，超过后不再等待"""
+        with self._rwlock.write():
+            if ip not in self._holds:
+                self._holds[ip] = (threading.Event(), time.monotonic() + seconds)
+
+    def resume(self, ip):
+        """结束 hold，唤醒排队的调用"""
+        with self._rwlock.write():
+            entry = self._holds.pop(ip, None)
+        if entry is not None:
+            entry[0].set()
+
+    def held(self, ip):
+        with self._rwlock.read():
+            return ip in self._holds
+
+    @contextmanager
+    def bypass_hold(self):
+        """在当前线程中忽略 hold，供正在建立连接的线程调用 connect_robot 等带锁的函数"""
+        previous = getattr(self._local, "bypass", False)
+        self._local.bypass = True
+        try:
+            yield
+        finally:
+            self._local.bypass = previous
+
+    def _wait_hold(self, ip, timeout):
+        if getattr(self._local, "bypass", False):
+            return
+        with self._rwlock.read():
+            entry = self._holds.get(ip)
+        if entry is None:
+            return
+        event, deadline = entry
+        wait = deadline - time.monotonic()
+        if timeout is not None:
+            wait = min(wait, timeout)
+        if wait > 0:
+            event.wait(wait)
+
+    def swap(self, ip, arm):
+        """用重连后的新连接替换旧连接，返回旧连接；机器人已被移除时不替换并返回 None"""
+        with self._rwlock.write():
+            previous = self._arms.get(ip)
+            if previous is None:
+                return None
+            self._arms[ip] = arm
+        for callback in self._reconnect_hooks:
+            callback(ip)
+        return previous
+
+    def lock_for(self, ip):
+        """获取指定IP的机器人锁（不存在时创建）"""
+        with self._rwlock.read():
+            lock = self._locks.get(ip)
+        if lock is not None:
+            return lock
+        with self._rwlock.write():
+            return self._locks.setdefault(ip, threading.RLock())
+
+    def acquire(self, ip, timeout=None):
+        """获取指定机器人的独占使用权
+
+        参数:
+            ip: 机器人控制柜IP地址
+            timeout: 等待超时时间（秒），None 表示一直等待
+
+        返回:
+            Arm: 已连接的机器人实例，未连接时为 None
+        """
+        self._wait_hold(ip, timeout)
+        lock = self.lock_for(ip)
+        if not lock.acquire(timeout=-1 if timeout is None else timeout):
+            raise TimeoutError(f"等待机器人锁超时: {ip}")
+        return self.get(ip)
+
+    def release(self, ip):
+        """释放通过 acquire 获得的机器人使用权"""
+        self.lock_for(ip).release()
+
+    @contextmanager
+    def lease(self, ip, timeout=None):
+        """以上下文管理器方式租用机器人，退出时自动释放"""
+        arm = self.acquire(ip, timeout)
+        try:
+            yield arm
+        finally:
+            self.release(ip)
+
+    def get(self, ip, default=None):
+        with self._rwlock.read():
+            return self._arms.get(ip, default)
+
+    def keys(self):
+        with self._rwlock.read():
+            return list(self._arms.keys())
+
+    def items(self):
+        with self._rwlock.read():
+            return list(self._arms.items())
+
+    def pop(self, ip, *default):
+        with self._rwlock.write():
+            removed = ip in self._arms
+            arm = self._arms.pop(ip, *default)
+        if removed:
+            self._notify_removed([ip])
+        return arm
+
+    def clear(self):
+        with self._rwlock.write():
+            ips = list(self._arms)
+            self._arms.clear()
+        self._notify_removed(ips)
+
+    def __contains__(self, ip):
+        with self._rwlock.read():
+            return ip in self._arms
+
+    def __getitem__(self, ip):
+        with self._rwlock.read():
+            return self._arms[ip]
+
+    def __setitem__(self, ip, arm):
+        with self._rwlock.write():
+            replaced = ip in self._arms
+            self._arms[ip] = arm
+            self._locks.setdefault(ip, threading.RLock())
+        if replaced:
+            self._notify_removed([ip])
+
+    def __delitem__(self, ip):
+        with self._rwlock.write():
+            del self._arms[ip]
+        self._notify_removed([ip])
+
+    def __iter__(self):
+        return iter(self.keys())
+
+    def __len__(self):
+        with self._rwlock.read():
+            return len(self._arms)
+
+    def __bool__(self):
+        return len(self) > 0
+
+
+def with_robot_lock(registry):
+    """装饰器：调用期间持有第一个参数 ip 对应的机器人锁"""
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(ip, *args, **kwargs):
+            with registry.lease(ip):
+                return func(ip, *args, **kwargs)
+        return wrapper
+    return decorator
@@ -0,0 +1,244 @@
+# -*- coding: utf-8 -*-
+"""工具返回值的序列化
+
+所有工具的返回值都通过同一个编码器序列化为JSON文本：安装了 orjson 时使用 orjson，否则使用标准库 json
+（ensure_ascii=False），可以通过 AGILEBOT_MCP_JSON_ENCODER 或 set_encoder 指定。
+success/error 构造统一格式的返回值。结构固定的数据（位姿寄存器、坐标系、负载）用带 __slots__ 的数据类
+表示，直接从SDK对象构造后交给编码器，不先逐字段拼成字典；orjson 在C代码中直接序列化数据类。
+字段随类型不同的数据（关节/笛卡尔PR寄存器、负载/负载测定结果）分别定义数据类，不使用取值为 None 的可选字段。
+无法直接序列化的对象按 str() 输出。
+"""
+import dataclasses
+import json
+import os
+from dataclasses import dataclass
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# auto / orjson / json
+JSON_ENCODER = os.environ.get("AGILEBOT_MCP_JSON_ENCODER", "auto")
+
+# 数据类 -> 字段名，避免每次序列化都调用 dataclasses.fields
+_field_names = {}
+
+
+def as_dict(obj):
+    """把数据类转换为字典（只转换一层，嵌套的数据类由编码器继续处理）"""
+    names = _field_names.get(type(obj))
+    if names is None:
+        names = _field_names[type(obj)] = tuple(field.name for field in dataclasses.fields(obj))
+    return {name: getattr(obj, name) for name in names}
+
+
+def _default(obj):
+    if dataclasses.is_dataclass(obj):
+        return as_dict(obj)
+    if hasattr(obj, "tolist"):
+        # numpy 数组和标量
+        return obj.tolist()
+    # 其他对象（例如订阅消息中的SDK对象）按 str() 输出
+    return str(obj)
+
+
+def _encode_json(obj):
+    return json.dumps(obj, ensure_ascii=False, default=_default)
+
+
+if orjson is not None:
+    _ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+
+    def _encode_orjson(obj):
+        return orjson.dumps(obj, default=_default, option=_ORJSON_OPTIONS).decode("utf-8")
+else:
+    _encode_orjson = None
+
+ENCODERS = {"json": _encode_json, "orjson": _encode_orjson}
+
+
+def _select_encoder(name):
+    if name == "auto":
+        return _encode_orjson or _encode_json
+    if name not in ENCODERS:
+        raise ValueError(f"未知的JSON编码器: {name}，可选: auto, {', '.join(ENCODERS)}")
+    if ENCODERS[name] is None:
+        raise ValueError(f"JSON编码器不可用: {name}，请先安装")
+    return ENCODERS[name]
+
+
+_encoder = _select_encoder(JSON_ENCODER)
+
+
+def set_encoder(encoder):
+    """替换编码器，encoder 为编码器名（auto、orjson、json）或 encoder(obj) -> str 函数，返回原来的编码器"""
+    global _encoder
+    previous = _encoder
+    _encoder = _select_encoder(encoder) if isinstance(encoder, str) else encoder
+    return previous
+
+
+def encode(obj):
+    """把返回值序列化为JSON文本"""
+    return _encoder(obj)
+
+
+def success(**fields):
+    return _encoder({"status": "success", **fields})
+
+
+def error(message, **fields):
+    return _encoder({"status": "error", "message": message, **fields})
+
+
+@dataclass(slots=True)
+class Joint:
+    j1: float
+    j2: float
+    j3: float
+    j4: float
+    j5: float
+    j6: float
+
+    @classmethod
+    def from_sdk(cls, joint):
+        return cls(joint.j1, joint.j2, joint.j3, joint.j4, joint.j5, joint.j6)
+
+
+@dataclass(slots=True)
+class Cartesian:
+    x: float
+    y: float
+    z: float
+    a: float
+    b: float
+    c: float
+
+    @classmethod
+    def from_sdk(cls, position):
+        return cls(position.x, position.y, position.z, position.a, position.b, position.c)
+
+
+@dataclass(slots=True)
+class Posture:
+    arm_back_front: int
+    arm_left_right: int
+    arm_up_down: int
+    wrist_flip: int
+
+    @classmethod
+    def from_sdk(cls, posture):
+        return cls(posture.arm_back_front, posture.arm_left_right, posture.arm_up_down, posture.wrist_flip)
+
+
+@dataclass(slots=True)
+class PoseRegisterData:
+    """PR寄存器的公共字段，位姿类型未知时只输出这些字段"""
+    index: int
+    id: int
+    name: str
+    comment: str
+    pose_type: str
+
+    @classmethod
+    def from_sdk(cls, index, pose_register, joint_type, cart_type):
+        """按位姿类型返回 JointPoseRegister、CartPoseRegister 或 PoseRegisterData"""
+        pose_data = pose_register.poseRegisterData
+        fields = (index, pose_register.id, pose_register.name, pose_register.comment, str(pose_data.pt))
+        if pose_data.pt == joint_type:
+            return JointPoseRegister(*fields, Joint.from_sdk(pose_data.joint))
+        if pose_data.pt == cart_type:
+            cart_data = pose_data.cartData
+            return CartPoseRegister(*fields, Cartesian.from_sdk(cart_data.position), Posture.from_sdk(cart_data.posture))
+        return cls(*fields)
+
+
+@dataclass(slots=True)
+class JointPoseRegister(PoseRegisterData):
+    joint: Joint
+
+
+@dataclass(slots=True)
+class CartPoseRegister(PoseRegisterData):
+    cartesian: Cartesian
+    posture: Posture
+
+
+@dataclass(slots=True)
+class Translation:
+    x: float
+    y: float
+    z: float
+
+
+@dataclass(slots=True)
+class Rotation:
+    r: float
+    p: float
+    y: float
+
+
+@dataclass(slots=True)
+class CoordinateSummary:
+    id: int
+    name: str
+    comment: str
+    group_id: int
+
+    @classmethod
+    def from_sdk(cls, coord):
+        return cls(coord.id, coord.name, coord.comment, coord.group_id)
+
+
+@dataclass(slots=True)
+class CoordinateData:
+    id: int
+    name: str
+    comment: str
+    group_id: int
+    position: Translation
+    orientation: Rotation
+
+    @classmethod
+    def from_sdk(cls, coord):
+        info, position, orientation = coord.coordinate_info, coord.position, coord.orientation
+        return cls(info.coordinate_id, info.name, info.comment, info.group_id,
+                   Translation(position.x, position.y, position.z),
+                   Rotation(orientation.r, orientation.p, orientation.y))
+
+
+@dataclass(slots=True)
+class PayloadData:
+    id: int
+    m_load: float
+    lcx_load: float
+    lcy_load: float
+    lcz_load: float
+    Ixx_load: float
+    Iyy_load: float
+    Izz_load: float
+    comment: str
+
+    @classmethod
+    def from_sdk(cls, payload):
+        return cls(payload.id, payload.m_load, payload.lcx_load, payload.lcy_load, payload.lcz_load,
+                   payload.Ixx_load, payload.Iyy_load, payload.Izz_load,
+                   payload.comment.decode("utf-8") if payload.comment else "")
+
+
+@dataclass(slots=True)
+class IdentifiedPayload:
+    """负载测定结果，没有 id 和 comment"""
+    m_load: float
+    lcx_load: float
+    lcy_load: float
+    lcz_load: float
+    Ixx_load: float
+    Iyy_load: float
+    Izz_load: float
+
+    @classmethod
+    def from_sdk(cls, payload):
+        return cls(payload.m_load, payload.lcx_load, payload.lcy_load, payload.lcz_load,
+                   payload.Ixx_load, payload.Iyy_load, payload.Izz_load)
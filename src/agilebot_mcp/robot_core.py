@@ -1,124 +1,262 @@
 # -*- coding: utf-8 -*-
 import json
 import logging
+import os
 import time
-from Agilebot.IR.A.arm import Arm
-from Agilebot.IR.A.status_code import StatusCodeEnum
-from Agilebot.IR.A.sdk_types import PoseType
-from Agilebot.IR.A.sdk_classes import MotionPose, Posture
+
+from .sdk import StatusCodeEnum, PoseType, MotionPose, Posture
+from .backend import create_arm
+from .registry import RobotRegistry, with_robot_lock
+from .telemetry import (
+    TELEMETRY_MAX_AGE, start_telemetry, stop_telemetry, stop_all_telemetry,
+    get_telemetry, get_snapshot, record_telemetry
+)
+from .responses import encode, success, error
 
 logger = logging.getLogger(__name__)
 
-robot_list = dict()
+robot_list = RobotRegistry()
+robot_lock = with_robot_lock(robot_list)
 global_speed = 50
 global_accel = 0.5
+# IP -> {"speed": ..., "accel": ...}，未设置的机器人使用 global_speed/global_accel
+_motion_defaults = dict()
+
+# 就绪检查：缓存有效期内跳过状态查询；上电/复位后轮询状态直到就绪或超时（单位：秒）
+READY_CACHE_TTL = float(os.environ.get("AGILEBOT_MCP_READY_TTL", "5"))
+READY_TIMEOUT = float(os.environ.get("AGILEBOT_MCP_READY_TIMEOUT", "5"))
+READY_POLL_INITIAL = 0.02
+READY_POLL_MAX = 0.25
+_ready_cache = dict()
 
 
 def cleanup_robot_connections():
-    global robot_list
     if robot_list:
-        logger.info(f"正在断开所有机器人连接，共 {len(robot_list)} 个机器人")
-        for ip in list(robot_list.keys()):
+        logger.info("正在断开所有机器人连接，共 %s 个机器人", len(robot_list))
+        for ip in robot_list.keys():
             try:
-                robot_list[ip].disconnect()
-                logger.info(f"成功断开机器人连接: {ip}")
+                with robot_list.lease(ip) as arm:
+                    if arm is not None:
+                        arm.disconnect()
+                logger.info("成功断开机器人连接: %s", ip)
             except Exception as e:
-                logger.error(f"断开机器人连接时发生异常: {ip}, 异常信息: {str(e)}")
+                logger.error("断开机器人连接时发生异常: %s, 异常信息: %s", ip, e)
         robot_list.clear()
+        stop_all_telemetry()
+        _ready_cache.clear()
         logger.info("所有机器人连接已断开")
 
 
+def _is_ctrl_ok(ctrl_status):
+    return 'CTRL_ESTOP' not in str(ctrl_status)
+
+
+def _is_servo_ready(servo_status):
+    servo_status_str = str(servo_status)
+    return 'SERVO_DISABLE' not in servo_status_str and 'SERVO_IDLE' not in servo_status_str
+
+
+def _poll_until(fetch, predicate, timeout):
+    """轮询 fetch() 直到返回OK且 predicate 成立，轮询间隔指数退避
+
+    返回:
+        tuple: (是否达到目标状态, 最后一次获取的值)
+    """
+    deadline = time.monotonic() + timeout
+    delay = READY_POLL_INITIAL
+    while True:
+        value, ret = fetch()
+        if ret == StatusCodeEnum.OK and predicate(value):
+            return True, value
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            return False, value
+        time.sleep(min(delay, remaining))
+        delay = min(delay * 2, READY_POLL_MAX)
+
+
+def set_motion_defaults(ip, speed=None, accel=None):
+    """设置机器人运动指令的默认速度和加速度，None 表示使用全局默认值"""
+    defaults = {name: value for name, value in (("speed", speed), ("accel", accel)) if value is not None}
+    if defaults:
+        _motion_defaults[ip] = defaults
+    else:
+        _motion_defaults.pop(ip, None)
+
+
+def _motion_params(ip, speed, accel):
+    defaults = _motion_defaults.get(ip, {})
+    if speed is None:
+        speed = defaults.get("speed", global_speed)
+    if accel is None:
+        accel = defaults.get("accel", global_accel)
+    return speed, accel
+
+
+def mark_robot_ready(ip):
+    """记录机器人刚刚被确认处于可运动状态"""
+    _ready_cache[ip] = time.monotonic()
+
+
+def invalidate_robot_ready(ip):
+    """清除就绪缓存，下次运动前重新检查"""
+    _ready_cache.pop(ip, None)
+
+
+@robot_lock
 def check_robot_ready(ip):
     if ip not in robot_list:
-        return json.dumps({"status": "error", "message": "机器人未连接"}, ensure_ascii=False)
+        return error("机器人未连接")
+    
+    checked_at = _ready_cache.get(ip)
+    if checked_at is not None and time.monotonic() - checked_at < READY_CACHE_TTL:
+        return success(message="机器人准备就绪")
     
     robot = robot_list[ip]
     
     ctrl_status, ret = robot.get_ctrl_status()
-    ctrl_status_str = str(ctrl_status)
+    if ret != StatusCodeEnum.OK:
+        logger.error("获取控制器状态失败: %s, 错误代码: %s", ip, ret)
+        return error("获取控制器状态失败")
     
-    if 'CTRL_ESTOP' in ctrl_status_str:
-        logger.info(f"机器人处于急停状态，尝试复位: {ip}")
+    if not _is_ctrl_ok(ctrl_status):
+        logger.info("机器人处于急停状态，尝试复位: %s", ip)
         reset_ret = robot.servo_reset()
-        logger.info(f"复位结果: {reset_ret}")
-        time.sleep(1)
+        logger.info("复位结果: %s", reset_ret)
+        ok, ctrl_status = _poll_until(robot.get_ctrl_status, _is_ctrl_ok, READY_TIMEOUT)
+        if not ok:
+            logger.error("急停复位超时: %s, 控制器状态: %s", ip, ctrl_status)
+            return error("急停复位超时")
     
     servo_status, ret = robot.get_servo_status()
-    servo_status_str = str(servo_status)
+    if ret != StatusCodeEnum.OK:
+        logger.error("获取伺服状态失败: %s, 错误代码: %s", ip, ret)
+        return error("获取伺服状态失败")
     
-    if 'SERVO_DISABLE' in servo_status_str or 'SERVO_IDLE' in servo_status_str:
-        logger.info(f"伺服未上电，尝试上电: {ip}")
+    if not _is_servo_ready(servo_status):
+        logger.info("伺服未上电，尝试上电: %s", ip)
         power_ret = robot.servo_on()
-        logger.info(f"上电结果: {power_ret}")
+        logger.info("上电结果: %s", power_ret)
         
         if power_ret != StatusCodeEnum.OK:
-            logger.warning(f"上电失败，尝试清除错误状态: {ip}")
+            logger.warning("上电失败，尝试清除错误状态: %s", ip)
             clear_ret = robot.servo_reset()
-            logger.info(f"清除错误结果: {clear_ret}")
-            time.sleep(0.5)
+            logger.info("清除错误结果: %s", clear_ret)
             
-            power_ret = robot.servo_on()
-            logger.info(f"重新上电结果: {power_ret}")
-        
-        time.sleep(1)
+            ok, power_ret = _poll_until(lambda: (robot.servo_on(), StatusCodeEnum.OK),
+                                        lambda power_ret: power_ret == StatusCodeEnum.OK, READY_TIMEOUT)
+            logger.info("重新上电结果: %s", '成功' if ok else '失败')
+            if not ok:
+                logger.error("重新上电失败: %s, 错误代码: %s", ip, power_ret)
+                return error("伺服上电失败")
+        
+        ok, servo_status = _poll_until(robot.get_servo_status, _is_servo_ready, READY_TIMEOUT)
+        if not ok:
+            logger.error("伺服上电超时: %s, 伺服状态: %s", ip, servo_status)
+            return error("伺服上电超时")
     
-    return json.dumps({"status": "success", "message": "机器人准备就绪"}, ensure_ascii=False)
+    mark_robot_ready(ip)
+    return success(message="机器人准备就绪")
 
 
+@robot_lock
 def connect_robot(ip: str):
     try:
         if ip in robot_list:
-            return json.dumps({"status": "success", "message": "机器人已连接"}, ensure_ascii=False)
+            return success(message="机器人已连接")
         
         try:
-            arm = Arm()
+            arm = create_arm()
         except Exception as e:
-            logger.error(f"初始化机器人实例时发生异常: {ip}, 异常信息: {str(e)}")
-            return json.dumps({"status": "error", "message": "初始化机器人实例失败"}, ensure_ascii=False)
+            logger.error("初始化机器人实例时发生异常: %s, 异常信息: %s", ip, e)
+            return error(f"初始化机器人实例失败: {str(e)}")
         
         try:
             ret = arm.connect(ip)
         except Exception as e:
-            logger.error(f"连接机器人时发生异常: {ip}, 异常信息: {str(e)}")
-            return json.dumps({"status": "error", "message": "连接机器人失败: 网络错误"}, ensure_ascii=False)
+            logger.error("连接机器人时发生异常: %s, 异常信息: %s", ip, e)
+            return error("连接机器人失败: 网络错误")
         
         if ret == StatusCodeEnum.OK:
             robot_list[ip] = arm
-            logger.info(f"成功连接机器人: {ip}")
-            return json.dumps({"status": "success", "message": "机器人连接成功"}, ensure_ascii=False)
+            start_telemetry(ip)
+            # 健康检查在第一次连接时才加载和启动
+            from .health import start_health_monitor
+            start_health_monitor()
+            logger.info("成功连接机器人: %s", ip)
+            return success(message="机器人连接成功")
         else:
-            logger.error(f"连接机器人失败: {ip}, 错误代码: {ret}")
-            return json.dumps({"status": "error", "message": "机器人连接失败"}, ensure_ascii=False)
+            logger.error("连接机器人失败: %s, 错误代码: %s", ip, ret)
+            return error("机器人连接失败")
             
     except Exception as e:
-        logger.error(f"连接机器人时发生异常: {ip}, 异常信息: {str(e)}")
-        return json.dumps({"status": "error", "message": "连接机器人时发生异常: 网络或编码错误"}, ensure_ascii=False)
+        logger.error("连接机器人时发生异常: %s, 异常信息: %s", ip, e)
+        return error("连接机器人时发生异常: 网络或编码错误")
 
 
+@robot_lock
 def disconnect_robot(ip: str):
     try:
         if ip not in robot_list:
-            return json.dumps({"status": "error", "message": "机器人未连接"}, ensure_ascii=False)
+            return error("机器人未连接")
         
         ret = robot_list[ip].disconnect()
         del robot_list[ip]
+        stop_telemetry(ip)
+        invalidate_robot_ready(ip)
         
         if ret == StatusCodeEnum.OK:
-            logger.info(f"成功断开机器人连接: {ip}")
-            return json.dumps({"status": "success", "message": "机器人断开连接成功"}, ensure_ascii=False)
+            logger.info("成功断开机器人连接: %s", ip)
+            return success(message="机器人断开连接成功")
         else:
-            logger.error(f"断开机器人连接失败: {ip}, 错误代码: {ret}")
-            return json.dumps({"status": "error", "message": "机器人断开连接失败"}, ensure_ascii=False)
+            logger.error("断开机器人连接失败: %s, 错误代码: %s", ip, ret)
+            return error("机器人断开连接失败")
             
     except Exception as e:
-        logger.error(f"断开机器人连接时发生异常: {ip}, 异常信息: {str(e)}")
-        return json.dumps({"status": "error", "message": "断开机器人连接时发生异常: 编码错误"}, ensure_ascii=False)
+        logger.error("断开机器人连接时发生异常: %s, 异常信息: %s", ip, e)
+        return error("断开机器人连接时发生异常: 编码错误")
+
+
+def _rpc_source():
+    return {"source": "rpc", "max_age_ms": TELEMETRY_MAX_AGE * 1000}
+
+
+def _cached_response(ip, field, key, required=()):
+    """订阅快照足够新、且包含 required 中的所有键时直接用快照构造响应，否则返回 None"""
+    cached = get_telemetry(ip, field)
+    if cached is None:
+        return None
+    value, age = cached
+    if any(name not in value for name in required):
+        return None
+    response = {"status": "success"}
+    if key is None:
+        response.update(value)
+    else:
+        response[key] = value
+    response.update(source="cache", age_ms=round(age * 1000, 1), max_age_ms=TELEMETRY_MAX_AGE * 1000)
+    return encode(response)
 
 
-def get_status(ip: str):
+def get_robot_snapshot(ip: str):
+    snapshot = get_snapshot(ip)
+    if snapshot is None:
+        return error("请先连接机器人")
+    return success(data=snapshot, max_age_ms=TELEMETRY_MAX_AGE * 1000)
+
+
+def get_status(ip: str, allow_rpc: bool = True):
+    cached = _cached_response(ip, "robot_status", "message")
+    if cached is not None or not allow_rpc:
+        return cached
+    return _get_status_rpc(ip)
+
+
+@robot_lock
+def _get_status_rpc(ip: str):
     try:
         if ip not in robot_list:
-            return json.dumps({"status": "error", "message": "请先连接机器人"}, ensure_ascii=False)
+            return error("请先连接机器人")
         
         robot_status, ret = robot_list[ip].get_robot_status()
         
@@ -127,21 +265,30 @@ def get_status(ip: str):
                 status_msg = str(robot_status)
             except Exception as e:
                 status_msg = "未知状态"
-            logger.info(f"获取机器人状态成功: {ip}, 状态: {status_msg}")
-            return json.dumps({"status": "success", "message": status_msg}, ensure_ascii=False)
+            record_telemetry(ip, "robot_status", status_msg)
+            logger.info("获取机器人状态成功: %s, 状态: %s", ip, status_msg)
+            return encode({"status": "success", "message": status_msg, **_rpc_source()})
         else:
-            logger.error(f"获取机器人状态失败: {ip}, 错误代码: {ret}")
-            return json.dumps({"status": "error", "message": "获取机器人状态失败"}, ensure_ascii=False)
+            logger.error("获取机器人状态失败: %s, 错误代码: %s", ip, ret)
+            return error("获取机器人状态失败")
             
     except Exception as e:
-        logger.error(f"获取机器人状态时发生异常: {ip}, 异常信息: {str(e)}")
-        return json.dumps({"status": "error", "message": "获取机器人状态时发生异常: 编码错误"}, ensure_ascii=False)
+        logger.error("获取机器人状态时发生异常: %s, 异常信息: %s", ip, e)
+        return error("获取机器人状态时发生异常: 编码错误")
+
 
+def get_controller_info(ip: str, allow_rpc: bool = True):
+    cached = _cached_response(ip, "ctrl_status", "message")
+    if cached is not None or not allow_rpc:
+        return cached
+    return _get_controller_info_rpc(ip)
 
-def get_controller_info(ip: str):
+
+@robot_lock
+def _get_controller_info_rpc(ip: str):
     try:
         if ip not in robot_list:
-            return json.dumps({"status": "error", "message": "请先连接机器人"}, ensure_ascii=False)
+            return error("请先连接机器人")
         
         ctrl_status, ret = robot_list[ip].get_ctrl_status()
         
@@ -150,21 +297,30 @@ def get_controller_info(ip: str):
                 status_msg = str(ctrl_status)
             except Exception as e:
                 status_msg = "未知状态"
-            logger.info(f"获取控制器状态成功: {ip}, 状态: {status_msg}")
-            return json.dumps({"status": "success", "message": status_msg}, ensure_ascii=False)
+            record_telemetry(ip, "ctrl_status", status_msg)
+            logger.info("获取控制器状态成功: %s, 状态: %s", ip, status_msg)
+            return encode({"status": "success", "message": status_msg, **_rpc_source()})
         else:
-            logger.error(f"获取控制器状态失败: {ip}, 错误代码: {ret}")
-            return json.dumps({"status": "error", "message": "获取控制器状态失败"}, ensure_ascii=False)
+            logger.error("获取控制器状态失败: %s, 错误代码: %s", ip, ret)
+            return error("获取控制器状态失败")
             
     except Exception as e:
-        logger.error(f"获取控制器状态时发生异常: {ip}, 异常信息: {str(e)}")
-        return json.dumps({"status": "error", "message": "获取控制器状态时发生异常: 编码错误"}, ensure_ascii=False)
+        logger.error("获取控制器状态时发生异常: %s, 异常信息: %s", ip, e)
+        return error("获取控制器状态时发生异常: 编码错误")
+
+
+def get_current_joint_positions(ip: str, allow_rpc: bool = True):
+    cached = _cached_response(ip, "joint", "positions")
+    if cached is not None or not allow_rpc:
+        return cached
+    return _get_current_joint_positions_rpc(ip)
 
 
-def get_current_joint_positions(ip: str):
+@robot_lock
+def _get_current_joint_positions_rpc(ip: str):
     try:
         if ip not in robot_list:
-            return json.dumps({"status": "error", "message": "请先连接机器人"}, ensure_ascii=False)
+            return error("请先连接机器人")
         
         pose, ret = robot_list[ip].motion.get_current_pose(PoseType.JOINT)
         
@@ -177,21 +333,31 @@ def get_current_joint_positions(ip: str):
                 "j5": pose.joint.j5,
                 "j6": pose.joint.j6
             }
-            logger.info(f"获取关节位置成功: {ip}, 位置: {positions}")
-            return json.dumps({"status": "success", "positions": positions}, ensure_ascii=False)
+            record_telemetry(ip, "joint", positions)
+            logger.info("获取关节位置成功: %s, 位置: %s", ip, positions)
+            return encode({"status": "success", "positions": positions, **_rpc_source()})
         else:
-            logger.error(f"获取关节位置失败: {ip}, 错误代码: {ret}")
-            return json.dumps({"status": "error", "message": "获取关节位置失败"}, ensure_ascii=False)
+            logger.error("获取关节位置失败: %s, 错误代码: %s", ip, ret)
+            return error("获取关节位置失败")
             
     except Exception as e:
-        logger.error(f"获取关节位置时发生异常: {ip}, 异常信息: {str(e)}")
-        return json.dumps({"status": "error", "message": "获取关节位置时发生异常: 编码错误"}, ensure_ascii=False)
+        logger.error("获取关节位置时发生异常: %s, 异常信息: %s", ip, e)
+        return error("获取关节位置时发生异常: 编码错误")
+
+
+def get_current_cartesian_position(ip: str, allow_rpc: bool = True):
+    # RPC响应包含位置和姿态，快照中没有姿态时也走RPC，保证两种来源的响应字段一致
+    cached = _cached_response(ip, "cartesian", None, required=("position", "posture"))
+    if cached is not None or not allow_rpc:
+        return cached
+    return _get_current_cartesian_position_rpc(ip)
 
 
-def get_current_cartesian_position(ip: str):
+@robot_lock
+def _get_current_cartesian_position_rpc(ip: str):
     try:
         if ip not in robot_list:
-            return json.dumps({"status": "error", "message": "请先连接机器人"}, ensure_ascii=False)
+            return error("请先连接机器人")
         
         pose, ret = robot_list[ip].motion.get_current_pose(PoseType.CART)
         
@@ -210,26 +376,25 @@ def get_current_cartesian_position(ip: str):
                 "arm_up_down": pose.cartData.posture.arm_up_down,
                 "wrist_flip": pose.cartData.posture.wrist_flip
             }
-            logger.info(f"获取笛卡尔位置成功: {ip}, 位置: {position}")
-            return json.dumps({"status": "success", "position": position, "posture": posture}, ensure_ascii=False)
+            record_telemetry(ip, "cartesian", {"position": position, "posture": posture})
+            logger.info("获取笛卡尔位置成功: %s, 位置: %s", ip, position)
+            return encode({"status": "success", "position": position, "posture": posture, **_rpc_source()})
         else:
-            logger.error(f"获取笛卡尔位置失败: {ip}, 错误代码: {ret}")
-            return json.dumps({"status": "error", "message": "获取笛卡尔位置失败"}, ensure_ascii=False)
+            logger.error("获取笛卡尔位置失败: %s, 错误代码: %s", ip, ret)
+            return error("获取笛卡尔位置失败")
             
     except Exception as e:
-        logger.error(f"获取笛卡尔位置时发生异常: {ip}, 异常信息: {str(e)}")
-        return json.dumps({"status": "error", "message": "获取笛卡尔位置时发生异常: 编码错误"}, ensure_ascii=False)
+        logger.error("获取笛卡尔位置时发生异常: %s, 异常信息: %s", ip, e)
+        return error("获取笛卡尔位置时发生异常: 编码错误")
 
 
+@robot_lock
 def move_joint(ip, joint_positions, speed=None, accel=None):
-    if speed is None:
-        speed = global_speed
-    if accel is None:
-        accel = global_accel
+    speed, accel = _motion_params(ip, speed, accel)
     
     try:
         if ip not in robot_list:
-            return json.dumps({"status": "error", "message": "请先连接机器人"}, ensure_ascii=False)
+            return error("请先连接机器人")
         
         pose = MotionPose()
         pose.pt = PoseType.JOINT
@@ -239,26 +404,26 @@ def move_joint(ip, joint_positions, speed=None, accel=None):
         ret = robot_list[ip].motion.move_line(pose, speed, accel)
         
         if ret == StatusCodeEnum.OK:
-            logger.info(f"关节运动指令发送成功: {ip}, 目标位置: {joint_positions}")
-            return json.dumps({"status": "success", "message": "关节运动指令发送成功"}, ensure_ascii=False)
+            mark_robot_ready(ip)
+            logger.info("关节运动指令发送成功: %s, 目标位置: %s", ip, joint_positions)
+            return success(message="关节运动指令发送成功")
         else:
-            logger.error(f"关节运动指令发送失败: {ip}, 错误代码: {ret}")
-            return json.dumps({"status": "error", "message": "关节运动指令发送失败"}, ensure_ascii=False)
+            invalidate_robot_ready(ip)
+            logger.error("关节运动指令发送失败: %s, 错误代码: %s", ip, ret)
+            return error("关节运动指令发送失败")
             
     except Exception as e:
-        logger.error(f"关节运动时发生异常: {ip}, 异常信息: {str(e)}")
-        return json.dumps({"status": "error", "message": f"关节运动时发生异常: {str(e)}"}, ensure_ascii=False)
+        logger.error("关节运动时发生异常: %s, 异常信息: %s", ip, e)
+        return error(f"关节运动时发生异常: {str(e)}")
 
 
+@robot_lock
 def move_cartesian(ip, position, posture=None, speed=None, accel=None):
-    if speed is None:
-        speed = global_speed
-    if accel is None:
-        accel = global_accel
+    speed, accel = _motion_params(ip, speed, accel)
     
     try:
         if ip not in robot_list:
-            return json.dumps({"status": "error", "message": "请先连接机器人"}, ensure_ascii=False)
+            return error("请先连接机器人")
         
         pose = MotionPose()
         pose.pt = PoseType.CART
@@ -276,59 +441,90 @@ def move_cartesian(ip, position, posture=None, speed=None, accel=None):
         ret = robot_list[ip].motion.move_line(pose, speed, accel)
         
         if ret == StatusCodeEnum.OK:
-            logger.info(f"笛卡尔运动指令发送成功: {ip}, 目标位置: {position}")
-            return json.dumps({"status": "success", "message": "笛卡尔运动指令发送成功"}, ensure_ascii=False)
+            mark_robot_ready(ip)
+            logger.info("笛卡尔运动指令发送成功: %s, 目标位置: %s", ip, position)
+            return success(message="笛卡尔运动指令发送成功")
         else:
-            logger.error(f"笛卡尔运动指令发送失败: {ip}, 错误代码: {ret}")
-            return json.dumps({"status": "error", "message": "笛卡尔运动指令发送失败"}, ensure_ascii=False)
+            invalidate_robot_ready(ip)
+            logger.error("笛卡尔运动指令发送失败: %s, 错误代码: %s", ip, ret)
+            return error("笛卡尔运动指令发送失败")
             
     except Exception as e:
-        logger.error(f"笛卡尔运动时发生异常: {ip}, 异常信息: {str(e)}")
-        return json.dumps({"status": "error", "message": f"笛卡尔运动时发生异常: {str(e)}"}, ensure_ascii=False)
+        logger.error("笛卡尔运动时发生异常: %s, 异常信息: %s", ip, e)
+        return error(f"笛卡尔运动时发生异常: {str(e)}")
+
 
+def move_joint_when_ready(ip, joint_positions, speed=None, accel=None):
+    """在同一次租用中检查就绪状态并发送关节运动指令，未就绪时返回就绪检查的错误而不发送"""
+    with robot_list.lease(ip):
+        ready = check_robot_ready(ip)
+        if json.loads(ready)["status"] != "success":
+            return ready
+        return move_joint(ip, joint_positions, speed, accel)
 
+
+def move_cartesian_when_ready(ip, position, posture=None, speed=None, accel=None):
+    """在同一次租用中检查就绪状态并发送笛卡尔运动指令，未就绪时返回就绪检查的错误而不发送"""
+    with robot_list.lease(ip):
+        ready = check_robot_ready(ip)
+        if json.loads(ready)["status"] != "success":
+            return ready
+        return move_cartesian(ip, position, posture, speed, accel)
+
+
+@robot_lock
 def power_off_robot(ip: str):
     try:
         if ip not in robot_list:
-            return json.dumps({"status": "error", "message": "请先连接机器人"}, ensure_ascii=False)
+            return error("请先连接机器人")
         
         ret = robot_list[ip].servo_off()
+        invalidate_robot_ready(ip)
         
         if ret == StatusCodeEnum.OK:
-            logger.info(f"机器人断电成功: {ip}")
-            return json.dumps({"status": "success", "message": "机器人断电成功"}, ensure_ascii=False)
+            logger.info("机器人断电成功: %s", ip)
+            return success(message="机器人断电成功")
         else:
-            logger.error(f"机器人断电失败: {ip}, 错误代码: {ret}")
-            return json.dumps({"status": "error", "message": "机器人断电失败"}, ensure_ascii=False)
+            logger.error("机器人断电失败: %s, 错误代码: %s", ip, ret)
+            return error("机器人断电失败")
             
     except Exception as e:
-        logger.error(f"机器人断电时发生异常: {ip}, 异常信息: {str(e)}")
-        return json.dumps({"status": "error", "message": "机器人断电时发生异常: 编码错误"}, ensure_ascii=False)
+        logger.error("机器人断电时发生异常: %s, 异常信息: %s", ip, e)
+        return error("机器人断电时发生异常: 编码错误")
 
 
+@robot_lock
 def power_on_robot(ip: str):
     try:
         if ip not in robot_list:
-            return json.dumps({"status": "error", "message": "请先连接机器人"}, ensure_ascii=False)
+            return error("请先连接机器人")
         
         ret = robot_list[ip].servo_on()
         
         if ret == StatusCodeEnum.OK:
-            logger.info(f"机器人上电成功: {ip}")
-            return json.dumps({"status": "success", "message": "机器人上电成功"}, ensure_ascii=False)
+            logger.info("机器人上电成功: %s", ip)
+            return success(message="机器人上电成功")
         else:
-            logger.error(f"机器人上电失败: {ip}, 错误代码: {ret}")
-            return json.dumps({"status": "error", "message": "机器人上电失败"}, ensure_ascii=False)
+            logger.error("机器人上电失败: %s, 错误代码: %s", ip, ret)
+            return error("机器人上电失败")
             
     except Exception as e:
-        logger.error(f"机器人上电时发生异常: {ip}, 异常信息: {str(e)}")
-        return json.dumps({"status": "error", "message": "机器人上电时发生异常: 编码错误"}, ensure_ascii=False)
+        logger.error("机器人上电时发生异常: %s, 异常信息: %s", ip, e)
+        return error("机器人上电时发生异常: 编码错误")
+
+
+def get_servo_status(ip: str, allow_rpc: bool = True):
+    cached = _cached_response(ip, "servo_status", "message")
+    if cached is not None or not allow_rpc:
+        return cached
+    return _get_servo_status_rpc(ip)
 
 
-def get_servo_status(ip: str):
+@robot_lock
+def _get_servo_status_rpc(ip: str):
     try:
         if ip not in robot_list:
-            return json.dumps({"status": "error", "message": "请先连接机器人"}, ensure_ascii=False)
+            return error("请先连接机器人")
         
         servo_status, ret = robot_list[ip].get_servo_status()
         
@@ -337,21 +533,23 @@ def get_servo_status(ip: str):
                 status_msg = str(servo_status)
             except Exception as e:
                 status_msg = "未知状态"
-            logger.info(f"获取伺服控制器状态成功: {ip}, 状态: {status_msg}")
-            return json.dumps({"status": "success", "message": status_msg}, ensure_ascii=False)
+            record_telemetry(ip, "servo_status", status_msg)
+            logger.info("获取伺服控制器状态成功: %s, 状态: %s", ip, status_msg)
+            return encode({"status": "success", "message": status_msg, **_rpc_source()})
         else:
-            logger.error(f"获取伺服控制器状态失败: {ip}, 错误代码: {ret}")
-            return json.dumps({"status": "error", "message": "获取伺服控制器状态失败"}, ensure_ascii=False)
+            logger.error("获取伺服控制器状态失败: %s, 错误代码: %s", ip, ret)
+            return error("获取伺服控制器状态失败")
             
     except Exception as e:
-        logger.error(f"获取伺服控制器状态时发生异常: {ip}, 异常信息: {str(e)}")
-        return json.dumps({"status": "error", "message": "获取伺服控制器状态时发生异常: 编码错误"}, ensure_ascii=False)
+        logger.error("获取伺服控制器状态时发生异常: %s, 异常信息: %s", ip, e)
+        return error("获取伺服控制器状态时发生异常: 编码错误")
 
 
+@robot_lock
 def get_robot_info(ip: str):
     try:
         if ip not in robot_list:
-            return json.dumps({"status": "error", "message": "请先连接机器人"}, ensure_ascii=False)
+            return error("请先连接机器人")
         
         model_info, ret = robot_list[ip].get_arm_model_info()
         
@@ -360,69 +558,73 @@ def get_robot_info(ip: str):
                 model_str = str(model_info)
             except Exception as e:
                 model_str = "未知型号"
-            logger.info(f"获取机器人型号成功: {ip}, 型号: {model_str}")
-            return json.dumps({"status": "success", "model": model_str}, ensure_ascii=False)
+            logger.info("获取机器人型号成功: %s, 型号: %s", ip, model_str)
+            return success(model=model_str)
         else:
-            logger.error(f"获取机器人型号失败: {ip}, 错误代码: {ret}")
-            return json.dumps({"status": "error", "message": "获取机器人型号失败"}, ensure_ascii=False)
+            logger.error("获取机器人型号失败: %s, 错误代码: %s", ip, ret)
+            return error("获取机器人型号失败")
             
     except Exception as e:
-        logger.error(f"获取机器人型号时发生异常: {ip}, 异常信息: {str(e)}")
-        return json.dumps({"status": "error", "message": "获取机器人型号时发生异常: 编码错误"}, ensure_ascii=False)
+        logger.error("获取机器人型号时发生异常: %s, 异常信息: %s", ip, e)
+        return error("获取机器人型号时发生异常: 编码错误")
 
 
+@robot_lock
 def servo_reset(ip: str):
     try:
         if ip not in robot_list:
-            return json.dumps({"status": "error", "message": "请先连接机器人"}, ensure_ascii=False)
+            return error("请先连接机器人")
         
         ret = robot_list[ip].servo_reset()
+        invalidate_robot_ready(ip)
         
         if ret == StatusCodeEnum.OK:
-            logger.info(f"伺服复位成功: {ip}")
-            return json.dumps({"status": "success", "message": "伺服复位成功"}, ensure_ascii=False)
+            logger.info("伺服复位成功: %s", ip)
+            return success(message="伺服复位成功")
         else:
-            logger.error(f"伺服复位失败: {ip}, 错误代码: {ret}")
-            return json.dumps({"status": "error", "message": "伺服复位失败"}, ensure_ascii=False)
+            logger.error("伺服复位失败: %s, 错误代码: %s", ip, ret)
+            return error("伺服复位失败")
             
     except Exception as e:
-        logger.error(f"伺服复位时发生异常: {ip}, 异常信息: {str(e)}")
-        return json.dumps({"status": "error", "message": "伺服复位时发生异常: 编码错误"}, ensure_ascii=False)
+        logger.error("伺服复位时发生异常: %s, 异常信息: %s", ip, e)
+        return error("伺服复位时发生异常: 编码错误")
 
 
+@robot_lock
 def acquire_access(ip: str):
     try:
         if ip not in robot_list:
-            return json.dumps({"status": "error", "message": "请先连接机器人"}, ensure_ascii=False)
+            return error("请先连接机器人")
         
         ret = robot_list[ip].acquire_access()
         
         if ret == StatusCodeEnum.OK:
-            logger.info(f"获取操作权限成功: {ip}")
-            return json.dumps({"status": "success", "message": "获取操作权限成功"}, ensure_ascii=False)
+            logger.info("获取操作权限成功: %s", ip)
+            return success(message="获取操作权限成功")
         else:
-            logger.error(f"获取操作权限失败: {ip}, 错误代码: {ret}")
-            return json.dumps({"status": "error", "message": "获取操作权限失败"}, ensure_ascii=False)
+            logger.error("获取操作权限失败: %s, 错误代码: %s", ip, ret)
+            return error("获取操作权限失败")
             
     except Exception as e:
-        logger.error(f"获取操作权限时发生异常: {ip}, 异常信息: {str(e)}")
-        return json.dumps({"status": "error", "message": "获取操作权限时发生异常: 编码错误"}, ensure_ascii=False)
+        logger.error("获取操作权限时发生异常: %s, 异常信息: %s", ip, e)
+        return error("获取操作权限时发生异常: 编码错误")
 
 
+@robot_lock
 def release_access(ip: str):
     try:
         if ip not in robot_list:
-            return json.dumps({"status": "error", "message": "请先连接机器人"}, ensure_ascii=False)
+            return error("请先连接机器人")
         
         ret = robot_list[ip].release_access()
         
         if ret == StatusCodeEnum.OK:
-            logger.info(f"返还操作权限成功: {ip}")
-            return json.dumps({"status": "success", "message": "返还操作权限成功"}, ensure_ascii=False)
+            logger.info("返还操作权限成功: %s", ip)
+            return success(message="返还操作权限成功")
         else:
-            logger.error(f"返还操作权限失败: {ip}, 错误代码: {ret}")
-            return json.dumps({"status": "error", "message": "返还操作权限失败"}, ensure_ascii=False)
+            logger.error("返还操作权限失败: %s, 错误代码: %s", ip, ret)
+            return error("返还操作权限失败")
             
     except Exception as e:
-        logger.error(f"返还操作权限时发生异常: {ip}, 异常信息: {str(e)}")
-        return json.dumps({"status": "error", "message": "返还操作权限时发生异常: 编码错误"}, ensure_ascii=False)
+        logger.error("返还操作权限时发生异常: %s, 异常信息: %s", ip, e)
+        return error("返还操作权限时发生异常: 编码错误")
@@ -0,0 +1,77 @@
+# -*- coding: utf-8 -*-
+"""捷勃特SDK类型的统一入口
+
+已安装 Agilebot SDK 时导出SDK中的类型；未安装时导出 sim_types 中的替代类型，
+此时只能使用模拟器后端（AGILEBOT_MCP_BACKEND=sim）。
+
+SDK子模块在第一次访问其中的类型时才导入（PEP 562 模块级 __getattr__），
+这样服务器启动时不加载SDK，某一类工具第一次被调用时只加载它用到的子模块，
+例如 flyshot 只在使用负载工具时导入。
+"""
+import importlib
+import importlib.util
+
+# 类型名 -> 所在的SDK子模块
+_SDK_MODULES = {
+    "Arm": "Agilebot.IR.A.arm",
+    "HardwareState": "Agilebot.IR.A.hardware_state",
+    "StatusCodeEnum": "Agilebot.IR.A.status_code",
+    "PoseType": "Agilebot.IR.A.sdk_types",
+    "ModbusChannel": "Agilebot.IR.A.sdk_types",
+    "CoordinateSystemType": "Agilebot.IR.A.sdk_types",
+    "MotionPose": "Agilebot.IR.A.sdk_classes",
+    "Posture": "Agilebot.IR.A.sdk_classes",
+    "PoseRegister": "Agilebot.IR.A.sdk_classes",
+    "GeometryPose": "Agilebot.IR.A.sdk_classes",
+    "CoordinateInfo": "Agilebot.IR.A.sdk_classes",
+    "Translation": "Agilebot.IR.A.sdk_classes",
+    "Rotation": "Agilebot.IR.A.sdk_classes",
+    "Payload": "Agilebot.IR.A.flyshot",
+    "BasScript": "Agilebot.IR.A.bas_script",
+    "AssignType": "Agilebot.IR.A.script_types",
+    "OtherType": "Agilebot.IR.A.script_types",
+    "MovePoseType": "Agilebot.IR.A.script_types",
+    "SpeedType": "Agilebot.IR.A.script_types",
+    "SmoothType": "Agilebot.IR.A.script_types",
+    "ValueType": "Agilebot.IR.A.script_types",
+    "FileManager": "Agilebot.IR.A.file_manager",
+    "USER_PROGRAM": "Agilebot.IR.A.file_manager",
+    "ROBOT_TMP": "Agilebot.IR.A.file_manager",
+    "TRAJECTORY": "Agilebot.IR.A.file_manager",
+    "TRAJECTORY_CSV": "Agilebot.IR.A.file_manager",
+}
+# 只有连接真实控制柜才需要的类型，未安装SDK时为 None
+_SDK_ONLY = ("Arm", "HardwareState", "FileManager")
+
+# 只查找包而不导入，不会加载SDK
+SDK_AVAILABLE = importlib.util.find_spec("Agilebot") is not None
+
+__all__ = ["SDK_AVAILABLE", "failure_code", *_SDK_MODULES]
+
+
+def __getattr__(name):
+    module_name = _SDK_MODULES.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    if SDK_AVAILABLE:
+        value = getattr(importlib.import_module(module_name), name)
+    elif name in _SDK_ONLY:
+        value = None
+    else:
+        value = getattr(importlib.import_module(".sim_types", __package__), name)
+    # 缓存到模块字典，之后的访问不再经过 __getattr__
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_SDK_MODULES))
+
+
+def failure_code():
+    """返回一个表示失败的状态码，供模拟器注入故障时使用"""
+    status_code_enum = __getattr__("StatusCodeEnum")
+    failed = getattr(status_code_enum, "FAIL", None)
+    if failed is not None:
+        return failed
+    return next(code for code in status_code_enum if code != status_code_enum.OK)
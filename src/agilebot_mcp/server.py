@@ -1,45 +1,117 @@
 # -*- coding: utf-8 -*-
+import asyncio
+import importlib
 import logging
-from logging.handlers import RotatingFileHandler
-from pathlib import Path
 import sys
 import os
+import signal
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import anyio
+
+from .logging_setup import configure_logging, stop_logging
 
 os.environ['PYTHONIOENCODING'] = 'utf-8'
 os.environ['PYTHONUTF8'] = '1'
 sys.stdout.reconfigure(encoding='utf-8')
 sys.stderr.reconfigure(encoding='utf-8')
 
-log_dir = Path("logs")
-log_dir.mkdir(parents=True, exist_ok=True)
-handler = RotatingFileHandler(
-    str(log_dir / "agilebot_mcp_server.log"),
-    maxBytes=1024 * 1024,
-    backupCount=3,
-    encoding="utf-8"
-)
-formatter = logging.Formatter("%(asctime)s - %(name)s - %(levelname)s - %(message)s")
-handler.setFormatter(formatter)
-
+configure_logging()
 logger = logging.getLogger()
-logger.addHandler(handler)
-logger.setLevel(logging.INFO)
 
-from .robot_core import cleanup_robot_connections
+from .executor import robot_executor
 from .mcp_tools import mcp
 
+# stdio: 每个客户端启动一个服务器进程；sse: 一个服务器进程通过HTTP同时服务多个客户端，共享机器人连接和缓存
+TRANSPORT = os.environ.get("AGILEBOT_MCP_TRANSPORT", "stdio")
+HOST = os.environ.get("AGILEBOT_MCP_HOST", "127.0.0.1")
+PORT = int(os.environ.get("AGILEBOT_MCP_PORT", "8000"))
+# asyncio.to_thread 使用的线程数（SDK导入、文件读写、批量操作等非机器人调用），为空时使用 asyncio 的默认值
+WORKERS = os.environ.get("AGILEBOT_MCP_WORKERS")
+TRANSPORTS = ("stdio", "sse")
+# SSE服务器停止时等待客户端连接关闭的最长时间（秒）
+SHUTDOWN_TIMEOUT = 3
+
+
+def _loaded(name):
+    """返回已经导入的工具实现模块，没有导入过（对应工具从未被调用）时返回 None"""
+    return sys.modules.get(f"{__package__}.{name}")
+
+
+def _load_inventory():
+    """在后台线程中导入SDK并按清单连接机器人，不推迟服务器启动"""
+    try:
+        importlib.import_module(".inventory", __package__).start_bootstrap()
+    except Exception as e:
+        logger.error("加载机器人清单失败: %s", e)
+
+
+async def _serve_sse():
+    """在同一个进程中通过SSE服务所有客户端
+
+    只使用一个 uvicorn 进程：多进程会让每个进程各自连接机器人，失去共享连接的意义。
+    uvicorn 的日志交给本服务的日志配置处理，不单独配置。客户端保持打开的SSE连接不会自行结束，
+    停止时最多等待 SHUTDOWN_TIMEOUT 秒后强制关闭，保证之后能断开机器人连接。
+    """
+    import uvicorn
+
+    config = uvicorn.Config(mcp.sse_app(), host=HOST, port=PORT, log_config=None, access_log=False,
+                            log_level=mcp.settings.log_level.lower(), timeout_graceful_shutdown=SHUTDOWN_TIMEOUT)
+    logger.info("SSE服务地址: http://%s:%s%s", HOST, PORT, mcp.settings.sse_path)
+    await uvicorn.Server(config).serve()
+
+
+def _terminate(signum, frame):
+    # uvicorn 停止后会重新发出收到的信号，按默认处理会直接结束进程，跳过断开机器人连接等清理
+    raise SystemExit(0)
+
+
+async def _serve(transport):
+    if WORKERS:
+        asyncio.get_running_loop().set_default_executor(
+            ThreadPoolExecutor(max_workers=int(WORKERS), thread_name_prefix="mcp-worker"))
+    if transport == "sse":
+        await _serve_sse()
+    else:
+        await mcp.run_stdio_async()
+
+
 def main():
+    if TRANSPORT not in TRANSPORTS:
+        logger.error("未知的传输方式: %s，可选: %s", TRANSPORT, ", ".join(TRANSPORTS))
+        stop_logging()
+        sys.exit(2)
     logger.info("Agilebot MCP Server 启动")
-    logger.info("MCP服务器启动中...")
+    logger.info("MCP服务器启动中..., 传输方式: %s", TRANSPORT)
+    if os.environ.get("AGILEBOT_MCP_INVENTORY"):
+        threading.Thread(target=_load_inventory, name="inventory-load", daemon=True).start()
+    signal.signal(signal.SIGTERM, _terminate)
     try:
-        mcp.run()
+        anyio.run(_serve, TRANSPORT)
     except KeyboardInterrupt:
         logger.info("用户中断，MCP服务器停止")
     except Exception as e:
-        logger.error(f"MCP服务器运行时发生异常: {str(e)}")
+        logger.error("MCP服务器运行时发生异常: %s", e)
     finally:
-        cleanup_robot_connections()
+        health = _loaded("health")
+        if health is not None:
+            health.health_monitor.stop()
+        jobs = _loaded("jobs")
+        if jobs is not None:
+            jobs.cancel_all_jobs()
+        modbus_poll = _loaded("modbus_poll")
+        if modbus_poll is not None:
+            modbus_poll.poll_scheduler.stop()
+        recorder = _loaded("recorder")
+        if recorder is not None:
+            recorder.stop_all_recordings()
+        robot_executor.shutdown(wait=False)
+        robot_core = _loaded("robot_core")
+        if robot_core is not None:
+            robot_core.cleanup_robot_connections()
         logger.info("MCP服务器已停止")
+        stop_logging()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,176 @@
+# -*- coding: utf-8 -*-
+"""未安装捷勃特SDK时使用的替代数据类型
+
+只实现服务器和模拟器用到的字段，名称与 Agilebot.IR.A 中的同名类型保持一致。
+"""
+from enum import Enum, IntEnum
+
+
+class StatusCodeEnum(Enum):
+    OK = (0, "成功")
+    FAIL = (-1, "失败")
+    TIMEOUT = (-2, "超时")
+    NOT_CONNECTED = (-3, "未连接")
+
+    @property
+    def code(self):
+        return self.value[0]
+
+    @property
+    def errmsg(self):
+        return self.value[1]
+
+
+# FileManager 的文件类型
+USER_PROGRAM = "user_program"
+ROBOT_TMP = "robot_tmp"
+TRAJECTORY = "trajectory"
+TRAJECTORY_CSV = "trajectory_csv"
+
+
+class _IntEnum(IntEnum):
+    def __str__(self):
+        return f"{type(self).__name__}.{self.name}"
+
+
+class PoseType(_IntEnum):
+    JOINT = 0
+    CART = 1
+
+
+class ModbusChannel(_IntEnum):
+    CONTROLLER_485 = 0
+    CONTROLLER_TCP = 1
+    CONTROLLER_TCP_TO_485 = 2
+    END_485 = 3
+
+
+class CoordinateSystemType(_IntEnum):
+    UserFrame = 0
+    ToolFrame = 1
+
+
+class _Fields:
+    _fields = ()
+
+    def __init__(self, *args, **kwargs):
+        for name, value in zip(self._fields, args):
+            setattr(self, name, value)
+        for name in self._fields[len(args):]:
+            setattr(self, name, kwargs.pop(name, 0))
+        if kwargs:
+            raise TypeError(f"{type(self).__name__} 不支持的字段: {', '.join(kwargs)}")
+
+    def __repr__(self):
+        values = ", ".join(f"{name}={getattr(self, name)!r}" for name in self._fields)
+        return f"{type(self).__name__}({values})"
+
+
+class Joint(_Fields):
+    _fields = ("j1", "j2", "j3", "j4", "j5", "j6")
+
+
+class Position(_Fields):
+    _fields = ("x", "y", "z", "a", "b", "c")
+
+
+class Posture(_Fields):
+    _fields = ("arm_back_front", "arm_left_right", "arm_up_down", "wrist_flip")
+
+
+class CartData:
+    def __init__(self):
+        self.position = Position()
+        self.posture = Posture()
+
+
+class MotionPose:
+    def __init__(self):
+        self.pt = PoseType.JOINT
+        self.joint = Joint()
+        self.cartData = CartData()
+
+
+class PoseRegister:
+    def __init__(self):
+        self.id = 0
+        self.name = ""
+        self.comment = ""
+        self.poseRegisterData = MotionPose()
+
+
+class CoordinateInfo(_Fields):
+    _fields = ("coordinate_id", "name", "comment", "group_id")
+
+
+class Translation(_Fields):
+    _fields = ("x", "y", "z")
+
+
+class Rotation(_Fields):
+    _fields = ("r", "p", "y")
+
+
+class GeometryPose:
+    def __init__(self, coordinate_info=None, position=None, orientation=None):
+        self.coordinate_info = coordinate_info if coordinate_info is not None else CoordinateInfo()
+        self.position = position if position is not None else Translation()
+        self.orientation = orientation if orientation is not None else Rotation()
+
+
+class DHParam(_Fields):
+    """get_DH_param 返回的一个关节的DH参数（模拟器使用，服务器只读取字段）"""
+    _fields = ("id", "a", "alpha", "d", "offset")
+
+
+class Payload(_Fields):
+    _fields = ("id", "m_load", "lcx_load", "lcy_load", "lcz_load", "Ixx_load", "Iyy_load", "Izz_load", "comment")
+
+
+# BAS脚本（Agilebot.IR.A.script_types）中用到的枚举
+class AssignType(_IntEnum):
+    R = 0
+    MR = 1
+
+
+class OtherType(_IntEnum):
+    VALUE = 0
+
+
+class MovePoseType(_IntEnum):
+    PR = 0
+
+
+class SpeedType(_IntEnum):
+    VALUE = 0
+
+
+class SmoothType(_IntEnum):
+    SMOOTH_DISTANCE = 0
+
+
+class ValueType(_IntEnum):
+    VALUE = 0
+
+
+class BasScript:
+    """按顺序记录脚本指令，模拟器的 execute_bas_script 逐条解释执行"""
+
+    def __init__(self, name=""):
+        self.name = name
+        self.commands = []
+
+    def _add(self, op, **args):
+        self.commands.append((op, args))
+        return StatusCodeEnum.OK
+
+    def assign_value(self, assign_type, assign_index, value_type, value):
+        return self._add("assign_value", assign_type=assign_type, assign_index=assign_index, value_type=value_type,
+                         value=value)
+
+    def move_joint(self, pose_type, pose_index, speed_type, speed_value, smooth_type=None, smooth_distance=0):
+        return self._add("move_joint", pose_type=pose_type, pose_index=pose_index, speed_type=speed_type,
+                         speed_value=speed_value, smooth_type=smooth_type, smooth_distance=smooth_distance)
+
+    def wait_time(self, value_type, value):
+        return self._add("wait_time", value_type=value_type, value=value)
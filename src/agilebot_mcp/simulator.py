@@ -0,0 +1,989 @@
+# -*- coding: utf-8 -*-
+"""模拟机器人后端
+
+SimArm 实现了服务器用到的 Arm 接口（motion、register、modbus、coordinate_system、
+motion.payload、trajectory、execution（BAS脚本）、状态查询和锁轴设置），SimFileManager 实现 FileManager 的上传、下载、
+搜索和删除，不依赖控制柜，用于离线基准测试和回归测试。
+同一IP的状态（寄存器、Modbus存储区、坐标系、负载等）在断开重连后保留。
+simulate_reboot 模拟控制柜重启：重启前建立的连接和状态订阅全部失效，停机期间无法连接。
+每次调用的延迟和故障率可通过 configure_simulator 或环境变量配置。
+"""
+import fnmatch
+import functools
+import math
+import os
+import random
+import threading
+import time
+
+from .sdk import (
+    StatusCodeEnum, PoseType, MotionPose, PoseRegister, GeometryPose,
+    CoordinateInfo, Translation, Rotation, Payload, failure_code
+)
+from . import sdk
+from .sim_types import DHParam
+
+MODBUS_MAX_NUMBER = 120
+# 模拟机器人的DH参数（standard DH）: a（mm）、alpha（度）、d（mm）、offset（度）
+SIM_DH = (
+    (50.0, -90.0, 330.0, 0.0),
+    (330.0, 0.0, 0.0, -90.0),
+    (35.0, -90.0, 0.0, 0.0),
+    (0.0, 90.0, 335.0, 0.0),
+    (0.0, -90.0, 0.0, 0.0),
+    (0.0, 0.0, 80.0, 0.0),
+)
+
+
+class SimConfig:
+    """模拟器的延迟与故障注入配置
+
+    latency: 每次调用的固定延迟（秒）
+    jitter: 在固定延迟上叠加的 [0, jitter) 随机延迟（秒）
+    failure_rate: 调用返回失败状态码的概率
+    failure_methods: 只对这些方法名注入故障，None 表示所有方法
+    telemetry_period: 模拟状态订阅的推送周期（秒）
+    offline_prepare_time: 离线轨迹准备（运动到起始位姿）所需的时间（秒）
+    offline_run_time: 离线轨迹执行所需的时间（秒）
+    file_transfer_rate: 文件上传/下载速度（字节/秒），0 表示不按文件大小计时
+    connect_time: 建立连接额外需要的时间（秒）
+    """
+
+    def __init__(self):
+        self.latency = float(os.environ.get("AGILEBOT_MCP_SIM_LATENCY", "0"))
+        self.jitter = float(os.environ.get("AGILEBOT_MCP_SIM_JITTER", "0"))
+        self.failure_rate = float(os.environ.get("AGILEBOT_MCP_SIM_FAILURE_RATE", "0"))
+        self.failure_methods = None
+        self.telemetry_period = 0.05
+        self.offline_prepare_time = 0.5
+        self.offline_run_time = 1.0
+        self.file_transfer_rate = 0
+        self.connect_time = 0
+        self._random = random.Random()
+
+    def seed(self, value):
+        self._random.seed(value)
+
+    def inject(self, method):
+        """按配置等待，返回本次调用是否应当失败"""
+        delay = self.latency
+        if self.jitter:
+            delay += self._random.uniform(0, self.jitter)
+        if delay > 0:
+            time.sleep(delay)
+        if self.failure_rate <= 0:
+            return False
+        if self.failure_methods is not None and method not in self.failure_methods:
+            return False
+        return self._random.random() < self.failure_rate
+
+
+sim_config = SimConfig()
+
+
+def configure_simulator(**kwargs):
+    """修改模拟器配置，例如 configure_simulator(latency=0.005, failure_rate=0.01)"""
+    for name, value in kwargs.items():
+        if name == "seed":
+            sim_config.seed(value)
+        elif name in ("latency", "jitter", "failure_rate", "failure_methods", "telemetry_period",
+                      "offline_prepare_time", "offline_run_time", "file_transfer_rate", "connect_time"):
+            setattr(sim_config, name, value)
+        else:
+            raise ValueError(f"未知的模拟器配置项: {name}")
+    return sim_config
+
+
+def _new_payload(**fields):
+    payload = Payload()
+    for name in ("id", "m_load", "lcx_load", "lcy_load", "lcz_load", "Ixx_load", "Iyy_load", "Izz_load"):
+        setattr(payload, name, fields.get(name, 0))
+    payload.comment = fields.get("comment", b"")
+    return payload
+
+
+class SimStatus:
+    """模拟的状态枚举值，str() 与SDK状态枚举一样返回状态名"""
+
+    def __init__(self, name):
+        self.name = name
+        self.msg = name
+
+    def __str__(self):
+        return self.name
+
+    def __repr__(self):
+        return f"SimStatus({self.name})"
+
+    def __eq__(self, other):
+        return str(self) == str(other)
+
+    def __hash__(self):
+        return hash(self.name)
+
+
+class SimController:
+    """一台模拟控制柜的全部状态"""
+
+    def __init__(self, ip):
+        self.ip = ip
+        self.lock = threading.RLock()
+        self.connections = 0
+        self.ctrl_status = "CTRL_RUNNING"
+        self.servo_status = "SERVO_DISABLE"
+        self.robot_status = "ROBOT_IDLE"
+        self.model = "SIM-6"
+        self.access = False
+        self.dh = [list(row) for row in SIM_DH]
+        self.joint = [0.0] * 6
+        self.cartesian, self.posture = sim_forward(self.dh, self.joint)
+        self.registers = {"R": {}, "MR": {}, "SR": {}, "MH": {}, "MI": {}, "PR": {}}
+        self.modbus = {}
+        self.frames = {0: {}, 1: {}}
+        self.payloads = {0: _new_payload(id=0, comment=b"default")}
+        self.current_payload = 0
+        self.payload_identify_state = "IDLE"
+        self.drag = {
+            "cart": dict.fromkeys(("x", "y", "z", "a", "b", "c"), True),
+            "joint": dict.fromkeys(("j1", "j2", "j3", "j4", "j5", "j6"), True),
+            "is_continuous_drag": False,
+        }
+        self.drag_enabled = False
+        self.offline_file = None
+        self.offline_state = "IDLE"
+        self._offline_timer = None
+        # (文件类型, 文件名) -> 文件内容
+        self.files = {}
+        # 每次重启加1，之前建立的连接随之失效
+        self.session = 0
+        self.down_until = 0.0
+
+    def online(self, session=None):
+        """控制柜是否在线；给出 session 时还要求该连接建立在最近一次重启之后"""
+        if time.monotonic() < self.down_until:
+            return False
+        return session is None or session == self.session
+
+    def reboot(self, downtime):
+        """模拟重启：停机 downtime 秒，已有连接失效，运动和伺服状态复位"""
+        with self.lock:
+            if self._offline_timer is not None:
+                self._offline_timer.cancel()
+                self._offline_timer = None
+            self.session += 1
+            self.down_until = time.monotonic() + downtime
+            self.connections = 0
+            self.ctrl_status = "CTRL_RUNNING"
+            self.servo_status = "SERVO_DISABLE"
+            self.robot_status = "ROBOT_IDLE"
+            self.offline_state = "IDLE"
+            self.access = False
+            self.drag_enabled = False
+
+    def run_for(self, seconds, state):
+        """机器人进入运行状态，seconds 秒后回到空闲，离线轨迹进入 state 状态"""
+        with self.lock:
+            if self._offline_timer is not None:
+                self._offline_timer.cancel()
+            self.robot_status = "ROBOT_RUNNING"
+            self.servo_status = "SERVO_RUNNING"
+            self._offline_timer = timer = threading.Timer(seconds, self._finish_run, args=(state,))
+            timer.daemon = True
+            timer.start()
+
+    def _finish_run(self, state):
+        with self.lock:
+            self._offline_timer = None
+            if self.ctrl_status == "CTRL_ESTOP":
+                return
+            self.robot_status = "ROBOT_IDLE"
+            self.servo_status = "SERVO_IDLE"
+            self.offline_state = state
+
+    def trigger_estop(self):
+        """模拟急停：控制器进入 CTRL_ESTOP，伺服断电，直到 servo_reset"""
+        with self.lock:
+            if self._offline_timer is not None:
+                self._offline_timer.cancel()
+                self._offline_timer = None
+            self.ctrl_status = "CTRL_ESTOP"
+            self.servo_status = "SERVO_DISABLE"
+            self.robot_status = "ROBOT_IDLE"
+            self.offline_state = "IDLE"
+
+    def modbus_memory(self, channel, slave_id):
+        """返回某个从机的存储区 {"coils", "holding_regs", "discrete_inputs", "input_regs"}，可直接修改"""
+        with self.lock:
+            return self.modbus.setdefault((int(channel), slave_id), {
+                "coils": {}, "holding_regs": {}, "discrete_inputs": {}, "input_regs": {}
+            })
+
+    def snapshot(self):
+        with self.lock:
+            return {
+                "robot_status": self.robot_status,
+                "servo_status": self.servo_status,
+                "ctrl_status": self.ctrl_status,
+                "joint_position": list(self.joint),
+                "cart_position": {"position": dict(zip(("x", "y", "z", "a", "b", "c"), self.cartesian)),
+                                  "posture": dict(zip(("arm_back_front", "arm_left_right", "arm_up_down",
+                                                       "wrist_flip"), self.posture))},
+            }
+
+
+def _matmul(left, right):
+    return [[sum(left[row][k] * right[k][column] for k in range(4)) for column in range(4)] for row in range(4)]
+
+
+def _matrix_pose(matrix):
+    """齐次变换矩阵 -> [x, y, z, a, b, c]，R = Rz(c)·Ry(b)·Rx(a)"""
+    b = math.atan2(-matrix[2][0], math.hypot(matrix[0][0], matrix[1][0]))
+    a = math.atan2(matrix[2][1], matrix[2][2])
+    c = math.atan2(matrix[1][0], matrix[0][0])
+    return [matrix[0][3], matrix[1][3], matrix[2][3], math.degrees(a), math.degrees(b), math.degrees(c)]
+
+
+def _pose_matrix(x, y, z, a, b, c):
+    a, b, c = math.radians(a), math.radians(b), math.radians(c)
+    ca, sa, cb, sb, cc, sc = math.cos(a), math.sin(a), math.cos(b), math.sin(b), math.cos(c), math.sin(c)
+    return [[cc * cb, cc * sb * sa - sc * ca, cc * sb * ca + sc * sa, x],
+            [sc * cb, sc * sb * sa + cc * ca, sc * sb * ca - cc * sa, y],
+            [-sb, cb * sa, cb * ca, z],
+            [0.0, 0.0, 0.0, 1.0]]
+
+
+def _rigid_inverse(matrix):
+    rotation = [[matrix[column][row] for column in range(3)] for row in range(3)]
+    translation = [-sum(rotation[row][k] * matrix[k][3] for k in range(3)) for row in range(3)]
+    return [rotation[row] + [translation[row]] for row in range(3)] + [[0.0, 0.0, 0.0, 1.0]]
+
+
+def sim_flange(dh, joint):
+    """模拟控制器的正运动学（standard DH），返回 (基坐标系中的法兰位姿矩阵, [姿态])
+
+    姿态: arm_back_front 为腕部中心在J1转向的反方向，arm_up_down 为肘部低于肩部到腕部中心的连线，
+    wrist_flip 为 sin(θ5) < 0，arm_left_right 固定为0。
+    """
+    frames = [[[float(row == column) for column in range(4)] for row in range(4)]]
+    thetas = []
+    for (a, alpha, d, offset), value in zip(dh, joint):
+        theta, alpha = math.radians(value + offset), math.radians(alpha)
+        ct, st, ca, sa = math.cos(theta), math.sin(theta), math.cos(alpha), math.sin(alpha)
+        link = [[ct, -st * ca, st * sa, a * ct], [st, ct * ca, -ct * sa, a * st], [0.0, sa, ca, d], [0.0, 0.0, 0.0, 1.0]]
+        frames.append(_matmul(frames[-1], link))
+        thetas.append(theta)
+    shoulder, elbow, wrist = ([frames[index][axis][3] for axis in range(3)] for index in (1, 2, 4))
+    back = wrist[0] * math.cos(thetas[0]) + wrist[1] * math.sin(thetas[0]) < 0
+    line = [w - s for w, s in zip(wrist, shoulder)]
+    offset = [e - s for e, s in zip(elbow, shoulder)]
+    ratio = sum(o * l for o, l in zip(offset, line)) / max(sum(l * l for l in line), 1e-12)
+    down = offset[2] - line[2] * ratio < 0
+    return frames[-1], [int(back), 0, int(down), int(math.sin(thetas[4]) < 0)]
+
+
+def sim_forward(dh, joint):
+    """返回 ([x, y, z, a, b, c], [姿态])，法兰在基坐标系中的位姿"""
+    flange, posture = sim_flange(dh, joint)
+    return _matrix_pose(flange), posture
+
+
+_controllers = dict()
+_controllers_lock = threading.Lock()
+
+
+def get_controller(ip):
+    """获取（不存在时创建）IP对应的模拟控制柜"""
+    with _controllers_lock:
+        controller = _controllers.get(ip)
+        if controller is None:
+            controller = _controllers[ip] = SimController(ip)
+        return controller
+
+
+def reset_simulator():
+    """清除所有模拟控制柜的状态"""
+    with _controllers_lock:
+        _controllers.clear()
+
+
+def simulate_reboot(ip, downtime=1.0):
+    """模拟IP对应的控制柜重启，停机 downtime 秒"""
+    get_controller(ip).reboot(downtime)
+
+
+def _rpc(has_value=True):
+    """模拟一次RPC：注入延迟和故障，并在控制柜锁内执行；控制柜离线或连接已失效时返回失败"""
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(self, *args, **kwargs):
+            if sim_config.inject(func.__name__) \
+                    or not self._controller.online(getattr(self, "_session", None)):
+                return (None, failure_code()) if has_value else failure_code()
+            with self._controller.lock:
+                return func(self, *args, **kwargs)
+        return wrapper
+    return decorator
+
+
+class _Axes:
+    def __init__(self, **values):
+        self.__dict__.update(values)
+
+
+class SimSlave:
+    def __init__(self, controller, channel, slave_id):
+        self._controller = controller
+        self._session = controller.session
+        self._memory = controller.modbus_memory(channel, slave_id)
+
+    def _read(self, area, address, number):
+        if number > MODBUS_MAX_NUMBER or number <= 0:
+            return None, failure_code()
+        memory = self._memory[area]
+        return [memory.get(address + offset, 0) for offset in range(number)], StatusCodeEnum.OK
+
+    def _write(self, area, address, values):
+        if len(values) > MODBUS_MAX_NUMBER or not values:
+            return failure_code()
+        memory = self._memory[area]
+        for offset, value in enumerate(values):
+            memory[address + offset] = value
+        return StatusCodeEnum.OK
+
+    @_rpc()
+    def read_coils(self, address, number):
+        return self._read("coils", address, number)
+
+    @_rpc(has_value=False)
+    def write_coils(self, address, values):
+        return self._write("coils", address, values)
+
+    @_rpc()
+    def read_holding_regs(self, address, number):
+        return self._read("holding_regs", address, number)
+
+    @_rpc(has_value=False)
+    def write_holding_regs(self, address, values):
+        return self._write("holding_regs", address, values)
+
+    @_rpc()
+    def read_discrete_inputs(self, address, number):
+        return self._read("discrete_inputs", address, number)
+
+    @_rpc()
+    def read_input_regs(self, address, number):
+        return self._read("input_regs", address, number)
+
+
+class SimModbus:
+    def __init__(self, controller):
+        self._controller = controller
+        self._session = controller.session
+
+    def get_slave(self, channel, slave_id, master_id=0):
+        return SimSlave(self._controller, channel, slave_id)
+
+
+class SimRegister:
+    def __init__(self, controller):
+        self._controller = controller
+        self._session = controller.session
+
+    def _read(self, kind, index, default):
+        return self._controller.registers[kind].get(index, default), StatusCodeEnum.OK
+
+    def _write(self, kind, index, value):
+        self._controller.registers[kind][index] = value
+        return StatusCodeEnum.OK
+
+    def _delete(self, kind, index):
+        if self._controller.registers[kind].pop(index, None) is None:
+            return failure_code()
+        return StatusCodeEnum.OK
+
+    @_rpc()
+    def read_R(self, index):
+        return self._read("R", index, 0.0)
+
+    @_rpc(has_value=False)
+    def write_R(self, index, value):
+        return self._write("R", index, float(value))
+
+    @_rpc(has_value=False)
+    def delete_R(self, index):
+        return self._delete("R", index)
+
+    @_rpc()
+    def read_MR(self, index):
+        return self._read("MR", index, 0)
+
+    @_rpc(has_value=False)
+    def write_MR(self, index, value):
+        return self._write("MR", index, int(value))
+
+    @_rpc(has_value=False)
+    def delete_MR(self, index):
+        return self._delete("MR", index)
+
+    @_rpc()
+    def read_SR(self, index):
+        return self._read("SR", index, "")
+
+    @_rpc(has_value=False)
+    def write_SR(self, index, value):
+        return self._write("SR", index, str(value))
+
+    @_rpc(has_value=False)
+    def delete_SR(self, index):
+        return self._delete("SR", index)
+
+    @_rpc()
+    def read_MH(self, index):
+        return self._read("MH", index, 0)
+
+    @_rpc(has_value=False)
+    def write_MH(self, index, value):
+        return self._write("MH", index, int(value))
+
+    @_rpc()
+    def read_MI(self, index):
+        return self._read("MI", index, 0)
+
+    @_rpc(has_value=False)
+    def write_MI(self, index, value):
+        return self._write("MI", index, int(value))
+
+    @_rpc()
+    def read_PR(self, index):
+        pose_register = self._controller.registers["PR"].get(index)
+        if pose_register is None:
+            pose_register = PoseRegister()
+            pose_register.id = index
+        return pose_register, StatusCodeEnum.OK
+
+    @_rpc(has_value=False)
+    def write_PR(self, pose_register):
+        return self._write("PR", pose_register.id, pose_register)
+
+    @_rpc(has_value=False)
+    def delete_PR(self, index):
+        return self._delete("PR", index)
+
+
+class _CoordinateList:
+    """模拟 protobuf 坐标系列表消息，仅支持 ListFields()"""
+
+    def __init__(self, coords):
+        self._coords = coords
+
+    def ListFields(self):
+        return [(None, self._coords)] if self._coords else []
+
+
+class SimCoordinateSystem:
+    def __init__(self, controller):
+        self._controller = controller
+        self._session = controller.session
+
+    def _frames(self, coord_type):
+        return self._controller.frames[int(coord_type)]
+
+    @_rpc()
+    def get_coordinate_list(self, coord_type):
+        coords = [_Axes(id=coord_id, name=frame.coordinate_info.name, comment=frame.coordinate_info.comment,
+                        group_id=frame.coordinate_info.group_id)
+                  for coord_id, frame in sorted(self._frames(coord_type).items())]
+        return _CoordinateList(coords), StatusCodeEnum.OK
+
+    @_rpc()
+    def add(self, coord_type):
+        frames = self._frames(coord_type)
+        coord_id = max(frames, default=0) + 1
+        info = CoordinateInfo()
+        info.coordinate_id, info.name, info.comment, info.group_id = coord_id, f"frame{coord_id}", "", 0
+        position = Translation()
+        position.x = position.y = position.z = 0.0
+        orientation = Rotation()
+        orientation.r = orientation.p = orientation.y = 0.0
+        frames[coord_id] = GeometryPose(info, position, orientation)
+        return frames[coord_id], StatusCodeEnum.OK
+
+    @_rpc()
+    def get(self, coord_type, coordinate_id):
+        frame = self._frames(coord_type).get(coordinate_id)
+        if frame is None:
+            return None, failure_code()
+        return frame, StatusCodeEnum.OK
+
+    @_rpc(has_value=False)
+    def update(self, coord_type, coord):
+        frames = self._frames(coord_type)
+        if coord.coordinate_info.coordinate_id not in frames:
+            return failure_code()
+        frames[coord.coordinate_info.coordinate_id] = coord
+        return StatusCodeEnum.OK
+
+    @_rpc(has_value=False)
+    def delete(self, coord_type, coordinate_id):
+        if self._frames(coord_type).pop(coordinate_id, None) is None:
+            return failure_code()
+        return StatusCodeEnum.OK
+
+
+class SimPayload:
+    def __init__(self, controller):
+        self._controller = controller
+        self._session = controller.session
+
+    def _identified(self, weight):
+        return _new_payload(m_load=weight if weight > 0 else 1.0, lcz_load=0.05,
+                            Ixx_load=0.001, Iyy_load=0.001, Izz_load=0.001)
+
+    @_rpc()
+    def get_current_payload(self):
+        return self._controller.current_payload, StatusCodeEnum.OK
+
+    @_rpc()
+    def get_payload_by_id(self, payload_id):
+        payload = self._controller.payloads.get(payload_id)
+        if payload is None:
+            return None, failure_code()
+        return payload, StatusCodeEnum.OK
+
+    @_rpc(has_value=False)
+    def set_current_payload(self, payload_id):
+        if payload_id not in self._controller.payloads:
+            return failure_code()
+        self._controller.current_payload = payload_id
+        return StatusCodeEnum.OK
+
+    @_rpc(has_value=False)
+    def add_payload(self, payload):
+        if payload.id in self._controller.payloads:
+            return failure_code()
+        self._controller.payloads[payload.id] = payload
+        return StatusCodeEnum.OK
+
+    @_rpc(has_value=False)
+    def delete_payload(self, payload_id):
+        if payload_id == self._controller.current_payload or payload_id not in self._controller.payloads:
+            return failure_code()
+        del self._controller.payloads[payload_id]
+        return StatusCodeEnum.OK
+
+    @_rpc(has_value=False)
+    def update_payload(self, payload):
+        if payload.id not in self._controller.payloads:
+            return failure_code()
+        self._controller.payloads[payload.id] = payload
+        return StatusCodeEnum.OK
+
+    @_rpc()
+    def get_all_payload(self):
+        return [(payload.id, payload.comment) for payload in self._controller.payloads.values()], StatusCodeEnum.OK
+
+    @_rpc()
+    def check_axis_three_horizontal(self):
+        return self._controller.joint[1] + self._controller.joint[2], StatusCodeEnum.OK
+
+    @_rpc()
+    def get_payload_identify_state(self):
+        return SimStatus(self._controller.payload_identify_state), StatusCodeEnum.OK
+
+    @_rpc(has_value=False)
+    def start_payload_identify(self, weight, angle):
+        self._controller.payload_identify_state = "RUNNING"
+        return StatusCodeEnum.OK
+
+    @_rpc()
+    def payload_identify_result(self):
+        self._controller.payload_identify_state = "DONE"
+        return self._identified(-1), StatusCodeEnum.OK
+
+    @_rpc(has_value=False)
+    def interference_check_for_payload_identify(self, weight, angle):
+        return StatusCodeEnum.OK
+
+    @_rpc(has_value=False)
+    def payload_identify_start(self):
+        self._controller.payload_identify_state = "RUNNING"
+        return StatusCodeEnum.OK
+
+    @_rpc(has_value=False)
+    def payload_identify_done(self):
+        self._controller.payload_identify_state = "IDLE"
+        return StatusCodeEnum.OK
+
+    @_rpc()
+    def payload_identify(self, weight, angle):
+        self._controller.payload_identify_state = "DONE"
+        return self._identified(weight), StatusCodeEnum.OK
+
+
+class SimMotion:
+    def __init__(self, controller):
+        self._controller = controller
+        self._session = controller.session
+        self.payload = SimPayload(controller)
+
+    def _can_move(self):
+        controller = self._controller
+        return controller.ctrl_status != "CTRL_ESTOP" and controller.servo_status not in ("SERVO_DISABLE", "SERVO_IDLE") \
+            and not controller.drag_enabled
+
+    def _apply_pose(self, pose):
+        if pose.pt == PoseType.JOINT:
+            joint = pose.joint
+            self._controller.joint = [joint.j1, joint.j2, joint.j3, joint.j4, joint.j5, joint.j6]
+            self._controller.cartesian, self._controller.posture = sim_forward(self._controller.dh,
+                                                                               self._controller.joint)
+        else:
+            position, posture = pose.cartData.position, pose.cartData.posture
+            self._controller.cartesian = [position.x, position.y, position.z, position.a, position.b, position.c]
+            self._controller.posture = [posture.arm_back_front, posture.arm_left_right, posture.arm_up_down,
+                                        posture.wrist_flip]
+
+    @_rpc()
+    def get_current_pose(self, pose_type, uf=0, tf=0):
+        pose = MotionPose()
+        pose.pt = pose_type
+        joint, cartesian, posture = self._controller.joint, self._controller.cartesian, self._controller.posture
+        pose.joint.j1, pose.joint.j2, pose.joint.j3, pose.joint.j4, pose.joint.j5, pose.joint.j6 = joint
+        position = pose.cartData.position
+        position.x, position.y, position.z, position.a, position.b, position.c = cartesian
+        pose.cartData.posture.arm_back_front, pose.cartData.posture.arm_left_right = posture[0], posture[1]
+        pose.cartData.posture.arm_up_down, pose.cartData.posture.wrist_flip = posture[2], posture[3]
+        return pose, StatusCodeEnum.OK
+
+    @_rpc()
+    def get_DH_param(self):
+        return [DHParam(index + 1, *row) for index, row in enumerate(self._controller.dh)], StatusCodeEnum.OK
+
+    def _frame_matrix(self, coord_type, coordinate_id):
+        """坐标系在基坐标系（用户坐标系）或法兰（工具坐标系）中的位姿矩阵，0号为单位矩阵，不存在时返回 None"""
+        if not coordinate_id:
+            return _pose_matrix(0, 0, 0, 0, 0, 0)
+        frame = self._controller.frames[int(coord_type)].get(coordinate_id)
+        if frame is None:
+            return None
+        position, orientation = frame.position, frame.orientation
+        return _pose_matrix(position.x, position.y, position.z, orientation.r, orientation.p, orientation.y)
+
+    @_rpc()
+    def convert_joint_to_cart(self, pose, uf_index=0, tf_index=0):
+        """返回工具坐标系 tf_index 在用户坐标系 uf_index 中的位姿"""
+        user, tool = self._frame_matrix(0, uf_index), self._frame_matrix(1, tf_index)
+        if user is None or tool is None:
+            return None, failure_code()
+        joint = pose.joint
+        flange, posture = sim_flange(self._controller.dh, [joint.j1, joint.j2, joint.j3, joint.j4, joint.j5, joint.j6])
+        cartesian = _matrix_pose(_matmul(_matmul(_rigid_inverse(user), flange), tool))
+        result = MotionPose()
+        result.pt = PoseType.CART
+        position = result.cartData.position
+        position.x, position.y, position.z, position.a, position.b, position.c = cartesian
+        result.cartData.posture.arm_back_front, result.cartData.posture.arm_left_right = posture[0], posture[1]
+        result.cartData.posture.arm_up_down, result.cartData.posture.wrist_flip = posture[2], posture[3]
+        return result, StatusCodeEnum.OK
+
+    @_rpc()
+    def convert_cart_to_joint(self, pose, uf_index=0, tf_index=0):
+        """用本地运动学求逆解（需要numpy），按位姿中的姿态选解，多个解时选离当前关节值最近的"""
+        user, tool = self._frame_matrix(0, uf_index), self._frame_matrix(1, tf_index)
+        if user is None or tool is None:
+            return None, failure_code()
+        try:
+            from .kinematics import KinematicModel
+            model = KinematicModel(self._controller.model, self._controller.dh)
+        except Exception:
+            return None, failure_code()
+        position, posture = pose.cartData.position, pose.cartData.posture
+        target = _pose_matrix(position.x, position.y, position.z, position.a, position.b, position.c)
+        solution = model.inverse([_matrix_pose(_matmul(_matmul(user, target), _rigid_inverse(tool)))],
+                                 posture={"arm_back_front": posture.arm_back_front, "arm_up_down": posture.arm_up_down,
+                                          "wrist_flip": posture.wrist_flip},
+                                 reference=self._controller.joint)[0]
+        if not solution["reachable"]:
+            return None, failure_code()
+        result = MotionPose()
+        result.pt = PoseType.JOINT
+        joint = solution["joint"]
+        result.joint.j1, result.joint.j2, result.joint.j3 = joint.j1, joint.j2, joint.j3
+        result.joint.j4, result.joint.j5, result.joint.j6 = joint.j4, joint.j5, joint.j6
+        return result, StatusCodeEnum.OK
+
+    @_rpc(has_value=False)
+    def move_line(self, pose, vel=None, acc=None, *args, **kwargs):
+        if not self._can_move():
+            return failure_code()
+        self._apply_pose(pose)
+        return StatusCodeEnum.OK
+
+    @_rpc(has_value=False)
+    def move_joint(self, pose, vel=None, acc=None, *args, **kwargs):
+        if not self._can_move():
+            return failure_code()
+        self._apply_pose(pose)
+        return StatusCodeEnum.OK
+
+    @_rpc()
+    def get_drag_set(self):
+        drag = self._controller.drag
+        status = _Axes(cart_status=_Axes(**drag["cart"]), joint_status=_Axes(**drag["joint"]),
+                       is_continuous_drag=drag["is_continuous_drag"])
+        return status, StatusCodeEnum.OK
+
+    @_rpc(has_value=False)
+    def set_drag_set(self, drag_status):
+        drag = self._controller.drag
+        for axis in drag["cart"]:
+            drag["cart"][axis] = bool(getattr(drag_status.cart_status, axis))
+        for axis in drag["joint"]:
+            drag["joint"][axis] = bool(getattr(drag_status.joint_status, axis))
+        drag["is_continuous_drag"] = bool(drag_status.is_continuous_drag)
+        return StatusCodeEnum.OK
+
+    @_rpc(has_value=False)
+    def enable_drag(self, enable):
+        if enable and self._controller.ctrl_status == "CTRL_ESTOP":
+            return failure_code()
+        self._controller.drag_enabled = bool(enable)
+        return StatusCodeEnum.OK
+
+
+class SimTrajectory:
+    """离线轨迹：准备和执行分别让机器人运行 offline_prepare_time、offline_run_time 秒后回到空闲"""
+
+    def __init__(self, controller):
+        self._controller = controller
+        self._session = controller.session
+
+    @_rpc(has_value=False)
+    def set_offline_trajectory_file(self, file_name):
+        if not file_name or self._controller.robot_status != "ROBOT_IDLE":
+            return failure_code()
+        self._controller.offline_file = file_name
+        self._controller.offline_state = "IDLE"
+        return StatusCodeEnum.OK
+
+    @_rpc(has_value=False)
+    def prepare_offline_trajectory(self):
+        controller = self._controller
+        if controller.offline_file is None or controller.ctrl_status == "CTRL_ESTOP" \
+                or controller.robot_status != "ROBOT_IDLE":
+            return failure_code()
+        controller.run_for(sim_config.offline_prepare_time, "PREPARED")
+        return StatusCodeEnum.OK
+
+    @_rpc(has_value=False)
+    def execute_offline_trajectory(self):
+        controller = self._controller
+        if controller.offline_state != "PREPARED" or controller.robot_status != "ROBOT_IDLE":
+            return failure_code()
+        controller.run_for(sim_config.offline_run_time, "IDLE")
+        return StatusCodeEnum.OK
+
+
+class SimExecution:
+    """BAS脚本：按 sim_types.BasScript 记录的指令顺序立即执行，等待指令不计时"""
+
+    def __init__(self, controller, motion):
+        self._controller = controller
+        self._session = controller.session
+        self._motion = motion
+
+    @_rpc(has_value=False)
+    def execute_bas_script(self, script):
+        commands = getattr(script, "commands", None)
+        controller = self._controller
+        if not commands or controller.robot_status != "ROBOT_IDLE" or not self._motion._can_move():
+            return failure_code()
+        for op, args in commands:
+            if op == "assign_value":
+                kind = args["assign_type"].name
+                controller.registers[kind][args["assign_index"]] = float(args["value"]) if kind == "R" \
+                    else int(args["value"])
+            elif op == "move_joint":
+                pose_register = controller.registers["PR"].get(args["pose_index"])
+                if pose_register is None:
+                    return failure_code()
+                self._motion._apply_pose(pose_register.poseRegisterData)
+        return StatusCodeEnum.OK
+
+
+class SimArm:
+    """模拟的 Arm，connect 之后才能使用 motion、register 等子模块"""
+
+    def __init__(self):
+        self._controller = None
+        self.motion = None
+        self.register = None
+        self.modbus = None
+        self.coordinate_system = None
+        self.trajectory = None
+        self.execution = None
+
+    def connect(self, ip):
+        controller = get_controller(ip)
+        if sim_config.connect_time > 0:
+            time.sleep(sim_config.connect_time)
+        if sim_config.inject("connect") or not controller.online():
+            return failure_code()
+        with controller.lock:
+            controller.connections += 1
+        self._controller = controller
+        self._session = controller.session
+        self.motion = SimMotion(controller)
+        self.register = SimRegister(controller)
+        self.modbus = SimModbus(controller)
+        self.coordinate_system = SimCoordinateSystem(controller)
+        self.trajectory = SimTrajectory(controller)
+        self.execution = SimExecution(controller, self.motion)
+        return StatusCodeEnum.OK
+
+    @_rpc(has_value=False)
+    def disconnect(self):
+        self._controller.connections -= 1
+        return StatusCodeEnum.OK
+
+    @_rpc(has_value=False)
+    def servo_on(self):
+        if self._controller.ctrl_status == "CTRL_ESTOP":
+            return failure_code()
+        self._controller.servo_status = "SERVO_READY"
+        return StatusCodeEnum.OK
+
+    @_rpc(has_value=False)
+    def servo_off(self):
+        self._controller.servo_status = "SERVO_DISABLE"
+        return StatusCodeEnum.OK
+
+    @_rpc(has_value=False)
+    def servo_reset(self):
+        self._controller.ctrl_status = "CTRL_RUNNING"
+        self._controller.drag_enabled = False
+        return StatusCodeEnum.OK
+
+    @_rpc()
+    def get_ctrl_status(self):
+        return SimStatus(self._controller.ctrl_status), StatusCodeEnum.OK
+
+    @_rpc()
+    def get_servo_status(self):
+        return SimStatus(self._controller.servo_status), StatusCodeEnum.OK
+
+    @_rpc()
+    def get_robot_status(self):
+        return SimStatus(self._controller.robot_status), StatusCodeEnum.OK
+
+    @_rpc()
+    def get_arm_model_info(self):
+        return self._controller.model, StatusCodeEnum.OK
+
+    @_rpc(has_value=False)
+    def acquire_access(self):
+        self._controller.access = True
+        return StatusCodeEnum.OK
+
+    @_rpc(has_value=False)
+    def release_access(self):
+        self._controller.access = False
+        return StatusCodeEnum.OK
+
+
+class SimFileManager:
+    """模拟的 FileManager，文件保存在控制柜的 files 中
+
+    传输按 file_transfer_rate 计时，计时期间不持有控制柜锁，同一控制柜的多个传输可以并行。
+    """
+
+    def __init__(self, ip):
+        self._controller = get_controller(ip)
+
+    def _transfer(self, size):
+        if sim_config.file_transfer_rate > 0:
+            time.sleep(size / sim_config.file_transfer_rate)
+
+    def upload(self, file_path, file_type, overwrite=False):
+        if sim_config.inject("upload") or not self._controller.online():
+            return failure_code()
+        if file_type == sdk.USER_PROGRAM:
+            # 程序由同名的 .json 和 .xml 文件组成，file_path 不带扩展名
+            paths = [file_path + suffix for suffix in (".json", ".xml") if os.path.isfile(file_path + suffix)]
+        else:
+            paths = [file_path] if os.path.isfile(file_path) else []
+        if not paths:
+            return failure_code()
+        contents = {}
+        for path in paths:
+            with open(path, "rb") as f:
+                contents[os.path.basename(path)] = f.read()
+        self._transfer(sum(len(data) for data in contents.values()))
+        with self._controller.lock:
+            files = self._controller.files
+            if not overwrite and any((file_type, name) in files for name in contents):
+                return failure_code()
+            for name, data in contents.items():
+                files[(file_type, name)] = data
+        return StatusCodeEnum.OK
+
+    def _matches(self, file_name, file_type):
+        return {name: data for (kind, name), data in self._controller.files.items()
+                if kind == file_type and (name == file_name or os.path.splitext(name)[0] == file_name)}
+
+    def download(self, file_name, file_path, file_type=None):
+        if sim_config.inject("download") or not self._controller.online():
+            return failure_code()
+        with self._controller.lock:
+            matches = self._matches(file_name, file_type)
+        if not matches:
+            return failure_code()
+        self._transfer(sum(len(data) for data in matches.values()))
+        os.makedirs(file_path, exist_ok=True)
+        for name, data in matches.items():
+            with open(os.path.join(file_path, name), "wb") as f:
+                f.write(data)
+        return StatusCodeEnum.OK
+
+    @_rpc(has_value=False)
+    def search(self, file_name, file_list):
+        pattern = file_name if any(char in file_name for char in "*?[") else f"*{file_name}*"
+        file_list.extend(sorted({name for _, name in self._controller.files if fnmatch.fnmatch(name, pattern)}))
+        return StatusCodeEnum.OK
+
+    @_rpc(has_value=False)
+    def delete(self, file_name, file_type):
+        matches = self._matches(file_name, file_type)
+        if not matches:
+            return failure_code()
+        for name in matches:
+            del self._controller.files[(file_type, name)]
+        return StatusCodeEnum.OK
+
+
+class SimHardwareState:
+    """模拟的 HardwareState 订阅，按 telemetry_period 周期推送控制柜状态"""
+
+    def __init__(self, ip):
+        self._controller = get_controller(ip)
+        self._subscribed = False
+        self._session = None
+
+    def subscribe(self, **kwargs):
+        if not self._controller.online():
+            return failure_code()
+        self._subscribed = True
+        self._session = self._controller.session
+        return StatusCodeEnum.OK
+
+    def recv(self):
+        if not self._subscribed:
+            raise RuntimeError("未订阅")
+        time.sleep(sim_config.telemetry_period)
+        if not self._controller.online(self._session):
+            raise ConnectionError("控制柜连接已断开")
+        return self._controller.snapshot()
+
+    def unsubscribe(self):
+        self._subscribed = False
+        return StatusCodeEnum.OK
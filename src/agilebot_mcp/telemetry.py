@@ -0,0 +1,212 @@
+# -*- coding: utf-8 -*-
+import logging
+import os
+import threading
+import time
+
+from .sdk import StatusCodeEnum
+from .backend import create_hardware_state
+
+logger = logging.getLogger(__name__)
+
+# 快照超过该时间（秒）视为过期，状态查询回退为RPC
+TELEMETRY_MAX_AGE = float(os.environ.get("AGILEBOT_MCP_TELEMETRY_MAX_AGE", "0.5"))
+TELEMETRY_ENABLED = os.environ.get("AGILEBOT_MCP_TELEMETRY", "1") != "0"
+
+JOINT_AXES = ("j1", "j2", "j3", "j4", "j5", "j6")
+CART_AXES = ("x", "y", "z", "a", "b", "c")
+POSTURE_FIELDS = ("arm_back_front", "arm_left_right", "arm_up_down", "wrist_flip")
+
+# 订阅消息中的主题名 -> 快照字段
+_TOPIC_FIELDS = {
+    "robot_status": "robot_status",
+    "servo_status": "servo_status",
+    "ctrl_status": "ctrl_status",
+    "controller_status": "ctrl_status",
+    "joint": "joint",
+    "joint_position": "joint",
+    "joint_pose": "joint",
+    "cartesian": "cartesian",
+    "cart_position": "cartesian",
+    "cartesian_position": "cartesian",
+    "cart_pose": "cartesian",
+}
+
+
+def _as_axes(value, axes):
+    """把列表、字典或带属性的对象统一转换为 {轴名: 值} 字典"""
+    if isinstance(value, dict):
+        return {axis: value[axis] for axis in axes if axis in value}
+    if isinstance(value, (list, tuple)):
+        return dict(zip(axes, value))
+    return {axis: getattr(value, axis) for axis in axes if hasattr(value, axis)}
+
+
+class RobotTelemetry:
+    """单台机器人的状态快照，由 HardwareState 订阅线程在后台持续刷新"""
+
+    def __init__(self, ip):
+        self.ip = ip
+        self._lock = threading.Lock()
+        # 每次刷新后通知 wait_for_update 的等待者
+        self._updated = threading.Condition(self._lock)
+        self._version = 0
+        self._fields = {}
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name=f"telemetry-{self.ip}", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def update(self, field, value):
+        with self._lock:
+            self._fields[field] = (value, time.monotonic())
+            self._version += 1
+            self._updated.notify_all()
+
+    def wait_for_update(self, timeout):
+        """等待下一次刷新，返回是否在 timeout 秒内收到"""
+        with self._lock:
+            version = self._version
+            return self._updated.wait_for(lambda: self._version != version, timeout)
+
+    def get(self, field, max_age=TELEMETRY_MAX_AGE):
+        """返回 (值, 已过去的秒数)，不存在或已过期时返回 None"""
+        with self._lock:
+            entry = self._fields.get(field)
+        if entry is None:
+            return None
+        value, updated_at = entry
+        age = time.monotonic() - updated_at
+        if age > max_age:
+            return None
+        return value, age
+
+    def snapshot(self):
+        now = time.monotonic()
+        with self._lock:
+            return {field: {"value": value, "age_ms": round((now - updated_at) * 1000, 1)}
+                    for field, (value, updated_at) in self._fields.items()}
+
+    def apply_message(self, message):
+        """把一条订阅消息合并到快照中"""
+        if not isinstance(message, dict):
+            message = getattr(message, "__dict__", {})
+        if "topic" in message and "data" in message:
+            items = [(message["topic"], message["data"])]
+        else:
+            items = message.items()
+        for topic, value in items:
+            name = str(topic).lower().rsplit(".", 1)[-1]
+            field = _TOPIC_FIELDS.get(name)
+            if field == "joint":
+                self.update("joint", _as_axes(value, JOINT_AXES))
+            elif field == "cartesian":
+                if isinstance(value, dict):
+                    position, posture = value.get("position", value), value.get("posture")
+                else:
+                    position, posture = getattr(value, "position", value), getattr(value, "posture", None)
+                cartesian = {"position": _as_axes(position, CART_AXES)}
+                # 消息不带姿态时快照中也没有 posture，需要姿态的查询回退为RPC
+                if posture is not None:
+                    cartesian["posture"] = _as_axes(posture, POSTURE_FIELDS)
+                self.update("cartesian", cartesian)
+            elif field is not None:
+                self.update(field, str(value))
+            else:
+                with self._lock:
+                    io_value, _ = self._fields.get("io", ({}, 0))
+                    self._fields["io"] = (dict(io_value, **{str(topic): value}), time.monotonic())
+
+    def _run(self):
+        try:
+            hw_state = create_hardware_state(self.ip)
+            ret = hw_state.subscribe()
+            if ret != StatusCodeEnum.OK:
+                logger.error("订阅机器人状态失败: %s, 错误代码: %s", self.ip, ret)
+                return
+        except Exception as e:
+            logger.error("订阅机器人状态时发生异常: %s, 异常信息: %s", self.ip, e)
+            return
+        logger.info("开始订阅机器人状态: %s", self.ip)
+        try:
+            while not self._stop.is_set():
+                self.apply_message(hw_state.recv())
+        except Exception as e:
+            logger.error("接收机器人状态时发生异常: %s, 异常信息: %s", self.ip, e)
+        finally:
+            try:
+                hw_state.unsubscribe()
+            except Exception:
+                pass
+            logger.info("停止订阅机器人状态: %s", self.ip)
+
+
+_telemetry = dict()
+_telemetry_lock = threading.Lock()
+
+
+def start_telemetry(ip):
+    """为已连接的机器人启动后台状态订阅"""
+    with _telemetry_lock:
+        if ip in _telemetry:
+            return _telemetry[ip]
+        telemetry = RobotTelemetry(ip)
+        _telemetry[ip] = telemetry
+    if TELEMETRY_ENABLED:
+        telemetry.start()
+    return telemetry
+
+
+def stop_telemetry(ip):
+    with _telemetry_lock:
+        telemetry = _telemetry.pop(ip, None)
+    if telemetry is not None:
+        telemetry.stop()
+
+
+def stop_all_telemetry():
+    with _telemetry_lock:
+        telemetries = list(_telemetry.values())
+        _telemetry.clear()
+    for telemetry in telemetries:
+        telemetry.stop()
+
+
+def get_snapshot(ip):
+    """返回机器人完整快照及各字段距上次刷新的时间，未订阅时返回 None"""
+    telemetry = _telemetry.get(ip)
+    if telemetry is None:
+        return None
+    return telemetry.snapshot()
+
+
+def get_telemetry(ip, field, max_age=TELEMETRY_MAX_AGE):
+    """从快照读取字段，返回 (值, 已过去的秒数)；无快照或已过期时返回 None"""
+    telemetry = _telemetry.get(ip)
+    if telemetry is None:
+        return None
+    return telemetry.get(field, max_age)
+
+
+def wait_for_telemetry(ip, timeout):
+    """等待机器人快照的下一次刷新
+
+    返回:
+        bool: 是否在 timeout 秒内收到刷新；没有订阅时返回 None，调用方应改为自行等待
+    """
+    telemetry = _telemetry.get(ip)
+    if telemetry is None:
+        return None
+    return telemetry.wait_for_update(timeout)
+
+
+def record_telemetry(ip, field, value):
+    """用RPC得到的最新值刷新快照"""
+    telemetry = _telemetry.get(ip)
+    if telemetry is not None:
+        telemetry.update(field, value)
@@ -0,0 +1,680 @@
+# -*- coding: utf-8 -*-
+"""离线轨迹文件（.trajectory）的解析、校验、统计以及由CSV生成
+
+文件格式（arm.trajectory.set_offline_trajectory_file 使用）:
+    第1行: 轴数 周期(秒) 点数，例如 "6 0.001000 15726"
+    第2行: 起始位姿（各轴关节角，弧度）
+    之后每行一个点: 各轴位置、速度、加速度、力矩，最后两列为DO端口和DO状态；
+        端口为 -1 表示没有DO动作，多个端口用 "|" 分隔，状态可以是一个值或与端口一一对应，
+        例如 "1|2 1"、"7|8 1|0"
+
+文件按块读取，每块用 numpy.loadtxt 解析为浮点数组后写入按点数预分配的数组；
+DO字段中少数带 "|" 的值在解析前替换为占位数字，解析后再还原为端口/状态位掩码。
+
+带时间戳的CSV（ts、pts_J*、vel_J*、acc_J*、tor_J*、do_port、do_state 列）用同样的方式读取（只转换用到的列），
+按控制器周期线性插值重采样，缺少的速度/加速度用有限差分补齐后写成 .trajectory 文件；
+写文件时用查表把数值批量格式化为 "%.6f" 文本，不逐行调用字符串格式化。
+转换的主要耗时在 loadtxt 把文本转换为浮点数，是CPU密集的（单核约 140 MB/s）。
+需要安装 numpy（pip install "agilebot-mcp[analysis]"）。
+"""
+import io
+import logging
+import math
+from pathlib import Path
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+from .responses import encode, error
+
+logger = logging.getLogger(__name__)
+
+CHUNK_BYTES = 8 * 1024 * 1024
+# 未指定时使用的校验上限，实际值取决于机型
+DEFAULT_JOINT_LIMIT = 2 * math.pi
+DEFAULT_MAX_VELOCITY = 2 * math.pi
+DEFAULT_MAX_ACCELERATION = 30.0
+START_POSE_TOLERANCE = 1e-3
+# 相邻两点的位置变化超过 最大速度 × 周期 × JUMP_FACTOR 时视为跳变
+JUMP_FACTOR = 1.5
+# summary 中最多列出的DO动作数，避免响应过大
+MAX_DO_EVENTS = 50
+# DO端口/状态以 int64 位掩码保存，端口号范围为 0~62
+MAX_DO_PORT = 62
+# 占位数字从该值开始向下编号，不会与正常的端口号/状态冲突
+_PLACEHOLDER_BASE = -1000000
+# 控制器默认的轨迹周期（秒）
+DEFAULT_PERIOD = 0.001
+# 写文件时每次格式化的点数
+WRITE_BLOCK_ROWS = 100000
+# CSV列名前缀（不区分大小写），后接轴号
+KINDS = ("position", "velocity", "acceleration", "torque")
+CSV_PREFIXES = {"position": "pts_j", "velocity": "vel_j", "acceleration": "acc_j", "torque": "tor_j"}
+_SEPARATORS = b" \t\r\n,"
+
+
+class TrajectoryFormatError(ValueError):
+    pass
+
+
+class Trajectory:
+    """解析后的离线轨迹，position/velocity/acceleration/torque 均为 (点数, 轴数) 的数组
+
+    do_ports 为每个点上有DO动作的端口位掩码（第 n 位对应端口 n，0 表示没有DO动作），
+    do_values 为对应端口的输出状态位掩码。
+    """
+
+    def __init__(self, period, start_pose, data, do_ports, do_values, declared_rows=None, offset=0):
+        axes = start_pose.size
+        self.period = period
+        self.start_pose = start_pose
+        self.data = data
+        self.position = data[:, 0:axes]
+        self.velocity = data[:, axes:2 * axes]
+        self.acceleration = data[:, 2 * axes:3 * axes]
+        self.torque = data[:, 3 * axes:4 * axes]
+        self.do_ports = do_ports
+        self.do_values = do_values
+        self.declared_rows = len(data) if declared_rows is None else declared_rows
+        self.offset = offset
+
+    @property
+    def axes(self):
+        return self.start_pose.size
+
+    @property
+    def rows(self):
+        return len(self.position)
+
+    @property
+    def duration(self):
+        return self.rows * self.period
+
+    @property
+    def time(self):
+        return (np.arange(self.rows) + self.offset) * self.period
+
+    def do_events(self, limit=MAX_DO_EVENTS):
+        """返回前 limit 个DO动作 [{"row", "time", "ports", "states"}]"""
+        events = []
+        for row in np.flatnonzero(self.do_ports)[:limit].tolist():
+            ports = _mask_bits(int(self.do_ports[row]))
+            values = int(self.do_values[row])
+            events.append({
+                "row": row + self.offset,
+                "time": round((row + self.offset) * self.period, 6),
+                "ports": ports,
+                "states": [(values >> port) & 1 for port in ports],
+            })
+        return events
+
+    def summary(self):
+        def per_axis(values):
+            return [round(value, 6) for value in values.tolist()]
+
+        empty = self.rows == 0
+        return {
+            "axes": self.axes,
+            "period": self.period,
+            "rows": self.rows,
+            "declared_rows": self.declared_rows,
+            "duration_s": round(self.duration, 6),
+            "start_pose": per_axis(self.start_pose),
+            "end_pose": None if empty else per_axis(self.position[-1]),
+            "position_min": None if empty else per_axis(self.position.min(axis=0)),
+            "position_max": None if empty else per_axis(self.position.max(axis=0)),
+            "max_abs_velocity": None if empty else per_axis(np.abs(self.velocity).max(axis=0)),
+            "max_abs_acceleration": None if empty else per_axis(np.abs(self.acceleration).max(axis=0)),
+            "max_abs_torque": None if empty else per_axis(np.abs(self.torque).max(axis=0)),
+            "do_event_count": int(np.count_nonzero(self.do_ports)),
+            "do_events": self.do_events(),
+        }
+
+    def validate(self, joint_limits=None, max_velocity=DEFAULT_MAX_VELOCITY,
+                 max_acceleration=DEFAULT_MAX_ACCELERATION, max_torque=None):
+        """检查点数、周期、起始位姿、关节限位、速度/加速度/力矩上限和位置跳变
+
+        参数:
+            joint_limits: 每个轴的 [下限, 上限]（弧度），默认 ±2π
+            max_velocity: 速度上限（弧度/秒），单个值或每轴一个值
+            max_acceleration: 加速度上限（弧度/秒²），单个值或每轴一个值
+            max_torque: 力矩上限，默认不检查
+
+        返回:
+            list: 问题列表，每项包含 check、说明以及首次出现的位置，空列表表示通过
+        """
+        issues = []
+        if self.rows != self.declared_rows:
+            issues.append({"check": "rows", "message": f"文件头声明 {self.declared_rows} 个点，实际 {self.rows} 个"})
+        if not self.period > 0:
+            issues.append({"check": "period", "message": f"周期必须大于0，实际为 {self.period}"})
+            return issues
+        if self.rows == 0:
+            return issues
+
+        data = (self.position, self.velocity, self.acceleration, self.torque)
+        not_finite = ~np.isfinite(np.hstack(data))
+        if not_finite.any():
+            row = int(np.flatnonzero(not_finite.any(axis=1))[0])
+            issues.append(self._issue("not_finite", row, None, "存在NaN或无穷大", int(not_finite.any(axis=1).sum())))
+            return issues
+
+        deviation = np.abs(self.position[0] - self.start_pose)
+        if deviation.max() > START_POSE_TOLERANCE:
+            axis = int(deviation.argmax())
+            issues.append(self._issue("start_pose", 0, axis, f"第一个点与起始位姿相差 {deviation[axis]:.6f} 弧度", 1))
+
+        if joint_limits is None:
+            lower = np.full(self.axes, -DEFAULT_JOINT_LIMIT)
+            upper = np.full(self.axes, DEFAULT_JOINT_LIMIT)
+        else:
+            limits = np.asarray(joint_limits, dtype=np.float64).reshape(self.axes, 2)
+            lower, upper = limits[:, 0], limits[:, 1]
+        self._check_range(issues, "joint_limit", self.position, lower, upper, "关节位置超出限位")
+        self._check_bound(issues, "velocity", self.velocity, max_velocity, "速度超过上限")
+        self._check_bound(issues, "acceleration", self.acceleration, max_acceleration, "加速度超过上限")
+        if max_torque is not None:
+            self._check_bound(issues, "torque", self.torque, max_torque, "力矩超过上限")
+        if self.rows > 1:
+            step = np.abs(np.diff(self.position, axis=0))
+            limit = np.broadcast_to(np.asarray(max_velocity, dtype=np.float64), (self.axes,)) * self.period * JUMP_FACTOR
+            self._check_range(issues, "position_jump", step, np.zeros(self.axes), limit, "相邻两点位置跳变", row_offset=1)
+        return issues
+
+    def _issue(self, check, row, axis, message, count):
+        row += self.offset
+        issue = {"check": check, "message": message, "count": count,
+                 "first_row": row, "first_line": row + 3, "first_time": round(row * self.period, 6)}
+        if axis is not None:
+            issue["axis"] = f"J{axis + 1}"
+        return issue
+
+    def _check_bound(self, issues, check, values, bound, message):
+        bound = np.broadcast_to(np.asarray(bound, dtype=np.float64), (self.axes,))
+        self._check_range(issues, check, values, -bound, bound, message)
+
+    def _check_range(self, issues, check, values, lower, upper, message, row_offset=0):
+        bad = (values < lower) | (values > upper)
+        if not bad.any():
+            return
+        for axis in np.flatnonzero(bad.any(axis=0)).tolist():
+            rows = np.flatnonzero(bad[:, axis])
+            row = int(rows[0])
+            issue = self._issue(check, row + row_offset, axis, message, int(rows.size))
+            issue.update(value=round(float(values[row, axis]), 6),
+                         limit=[round(float(lower[axis]), 6), round(float(upper[axis]), 6)])
+            issues.append(issue)
+
+
+def _mask_bits(mask):
+    bits = []
+    while mask:
+        low = mask & -mask
+        bits.append(low.bit_length() - 1)
+        mask ^= low
+    return bits
+
+
+def _read_header(stream):
+    first = stream.readline().split()
+    second = stream.readline().split()
+    try:
+        axes, period, rows = int(first[0]), float(first[1]), int(first[2])
+        start_pose = np.array([float(value) for value in second], dtype=np.float64)
+    except (IndexError, ValueError):
+        raise TrajectoryFormatError("文件头格式错误，第1行应为 \"轴数 周期 点数\"，第2行为起始位姿")
+    if start_pose.size != axes:
+        raise TrajectoryFormatError(f"起始位姿有 {start_pose.size} 个值，与轴数 {axes} 不一致")
+    return axes, period, rows, start_pose
+
+
+def _replace_piped_tokens(chunk, tokens):
+    """把带 "|" 的DO字段替换为占位数字，原字段按顺序追加到 tokens"""
+    if b"|" not in chunk:
+        return chunk
+    parts = []
+    position = 0
+    while True:
+        bar = chunk.find(b"|", position)
+        if bar < 0:
+            break
+        start = bar
+        while start > position and chunk[start - 1] not in _SEPARATORS:
+            start -= 1
+        end = bar
+        while end < len(chunk) and chunk[end] not in _SEPARATORS:
+            end += 1
+        parts.append(chunk[position:start])
+        parts.append(b"%d" % (_PLACEHOLDER_BASE - len(tokens)))
+        tokens.append(chunk[start:end])
+        position = end
+    parts.append(chunk[position:])
+    return b"".join(parts)
+
+
+def _decode_do(port_column, state_column, tokens, offset=0):
+    """把DO端口/状态列还原为位掩码，只对有DO动作的少数点逐个处理"""
+    do_ports = np.zeros(len(port_column), dtype=np.int64)
+    do_values = np.zeros(len(port_column), dtype=np.int64)
+
+    def values_of(raw):
+        if raw <= _PLACEHOLDER_BASE:
+            return [int(value) for value in tokens[int(_PLACEHOLDER_BASE - raw)].split(b"|")]
+        return [int(raw)]
+
+    for row in np.flatnonzero(port_column != -1).tolist():
+        ports = values_of(port_column[row])
+        states = values_of(state_column[row])
+        if len(states) == 1:
+            states = states * len(ports)
+        if len(states) != len(ports) or min(ports) < 0 or max(ports) > MAX_DO_PORT:
+            raise TrajectoryFormatError(f"第 {row + offset} 个点的DO字段格式错误（端口范围 0~{MAX_DO_PORT}）")
+        for port, state in zip(ports, states):
+            do_ports[row] |= 1 << port
+            if state:
+                do_values[row] |= 1 << port
+    return do_ports, do_values
+
+
+def _iter_blocks(stream, chunk_bytes):
+    """从 stream 的当前位置按块读取，每块在最后一个换行处截断，剩余部分并入下一块"""
+    remainder = b""
+    while True:
+        data = stream.read(chunk_bytes)
+        if not data:
+            if remainder and not remainder.isspace():
+                yield remainder
+            return
+        chunk = remainder + data
+        cut = chunk.rfind(b"\n") + 1
+        if cut == 0:
+            remainder = chunk
+            continue
+        chunk, remainder = chunk[:cut], chunk[cut:]
+        if not chunk.isspace():
+            yield chunk
+
+
+def _parse_block(chunk, width, delimiter, line, usecols=None):
+    """把一块文本解析为 (点数, width) 的浮点数组，带 "|" 的字段替换为占位数字
+
+    指定 usecols 时只转换这些列（width 为 usecols 的长度），文本转浮点数是读取阶段的主要耗时。
+    """
+    tokens = []
+    chunk = _replace_piped_tokens(chunk, tokens)
+    try:
+        block = np.loadtxt(io.BytesIO(chunk), dtype=np.float64, delimiter=delimiter, ndmin=2, comments=None,
+                           usecols=usecols)
+    except ValueError as e:
+        raise TrajectoryFormatError(f"第 {line} 行之后的数据无法解析: {e}")
+    if block.shape[1] != width:
+        raise TrajectoryFormatError(f"每行应有 {width} 列，实际为 {block.shape[1]} 列")
+    return block, tokens
+
+
+def iter_trajectory_chunks(path, chunk_bytes=CHUNK_BYTES):
+    """按块流式解析轨迹文件，每块产出一个 Trajectory（offset 为该块第一个点的序号）
+
+    适合只需统计或校验、不需要把整个文件留在内存中的场景。
+    """
+    with open(path, "rb") as stream:
+        axes, period, rows, start_pose = _read_header(stream)
+        width = 4 * axes + 2
+        offset = 0
+        for chunk in _iter_blocks(stream, chunk_bytes):
+            block, tokens = _parse_block(chunk, width, None, offset + 3)
+            do_ports, do_values = _decode_do(block[:, width - 2], block[:, width - 1], tokens, offset)
+            yield Trajectory(period, start_pose, block[:, :width - 2], do_ports, do_values, rows, offset)
+            offset += len(block)
+
+
+def load_trajectory(path, chunk_bytes=CHUNK_BYTES):
+    """解析整个轨迹文件，返回 Trajectory
+
+    按文件头声明的点数预分配数组，各块解析后直接写入；实际点数少于声明时截断，多于声明时报错。
+    """
+    with open(path, "rb") as stream:
+        axes, period, rows, start_pose = _read_header(stream)
+    if rows < 0:
+        raise TrajectoryFormatError(f"文件头中的点数无效: {rows}")
+    data = np.empty((rows, 4 * axes), dtype=np.float64)
+    do_ports = np.zeros(rows, dtype=np.int64)
+    do_values = np.zeros(rows, dtype=np.int64)
+    filled = 0
+    for chunk in iter_trajectory_chunks(path, chunk_bytes):
+        end = filled + chunk.rows
+        if end > rows:
+            raise TrajectoryFormatError(f"实际点数超过文件头声明的 {rows} 个")
+        data[filled:end, 0:axes] = chunk.position
+        data[filled:end, axes:2 * axes] = chunk.velocity
+        data[filled:end, 2 * axes:3 * axes] = chunk.acceleration
+        data[filled:end, 3 * axes:4 * axes] = chunk.torque
+        do_ports[filled:end] = chunk.do_ports
+        do_values[filled:end] = chunk.do_values
+        filled = end
+    return Trajectory(period, start_pose, data[:filled], do_ports[:filled], do_values[:filled], rows)
+
+
+def _csv_columns(header):
+    """根据CSV表头确定各类数据所在的列，返回 (时间列, {类别: 列号列表}, DO端口列, DO状态列, 列数)"""
+    names = [name.strip().lower() for name in header.decode("utf-8-sig").split(",")]
+    index = {name: column for column, name in enumerate(names)}
+    if "ts" not in index:
+        raise TrajectoryFormatError("CSV缺少时间戳列 ts")
+    axes = 0
+    while f"pts_j{axes + 1}" in index:
+        axes += 1
+    if axes == 0:
+        raise TrajectoryFormatError("CSV缺少关节位置列 pts_J1、pts_J2 ...")
+    groups = {}
+    for kind, prefix in CSV_PREFIXES.items():
+        columns = [index.get(f"{prefix}{axis + 1}") for axis in range(axes)]
+        if all(column is not None for column in columns):
+            groups[kind] = columns
+        elif any(column is not None for column in columns):
+            raise TrajectoryFormatError(f"CSV中的 {prefix}* 列不完整，应有 {axes} 列")
+    if ("do_port" in index) != ("do_state" in index):
+        raise TrajectoryFormatError("CSV中的 do_port 和 do_state 列应同时存在")
+    return index["ts"], groups, index.get("do_port"), index.get("do_state"), len(names)
+
+
+def _columns_of(data, columns):
+    """取出 data 中的若干列，列号连续时返回视图而不复制"""
+    if columns == list(range(columns[0], columns[0] + len(columns))):
+        return data[:, columns[0]:columns[0] + len(columns)]
+    return data[:, columns]
+
+
+def read_trajectory_csv(path, chunk_bytes=CHUNK_BYTES):
+    """按块读取带时间戳的轨迹CSV
+
+    返回:
+        tuple: (ts, {"position"/"velocity"/"acceleration"/"torque": (点数, 轴数) 数组}, do_ports, do_values)，
+            CSV中没有的类别不出现在字典中，没有DO列时 do_ports/do_values 全为0
+    """
+    blocks = []
+    do_blocks = []
+    with open(path, "rb") as stream:
+        ts_column, groups, port_column, state_column, _ = _csv_columns(stream.readline())
+        # 只解析用到的列（例如 jerk_J* 不读取），列号换算为解析结果中的位置
+        usecols = sorted({ts_column, *(column for columns in groups.values() for column in columns)}
+                         | ({port_column, state_column} if port_column is not None else set()))
+        position = {column: slot for slot, column in enumerate(usecols)}
+        ts_column = position[ts_column]
+        groups = {kind: [position[column] for column in columns] for kind, columns in groups.items()}
+        if port_column is not None:
+            port_column, state_column = position[port_column], position[state_column]
+        offset = 0
+        for chunk in _iter_blocks(stream, chunk_bytes):
+            block, tokens = _parse_block(chunk, len(usecols), ",", offset + 2, usecols)
+            if port_column is None:
+                do_blocks.append(np.zeros((2, len(block)), dtype=np.int64))
+            else:
+                do_blocks.append(_decode_do(block[:, port_column], block[:, state_column], tokens, offset))
+            blocks.append(block)
+            offset += len(block)
+    if not blocks:
+        raise TrajectoryFormatError("CSV中没有数据行")
+    data = np.concatenate(blocks) if len(blocks) > 1 else blocks[0]
+    do_ports = np.concatenate([ports for ports, _ in do_blocks])
+    do_values = np.concatenate([values for _, values in do_blocks])
+    return data[:, ts_column], {kind: _columns_of(data, columns) for kind, columns in groups.items()}, \
+        do_ports, do_values
+
+
+def _interpolation(ts, period):
+    """计算从 ts[0] 开始、间隔为 period 的等间隔时刻在 ts 中的左侧采样点序号和插值权重"""
+    t = ts - ts[0]
+    step = np.diff(t)
+    if (step <= 0).any():
+        row = int(np.flatnonzero(step <= 0)[0]) + 1
+        raise TrajectoryFormatError(f"时间戳必须严格递增，第 {row} 个点的时间戳为 {ts[row]}，前一个点为 {ts[row - 1]}")
+    count = int(math.floor(t[-1] / period + 1e-6)) + 1
+    if len(t) == 1:
+        return np.zeros(1, dtype=np.int64), np.zeros((1, 1))
+    grid = np.arange(count) * period
+    left = np.clip(np.searchsorted(t, grid, side="right") - 1, 0, len(t) - 2)
+    return left, ((grid - t[left]) / step[left])[:, None]
+
+
+def _interpolate(values, left, weight, out):
+    lower = values[left]
+    if len(values) == 1:
+        out[:] = lower
+        return
+    upper = values[left + 1]
+    np.subtract(upper, lower, out=upper)
+    upper *= weight
+    np.add(lower, upper, out=out)
+
+
+def resample(ts, values, period):
+    """把按时间戳 ts 采样的 values（点数, 列数）线性插值到从 ts[0] 开始、间隔为 period 的等间隔时刻"""
+    left, weight = _interpolation(ts, period)
+    out = np.empty((len(left), values.shape[1]), dtype=np.float64)
+    _interpolate(values, left, weight, out)
+    return out
+
+
+def build_trajectory(ts, columns, do_ports, do_values, period=DEFAULT_PERIOD):
+    """由 read_trajectory_csv 的结果生成 Trajectory
+
+    各列按 period 重采样；没有速度/加速度列或其中有NaN时，由位置/速度的中心差分补齐；
+    没有力矩列时力矩为0。DO动作放到时间上最近的点，多个动作落在同一点时端口合并、后面的状态覆盖前面的。
+    """
+    if not period > 0:
+        raise TrajectoryFormatError(f"周期必须大于0，实际为 {period}")
+    axes = columns["position"].shape[1]
+    left, weight = _interpolation(ts, period)
+    rows = len(left)
+
+    # 各类数据直接插值到预分配数组的对应列，不再先拼接
+    data = np.zeros((rows, 4 * axes), dtype=np.float64)
+    for slot, kind in enumerate(KINDS):
+        if kind in columns:
+            _interpolate(columns[kind], left, weight, data[:, slot * axes:(slot + 1) * axes])
+    for slot in (1, 2):
+        target = data[:, slot * axes:(slot + 1) * axes]
+        missing = np.isnan(target) if KINDS[slot] in columns else None
+        if missing is not None and not missing.any() or rows < 2:
+            continue
+        derived = np.gradient(data[:, (slot - 1) * axes:slot * axes], period, axis=0)
+        if missing is None:
+            target[:] = derived
+        else:
+            np.copyto(target, derived, where=missing)
+
+    out_ports = np.zeros(rows, dtype=np.int64)
+    out_values = np.zeros(rows, dtype=np.int64)
+    events = np.flatnonzero(do_ports)
+    targets = np.clip(np.rint((ts[events] - ts[0]) / period).astype(np.int64), 0, rows - 1)
+    for source, target in zip(events.tolist(), targets.tolist()):
+        ports = int(do_ports[source])
+        out_ports[target] |= ports
+        out_values[target] = (int(out_values[target]) & ~ports) | int(do_values[source])
+    return Trajectory(period, data[0, :axes].copy(), data, out_ports, out_values)
+
+
+def compile_csv(path, period=DEFAULT_PERIOD, chunk_bytes=CHUNK_BYTES):
+    """把带时间戳的轨迹CSV转换为 Trajectory，见 read_trajectory_csv 和 build_trajectory"""
+    return build_trajectory(*read_trajectory_csv(path, chunk_bytes), period)
+
+
+def _format_tables():
+    # 符号和整数部分: 序号为 负号 × 1000 + 整数部分，右对齐到4个字节，前面补0字节
+    leading = np.zeros((2000, 4), dtype=np.uint8)
+    for value in range(2000):
+        text = (b"-" if value >= 1000 else b"") + b"%d" % (value % 1000)
+        leading[value, 4 - len(text):] = list(text)
+    # 小数部分: "." + 6位数字 + " "，共8个字节
+    fraction = np.empty((1000000, 8), dtype=np.uint8)
+    fraction[:, 0] = ord(".")
+    fraction[:, 7] = ord(" ")
+    digits = np.arange(1000000, dtype=np.int64)
+    for place in range(6, 0, -1):
+        digits, fraction[:, place] = np.divmod(digits, 10)
+    fraction[:, 1:7] += ord("0")
+    # 按 uint32/uint64 查表后直接拼成每个数值12字节的定长记录
+    return leading.view("<u4").ravel(), fraction.view("<u8").ravel()
+
+
+_FORMAT_TABLES = None
+
+
+def format_values(values):
+    """把 (点数, 列数) 的数组格式化为空格分隔的 "%.6f" 文本（每个数值后带一个空格，不含换行）
+
+    每个数值拼成 [符号和整数部分4字节, ".", 小数6位, " "] 的12字节定长记录（两次查表），
+    整数部分的前导位置为0字节，写文件前删除。
+
+    返回:
+        numpy.ndarray: (点数, 列数 × 12) 的 uint8 数组；有数值的整数部分超过3位时返回 None
+    """
+    global _FORMAT_TABLES
+    if _FORMAT_TABLES is None:
+        _FORMAT_TABLES = _format_tables()
+    leading, fraction = _FORMAT_TABLES
+    rows, columns = values.shape
+    scaled = np.rint(values * 1e6).astype(np.int64)
+    negative = scaled < 0
+    np.abs(scaled, out=scaled)
+    whole = scaled // 1000000
+    scaled -= whole * 1000000
+    if whole.size and whole.max() >= 1000:
+        return None
+    whole += negative * 1000
+    words = np.empty((rows, columns, 3), dtype="<u4")
+    words[:, :, 0] = leading[whole]
+    words[:, :, 1:].view("<u8")[:, :, 0] = fraction[scaled]
+    return words.view(np.uint8).reshape(rows, columns * 12)
+
+
+def _do_fields(do_ports, do_values):
+    """每个点的DO字段文本（含换行），返回 (不同文本组成的表, 每个点对应的表行号)"""
+    texts = [b"-1 0\n"]
+    codes = np.zeros(len(do_ports), dtype=np.int64)
+    seen = {}
+    for row in np.flatnonzero(do_ports).tolist():
+        ports = _mask_bits(int(do_ports[row]))
+        values = int(do_values[row])
+        states = [(values >> port) & 1 for port in ports]
+        state_text = str(states[0]) if len(set(states)) == 1 else "|".join(map(str, states))
+        text = ("|".join(map(str, ports)) + " " + state_text + "\n").encode()
+        if text not in seen:
+            seen[text] = len(texts)
+            texts.append(text)
+        codes[row] = seen[text]
+    width = max(len(text) for text in texts)
+    table = np.zeros((len(texts), width), dtype=np.uint8)
+    for code, text in enumerate(texts):
+        table[code, :len(text)] = list(text)
+    return table, codes
+
+
+def write_trajectory(path, trajectory, block_rows=WRITE_BLOCK_ROWS):
+    """把 Trajectory 写成 .trajectory 文件，数值保留6位小数"""
+    if not np.isfinite(trajectory.data[:, :4 * trajectory.axes]).all():
+        raise TrajectoryFormatError("轨迹中存在NaN或无穷大，不能写入文件")
+    table, codes = _do_fields(trajectory.do_ports, trajectory.do_values)
+    with open(path, "wb") as stream:
+        stream.write(b"%d %.6f %d\n" % (trajectory.axes, trajectory.period, trajectory.rows))
+        stream.write((" ".join("%.6f" % value for value in trajectory.start_pose.tolist()) + "\n").encode())
+        for start in range(0, trajectory.rows, block_rows):
+            end = min(start + block_rows, trajectory.rows)
+            values = trajectory.data[start:end, :4 * trajectory.axes]
+            text = format_values(values)
+            if text is None:
+                # 整数部分超过3位（例如力矩很大）的块逐行格式化
+                stream.write(b"".join(
+                    ("".join("%.6f " % value for value in row)).encode() + table[code].tobytes().rstrip(b"\0")
+                    for row, code in zip(values.tolist(), codes[start:end].tolist())))
+                continue
+            text = np.concatenate((text, table[codes[start:end]]), axis=1)
+            stream.write(text.tobytes().translate(None, b"\0"))
+
+
+def inspect_trajectory_file(path: str, joint_limits=None, max_velocity=None, max_acceleration=None, max_torque=None):
+    """解析、统计并校验本地的离线轨迹文件
+
+    参数:
+        path: 服务器本地的 .trajectory 文件路径
+        joint_limits: 每个轴的 [下限, 上限]（弧度），默认 ±2π
+        max_velocity: 速度上限（弧度/秒），单个值或每轴一个值，默认 2π
+        max_acceleration: 加速度上限（弧度/秒²），单个值或每轴一个值，默认 30
+        max_torque: 力矩上限，单个值或每轴一个值，默认不检查
+
+    返回:
+        str: JSON格式的结果，summary 为统计信息，issues 为校验发现的问题，valid 表示是否通过校验
+    """
+    if np is None:
+        return error("解析轨迹文件需要安装numpy: pip install \"agilebot-mcp[analysis]\"")
+    try:
+        trajectory = load_trajectory(path)
+        issues = trajectory.validate(
+            joint_limits,
+            DEFAULT_MAX_VELOCITY if max_velocity is None else max_velocity,
+            DEFAULT_MAX_ACCELERATION if max_acceleration is None else max_acceleration,
+            max_torque
+        )
+        logger.info("解析轨迹文件成功: %s, 点数: %s, 问题数: %s", path, trajectory.rows, len(issues))
+        return encode({
+            "status": "success",
+            "path": path,
+            "valid": not issues,
+            "summary": trajectory.summary(),
+            "issues": issues,
+        })
+    except FileNotFoundError:
+        return error(f"轨迹文件不存在: {path}")
+    except TrajectoryFormatError as e:
+        return error(f"轨迹文件格式错误: {str(e)}")
+    except Exception as e:
+        logger.error("解析轨迹文件时发生异常: %s, 异常信息: %s", path, e)
+        return error(f"解析轨迹文件时发生异常: {str(e)}")
+
+
+def compile_trajectory_csv(csv_path: str, output_path: str = None, period: float = DEFAULT_PERIOD,
+                           joint_limits=None, max_velocity=None, max_acceleration=None):
+    """把服务器本地带时间戳的轨迹CSV转换为 .trajectory 文件并校验
+
+    参数:
+        csv_path: CSV文件路径，需要 ts 和 pts_J1... 列，可选 vel_J*、acc_J*、tor_J*、do_port、do_state 列
+        output_path: 输出的 .trajectory 文件路径，默认与CSV同名
+        period: 控制器周期（秒，默认0.001），按此间隔重采样
+        joint_limits: 每个轴的 [下限, 上限]（弧度），默认 ±2π
+        max_velocity: 速度上限（弧度/秒），默认 2π
+        max_acceleration: 加速度上限（弧度/秒²），默认 30
+
+    返回:
+        str: JSON格式的结果，包含输出路径、统计信息和校验问题（有问题时仍然写出文件，valid 为 false）
+    """
+    if np is None:
+        return error("转换轨迹文件需要安装numpy: pip install \"agilebot-mcp[analysis]\"")
+    if output_path is None:
+        output_path = str(Path(csv_path).with_suffix(".trajectory"))
+    try:
+        trajectory = compile_csv(csv_path, period)
+        issues = trajectory.validate(
+            joint_limits,
+            DEFAULT_MAX_VELOCITY if max_velocity is None else max_velocity,
+            DEFAULT_MAX_ACCELERATION if max_acceleration is None else max_acceleration
+        )
+        write_trajectory(output_path, trajectory)
+        logger.info("CSV转换为轨迹文件成功: %s -> %s, 点数: %s, 问题数: %s", csv_path, output_path, trajectory.rows, len(issues))
+        return encode({
+            "status": "success",
+            "csv_path": csv_path,
+            "output_path": output_path,
+            "valid": not issues,
+            "summary": trajectory.summary(),
+            "issues": issues,
+        })
+    except FileNotFoundError:
+        return error(f"CSV文件不存在: {csv_path}")
+    except TrajectoryFormatError as e:
+        return error(f"CSV格式错误: {str(e)}")
+    except Exception as e:
+        logger.error("CSV转换为轨迹文件时发生异常: %s, 异常信息: %s", csv_path, e)
+        return error(f"CSV转换为轨迹文件时发生异常: {str(e)}")